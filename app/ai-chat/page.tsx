@@ -51,6 +51,11 @@ function AICarFinderContent() {
     const [input, setInput] = useState('')
     const [isTyping, setIsTyping] = useState(false)
     const [sessionId] = useState(() => `session-${Date.now()}`)
+    // Server-side session (token issued on the first turn + version): later turns send only the new message
+    const sessionToken = useRef<string | null>(null)
+    const sessionVersion = useRef(0)
+    // Until a response carries sessionVersion (the store may be disabled), every turn sends full history
+    const sessionStored = useRef(false)
     const messagesEndRef = useRef<HTMLDivElement>(null)
     const inputRef = useRef<HTMLTextAreaElement>(null)
     const searchParams = useSearchParams()
@@ -92,16 +97,24 @@ function AICarFinderContent() {
         setIsTyping(true)
 
         try {
-            const response = await fetch('/api/ai-chat', {
+            const send = (withHistory: boolean) => fetch('/api/ai-chat', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({
                     message: textToSend,
                     sessionId,
-                    conversationHistory: updatedMessages
+                    ...(sessionToken.current ? { sessionToken: sessionToken.current } : {}),
+                    sessionVersion: sessionVersion.current,
+                    ...(withHistory ? { conversationHistory: messages.map(({ role, content }) => ({ role, content })) } : {})
                 })
             })
 
+            let response = await send(!sessionStored.current)
+            if (response.status === 409) {
+                // Session expired or out of date - resend the history once to re-seed it
+                response = await send(true)
+            }
+
             // Track message sent
             analytics.trackEvent(AnalyticsEvent.AI_CHAT_MESSAGE_SENT, {
                 message: typeof textToSend === 'string' ? textToSend.substring(0, 50) : 'Image/Audio', // Truncate for privacy/size
@@ -110,6 +123,10 @@ function AICarFinderContent() {
             });
 
             const data = await response.json()
+            // null = the server couldn't store this turn; the next one resyncs
+            sessionVersion.current = typeof data.sessionVersion === 'number' ? data.sessionVersion : -1
+            sessionStored.current = 'sessionVersion' in data
+            if (typeof data.sessionToken === 'string') sessionToken.current = data.sessionToken
 
             const aiMessage: Message = {
                 id: (Date.now() + 1).toString(),
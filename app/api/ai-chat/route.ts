@@ -20,7 +20,8 @@ export async function POST(request: NextRequest) {
 
         const data = await response.json()
 
-        return NextResponse.json(data)
+        // Keep the status: a 409 tells the client to resync its chat session
+        return NextResponse.json(data, { status: response.status })
     } catch (error) {
         console.error('AI Chat API Error:', error)
         return NextResponse.json(
@@ -0,0 +1,107 @@
+/**
+ * AI Chat Route Unit Tests
+ * Tests the chat handler end to end for spec-table answers and session turns
+ */
+
+// No LLM, scraping or vector search - spec answers must not need them
+jest.mock('../../server/ai-engine/ai-adapter', () => ({
+    chatCompletion: jest.fn(),
+    hasLLMProvider: () => false,
+    getLLMRouterStats: () => ({})
+}))
+jest.mock('../../server/ai-engine/web-scraper', () => ({
+    getCarIntelligence: jest.fn(),
+    getCachedIntelligence: jest.fn()
+}))
+jest.mock('../../server/ai-engine/rag-system', () => ({
+    handleQuestionWithRAG: jest.fn()
+}))
+jest.mock('../../server/ai-engine/vector-store', () => ({
+    hybridCarSearch: jest.fn(),
+    initializeVectorStore: jest.fn(),
+    getVectorStoreStats: () => ({})
+}))
+jest.mock('../../server/config/redis-config', () => ({
+    getCacheRedisClient: () => null,
+    getSessionRedisClient: () => null
+}))
+jest.mock('../../server/middleware/redis-cache', () => ({
+    getRedisClient: () => null
+}))
+
+let mockSpecTable: any = null
+jest.mock('../../server/services/spec-table', () => ({
+    ...jest.requireActual('../../server/services/spec-table'),
+    getSpecTable: () => mockSpecTable
+}))
+
+let mockSessionStoreEnabled = true
+jest.mock('../../server/ai-engine/chat-session', () => ({
+    ...jest.requireActual('../../server/ai-engine/chat-session'),
+    isChatSessionStoreEnabled: () => mockSessionStoreEnabled
+}))
+
+import aiChatHandler from '../../server/routes/ai-chat'
+import { buildSpecTable } from '../../server/services/spec-table'
+
+function fakeResponse() {
+    const res: any = { statusCode: 200, headers: {} as Record<string, string>, body: undefined }
+    res.set = (name: string, value: string) => { res.headers[name] = value; return res }
+    res.status = (code: number) => { res.statusCode = code; return res }
+    res.type = () => res
+    res.send = (payload: string) => { res.body = JSON.parse(payload); return res }
+    res.json = (payload: any) => { res.body = payload; return res }
+    return res
+}
+
+describe('AI Chat Route - Spec answers', () => {
+    beforeAll(() => {
+        mockSpecTable = buildSpecTable(
+            [{ id: 'swift', name: 'Swift', brandId: 'maruti' }],
+            [
+                { modelId: 'swift', name: 'Swift LXi', price: 649000 },
+                { modelId: 'swift', name: 'Swift ZXi Plus AMT', price: 964000 }
+            ],
+            new Map([['maruti', 'Maruti Suzuki']])
+        )
+    })
+
+    it('should return the resolved model in cars for "<model> price"', async () => {
+        const res = fakeResponse()
+        await aiChatHandler({ method: 'POST', body: { message: 'swift price' } } as any, res)
+
+        expect(res.statusCode).toBe(200)
+        expect(res.headers['X-AI-Route']).toBe('spec')
+        expect(res.body.reply).toContain('Swift')
+        expect(res.body.cars).toEqual([
+            { id: 'swift', name: 'Swift', brandName: 'Maruti Suzuki', minPrice: 649000, maxPrice: 964000 }
+        ])
+    })
+})
+
+describe('AI Chat Route - Session store disabled', () => {
+    beforeAll(() => { mockSessionStoreEnabled = false })
+    afterAll(() => { mockSessionStoreEnabled = true })
+
+    it('should ask for a resync instead of answering a delta turn without history', async () => {
+        const res = fakeResponse()
+        await aiChatHandler({ method: 'POST', body: { message: 'swift price', sessionVersion: 2 } } as any, res)
+
+        expect(res.statusCode).toBe(409)
+        expect(res.headers['X-Chat-Session']).toBe('resync')
+        expect(res.body).toMatchObject({ code: 'disabled', resync: true })
+    })
+
+    it('should answer a full-history turn without issuing a session', async () => {
+        const res = fakeResponse()
+        await aiChatHandler({
+            method: 'POST',
+            body: { message: 'swift price', sessionVersion: 2, conversationHistory: [{ role: 'user', content: 'hi' }] }
+        } as any, res)
+
+        expect(res.statusCode).toBe(200)
+        expect(res.body.reply).toContain('Swift')
+        expect(res.body).not.toHaveProperty('sessionVersion')
+        expect(res.body).not.toHaveProperty('sessionToken')
+    })
+})
@@ -0,0 +1,117 @@
+/**
+ * Chat Session Store Unit Tests
+ * Tests tokens, version checks, expiry, forced re-seeds and size caps
+ */
+
+// In-process tier only
+jest.mock('../../server/config/redis-config', () => ({
+    getSessionRedisClient: jest.fn(() => null)
+}))
+
+import {
+    appendTurn,
+    issueSessionToken,
+    loadSession,
+    verifySessionToken
+} from '../../server/ai-engine/chat-session'
+
+const turn = { message: 'creta or seltos?', reply: 'Both are good, what is your budget?' }
+
+function history(pairs: number, size = 10) {
+    return Array.from({ length: pairs }, (_, i) => [
+        { role: 'user' as const, content: `q${i} ${'x'.repeat(size)}` },
+        { role: 'ai' as const, content: `a${i} ${'y'.repeat(size)}` }
+    ]).flat()
+}
+
+describe('Chat Session - Tokens', () => {
+    it('should accept tokens it issued and map them to their store key', () => {
+        const { token, key } = issueSessionToken()
+        expect(verifySessionToken(token)).toBe(key)
+        expect(issueSessionToken().key).not.toBe(key)
+    })
+
+    it('should reject client-chosen ids and tampered tokens', () => {
+        const { token } = issueSessionToken()
+        const [key, signature] = token.split('.')
+
+        expect(verifySessionToken(`session-${Date.now()}`)).toBeNull()
+        expect(verifySessionToken(`other.${signature}`)).toBeNull()
+        expect(verifySessionToken(`${key}.${signature.slice(1)}x`)).toBeNull()
+        expect(verifySessionToken(undefined)).toBeNull()
+    })
+})
+
+describe('Chat Session - Load / append', () => {
+    afterEach(() => {
+        jest.useRealTimers()
+    })
+
+    it('should start an empty session at version 0 and append turns', async () => {
+        const { key } = issueSessionToken()
+        const start = await loadSession(key, 0)
+        expect(start.status).toBe('hit')
+
+        expect(await appendTurn(key, { version: 0, history: [] }, turn)).toBe(1)
+
+        const lookup = await loadSession(key, 1)
+        expect(lookup.status).toBe('hit')
+        if (lookup.status === 'hit') {
+            expect(lookup.session.history.map(e => e.role)).toEqual(['user', 'ai'])
+        }
+    })
+
+    it('should report a version mismatch without the stored version', async () => {
+        const { key } = issueSessionToken()
+        await appendTurn(key, { version: 0, history: [] }, turn)
+
+        expect(await loadSession(key, 0)).toEqual({ status: 'version_mismatch' })
+        expect(await loadSession(key, 7)).toEqual({ status: 'version_mismatch' })
+    })
+
+    it('should refuse a stale write unless forced', async () => {
+        const { key } = issueSessionToken()
+        await appendTurn(key, { version: 0, history: [] }, turn)
+        await appendTurn(key, { version: 1, history: history(1) }, turn)
+
+        // A second tab still on version 1
+        expect(await appendTurn(key, { version: 1, history: history(1) }, turn)).toBeNull()
+
+        // Re-seed with the full history (the token holder's resync)
+        expect(await appendTurn(key, { version: 4, history: history(3) }, turn, true)).toBe(5)
+        const lookup = await loadSession(key, 5)
+        expect(lookup.status === 'hit' && lookup.session.history).toHaveLength(8)
+    })
+
+    it('should expire sessions after the TTL', async () => {
+        jest.useFakeTimers()
+        const { key } = issueSessionToken()
+        await appendTurn(key, { version: 0, history: [] }, turn)
+
+        jest.advanceTimersByTime(1800 * 1000 + 1)
+
+        expect(await loadSession(key, 1)).toEqual({ status: 'expired' })
+    })
+
+    it('should cap history entries, dropping whole pairs from the front', async () => {
+        const { key } = issueSessionToken()
+        await appendTurn(key, { version: 0, history: history(30) }, turn)
+
+        const lookup = await loadSession(key, 1)
+        if (lookup.status !== 'hit') throw new Error('expected a hit')
+        expect(lookup.session.history).toHaveLength(40)
+        expect(lookup.session.history[0]).toMatchObject({ role: 'user', content: expect.stringMatching(/^q11 /) })
+        expect(lookup.session.history[39].content).toBe(turn.reply)
+    })
+
+    it('should cap stored bytes', async () => {
+        const { key } = issueSessionToken()
+        await appendTurn(key, { version: 0, history: history(8, 5000) }, turn)
+
+        const lookup = await loadSession(key, 1)
+        if (lookup.status !== 'hit') throw new Error('expected a hit')
+        expect(JSON.stringify(lookup.session).length).toBeLessThanOrEqual(64 * 1024)
+        expect(lookup.session.history.length).toBeLessThan(18)
+        expect(lookup.session.history[lookup.session.history.length - 1].content).toBe(turn.reply)
+    })
+})
@@ -0,0 +1,104 @@
+/**
+ * Comparison Materializer Unit Tests
+ * Tests query matching and invalidation during a refresh
+ */
+
+// Fake catalog: Creta, Seltos and Grand Vitara (COMPETITORS pairs them up)
+const mockCatalog: Record<string, any[]> = {
+    models: [
+        { id: 'm1', name: 'Creta', brandId: 'b1', bodyType: 'SUV' },
+        { id: 'm2', name: 'Seltos', brandId: 'b2', bodyType: 'SUV' },
+        { id: 'm3', name: 'Grand Vitara', brandId: 'b3', bodyType: 'SUV' }
+    ],
+    brands: [{ id: 'b1', name: 'Hyundai' }, { id: 'b2', name: 'Kia' }, { id: 'b3', name: 'Maruti Suzuki' }],
+    popularcomparisons: [{ model1Id: 'm2', model2Id: 'm3', order: 1 }],
+    variants: [
+        { modelId: 'm1', price: 1100000, fuelType: 'Petrol' },
+        { modelId: 'm2', price: 1090000, fuelType: 'Diesel' },
+        { modelId: 'm3', price: 1150000, fuelType: 'Hybrid' }
+    ]
+}
+let mockBeforeVariantsRead: () => Promise<void> = async () => {}
+
+jest.mock('mongoose', () => ({
+    __esModule: true,
+    default: {
+        connection: {
+            db: {
+                collection: (name: string) => ({
+                    find: () => {
+                        const cursor = {
+                            sort: () => cursor,
+                            toArray: async () => {
+                                if (name === 'variants') await mockBeforeVariantsRead()
+                                return mockCatalog[name]
+                            }
+                        }
+                        return cursor
+                    }
+                })
+            }
+        }
+    }
+}))
+jest.mock('../../server/middleware/redis-cache', () => ({
+    getRedisClient: () => null
+}))
+
+import {
+    findComparisonForQuery,
+    getComparisonMaterializerStats,
+    invalidateComparisonsForModel,
+    refreshComparisons
+} from '../../server/services/comparison-materializer'
+
+describe('Comparison Materializer - Query matching', () => {
+    beforeAll(async () => {
+        await refreshComparisons(true)
+    })
+
+    it('should find the pair when both models are named', () => {
+        const record = findComparisonForQuery('Creta vs Seltos, which is better?')
+
+        expect(record?.key).toBe('creta|seltos')
+        expect(record?.cars.map(car => car.brandName).sort()).toEqual(['Hyundai', 'Kia'])
+    })
+
+    it('should match multi-word names by name or slug', () => {
+        expect(findComparisonForQuery('grand vitara or seltos')?.key).toBe('grand_vitara|seltos')
+        expect(findComparisonForQuery('grand_vitara vs creta')?.key).toBe('creta|grand_vitara')
+    })
+
+    it('should not match when only one model is named', () => {
+        expect(findComparisonForQuery('is the creta worth it')).toBeNull()
+        expect(findComparisonForQuery('creta vs nexon')).toBeNull()
+    })
+})
+
+describe('Comparison Materializer - Invalidation', () => {
+    beforeEach(() => {
+        jest.useFakeTimers()
+    })
+
+    afterEach(() => {
+        mockBeforeVariantsRead = async () => {}
+        jest.clearAllTimers()
+        jest.useRealTimers()
+    })
+
+    it('should keep models edited during a refresh dirty for the next one', async () => {
+        // The edit lands after the refresh snapshotted its dirty set
+        mockBeforeVariantsRead = async () => invalidateComparisonsForModel('m1')
+
+        const first = await refreshComparisons()
+        expect(first.built).toBe(0)
+        expect(getComparisonMaterializerStats().pendingModels).toBe(1)
+
+        mockBeforeVariantsRead = async () => {}
+        const second = await refreshComparisons()
+
+        // Creta's two pairs are rebuilt even though its data fingerprint is unchanged
+        expect(second.built).toBe(2)
+        expect(getComparisonMaterializerStats().pendingModels).toBe(0)
+    })
+})
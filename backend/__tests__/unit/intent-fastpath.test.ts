@@ -0,0 +1,71 @@
+/**
+ * Intent Fast Path Unit Tests
+ * Tests which messages skip the RAG + LLM pipeline
+ */
+
+import { classifyFastPath, formatFastPathHeader } from '../../server/ai-engine/intent-fastpath'
+
+describe('Intent Fast Path - Handled Messages', () => {
+    it.each([
+        ['hello', 'greeting'],
+        ['Hi!', 'greeting'],
+        ['Good morning Karan', 'greeting'],
+        ['thanks a lot', 'thanks'],
+        ['bye', 'farewell'],
+        ['How are you?', 'small_talk'],
+        ['Hey Karan, how are you doing today?', 'small_talk'],
+        ['Tell me a joke', 'small_talk'],
+        ['who are you', 'small_talk'],
+        ["What's 2+2?", 'out_of_domain'],
+        ['12 * 7?', 'out_of_domain'],
+        ['what is 20 - 8', 'out_of_domain'],
+        ["What's the weather today?", 'out_of_domain'],
+        ['Who won the cricket match?', 'out_of_domain']
+    ])('should answer "%s" as %s', (message, intent) => {
+        const decision = classifyFastPath(message)
+        expect(decision.intent).toBe(intent)
+        expect(decision.handled).toBe(true)
+        expect(decision.reply).toBeTruthy()
+    })
+
+    it('should give the same reply for the same message', () => {
+        expect(classifyFastPath('hello').reply).toBe(classifyFastPath('hello').reply)
+    })
+})
+
+describe('Intent Fast Path - Fall Through', () => {
+    it.each([
+        'Best SUV under 15 lakhs',
+        'creta vs seltos',
+        'hi, I need a 7 seater for my family',
+        'is it safe?',
+        'any news on the new launches?',
+        'weather proof seat covers',
+        'tell me more',
+        'ok',
+        'how is it',
+        '10-15',
+        '8 - 12',
+        '5-7?'
+    ])('should send "%s" to the pipeline', (message) => {
+        const decision = classifyFastPath(message)
+        expect(decision.handled).toBe(false)
+        expect(decision.reply).toBeUndefined()
+    })
+
+    it('should treat known car names as car vocabulary', () => {
+        const names = new Set(['thar'])
+        expect(classifyFastPath('thar match score', names).intent).toBe('car')
+        expect(classifyFastPath('thar match score').intent).toBe('out_of_domain')
+    })
+
+    it('should ignore empty and non-string messages', () => {
+        expect(classifyFastPath('').handled).toBe(false)
+        expect(classifyFastPath(undefined).handled).toBe(false)
+    })
+
+    it('should report the decision in the header value', () => {
+        expect(formatFastPathHeader(classifyFastPath('hello'))).toContain('decision=handled')
+        expect(formatFastPathHeader(classifyFastPath('creta price'))).toContain('decision=fallthrough')
+    })
+})
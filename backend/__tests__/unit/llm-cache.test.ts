@@ -0,0 +1,133 @@
+/**
+ * LLM Prompt Cache Unit Tests
+ * Tests key building, memoization, bypass and stats
+ */
+
+// In-process tier only
+jest.mock('../../server/config/redis-config', () => ({
+    getCacheRedisClient: jest.fn(() => null)
+}))
+
+import { getCacheRedisClient } from '../../server/config/redis-config'
+import {
+    memoizeCompletion,
+    buildPromptCacheKey,
+    getLLMCacheStats,
+    clearLLMCache
+} from '../../server/ai-engine/llm-cache'
+
+const call = {
+    model: 'llama-3.1-8b-instant',
+    messages: [{ role: 'user' as const, content: 'Analyze this review' }],
+    params: { temperature: 0.2, maxTokens: 150 }
+}
+
+describe('LLM Cache - Key Building', () => {
+    it('should ignore parameter key order', () => {
+        const reordered = { ...call, params: { maxTokens: 150, temperature: 0.2 } }
+        expect(buildPromptCacheKey(reordered)).toBe(buildPromptCacheKey(call))
+    })
+
+    it('should separate keys by model, params and messages', () => {
+        const key = buildPromptCacheKey(call)
+        expect(buildPromptCacheKey({ ...call, model: 'llama-3.3-70b-versatile' })).not.toBe(key)
+        expect(buildPromptCacheKey({ ...call, params: { temperature: 0.7, maxTokens: 150 } })).not.toBe(key)
+        expect(buildPromptCacheKey({ ...call, messages: 'Analyze this review' })).not.toBe(key)
+    })
+})
+
+describe('LLM Cache - Memoization', () => {
+    beforeEach(() => {
+        clearLLMCache()
+    })
+
+    it('should call the model once for identical prompts', async () => {
+        const fn = jest.fn(async () => ({
+            content: 'positive',
+            usage: { promptTokens: 40, completionTokens: 5, totalTokens: 45 }
+        }))
+
+        const first = await memoizeCompletion(call, fn, { site: 'test' })
+        const second = await memoizeCompletion(call, fn, { site: 'test' })
+
+        expect(fn).toHaveBeenCalledTimes(1)
+        expect(first.cached).toBe(false)
+        expect(second).toMatchObject({ content: 'positive', cached: true })
+
+        const stats = getLLMCacheStats()
+        expect(stats.hitRate).toBe(0.5)
+        expect(stats.tokensSaved).toBe(45)
+        expect(stats.sites.test.memoryHits).toBe(1)
+    })
+
+    it('should bypass non-deterministic calls when requested', async () => {
+        const fn = jest.fn(async () => ({ content: 'sampled' }))
+        const options = { site: 'test', skipNonDeterministic: true }
+
+        await memoizeCompletion(call, fn, options)
+        await memoizeCompletion(call, fn, options)
+
+        expect(fn).toHaveBeenCalledTimes(2)
+        expect(getLLMCacheStats().sites.test.bypassed).toBe(2)
+    })
+
+    it('should not cache empty completions or errors', async () => {
+        const empty = jest.fn(async () => ({ content: '' }))
+        await memoizeCompletion(call, empty, { site: 'test' })
+        await memoizeCompletion(call, empty, { site: 'test' })
+        expect(empty).toHaveBeenCalledTimes(2)
+
+        const failing = jest.fn(async () => { throw new Error('upstream down') })
+        await expect(memoizeCompletion(call, failing, { site: 'test' })).rejects.toThrow('upstream down')
+        expect(getLLMCacheStats().entries).toBe(0)
+    })
+
+    it('should expire entries after the call-site TTL', async () => {
+        const fn = jest.fn(async () => ({ content: 'fresh' }))
+        const now = Date.now()
+        const spy = jest.spyOn(Date, 'now').mockReturnValue(now)
+
+        await memoizeCompletion(call, fn, { site: 'test', ttlSeconds: 1 })
+        spy.mockReturnValue(now + 2000)
+        await memoizeCompletion(call, fn, { site: 'test', ttlSeconds: 1 })
+
+        expect(fn).toHaveBeenCalledTimes(2)
+        spy.mockRestore()
+    })
+})
+
+describe('LLM Cache - Redis tier', () => {
+    beforeEach(() => {
+        clearLLMCache()
+    })
+
+    afterAll(() => {
+        (getCacheRedisClient as jest.Mock).mockReturnValue(null)
+    })
+
+    it('should keep a Redis hit in memory only for the remaining Redis TTL', async () => {
+        let stored: string | null = JSON.stringify({ content: 'from redis' })
+        const redis = {
+            status: 'ready',
+            pipeline: () => {
+                const pipeline = {
+                    get: () => pipeline,
+                    pttl: () => pipeline,
+                    exec: async () => [[null, stored], [null, stored ? 30 : -2]]
+                }
+                return pipeline
+            },
+            setex: jest.fn(async () => 'OK')
+        }
+        ;(getCacheRedisClient as jest.Mock).mockReturnValue(redis)
+        const fn = jest.fn(async () => ({ content: 'fresh' }))
+
+        expect(await memoizeCompletion(call, fn, { site: 'test', ttlSeconds: 3600 })).toMatchObject({ content: 'from redis', cached: true })
+
+        // The Redis entry expires; the in-process copy must not outlive it
+        stored = null
+        await new Promise(resolve => setTimeout(resolve, 50))
+        expect(await memoizeCompletion(call, fn, { site: 'test', ttlSeconds: 3600 })).toMatchObject({ content: 'fresh', cached: false })
+        expect(fn).toHaveBeenCalledTimes(1)
+    })
+})
@@ -0,0 +1,213 @@
+/**
+ * LLM Router Unit Tests
+ * Tests failover, hedging, circuit breaking and concurrency caps
+ */
+
+// ai-adapter pulls in the prompt cache; keep it in-process
+jest.mock('../../server/config/redis-config', () => ({
+    getCacheRedisClient: jest.fn(() => null)
+}))
+
+import { LLMRouter, logicalModel, type LLMProvider } from '../../server/ai-engine/llm-router'
+
+const delay = (ms: number) => new Promise(resolve => setTimeout(resolve, ms))
+
+/**
+ * In-process fake provider with a fixed latency (or failure)
+ */
+function fakeProvider(name: string, latencyMs: number, options: { fail?: boolean, maxConcurrency?: number, model?: string } = {}) {
+    const calls = { started: 0, aborted: 0 }
+    const provider: LLMProvider = {
+        name,
+        model: options.model ?? `${name}-model`,
+        maxConcurrency: options.maxConcurrency ?? 4,
+        complete(_request, signal) {
+            calls.started++
+            return new Promise((resolve, reject) => {
+                const timer = setTimeout(() => {
+                    if (options.fail) reject(new Error(`${name} down`))
+                    else resolve({ content: `${name} reply` })
+                }, latencyMs)
+                signal.addEventListener('abort', () => {
+                    clearTimeout(timer)
+                    calls.aborted++
+                    const error = new Error('aborted')
+                    error.name = 'AbortError'
+                    reject(error)
+                })
+            })
+        }
+    }
+    return { provider, calls }
+}
+
+const request = { messages: [{ role: 'user' as const, content: 'creta price' }] }
+
+describe('LLM Router - Failover', () => {
+    it('should fail over to the next provider when the first errors', async () => {
+        const broken = fakeProvider('broken', 5, { fail: true })
+        const healthy = fakeProvider('healthy', 5)
+        const router = new LLMRouter([broken.provider, healthy.provider], { defaultHedgeDelayMs: 1000 })
+
+        const result = await router.complete({ ...request, model: 'broken-model' })
+
+        expect(result.provider).toBe('healthy')
+        expect(broken.calls.started).toBe(1)
+    })
+
+    it('should reject when every provider fails', async () => {
+        const a = fakeProvider('a', 1, { fail: true })
+        const b = fakeProvider('b', 1, { fail: true })
+        const router = new LLMRouter([a.provider, b.provider])
+
+        await expect(router.complete(request)).rejects.toThrow('All LLM providers failed')
+    })
+})
+
+describe('LLM Router - Hedging', () => {
+    it('should fire a backup after the hedge delay and cancel the loser', async () => {
+        const slow = fakeProvider('slow', 200, { model: 'llama-8b' })
+        const fast = fakeProvider('fast', 10, { model: 'llama-8b' })
+        const router = new LLMRouter([slow.provider, fast.provider], {
+            defaultHedgeDelayMs: 20,
+            minHedgeDelayMs: 20
+        })
+
+        const result = await router.complete({ ...request, model: 'llama-8b' })
+        await delay(5)
+
+        expect(result.provider).toBe('fast')
+        expect(result.hedged).toBe(true)
+        expect(slow.calls.aborted).toBe(1)
+
+        // The cancelled loser must not count as a failure
+        const slowStats = router.getStats().find(s => s.provider === 'slow')!
+        expect(slowStats.failures).toBe(0)
+        expect(slowStats.active).toBe(0)
+    })
+
+    it('should only hedge on providers serving the requested model', async () => {
+        const slow = fakeProvider('slow', 60, { model: 'llama-8b' })
+        const bigger = fakeProvider('bigger', 1, { model: 'llama-70b' })
+        const router = new LLMRouter([slow.provider, bigger.provider], {
+            defaultHedgeDelayMs: 5,
+            minHedgeDelayMs: 5
+        })
+
+        const result = await router.complete({ ...request, model: 'llama-8b' })
+
+        expect(result.provider).toBe('slow')
+        expect(result.hedged).toBe(false)
+        expect(bigger.calls.started).toBe(0)
+    })
+
+    it('should still fail over to another model', async () => {
+        const broken = fakeProvider('broken', 1, { fail: true, model: 'llama-8b' })
+        const bigger = fakeProvider('bigger', 1, { model: 'llama-70b' })
+        const router = new LLMRouter([broken.provider, bigger.provider], { defaultHedgeDelayMs: 1000 })
+
+        const result = await router.complete({ ...request, model: 'llama-8b' })
+
+        expect(result.model).toBe('llama-70b')
+    })
+
+    it('should not hedge when disabled for the request', async () => {
+        const slow = fakeProvider('slow', 50)
+        const fast = fakeProvider('fast', 1)
+        const router = new LLMRouter([slow.provider, fast.provider], {
+            defaultHedgeDelayMs: 5,
+            minHedgeDelayMs: 5
+        })
+
+        const result = await router.complete({ ...request, model: 'slow-model', hedge: false })
+
+        expect(result.provider).toBe('slow')
+        expect(fast.calls.started).toBe(0)
+    })
+})
+
+describe('LLM Router - Shipped providers', () => {
+    let providers: LLMProvider[] = []
+
+    beforeAll(() => {
+        // Provider clients read their keys at import time
+        process.env.GROQ_API_KEY = 'test'
+        process.env.HF_API_KEY = 'test'
+        process.env.LLM_PROVIDERS = 'groq,ollama,huggingface'
+        providers = require('../../server/ai-engine/ai-adapter').buildProviders()
+    })
+
+    afterAll(() => {
+        delete process.env.GROQ_API_KEY
+        delete process.env.HF_API_KEY
+        delete process.env.LLM_PROVIDERS
+    })
+
+    it('should map every shipped model to a logical model shared with another provider', () => {
+        const logical = providers.map(p => logicalModel(p.model))
+        expect(logical).toEqual(['llama-8b', 'llama-70b', 'llama-8b', 'llama-70b'])
+    })
+
+    it('should hedge the small model from Groq onto Ollama, not onto a 70B model', async () => {
+        // Same providers and models, fake transports
+        const latency: Record<string, number> = { 'groq:llama-3.1-8b-instant': 200, 'ollama:llama3.1:8b': 10 }
+        const started: string[] = []
+        const fakes = providers.map(p => fakeProvider(p.name, latency[`${p.name}:${p.model}`] ?? 1, { model: p.model }))
+        fakes.forEach(fake => {
+            const complete = fake.provider.complete
+            fake.provider.complete = (req, signal) => {
+                started.push(`${fake.provider.name}:${fake.provider.model}`)
+                return complete(req, signal)
+            }
+        })
+        const router = new LLMRouter(fakes.map(f => f.provider), { defaultHedgeDelayMs: 20, minHedgeDelayMs: 20 })
+
+        const result = await router.complete({ ...request, model: 'llama-3.1-8b-instant' })
+
+        expect(result.provider).toBe('ollama')
+        expect(result.hedged).toBe(true)
+        expect(started).toEqual(['groq:llama-3.1-8b-instant', 'ollama:llama3.1:8b'])
+    })
+})
+
+describe('LLM Router - Circuit Breaker', () => {
+    it('should open after consecutive failures and probe after cooldown', async () => {
+        const flaky = fakeProvider('flaky', 1, { fail: true })
+        const backup = fakeProvider('backup', 1)
+        const router = new LLMRouter([flaky.provider, backup.provider], {
+            failureThreshold: 2,
+            cooldownMs: 30,
+            defaultHedgeDelayMs: 1000
+        })
+
+        await router.complete({ ...request, model: 'flaky-model' })
+        await router.complete({ ...request, model: 'flaky-model' })
+        expect(router.getStats().find(s => s.provider === 'flaky')!.circuit).toBe('open')
+
+        // While open, flaky is skipped entirely
+        await router.complete({ ...request, model: 'flaky-model' })
+        expect(flaky.calls.started).toBe(2)
+
+        // After cooldown a single half-open probe is allowed
+        await delay(40)
+        await router.complete({ ...request, model: 'flaky-model' })
+        expect(flaky.calls.started).toBe(3)
+        expect(router.getStats().find(s => s.provider === 'flaky')!.circuit).toBe('open')
+    })
+})
+
+describe('LLM Router - Concurrency Caps', () => {
+    it('should route around a provider at its concurrency cap', async () => {
+        const capped = fakeProvider('capped', 30, { maxConcurrency: 1 })
+        const spare = fakeProvider('spare', 30)
+        const router = new LLMRouter([capped.provider, spare.provider], { defaultHedgeDelayMs: 1000 })
+
+        const results = await Promise.all([
+            router.complete({ ...request, model: 'capped-model' }),
+            router.complete({ ...request, model: 'capped-model' })
+        ])
+
+        expect(results.map(r => r.provider).sort()).toEqual(['capped', 'spare'])
+        expect(capped.calls.started).toBe(1)
+    })
+})
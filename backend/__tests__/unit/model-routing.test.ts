@@ -0,0 +1,89 @@
+/**
+ * Model Routing Unit Tests
+ * Tests tier selection and context budgeting
+ */
+
+import {
+    selectRoute,
+    isTrivialMessage,
+    applyContextBudget,
+    recordRouteOutcome,
+    getRouteStats,
+    resetRouteStats,
+    ROUTE_POLICIES
+} from '../../server/ai-engine/model-routing'
+
+describe('Model Routing - Tier Selection', () => {
+    it('should send greetings to the trivial tier', () => {
+        const route = selectRoute({ message: 'Hello!', queryType: 'general', entities: [] })
+        expect(route.tier).toBe('trivial')
+        expect(route.compactPrompt).toBe(true)
+        expect(route.contextBudgetChars).toBe(0)
+    })
+
+    it('should not treat a greeting with a car name as trivial', () => {
+        expect(isTrivialMessage('hi', ['Creta'])).toBe(false)
+    })
+
+    it('should route single-car spec lookups to the structured tier', () => {
+        const route = selectRoute({ message: 'airbags in punch', queryType: 'safety', entities: ['Punch'] })
+        expect(route.tier).toBe('structured')
+        expect(route.model).toBe(ROUTE_POLICIES.structured.model)
+    })
+
+    it('should route multi-car comparisons to the large model', () => {
+        const route = selectRoute({ message: 'creta vs seltos', queryType: 'comparison', entities: ['Creta', 'Seltos'] })
+        expect(route.tier).toBe('complex')
+        expect(route.model).toBe(ROUTE_POLICIES.complex.model)
+    })
+
+    it('should route ownership-cost consultations to the complex tier', () => {
+        const route = selectRoute({ message: '5 year TCO of nexon ev', queryType: 'price', entities: ['Nexon'] })
+        expect(route.tier).toBe('complex')
+    })
+
+    it('should escalate very large contexts', () => {
+        const route = selectRoute({ message: 'suggest a family car', queryType: 'recommendation', entities: [], contextChars: 12000 })
+        expect(route.tier).toBe('complex')
+    })
+
+    it('should fall back to the standard tier', () => {
+        const route = selectRoute({ message: 'suggest a family car', queryType: 'recommendation', entities: [], contextChars: 1500 })
+        expect(route.tier).toBe('standard')
+    })
+})
+
+describe('Model Routing - Context Budget', () => {
+    it('should cut context at a line boundary within budget', () => {
+        const route = selectRoute({ message: 'creta price', queryType: 'price', entities: ['Creta'] })
+        const context = Array.from({ length: 1000 }, (_, i) => `- line ${i}`).join('\n')
+        const trimmed = applyContextBudget(context, route)
+
+        expect(trimmed.length).toBeLessThanOrEqual(route.contextBudgetChars)
+        expect(trimmed.endsWith('\n')).toBe(false)
+        expect(context.startsWith(trimmed)).toBe(true)
+    })
+
+    it('should drop context entirely for trivial turns', () => {
+        const route = selectRoute({ message: 'thanks', queryType: 'general', entities: [] })
+        expect(applyContextBudget('some context', route)).toBe('')
+    })
+})
+
+describe('Model Routing - Outcome Stats', () => {
+    beforeEach(() => {
+        resetRouteStats()
+    })
+
+    it('should aggregate latency and tokens per tier', () => {
+        const trivial = selectRoute({ message: 'hi', queryType: 'general', entities: [] })
+        recordRouteOutcome(trivial, 100, { promptTokens: 50, completionTokens: 10, totalTokens: 60 }, 0, 0)
+        recordRouteOutcome(trivial, 300, undefined, 400, 40)
+
+        const stats = getRouteStats()
+        expect(stats.total).toBe(2)
+        expect(stats.tiers.trivial.avgLatencyMs).toBe(200)
+        expect(stats.tiers.trivial.avgPromptTokens).toBe(75)
+        expect(stats.tiers.trivial.avgCompletionTokens).toBe(10)
+    })
+})
@@ -0,0 +1,199 @@
+/**
+ * News Index Unit Tests
+ * Tests feed parsing, cross-feed dedup, conditional polling, lookups and
+ * picking up another worker's ingestion
+ */
+
+// Active models for runNewsIngestion
+const mockCatalog: Record<string, any[]> = {
+    models: [{ name: 'Punch', brandId: 'tata' }],
+    brands: [{ id: 'tata', name: 'Tata' }]
+}
+let mockRedis: any = null
+
+jest.mock('axios', () => ({
+    __esModule: true,
+    default: { get: jest.fn() }
+}))
+jest.mock('mongoose', () => ({
+    __esModule: true,
+    default: {
+        connection: {
+            db: {
+                collection: (name: string) => ({
+                    find: () => ({ toArray: async () => mockCatalog[name] })
+                })
+            }
+        }
+    }
+}))
+jest.mock('../../server/middleware/redis-cache', () => ({
+    getRedisClient: () => mockRedis
+}))
+
+import axios from 'axios'
+import { feedUrl, lookupNews, modelKey, parseFeed, pollFeeds, runNewsIngestion } from '../../server/services/news-index'
+
+const mockedGet = axios.get as jest.MockedFunction<typeof axios.get>
+
+function rss(items: Array<[string, string, string]>): string {
+    return `<?xml version="1.0"?><rss><channel>${items.map(([title, link, pubDate]) =>
+        `<item><title>${title}</title><link>${link}</link><pubDate>${pubDate}</pubDate>` +
+        `<description>&lt;a href="#"&gt;${title}&lt;/a&gt;</description></item>`).join('')}</channel></rss>`
+}
+
+const SHARED: [string, string, string] = ['SUV sales rise in the festive season', 'https://news.example/suv-sales', 'Mon, 12 Oct 2026 09:00:00 GMT']
+
+const FEEDS: Record<string, string> = {
+    'Hyundai Creta': rss([
+        ['Hyundai Creta waiting period stretches to 8 weeks', 'https://news.example/creta-wait', 'Sun, 18 Oct 2026 09:00:00 GMT'],
+        SHARED
+    ]),
+    'Kia Seltos': rss([
+        ['Kia Seltos recall issued for fuel pump', 'https://news.example/seltos-recall', 'Sat, 17 Oct 2026 09:00:00 GMT'],
+        // Same story syndicated under another link
+        [SHARED[0], 'https://mirror.example/suv-sales', SHARED[2]]
+    ]),
+    'Datsun Go': rss([
+        ['Datsun Go production ends in India', 'https://news.example/go-ends', 'Fri, 16 Oct 2026 09:00:00 GMT']
+    ])
+}
+
+const MODELS = [
+    { key: modelKey('Hyundai', 'Creta'), brand: 'Hyundai', name: 'Creta' },
+    { key: modelKey('Kia', 'Seltos'), brand: 'Kia', name: 'Seltos' }
+]
+
+function serveFeeds() {
+    mockedGet.mockImplementation(async (url: string, config?: any) => {
+        const label = Object.keys(FEEDS).find(name => url === feedUrl(name))!
+        if (config?.headers?.['If-None-Match'] === `"${label}"`) {
+            return { status: 304, headers: {}, data: '' }
+        }
+        return { status: 200, headers: { etag: `"${label}"` }, data: FEEDS[label] }
+    })
+}
+
+// Just enough of ioredis for the ingest lock, generation and feed store
+function fakeRedis(store: Map<string, string>) {
+    return {
+        get: async (key: string) => store.get(key) ?? null,
+        mget: async (keys: string[]) => keys.map(key => store.get(key) ?? null),
+        set: async (key: string, value: string, ...args: any[]) => {
+            if (args.includes('NX') && store.has(key)) return null
+            store.set(key, value)
+            return 'OK'
+        },
+        setex: async (key: string, ttl: number, value: string) => {
+            store.set(key, value)
+            return 'OK'
+        },
+        incr: async (key: string) => {
+            const next = Number(store.get(key) || 0) + 1
+            store.set(key, String(next))
+            return next
+        }
+    }
+}
+
+describe('News Index - Parsing', () => {
+    it('should parse items and strip markup from descriptions', () => {
+        const articles = parseFeed(FEEDS['Hyundai Creta'], 0)
+
+        expect(articles).toHaveLength(2)
+        expect(articles[0].title).toBe('Hyundai Creta waiting period stretches to 8 weeks')
+        expect(articles[0].description).toBe('Hyundai Creta waiting period stretches to 8 weeks')
+        expect(articles[0].publishedAt).toBe(Date.parse('Sun, 18 Oct 2026 09:00:00 GMT'))
+    })
+
+    it('should derive stable ids from the link', () => {
+        expect(parseFeed(FEEDS['Hyundai Creta'])[1].id).toBe(parseFeed(FEEDS['Hyundai Creta'])[1].id)
+        expect(parseFeed(FEEDS['Hyundai Creta'])[1].id).not.toBe(parseFeed(FEEDS['Kia Seltos'])[1].id)
+    })
+})
+
+describe('News Index - Ingestion and lookup', () => {
+    beforeAll(async () => {
+        serveFeeds()
+        await pollFeeds(MODELS)
+    })
+
+    it('should send conditional GETs and count unchanged feeds as 304s', async () => {
+        const result = await pollFeeds(MODELS)
+
+        expect(result).toMatchObject({ feeds: 2, modified: 0, notModified: 2, errors: 0, newArticles: 0 })
+        expect(mockedGet.mock.calls[2][1]?.headers).toMatchObject({ 'If-None-Match': '"Hyundai Creta"' })
+    })
+
+    it('should return the feed of a model named in the query, with freshness', () => {
+        const result = lookupNews('is the creta waiting period long?')
+
+        expect(result?.matched).toBe('model')
+        expect(result?.model).toBe('Hyundai Creta')
+        expect(result?.articles[0].title).toContain('waiting period')
+        expect(result?.stale).toBe(false)
+        expect(result?.ageSeconds).toBeGreaterThanOrEqual(0)
+    })
+
+    it('should keep one copy of a story syndicated across feeds', () => {
+        const creta = lookupNews('Hyundai Creta')!.articles.find(a => a.title === SHARED[0])
+        const seltos = lookupNews('Kia Seltos')!.articles.find(a => a.title === SHARED[0])
+
+        expect(creta).toBeDefined()
+        expect(seltos?.id).toBe(creta?.id)
+    })
+
+    it('should rank articles by shared title words when no model is named', () => {
+        const result = lookupNews('any fuel pump recall news?')
+
+        expect(result?.matched).toBe('keywords')
+        expect(result?.articles[0].title).toBe('Kia Seltos recall issued for fuel pump')
+    })
+
+    it('should return null when nothing matches', () => {
+        expect(lookupNews('zzz qqq')).toBeNull()
+    })
+})
+
+describe('News Index - Model phrases', () => {
+    beforeAll(async () => {
+        serveFeeds()
+        await pollFeeds([...MODELS, { key: modelKey('Datsun', 'Go'), brand: 'Datsun', name: 'Go' }])
+    })
+
+    it('should match everyday-word model names only with the brand', () => {
+        expect(lookupNews('datsun go waiting period')?.model).toBe('Datsun Go')
+        expect(lookupNews('is it a good time to go for an suv?')?.matched).toBe('keywords')
+    })
+})
+
+describe('News Index - Cross-worker ingestion', () => {
+    afterEach(() => {
+        mockRedis = null
+        jest.useRealTimers()
+    })
+
+    it('should pick up the lock holder\'s cycle without waiting a full interval', async () => {
+        jest.useFakeTimers()
+        const store = new Map<string, string>([['news:ingest:lock', 'other-worker']])
+        mockRedis = fakeRedis(store)
+
+        // Another worker holds the lock and has not stored anything yet
+        expect(await runNewsIngestion()).toBeNull()
+        expect(lookupNews('tata punch waiting period')).toBeNull()
+
+        // The holder stores its feeds, then bumps the generation
+        const key = modelKey('Tata', 'Punch')
+        const [article] = parseFeed(rss([['Tata Punch waiting period drops', 'https://news.example/punch-wait', 'Sun, 18 Oct 2026 09:00:00 GMT']]))
+        const state = {
+            key, label: 'Tata Punch', url: feedUrl('Tata Punch'), etag: null, lastModified: null,
+            fetchedAt: Date.now(), checkedAt: Date.now(), failures: 0, articleIds: [article.id]
+        }
+        store.set(`news:feed:${key}`, JSON.stringify({ state, articles: [article] }))
+        store.set('news:generation', '1')
+
+        await jest.advanceTimersByTimeAsync(15000)
+
+        expect(lookupNews('tata punch waiting period')?.articles[0].title).toBe('Tata Punch waiting period drops')
+    })
+})
@@ -0,0 +1,63 @@
+/**
+ * Prompt Accounting Unit Tests
+ * Tests per-section token split and cost
+ */
+
+import { accountPrompt, estimateTokens, formatUsageHeader, PROMPT_SECTIONS } from '../../server/ai-engine/prompt-accounting'
+
+const parts = {
+    system: 'You are Karan, a car consultant. '.repeat(20),
+    history: ['tell me about creta', 'The Creta is a 5 seater SUV priced from ₹11 lakh.'],
+    message: 'what about its mileage?',
+    context: [
+        ['rag', '\n- Creta: 17.4 kmpl petrol, 21.8 kmpl diesel\n'.repeat(5)],
+        ['expert', '\n**🔄 KEY COMPETITORS:** Seltos, Grand Vitara\n'],
+        ['learned', '']
+    ] as Array<['rag' | 'expert' | 'learned', string]>,
+    contextChars: Infinity
+}
+
+const sum = (sections: Record<string, number>) => PROMPT_SECTIONS.reduce((total, s) => total + sections[s], 0)
+
+describe('Prompt Accounting - Section Split', () => {
+    it('should scale section estimates to the provider prompt tokens', () => {
+        const usage = accountPrompt(parts, {
+            model: 'llama-3.1-8b-instant',
+            content: 'Around 17 kmpl.',
+            usage: { promptTokens: 600, completionTokens: 20, totalTokens: 620 }
+        }, 'structured')
+        expect(usage.estimated).toBe(false)
+        expect(sum(usage.sections) + usage.overhead).toBe(600)
+        expect(usage.sections.system).toBeGreaterThan(usage.sections.rag)
+        expect(usage.sections.learned).toBe(0)
+    })
+
+    it('should only count context that survived the route budget', () => {
+        const ragChars = parts.context[0][1].length
+        const usage = accountPrompt({ ...parts, contextChars: ragChars }, { model: 'x', content: '' }, 'structured')
+        expect(usage.sections.rag).toBe(estimateTokens(parts.context[0][1]))
+        expect(usage.sections.expert).toBe(0)
+    })
+
+    it('should fall back to estimates without provider usage', () => {
+        const usage = accountPrompt(parts, { model: 'llama-3.1-8b-instant', content: 'Around 17 kmpl.' }, 'standard')
+        expect(usage.estimated).toBe(true)
+        expect(usage.promptTokens).toBe(sum(usage.sections) + usage.overhead)
+        expect(usage.completionTokens).toBe(estimateTokens('Around 17 kmpl.'))
+    })
+})
+
+describe('Prompt Accounting - Cost', () => {
+    const usage = { promptTokens: 1000, completionTokens: 100, totalTokens: 1100 }
+
+    it('should price tokens per model', () => {
+        const account = accountPrompt(parts, { model: 'llama-3.1-8b-instant', content: '', usage }, 'standard')
+        expect(account.costUsd).toBeCloseTo((1000 * 0.05 + 100 * 0.08) / 1e6, 12)
+        expect(formatUsageHeader(account)).toContain('prompt=1000; completion=100; system=')
+    })
+
+    it('should charge nothing for cache hits and leave unknown models unpriced', () => {
+        expect(accountPrompt(parts, { model: 'llama-3.1-8b-instant', content: '', usage, cached: true }, 'standard').costUsd).toBe(0)
+        expect(accountPrompt(parts, { model: 'local-model', content: '', usage }, 'standard').costUsd).toBeNull()
+    })
+})
@@ -0,0 +1,43 @@
+/**
+ * Query Scrubber Unit Tests
+ * Tests personal data masking for exported chat queries
+ */
+
+import { scrubQuery } from '../../server/ai-engine/query-scrubber'
+
+describe('Query Scrubber - Contact Details', () => {
+    it('should mask emails, phone numbers and registration numbers', () => {
+        expect(scrubQuery('mail me at ravi.k@example.com')).toBe('mail me at <email>')
+        expect(scrubQuery('call +91 98765 43210 after 6')).toBe('call <phone> after 6')
+        expect(scrubQuery('my car is MH 12 AB 1234')).toBe('my car is <regno>')
+    })
+
+    it('should mask labelled and bare PIN codes', () => {
+        expect(scrubQuery('dealers near pin code 400001')).toBe('dealers near pin code <pin>')
+        expect(scrubQuery('dealers near 560034?')).toBe('dealers near <pin>?')
+    })
+
+    it('should keep amounts written with a currency marker', () => {
+        expect(scrubQuery('budget rs 950000 for a hatchback')).toBe('budget rs 950000 for a hatchback')
+        expect(scrubQuery('under ₹800000')).toBe('under ₹800000')
+    })
+})
+
+describe('Query Scrubber - Names', () => {
+    it('should mask "my name is" in any case', () => {
+        expect(scrubQuery('My name is Ravi Kumar, need an SUV')).toBe('My name is <name>, need an SUV')
+        expect(scrubQuery('my name is ravi and I drive daily')).toBe('my name is <name> and I drive daily')
+        expect(scrubQuery('MY NAME IS RAVI')).toBe('MY NAME IS <name>')
+    })
+
+    it('should mask names introduced with "I am" / "I\'m"', () => {
+        expect(scrubQuery("I'm Priya from Pune")).toBe("I'm <name> from Pune")
+        expect(scrubQuery('I am Ravi Kumar.')).toBe('I am <name>.')
+    })
+
+    it('should not treat verbs and adjectives after "I am" as names', () => {
+        expect(scrubQuery('I am Looking for a car')).toBe('I am Looking for a car')
+        expect(scrubQuery("I'm Interested in the Creta")).toBe("I'm Interested in the Creta")
+        expect(scrubQuery('I am Confused between Nexon and Venue')).toBe('I am Confused between Nexon and Venue')
+    })
+})
@@ -0,0 +1,110 @@
+/**
+ * Response Shaping Unit Tests
+ * Tests the compact-mode opt-in and flattening of both car shapes
+ */
+
+import {
+    COMPACT_DEFAULT_FIELDS,
+    compactCars,
+    intelligenceKey,
+    parseResponseShape
+} from '../../server/ai-engine/response-shaping'
+
+// findMatchingCars shape (enriched, intelligence inlined)
+const enriched = {
+    id: 'hyundai-creta-sx',
+    name: 'Creta',
+    brand: 'Hyundai',
+    variant: 'SX',
+    price: 1450000,
+    fuelType: 'Petrol',
+    transmission: 'Manual',
+    image: '/cars/creta.jpg',
+    matchScore: 92,
+    reasons: ['Within budget', '5 seats'],
+    webIntelligence: { totalReviews: 120, commonIssues: ['rattle'] }
+}
+
+// hybridCarSearch shape (vector store entry)
+const vectorEntry = {
+    id: 'model-seltos',
+    score: 0.874,
+    embedding: [0.1, 0.2, 0.3],
+    data: {
+        name: 'Seltos',
+        brandName: 'Kia',
+        minPrice: 1090000,
+        maxPrice: 2050000,
+        fuelTypes: ['Petrol', 'Diesel'],
+        bodyType: 'SUV',
+        heroImage: '/cars/seltos.jpg'
+    }
+}
+
+describe('Response Shaping - Opt-in', () => {
+    it('should keep the full response unless the client opts in', () => {
+        expect(parseResponseShape({ message: 'hi' })).toBeNull()
+        expect(parseResponseShape({ compact: 'yes' })).toBeNull()
+        expect(parseResponseShape(undefined)).toBeNull()
+    })
+
+    it('should use the default fields for compact: true', () => {
+        expect(parseResponseShape({ compact: true })).toEqual({ fields: COMPACT_DEFAULT_FIELDS })
+    })
+
+    it('should accept carFields as an array or a comma-separated string, dropping unknown fields', () => {
+        expect(parseResponseShape({ carFields: ['name', 'price', 'embedding'] })).toEqual({ fields: ['name', 'price'] })
+        expect(parseResponseShape({ carFields: 'name, brand,data' })).toEqual({ fields: ['name', 'brand'] })
+    })
+
+    it('should fall back to the default fields when no requested field is known', () => {
+        expect(parseResponseShape({ carFields: ['embedding'] })).toEqual({ fields: COMPACT_DEFAULT_FIELDS })
+    })
+})
+
+describe('Response Shaping - Compact cars', () => {
+    it('should reference web intelligence instead of inlining it', () => {
+        const [car] = compactCars([enriched], { fields: COMPACT_DEFAULT_FIELDS })
+
+        expect(car).toEqual({
+            id: 'hyundai-creta-sx',
+            name: 'Creta',
+            brand: 'Hyundai',
+            variant: 'SX',
+            price: 1450000,
+            image: '/cars/creta.jpg',
+            matchScore: 92,
+            reasons: ['Within budget', '5 seats'],
+            intelligenceId: 'Hyundai Creta'
+        })
+        expect(car).not.toHaveProperty('webIntelligence')
+    })
+
+    it('should flatten vector store entries and drop the embedding', () => {
+        const [car] = compactCars([vectorEntry], {
+            fields: ['id', 'name', 'brand', 'price', 'priceRange', 'fuelType', 'bodyType', 'image', 'matchScore', 'intelligenceId']
+        })
+
+        expect(car).toEqual({
+            id: 'model-seltos',
+            name: 'Seltos',
+            brand: 'Kia',
+            price: 1090000,
+            priceRange: [1090000, 2050000],
+            fuelType: 'Petrol',
+            bodyType: 'SUV',
+            image: '/cars/seltos.jpg',
+            matchScore: 87
+        })
+    })
+
+    it('should return exactly the requested fields, omitting missing ones', () => {
+        const cars = compactCars([enriched, vectorEntry], { fields: ['name', 'variant'] })
+        expect(cars).toEqual([{ name: 'Creta', variant: 'SX' }, { name: 'Seltos' }])
+    })
+
+    it('should build intelligence ids the scraper cache uses', () => {
+        expect(intelligenceKey('Maruti Suzuki', 'Grand Vitara')).toBe('Maruti Suzuki Grand Vitara')
+        expect(intelligenceKey('', 'Creta')).toBe('Creta')
+    })
+})
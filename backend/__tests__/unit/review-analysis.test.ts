@@ -0,0 +1,94 @@
+/**
+ * Review Analysis Unit Tests
+ * Tests batching, content-hash dedup and per-review reuse
+ */
+
+jest.mock('../../server/ai-engine/ollama-client', () => ({
+    queryOllama: jest.fn()
+}))
+
+import { queryOllama } from '../../server/ai-engine/ollama-client'
+import {
+    analyzeReviews,
+    packBatches,
+    parseBatchResponse,
+    resetReviewAnalysisMemo,
+    reviewHash
+} from '../../server/ai-engine/review-analysis'
+
+const mockedQuery = queryOllama as jest.MockedFunction<typeof queryOllama>
+
+// Answers every numbered review in the prompt, except those matching `drop`
+function answerBatches(drop?: RegExp) {
+    mockedQuery.mockImplementation(async (prompt: string) => {
+        const reviews = [...prompt.matchAll(/^\[(\d+)\] "(.*)"$/gm)]
+        return JSON.stringify(reviews
+            .filter(([, , text]) => !drop || !drop.test(text))
+            .map(([, id, text]) => ({ id: Number(id), sentiment: text.includes('great') ? 'positive' : 'neutral', pros: [], cons: [], issues: [] })))
+    })
+}
+
+beforeEach(() => {
+    mockedQuery.mockReset()
+    resetReviewAnalysisMemo()
+})
+
+describe('Review Analysis - Batching', () => {
+    it('should hash reviews that differ only in case, spacing and punctuation the same', () => {
+        expect(reviewHash('Great  car, LOVE it!!')).toBe(reviewHash('great car love it'))
+        expect(reviewHash('great car')).not.toBe(reviewHash('bad car'))
+    })
+
+    it('should pack reviews by count and characters', () => {
+        const items = Array.from({ length: 10 }, (_, i) => ({ text: `review ${i}` }))
+        expect(packBatches(items, 4).map(batch => batch.length)).toEqual([4, 4, 2])
+    })
+
+    it('should map batch replies by id and drop malformed entries', () => {
+        const parsed = parseBatchResponse('```json\n[{"id": 2, "sentiment": "negative", "cons": ["noise"]}, {"id": 1, "sentiment": "meh"}]\n```', 2)
+        expect(parsed[0]).toBeNull()
+        expect(parsed[1]).toEqual({ sentiment: 'negative', pros: [], cons: ['noise'], issues: [] })
+    })
+})
+
+describe('Review Analysis - Dedup and Reuse', () => {
+    it('should analyze each distinct review once, in batches', async () => {
+        answerBatches()
+        const texts = Array.from({ length: 10 }, (_, i) => `owner review ${i}, great mileage`)
+        texts.push('Owner review 3 - great mileage!')
+
+        const { analyses, stats } = await analyzeReviews('Creta', texts, { batchSize: 4 })
+        expect(mockedQuery).toHaveBeenCalledTimes(3)
+        expect(stats).toMatchObject({ reviews: 11, unique: 10, analyzed: 10, fallback: 0 })
+        expect(analyses).toHaveLength(11)
+        expect(analyses[10]).toEqual(analyses[3])
+
+        const again = await analyzeReviews('Creta', texts, { batchSize: 4 })
+        expect(mockedQuery).toHaveBeenCalledTimes(3)
+        expect(again.stats.persisted).toBe(10)
+    })
+
+    it('should retry reviews missing from a reply and fall back only for the ones that keep failing', async () => {
+        answerBatches(/broken/)
+        const texts = ['first review is great', 'second broken review', 'third review is fine']
+
+        const { analyses, stats } = await analyzeReviews('Nexon', texts, { batchSize: 8 })
+        expect(stats).toMatchObject({ analyzed: 2, fallback: 1 })
+        expect(analyses[0].sentiment).toBe('positive')
+        expect(mockedQuery).toHaveBeenCalledTimes(2)
+
+        // Fallbacks are not kept - the next build asks again
+        await analyzeReviews('Nexon', texts, { batchSize: 8 })
+        expect(mockedQuery).toHaveBeenCalledTimes(3)
+    })
+
+    it('should fall back for the whole batch without splitting when the call fails', async () => {
+        mockedQuery.mockRejectedValue(new Error('Ollama server is not running'))
+        const texts = ['first review is great', 'second review', 'third review', 'fourth review']
+
+        const { analyses, stats } = await analyzeReviews('Venue', texts, { batchSize: 8 })
+        expect(mockedQuery).toHaveBeenCalledTimes(1)
+        expect(stats).toMatchObject({ analyzed: 0, fallback: 4, batches: 1 })
+        expect(analyses).toHaveLength(4)
+    })
+})
@@ -0,0 +1,154 @@
+/**
+ * Single-Flight Coalescing Unit Tests
+ * Tests key building and in-process request coalescing
+ */
+
+// Run without Redis so only the in-process layer is exercised
+jest.mock('../../server/config/redis-config', () => ({
+    getCacheRedisClient: jest.fn(() => null)
+}))
+
+import { getCacheRedisClient } from '../../server/config/redis-config'
+import {
+    coalesce,
+    buildCoalescingKey,
+    normalizeMessage,
+    fingerprintHistory,
+    getSingleFlightStats,
+    resetSingleFlightStats
+} from '../../server/ai-engine/single-flight'
+
+const delay = (ms: number) => new Promise(resolve => setTimeout(resolve, ms))
+
+describe('Single-Flight - Key Building', () => {
+    it('should normalize case, whitespace and trailing punctuation', () => {
+        expect(normalizeMessage('  Tata  Sierra launch DATE?? ')).toBe('tata sierra launch date')
+    })
+
+    it('should produce the same key for equivalent stateless messages', () => {
+        const a = buildCoalescingKey('Tata Sierra launch date?', [])
+        const b = buildCoalescingKey('tata sierra   launch date', [])
+        expect(a).toBe(b)
+    })
+
+    it('should separate keys by conversation history', () => {
+        const history = [{ role: 'user', content: 'hello' }]
+        expect(buildCoalescingKey('creta price', history)).not.toBe(buildCoalescingKey('creta price', []))
+    })
+
+    it('should ignore echoed cars when fingerprinting history', () => {
+        const plain = [{ role: 'ai', content: 'Here you go' }]
+        const withCars = [{ role: 'ai', content: 'Here you go', cars: [{ name: 'Creta' }] }]
+        expect(fingerprintHistory(plain)).toBe(fingerprintHistory(withCars))
+    })
+})
+
+describe('Single-Flight - Coalescing', () => {
+    beforeEach(() => {
+        resetSingleFlightStats()
+    })
+
+    it('should run concurrent duplicates once and share the result', async () => {
+        let executions = 0
+        const pipeline = async () => {
+            executions++
+            await delay(20)
+            return { status: 200, body: { reply: 'Sierra launches soon' } }
+        }
+
+        const results = await Promise.all(
+            Array.from({ length: 5 }, () => coalesce('same-key', pipeline))
+        )
+
+        expect(executions).toBe(1)
+        expect(results.map(r => r.role).filter(r => r === 'leader')).toHaveLength(1)
+        results.forEach(r => expect(r.value.body.reply).toBe('Sierra launches soon'))
+
+        const stats = getSingleFlightStats()
+        expect(stats.pipelineExecutions).toBe(1)
+        expect(stats.fanInRatio).toBe(5)
+    })
+
+    it('should not coalesce different keys', async () => {
+        let executions = 0
+        const pipeline = async () => {
+            executions++
+            await delay(5)
+            return executions
+        }
+
+        await Promise.all([coalesce('key-a', pipeline), coalesce('key-b', pipeline)])
+        expect(executions).toBe(2)
+    })
+
+    it('should run the pipeline again once the previous flight finished', async () => {
+        let executions = 0
+        const pipeline = async () => ++executions
+
+        await coalesce('sequential', pipeline)
+        await coalesce('sequential', pipeline)
+        expect(executions).toBe(2)
+    })
+
+    it('should bound follower wait time and fall back to running itself', async () => {
+        let executions = 0
+        const slow = async () => {
+            executions++
+            await delay(100)
+            return 'slow'
+        }
+
+        const leader = coalesce('bounded', slow, { maxWaitMs: 1000 })
+        const follower = await coalesce('bounded', async () => 'own', { maxWaitMs: 10 })
+
+        expect(follower).toEqual({ value: 'own', role: 'timeout' })
+        expect((await leader).value).toBe('slow')
+        expect(executions).toBe(1)
+    })
+})
+
+describe('Single-Flight - Cross-worker', () => {
+    // Just enough of ioredis for the lease + result protocol
+    const store = new Map<string, string>()
+    const redis = {
+        status: 'ready',
+        set: async (key: string, value: string, ...args: any[]) => {
+            if (args.includes('NX') && store.has(key)) return null
+            store.set(key, value)
+            return 'OK'
+        },
+        get: async (key: string) => store.get(key) ?? null,
+        del: async (key: string) => Number(store.delete(key))
+    }
+
+    beforeEach(() => {
+        store.clear()
+        ;(getCacheRedisClient as jest.Mock).mockReturnValue(redis)
+    })
+
+    afterAll(() => {
+        (getCacheRedisClient as jest.Mock).mockReturnValue(null)
+    })
+
+    it('should wait for the result of the flight another worker is leading', async () => {
+        store.set('sf:lease:remote', 'worker-b:flight-1')
+        setTimeout(() => {
+            store.set('sf:result:worker-b:flight-1', JSON.stringify('from worker b'))
+            store.delete('sf:lease:remote')
+        }, 20)
+
+        const result = await coalesce('remote', async () => 'own', { pollMs: 5, maxWaitMs: 1000 })
+        expect(result).toEqual({ value: 'from worker b', role: 'remote_follower' })
+    })
+
+    it("should not hand a finished flight's result to a later request", async () => {
+        expect(await coalesce('later', async () => 'first')).toEqual({ value: 'first', role: 'leader' })
+
+        // A new flight is running on another worker and has not published yet
+        store.set('sf:lease:later', 'worker-b:flight-2')
+        setTimeout(() => store.delete('sf:lease:later'), 30)
+
+        const result = await coalesce('later', async () => 'second', { pollMs: 5, maxWaitMs: 1000 })
+        expect(result).toEqual({ value: 'second', role: 'timeout' })
+    })
+})
@@ -0,0 +1,103 @@
+/**
+ * Spec Answer Unit Tests
+ * Tests spec-table normalization and direct factual answers
+ */
+
+import { buildSpecTable, normalizeMeasure } from '../../server/services/spec-table'
+import { answerSpecQuery, parseSpecAttributes } from '../../server/ai-engine/spec-answer'
+
+const models = [
+    { id: 'thar', name: 'Thar', brandId: 'mahindra' },
+    { id: 'ertiga', name: 'Ertiga', brandId: 'maruti' },
+    { id: 'crysta', name: 'Innova Crysta', brandId: 'toyota' },
+    { id: 'hycross', name: 'Innova Hycross', brandId: 'toyota' },
+    { id: 'venue', name: 'Venue', brandId: 'hyundai' },
+    { id: 'city', name: 'City', brandId: 'honda' }
+]
+const brands = new Map([
+    ['mahindra', 'Mahindra'], ['maruti', 'Maruti Suzuki'], ['toyota', 'Toyota'], ['hyundai', 'Hyundai'], ['honda', 'Honda']
+])
+const variants = [
+    { modelId: 'thar', name: 'Thar AX Opt', price: 1135000, groundClearance: '226 mm', fuelType: 'Diesel' },
+    { modelId: 'thar', name: 'Thar LX AT', price: 1660000, groundClearance: '226mm', fuelType: 'Petrol' },
+    { modelId: 'ertiga', name: 'Ertiga LXi', price: 869000, bootSpace: '209 Litres', mileageCompanyClaimed: '20.51 kmpl' },
+    { modelId: 'ertiga', name: 'Ertiga VXi CNG', price: 1078000, bootSpace: '209 Litres', mileageCompanyClaimed: '26.11 km/kg' },
+    { modelId: 'crysta', name: 'Crysta GX', price: 1999000, fuelTankCapacity: '55 L' },
+    { modelId: 'hycross', name: 'Hycross G', price: 1977000, fuelTankCapacity: '52 Litres' },
+    { modelId: 'venue', name: 'Venue E', price: 794000, sunroof: 'No', maxPower: '83 PS' },
+    { modelId: 'venue', name: 'Venue SX', price: 1144000, sunroof: 'Electric Sunroof', maxPower: '120 PS' },
+    { modelId: 'city', name: 'City V', price: 1200000, bootSpace: '506 L' }
+]
+const table = buildSpecTable(models, variants, brands)
+
+describe('Spec Table - Unit Normalization', () => {
+    it('should convert specs to canonical units', () => {
+        expect(normalizeMeasure('1.5 L', 'cc')).toBe(1500)
+        expect(normalizeMeasure('115 PS @ 6300 rpm', 'bhp')).toBeCloseTo(113.43, 1)
+        expect(normalizeMeasure('25.5 kgm', 'Nm')).toBeCloseTo(250.07, 1)
+        expect(normalizeMeasure('21 cm', 'mm')).toBe(210)
+    })
+
+    it('should not mix CNG km/kg into kmpl', () => {
+        expect(normalizeMeasure('26.11 km/kg', 'kmpl')).toBeNull()
+    })
+})
+
+describe('Spec Answer - Direct Answers', () => {
+    it('should answer a single-value spec with a citation', () => {
+        const answer = answerSpecQuery('ground clearance of thar', [], table)
+        expect(answer.answered).toBe(true)
+        expect(answer.reply).toContain('226 mm')
+        expect(answer.citations?.[0].url).toBe('/mahindra-cars/thar')
+    })
+
+    it('should return the resolved model as a car with its price range', () => {
+        const answer = answerSpecQuery('innova crysta price', [], table)
+        expect(answer.cars).toEqual([
+            { id: 'crysta', name: 'Innova Crysta', brandName: 'Toyota', minPrice: 1999000, maxPrice: 1999000 }
+        ])
+    })
+
+    it('should give min/max with the variant holding each end', () => {
+        const answer = answerSpecQuery('max power of venue', [], table)
+        expect(answer.reply).toContain('81.9 bhp (Venue E) to 118.4 bhp (Venue SX)')
+    })
+
+    it('should answer feature questions per variant', () => {
+        const answer = answerSpecQuery('does venue have sunroof', [], table)
+        expect(answer.reply).toContain('Yes, on 1 of 2 variants, from the Venue SX (Electric Sunroof)')
+    })
+
+    it('should answer every model behind an ambiguous name', () => {
+        const answer = answerSpecQuery('fuel tank capacity of innova', [], table)
+        expect(answer.models).toEqual(['Toyota Innova Crysta', 'Toyota Innova Hycross'])
+    })
+
+    it('should resolve "it" from the previous turns', () => {
+        const answer = answerSpecQuery('Exact boot space in liters?', [{ content: 'Tell me about the Ertiga' }], table)
+        expect(answer.reply).toContain('209 L')
+    })
+
+    it('should match generic model names only with the brand', () => {
+        expect(answerSpecQuery('boot space of honda city', [], table).answered).toBe(true)
+        expect(answerSpecQuery('boot space in city driving', [], table).reason).toBe('no_entity')
+    })
+})
+
+describe('Spec Answer - Fall Through', () => {
+    it('should leave opinions and comparisons to the consultant', () => {
+        expect(answerSpecQuery('How is the mileage of Ertiga in Mumbai traffic?', [], table).reason).toBe('consultant')
+        expect(answerSpecQuery('Compare ground clearance of Thar vs Ertiga', [], table).reason).toBe('consultant')
+    })
+
+    it('should fall through on unknown attributes and missing values', () => {
+        expect(answerSpecQuery('is the thar good for kids', [], table).reason).toBe('no_attribute')
+        expect(answerSpecQuery('top speed of thar', [], table).reason).toBe('no_data')
+        expect(answerSpecQuery('ground clearance of thar', [], null).reason).toBe('no_table')
+    })
+
+    it('should not read "engine power" or "price range" as two specs', () => {
+        expect(parseSpecAttributes('engine power of fortuner')).toEqual(['power'])
+        expect(parseSpecAttributes('price range of venue')).toEqual(['price'])
+    })
+})
@@ -0,0 +1,135 @@
+import mongoose from 'mongoose';
+import dotenv from 'dotenv';
+import path from 'path';
+import crypto from 'crypto';
+import fs from 'fs';
+import { fileURLToPath } from 'url';
+import { AIInteraction } from '../server/ai-engine/self-learning';
+import { scrubQuery } from '../server/ai-engine/query-scrubber';
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = path.dirname(__filename);
+dotenv.config({ path: path.resolve(__dirname, '../.env') });
+
+const MONGODB_URI = process.env.MONGODB_URI || 'mongodb://127.0.0.1:27017/gadizone';
+
+/**
+ * Export a time window of logged AI chat interactions for replay
+ *
+ * Output is JSONL: a header line, then one line per interaction in arrival order
+ *   {"t": ms since window start, "s": session, "q": query, "k": queryType, "rt": recorded responseTimeMs}
+ *
+ * Always anonymized: session ids are replaced by salted hashes, emails, phone
+ * numbers, vehicle registration numbers, PIN codes and self-introduced names
+ * are masked in the query text (server/ai-engine/query-scrubber.ts), and responses / RAG context / feedback text
+ * are not exported at all. The salt is random per export unless
+ * REPLAY_ANON_SALT is set (same salt = same session hashes across exports).
+ *
+ * Usage:
+ *   tsx scripts/export-ai-interactions.ts --since 24h --out replay.jsonl
+ *   tsx scripts/export-ai-interactions.ts --since 2026-10-01T18:00 --until 2026-10-01T21:00
+ */
+
+interface ExportOptions {
+  since: Date;
+  until: Date;
+  out: string;
+  limit: number;
+}
+
+function parseTime(value: string, now: number): Date {
+  const relative = value.match(/^(\d+(?:\.\d+)?)([mhd])$/);
+  if (relative) {
+    const unit = { m: 60_000, h: 3_600_000, d: 86_400_000 }[relative[2] as 'm' | 'h' | 'd'];
+    return new Date(now - parseFloat(relative[1]) * unit);
+  }
+  const date = new Date(value);
+  if (isNaN(date.getTime())) {
+    throw new Error(`Invalid time: ${value} (use an ISO date or 30m / 6h / 7d)`);
+  }
+  return date;
+}
+
+function parseArgs(argv: string[]): ExportOptions {
+  const get = (name: string) => {
+    const index = argv.indexOf(`--${name}`);
+    return index >= 0 ? argv[index + 1] : undefined;
+  };
+  const now = Date.now();
+  return {
+    since: parseTime(get('since') || '24h', now),
+    until: get('until') ? parseTime(get('until')!, now) : new Date(now),
+    out: get('out') || 'replay.jsonl',
+    limit: parseInt(get('limit') || '0', 10)
+  };
+}
+
+function sessionHasher(salt: string): (sessionId: string) => string {
+  const seen = new Map<string, string>();
+  return (sessionId: string) => {
+    let hashed = seen.get(sessionId);
+    if (!hashed) {
+      hashed = crypto.createHash('sha256').update(salt).update(sessionId).digest('hex').slice(0, 12);
+      seen.set(sessionId, hashed);
+    }
+    return hashed;
+  };
+}
+
+async function exportInteractions(options: ExportOptions) {
+  await mongoose.connect(MONGODB_URI);
+  console.log('✅ Connected to MongoDB');
+
+  const filter = { createdAt: { $gte: options.since, $lt: options.until } };
+  const total = await AIInteraction.countDocuments(filter);
+  console.log(`📦 ${total} interactions between ${options.since.toISOString()} and ${options.until.toISOString()}`);
+
+  const hashSession = sessionHasher(process.env.REPLAY_ANON_SALT || crypto.randomBytes(16).toString('hex'));
+  const rows: string[] = [];
+  const sessions = new Set<string>();
+  let start: number | null = null;
+  let scrubbed = 0;
+
+  let query = AIInteraction.find(filter)
+    .select({ sessionId: 1, query: 1, queryType: 1, responseTimeMs: 1, createdAt: 1, _id: 0 })
+    .sort({ createdAt: 1 })
+    .lean();
+  if (options.limit > 0) query = query.limit(options.limit);
+
+  for await (const doc of query.cursor() as AsyncIterable<any>) {
+    const createdAt = new Date(doc.createdAt).getTime();
+    if (start === null) start = createdAt;
+    const session = hashSession(String(doc.sessionId));
+    const text = scrubQuery(String(doc.query));
+    if (text !== doc.query) scrubbed++;
+    sessions.add(session);
+    rows.push(JSON.stringify({
+      t: createdAt - start,
+      s: session,
+      q: text,
+      k: doc.queryType || 'general',
+      rt: typeof doc.responseTimeMs === 'number' ? Math.round(doc.responseTimeMs) : null
+    }));
+  }
+
+  const header = {
+    format: 'ai-interactions-replay/1',
+    exportedAt: new Date().toISOString(),
+    windowStart: start === null ? null : new Date(start).toISOString(),
+    since: options.since.toISOString(),
+    until: options.until.toISOString(),
+    interactions: rows.length,
+    sessions: sessions.size,
+    anonymized: true
+  };
+  fs.writeFileSync(options.out, [JSON.stringify(header), ...rows].join('\n') + '\n');
+
+  console.log(`🔒 ${scrubbed} queries had personal data masked, ${sessions.size} sessions hashed`);
+  console.log(`💾 Wrote ${rows.length} interactions to ${options.out}`);
+  await mongoose.disconnect();
+}
+
+exportInteractions(parseArgs(process.argv.slice(2))).catch(error => {
+  console.error('❌ Export failed:', error);
+  process.exit(1);
+});
@@ -10,6 +10,9 @@
 
 import * as hf from './huggingface-client.js'
 import * as groq from './groq-client.js'
+import * as ollama from './ollama-client.js'
+import { LLMRouter, type LLMProvider, type ChatRequest, type ChatResponse } from './llm-router.js'
+import { memoizeCompletion } from './llm-cache.js'
 
 // ============================================
 // ENVIRONMENT DETECTION
@@ -42,3 +45,88 @@ export function getAIProvider() {
         environment: isVercel ? 'vercel' : 'local'
     }
 }
+
+// ============================================
+// CHAT COMPLETIONS (MULTI-PROVIDER ROUTER)
+// ============================================
+
+let router: LLMRouter | null = null
+
+function envInt(name: string, fallback: number): number {
+    const value = parseInt(process.env[name] || '', 10)
+    return Number.isFinite(value) && value > 0 ? value : fallback
+}
+
+/**
+ * Build the provider pool from env
+ * LLM_PROVIDERS: comma-separated order, e.g. "groq,ollama,huggingface"
+ * (ollama is opt-in since it needs a local server)
+ * Hedging pairs models across providers via MODEL_EQUIVALENTS (llm-router.ts)
+ */
+export function buildProviders(): LLMProvider[] {
+    const enabled = (process.env.LLM_PROVIDERS || 'groq,huggingface')
+        .split(',')
+        .map(p => p.trim().toLowerCase())
+        .filter(Boolean)
+
+    const providers: (LLMProvider | null)[] = []
+    for (const name of enabled) {
+        if (name === 'groq') {
+            const cap = envInt('LLM_GROQ_CONCURRENCY', 8)
+            providers.push(groq.createGroqProvider('llama-3.1-8b-instant', cap))
+            providers.push(groq.createGroqProvider('llama-3.3-70b-versatile', cap))
+        } else if (name === 'ollama') {
+            providers.push(ollama.createOllamaProvider(process.env.OLLAMA_MODEL || undefined, envInt('LLM_OLLAMA_CONCURRENCY', 2)))
+        } else if (name === 'huggingface') {
+            providers.push(hf.createHuggingFaceProvider(undefined, envInt('LLM_HF_CONCURRENCY', 4)))
+        }
+    }
+    return providers.filter((p): p is LLMProvider => p !== null)
+}
+
+function getRouter(): LLMRouter {
+    if (!router) {
+        router = new LLMRouter(buildProviders(), {
+            timeoutMs: envInt('LLM_TIMEOUT_MS', 30000),
+            defaultHedgeDelayMs: envInt('LLM_HEDGE_DELAY_MS', 2000)
+        })
+        console.log(`🔀 LLM router initialized with ${router.size} provider(s)`)
+    }
+    return router
+}
+
+/**
+ * Chat completion routed across providers (hedging + failover)
+ * Pass `cache` to memoize identical prompts (see llm-cache.ts)
+ */
+export async function chatCompletion(request: ChatRequest): Promise<ChatResponse> {
+    if (!request.cache) {
+        return getRouter().complete(request)
+    }
+
+    const start = Date.now()
+    const result = await memoizeCompletion(
+        {
+            model: request.model || 'default',
+            messages: request.messages,
+            params: { maxTokens: request.maxTokens, temperature: request.temperature }
+        },
+        () => getRouter().complete(request),
+        request.cache
+    )
+    return result.cached ? { ...result, latencyMs: Date.now() - start, hedged: false } : result
+}
+
+/**
+ * Whether any chat provider is configured
+ */
+export function hasLLMProvider(): boolean {
+    return getRouter().size > 0
+}
+
+/**
+ * Per-provider latency / circuit stats
+ */
+export function getLLMRouterStats() {
+    return getRouter().getStats()
+}
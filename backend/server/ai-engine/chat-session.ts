@@ -0,0 +1,300 @@
+/**
+ * Chat Session Store - Server-Side Conversation State
+ *
+ * Without it every /api/ai-chat call carries the whole conversationHistory
+ * (including echoed `cars` arrays and conversationState objects), so
+ * request size grows every turn and bytes over a session grow
+ * quadratically. Clients that opt in send only the new message plus the
+ * `sessionToken` and `sessionVersion` from the previous reply; the server keeps:
+ *
+ * - history (role + content only - all the LLM ever sees)
+ * - structured state (last conversationState)
+ * - shortlist (compact form of the last cars shown)
+ *
+ * Two tiers, same as the LLM prompt cache:
+ * - Redis (shared across workers), TTL refreshed on every write
+ * - In-process LRU when Redis isn't ready (single-instance deployments)
+ *
+ * Sessions are keyed by a server-issued token (random id + HMAC), never by
+ * the client-chosen sessionId, so nobody can read or overwrite a session
+ * they weren't given. Writes are compare-and-set on the version, so two
+ * tabs racing on one session can't silently drop each other's turns. An
+ * expired session or a version mismatch is reported back (without the
+ * stored version) and the client resends its full history once (resync),
+ * which re-seeds the store under its own token.
+ */
+
+import { createHmac, randomBytes, timingSafeEqual } from 'crypto'
+import { getSessionRedisClient } from '../config/redis-config'
+import { aiCacheRequests } from '../monitoring/metrics'
+
+// ============================================
+// CONFIGURATION
+// ============================================
+
+const REDIS_PREFIX = 'chat:session:'
+const TTL_SECONDS = parseInt(process.env.CHAT_SESSION_TTL_SECONDS || '1800', 10)
+const MAX_HISTORY_ENTRIES = parseInt(process.env.CHAT_SESSION_MAX_ENTRIES || '40', 10)
+const MAX_BYTES = parseInt(process.env.CHAT_SESSION_MAX_BYTES || String(64 * 1024), 10)
+const MAX_LOCAL_SESSIONS = parseInt(process.env.CHAT_SESSION_MAX_LOCAL || '2000', 10)
+const MAX_SHORTLIST = 5
+const DISABLED = process.env.CHAT_SESSION_DISABLED === 'true'
+
+// Signs session tokens; without SESSION_SECRET (dev only - index.ts requires it
+// in production) tokens are valid only on the worker that issued them
+const TOKEN_SECRET = process.env.SESSION_SECRET || randomBytes(32).toString('hex')
+
+export interface SessionEntry {
+    role: 'user' | 'ai'
+    content: string
+}
+
+export interface ShortlistCar {
+    id?: string
+    name?: string
+    brand?: string
+    variant?: string
+    price?: number
+}
+
+export interface ChatSession {
+    version: number
+    history: SessionEntry[]
+    state: any
+    shortlist: ShortlistCar[]
+    updatedAt: number
+}
+
+export type SessionLookup =
+    | { status: 'hit', session: ChatSession }
+    | { status: 'expired' | 'version_mismatch' }
+
+// ============================================
+// STATS
+// ============================================
+
+const stats = {
+    hits: 0,
+    expired: 0,
+    versionMismatches: 0,
+    writes: 0,
+    conflicts: 0,
+    trimmed: 0
+}
+
+// ============================================
+// IN-PROCESS FALLBACK
+// ============================================
+
+const local = new Map<string, { value: string, expiresAt: number }>()
+
+function localGet(sessionKey: string): string | null {
+    const entry = local.get(sessionKey)
+    if (!entry) return null
+    if (entry.expiresAt < Date.now()) {
+        local.delete(sessionKey)
+        return null
+    }
+    local.delete(sessionKey)
+    local.set(sessionKey, entry)
+    return entry.value
+}
+
+function localSet(sessionKey: string, value: string) {
+    local.delete(sessionKey)
+    local.set(sessionKey, { value, expiresAt: Date.now() + TTL_SECONDS * 1000 })
+    while (local.size > MAX_LOCAL_SESSIONS) {
+        const oldest = local.keys().next().value
+        if (oldest === undefined) break
+        local.delete(oldest)
+    }
+}
+
+function getReadyRedis() {
+    const redis = getSessionRedisClient()
+    return redis && (redis as any).status === 'ready' ? redis : null
+}
+
+// Only writes when the stored version is still the one the turn started from
+// (ARGV[1] = -1 forces the write: resync with full history)
+const CAS_SCRIPT = `
+local current = redis.call('GET', KEYS[1])
+if current and tonumber(ARGV[1]) >= 0 and cjson.decode(current).version ~= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', tonumber(ARGV[3]))
+return 1
+`
+
+// ============================================
+// SIZE CAPS
+// ============================================
+
+function compactCar(car: any): ShortlistCar {
+    return {
+        id: car?.id || car?._id?.toString(),
+        name: car?.name,
+        brand: car?.brand || car?.brandName,
+        variant: car?.variant,
+        price: typeof car?.price === 'number' ? car.price : undefined
+    }
+}
+
+/**
+ * Keep the newest history that fits the entry and byte caps (whole
+ * user/ai pairs are dropped from the front so roles stay aligned)
+ */
+function enforceCaps(session: ChatSession): string {
+    let serialized = JSON.stringify(session)
+    while (session.history.length > 0 &&
+        (session.history.length > MAX_HISTORY_ENTRIES || serialized.length > MAX_BYTES)) {
+        session.history.splice(0, Math.min(2, session.history.length))
+        stats.trimmed++
+        serialized = JSON.stringify(session)
+    }
+    return serialized
+}
+
+/**
+ * Normalize client-sent history (which may carry cars/state per message)
+ * to what the store keeps
+ */
+export function toSessionHistory(history: any[] = []): SessionEntry[] {
+    if (!Array.isArray(history)) return []
+    return history
+        .filter(msg => msg && typeof msg.content === 'string')
+        .map(msg => ({ role: msg.role === 'user' ? 'user' : 'ai', content: msg.content }))
+}
+
+// ============================================
+// TOKENS
+// ============================================
+
+function sign(key: string): string {
+    return createHmac('sha256', TOKEN_SECRET).update(key).digest('base64url').slice(0, 32)
+}
+
+/**
+ * New session token (returned to the client on its first stored turn).
+ * The random part is the store key; the signature proves the server issued it.
+ */
+export function issueSessionToken(): { token: string, key: string } {
+    const key = randomBytes(18).toString('base64url')
+    return { token: `${key}.${sign(key)}`, key }
+}
+
+/**
+ * Store key for a token this server issued, or null for anything else
+ */
+export function verifySessionToken(token: unknown): string | null {
+    if (typeof token !== 'string') return null
+    const [key, signature] = token.split('.')
+    if (!key || !signature) return null
+    const expected = Buffer.from(sign(key))
+    const actual = Buffer.from(signature)
+    return actual.length === expected.length && timingSafeEqual(actual, expected) ? key : null
+}
+
+// ============================================
+// LOAD / SAVE
+// ============================================
+
+export function isChatSessionStoreEnabled(): boolean {
+    return !DISABLED
+}
+
+/**
+ * Load a session (by verified token key) for a delta request sent with `expectedVersion`
+ */
+export async function loadSession(sessionKey: string, expectedVersion: number): Promise<SessionLookup> {
+    let raw: string | null = null
+    const redis = getReadyRedis()
+    if (redis) {
+        try {
+            raw = await redis.get(REDIS_PREFIX + sessionKey)
+        } catch (error) {
+            console.warn('⚠️ Chat session read error:', (error as Error).message)
+        }
+    } else {
+        raw = localGet(sessionKey)
+    }
+
+    if (!raw) {
+        // Version 0 = a client starting a new session in delta mode
+        if (expectedVersion === 0) {
+            return { status: 'hit', session: { version: 0, history: [], state: null, shortlist: [], updatedAt: Date.now() } }
+        }
+        stats.expired++
+        aiCacheRequests.inc({ cache: 'chat_session', result: 'miss' })
+        return { status: 'expired' }
+    }
+
+    const session = JSON.parse(raw) as ChatSession
+    if (session.version !== expectedVersion) {
+        stats.versionMismatches++
+        aiCacheRequests.inc({ cache: 'chat_session', result: 'stale' })
+        return { status: 'version_mismatch' }
+    }
+    stats.hits++
+    aiCacheRequests.inc({ cache: 'chat_session', result: 'hit' })
+    return { status: 'hit', session }
+}
+
+/**
+ * Append one turn and bump the version. Returns the new version, or null
+ * when another request moved the session on first (client must resync).
+ * `force` (resync with full history) must only be used for a verified token.
+ */
+export async function appendTurn(
+    sessionKey: string,
+    base: { version: number, history: SessionEntry[] },
+    turn: { message: string, reply: string, state?: any, cars?: any[] },
+    force = false
+): Promise<number | null> {
+    const session: ChatSession = {
+        version: base.version + 1,
+        history: [...base.history, { role: 'user', content: turn.message }, { role: 'ai', content: turn.reply }],
+        state: turn.state ?? null,
+        shortlist: (turn.cars || []).slice(0, MAX_SHORTLIST).map(compactCar),
+        updatedAt: Date.now()
+    }
+    const serialized = enforceCaps(session)
+
+    const redis = getReadyRedis()
+    if (redis) {
+        try {
+            const written = await redis.eval(CAS_SCRIPT, 1, REDIS_PREFIX + sessionKey,
+                force ? -1 : base.version, serialized, TTL_SECONDS)
+            if (written !== 1) {
+                stats.conflicts++
+                return null
+            }
+        } catch (error) {
+            console.warn('⚠️ Chat session write error:', (error as Error).message)
+            return null
+        }
+    } else {
+        const current = localGet(sessionKey)
+        if (current && !force && (JSON.parse(current) as ChatSession).version !== base.version) {
+            stats.conflicts++
+            return null
+        }
+        localSet(sessionKey, serialized)
+    }
+    stats.writes++
+    return session.version
+}
+
+export function getChatSessionStats() {
+    const lookups = stats.hits + stats.expired + stats.versionMismatches
+    return {
+        enabled: !DISABLED,
+        backend: getReadyRedis() ? 'redis' : 'memory',
+        localSessions: local.size,
+        ttlSeconds: TTL_SECONDS,
+        maxEntries: MAX_HISTORY_ENTRIES,
+        maxBytes: MAX_BYTES,
+        ...stats,
+        hitRate: lookups > 0 ? Number((stats.hits / lookups).toFixed(3)) : 0
+    }
+}
@@ -0,0 +1,145 @@
+/**
+ * AI Fingerprint - What the Chat Answers Depend On
+ *
+ * A compact, stable description of everything outside the request that
+ * shapes an AI chat answer:
+ * - Hashes of the registered system prompts
+ * - Model names per route tier and the configured providers
+ * - Catalog version (hash of brands, models and variants)
+ * - Git revision of the running build
+ *
+ * The evaluation harness keys its result cache on this, so a run only
+ * re-executes cases when one of these components actually changed.
+ */
+
+import { createHash } from 'crypto'
+import { execSync } from 'child_process'
+import { Brand, Model, Variant } from '../db/schemas'
+import { ROUTE_POLICIES } from './model-routing'
+import { getLLMRouterStats } from './ai-adapter'
+
+// ============================================
+// COMPONENTS
+// ============================================
+
+export interface AIFingerprint {
+    fingerprint: string
+    components: {
+        prompts: Record<string, string>
+        models: Record<string, string>
+        providers: string[]
+        catalogVersion: string
+        gitRevision: string
+    }
+    generatedAt: string
+}
+
+const CATALOG_TTL_MS = parseInt(process.env.AI_FINGERPRINT_CATALOG_TTL_MS || '300000', 10)
+
+const prompts = new Map<string, string>()
+
+function sha(text: string, length = 16): string {
+    return createHash('sha256').update(text).digest('hex').slice(0, length)
+}
+
+/**
+ * Register a prompt that feeds the chat (called at module load by its owner)
+ */
+export function registerPrompt(name: string, text: string) {
+    prompts.set(name, sha(text))
+}
+
+let gitRevision: string | null = null
+
+function getGitRevision(): string {
+    if (gitRevision) return gitRevision
+    gitRevision = process.env.GIT_COMMIT || process.env.RENDER_GIT_COMMIT || process.env.SOURCE_VERSION || ''
+    if (!gitRevision) {
+        try {
+            gitRevision = execSync('git rev-parse HEAD', { stdio: ['ignore', 'pipe', 'ignore'] }).toString().trim()
+        } catch {
+            gitRevision = 'unknown'
+        }
+    }
+    return gitRevision
+}
+
+let catalogVersion: { value: string, computedAt: number } | null = null
+let catalogInFlight: Promise<string> | null = null
+let catalogGeneration = 0   // Bumped by writes; a hash started before one is not cached
+
+async function hashCollection(model: any): Promise<string> {
+    const hash = createHash('sha256')
+    const docs = await model.find({}).sort({ _id: 1 }).select('-__v').lean()
+    for (const doc of docs) hash.update(JSON.stringify(doc))
+    return `${docs.length}:${hash.digest('hex').slice(0, 12)}`
+}
+
+async function computeCatalogVersion(): Promise<string> {
+    const [brands, models, variants] = await Promise.all([
+        hashCollection(Brand),
+        hashCollection(Model),
+        hashCollection(Variant)
+    ])
+    return sha(`${brands}|${models}|${variants}`)
+}
+
+/**
+ * Catalog hash, recomputed at most every CATALOG_TTL_MS (single-flight)
+ */
+async function getCatalogVersion(): Promise<string> {
+    if (catalogVersion && Date.now() - catalogVersion.computedAt < CATALOG_TTL_MS) {
+        return catalogVersion.value
+    }
+    if (!catalogInFlight) {
+        const generation = catalogGeneration
+        const flight: Promise<string> = computeCatalogVersion()
+            .then(value => {
+                if (generation === catalogGeneration) catalogVersion = { value, computedAt: Date.now() }
+                return value
+            })
+            .catch(error => {
+                console.warn('⚠️ Catalog fingerprint failed:', error.message)
+                return 'unavailable'
+            })
+            .finally(() => {
+                if (catalogInFlight === flight) catalogInFlight = null
+            })
+        catalogInFlight = flight
+    }
+    return catalogInFlight
+}
+
+/**
+ * Drop the cached catalog hash - called by the brand/model/variant write routes
+ */
+export function invalidateCatalogFingerprint() {
+    catalogVersion = null
+    catalogGeneration++
+    catalogInFlight = null
+}
+
+// ============================================
+// FINGERPRINT
+// ============================================
+
+export async function getAIFingerprint(): Promise<AIFingerprint> {
+    const models: Record<string, string> = {}
+    for (const [tier, policy] of Object.entries(ROUTE_POLICIES)) {
+        models[tier] = `${policy.model}/${policy.maxTokens}/${policy.temperature}`
+    }
+
+    const components = {
+        prompts: Object.fromEntries(Array.from(prompts.entries()).sort()),
+        models,
+        providers: getLLMRouterStats().map(s => `${s.provider}:${s.model}`).sort(),
+        catalogVersion: await getCatalogVersion(),
+        gitRevision: getGitRevision()
+    }
+
+    return {
+        fingerprint: sha(JSON.stringify(components)),
+        components,
+        generatedAt: new Date().toISOString()
+    }
+}
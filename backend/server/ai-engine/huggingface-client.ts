@@ -10,6 +10,7 @@
  */
 
 import { HfInference } from '@huggingface/inference'
+import type { LLMProvider } from './llm-router'
 
 const hf = new HfInference(process.env.HF_API_KEY)
 
@@ -287,3 +288,37 @@ export async function checkHFStatus(): Promise<boolean> {
         return false
     }
 }
+
+
+/**
+ * Hugging Face chat provider for the LLM router
+ * HF_ENDPOINT_URL overrides the hosted endpoint (e.g. a local stand-in)
+ */
+export function createHuggingFaceProvider(model: string = MODEL_NAME, maxConcurrency = 4): LLMProvider | null {
+    if (!process.env.HF_API_KEY && !process.env.HF_ENDPOINT_URL) return null
+
+    return {
+        name: 'huggingface',
+        model,
+        maxConcurrency,
+        async complete(request, signal) {
+            const response = await hf.chatCompletion({
+                model,
+                endpointUrl: process.env.HF_ENDPOINT_URL || undefined,
+                messages: request.messages,
+                max_tokens: request.maxTokens,
+                temperature: request.temperature
+            }, { signal })
+
+            const usage = response.usage
+            return {
+                content: response.choices[0]?.message?.content?.trim() || '',
+                usage: usage ? {
+                    promptTokens: usage.prompt_tokens,
+                    completionTokens: usage.completion_tokens,
+                    totalTokens: usage.total_tokens
+                } : undefined
+            }
+        }
+    }
+}
@@ -0,0 +1,217 @@
+/**
+ * Intent Fast Path - Answer Non-Car Messages Without the Pipeline
+ *
+ * "hello", "how are you", "tell me a joke", "what's 2+2" or "who won the
+ * cricket match" used to go through vector store init, hybrid search,
+ * learned-context lookup and an LLM call with the full consultant prompt.
+ * This classifier runs in-process (regexes + set lookups, microseconds)
+ * before coalescing and answers those with templated replies:
+ *
+ * - greeting / thanks / farewell / small_talk: anchored whole-message patterns
+ * - out_of_domain: off-topic vocabulary (weather, cricket, movies...) or bare
+ *   arithmetic, only when the message has no car vocabulary at all
+ * - car: everything else - falls through to the full pipeline
+ *
+ * Car vocabulary = classifyQuery() classes + CAR_KEYWORD_MAP (learning
+ * system) + domain words + known car names, so anything that looks like a
+ * car question is never short-circuited. Follow-ups such as "ok", "how is
+ * it" or "tell me more" deliberately don't match (they depend on history).
+ *
+ * Decisions below AI_FASTPATH_MIN_CONFIDENCE fall through as well.
+ */
+
+import { classifyQuery } from './self-learning'
+import { CAR_KEYWORD_MAP } from './learning-system'
+
+// ============================================
+// CONFIGURATION
+// ============================================
+
+const MIN_CONFIDENCE = parseFloat(process.env.AI_FASTPATH_MIN_CONFIDENCE || '0.85')
+const DISABLED = process.env.AI_FASTPATH_DISABLED === 'true'
+const MAX_MESSAGE_CHARS = 200
+
+export type FastPathIntent = 'greeting' | 'thanks' | 'farewell' | 'small_talk' | 'out_of_domain' | 'car'
+
+export interface FastPathDecision {
+    intent: FastPathIntent
+    confidence: number
+    handled: boolean   // true = reply with `reply`, skip the pipeline
+    rule: string       // Which rule decided (for the benchmark / X-Fast-Path)
+    reply?: string
+}
+
+// ============================================
+// VOCABULARY
+// ============================================
+
+const NAME = '( karan| bro| buddy| there| everyone)?'
+const END = '[\\s!.?,]*$'
+
+interface IntentRule {
+    rule: string
+    intent: Exclude<FastPathIntent, 'car' | 'out_of_domain'>
+    pattern: RegExp
+    confidence: number
+}
+
+// Whole-message patterns only - a greeting followed by a question is a question
+const RULES: IntentRule[] = [
+    { rule: 'greeting', intent: 'greeting', confidence: 0.99,
+        pattern: new RegExp(`^(hi+|hello+|hey+|hiya|yo|namaste|namaskar|hola|good (morning|afternoon|evening|day))${NAME}${END}`, 'i') },
+    { rule: 'thanks', intent: 'thanks', confidence: 0.99,
+        pattern: new RegExp(`^(thanks?|thank (you|u)|thx|ty|tysm|dhanyavaad|shukriya)( (a lot|so much|very much))?${NAME}([,!.\\s]+(that|this) (helps|helped|was helpful|is helpful))?${END}`, 'i') },
+    { rule: 'farewell', intent: 'farewell', confidence: 0.99,
+        pattern: new RegExp(`^(bye+|goodbye|good night|see (you|ya)( later)?|take care|ttyl)${NAME}${END}`, 'i') },
+    { rule: 'how_are_you', intent: 'small_talk', confidence: 0.95,
+        pattern: new RegExp(`^((hi+|hello+|hey+)${NAME}[,!\\s]+)?(how (are|r) (you|u)( doing)?( today)?|how('?s| is) it going|how do you do|what'?s up|wh?assup|sup)${NAME}${END}`, 'i') },
+    { rule: 'identity', intent: 'small_talk', confidence: 0.95,
+        pattern: new RegExp(`^(who (are|r) (you|u)|what('?s| is) your name|what are you|are (you|u) (a )?(bot|robot|human|real|an? ai))${END}`, 'i') },
+    { rule: 'capabilities', intent: 'small_talk', confidence: 0.9,
+        pattern: new RegExp(`^(what can (you|u) do|how can (you|u) help( me)?|help)${END}`, 'i') },
+    { rule: 'joke', intent: 'small_talk', confidence: 0.95,
+        pattern: new RegExp(`^((tell me )?(a|another|some) jokes?|(tell me |say )?something funny|make me laugh)( please)?${END}`, 'i') }
+]
+
+// Bare arithmetic ("what's 2+2", "12 * 7?"); a lone minus needs a cue - "10-15" is a range
+const ARITHMETIC = /^(what('?s| is)\s+|calculate\s+|solve\s+)?[\d\s.()+\-*/x×÷^%=]+\??$/i
+const ARITHMETIC_CUE = /^(what('?s| is)|calculate|solve)\s/i
+const ARITHMETIC_OPERATOR = /\d\s*[+*/x×÷^%=]\s*\d/i
+const MINUS_OPERATOR = /\d\s*-\s*\d/
+
+// Off-topic vocabulary (only counts when no car vocabulary is present)
+const OFF_TOPIC = new Set([
+    'weather', 'temperature', 'rain', 'raining', 'forecast', 'cricket', 'ipl', 'football', 'soccer',
+    'tennis', 'match', 'score', 'movie', 'movies', 'film', 'song', 'songs', 'music', 'recipe', 'cook',
+    'cooking', 'politics', 'election', 'president', 'minister', 'sensex', 'nifty', 'bitcoin', 'crypto',
+    'horoscope', 'capital', 'homework', 'poem', 'news'
+])
+
+// "is it good in rain?" is about the car being discussed - never off-topic
+const FOLLOW_UP = new Set(['it', 'its', 'this', 'that', 'these', 'those', 'them', 'which', 'one', 'ones'])
+
+// Car words classifyQuery() and CAR_KEYWORD_MAP don't cover
+const DOMAIN_WORDS = [
+    'car', 'cars', 'vehicle', 'vehicles', 'drive', 'driving', 'engine', 'bhp', 'torque', 'gear', 'gearbox',
+    'insurance', 'loan', 'finance', 'service', 'servicing', 'maintenance', 'resale', 'variant', 'variants',
+    'model', 'models', 'brand', 'launch', 'launches', 'showroom', 'dealer', 'dealership', 'boot', 'seat',
+    'seats', 'tyre', 'tyres', 'brake', 'brakes', 'kmpl', 'range', 'charging', 'charger', 'parking', 'speed',
+    'maruti', 'suzuki', 'hyundai', 'tata', 'mahindra', 'kia', 'toyota', 'honda', 'mg', 'skoda', 'volkswagen',
+    'vw', 'renault', 'nissan', 'jeep', 'bmw', 'audi', 'mercedes', 'byd', 'citroen'
+]
+
+const CAR_WORDS = new Set<string>([...Object.values(CAR_KEYWORD_MAP).flat(), ...DOMAIN_WORDS])
+const NO_NAMES: ReadonlySet<string> = new Set()
+
+// ============================================
+// REPLIES
+// ============================================
+
+const REPLIES: Record<string, string[]> = {
+    greeting: [
+        "Hey! 👋 I'm Karan, your car consultant. What's your budget, and who usually rides along - just you or the family?",
+        "Hello! 👋 Karan here. Looking for a new car? Tell me your budget and whether you drive mostly in the city or on highways.",
+        "Hi there! 🚗 Happy to help you find the right car. What budget do you have in mind, and how many people usually travel with you?"
+    ],
+    thanks: [
+        "You're welcome! 😊 Anything else you'd like to check - price, mileage, safety or a comparison?",
+        "Happy to help! Ping me anytime you want to look at another car or compare a couple of options."
+    ],
+    farewell: [
+        "Bye! 👋 All the best with the car hunt - come back anytime.",
+        "Take care! 🚗 I'm here whenever you want to compare cars or check prices."
+    ],
+    how_are_you: [
+        "Doing great, thanks for asking! 😊 Ready to talk cars - what's your budget and what will you mostly use the car for?",
+        "All good here! 🚗 Shall we find you a car? Tell me your budget and how many people usually ride with you."
+    ],
+    identity: [
+        "I'm Karan, an AI car consultant for Indian buyers 🚗 I can shortlist cars for your budget, compare models and explain prices, mileage and safety. What are you looking for?"
+    ],
+    capabilities: [
+        "I can shortlist cars for your budget and needs, compare models side by side, and explain prices, mileage, safety and features 🚗 What's your budget?"
+    ],
+    joke: [
+        "Why do cars never feel lonely? They always come with a spare! 😄 Now, shall I help you find one - what's your budget?",
+        "My car's mileage is so good it only visits the petrol pump to say hi. 😄 Want one like that? Tell me your budget."
+    ],
+    out_of_domain: [
+        "That's outside my lane 😅 - I only know cars. Ask me about prices, mileage, safety or which car fits your budget!",
+        "I'm a car consultant, so I'd only be guessing on that one. But for anything about cars - prices, comparisons, what to buy - I'm all yours. What's your budget?"
+    ]
+}
+
+// Same message → same reply (keeps responses cacheable and tests stable)
+function pickReply(rule: string, message: string): string {
+    const options = REPLIES[rule] || REPLIES.out_of_domain
+    let hash = 0
+    for (let i = 0; i < message.length; i++) {
+        hash = (hash * 31 + message.charCodeAt(i)) | 0
+    }
+    return options[Math.abs(hash) % options.length]
+}
+
+// ============================================
+// CLASSIFIER
+// ============================================
+
+function decide(intent: FastPathIntent, confidence: number, rule: string, message: string): FastPathDecision {
+    const handled = !DISABLED && intent !== 'car' && confidence >= MIN_CONFIDENCE
+    return {
+        intent,
+        confidence,
+        handled,
+        rule,
+        reply: handled ? pickReply(rule, message) : undefined
+    }
+}
+
+/**
+ * True when the message has any car vocabulary (word match, so "7" in
+ * "7 seater" counts but "2+7" inside an expression is checked earlier)
+ */
+function hasCarSignal(lower: string, words: string[], knownCarNames: ReadonlySet<string>): boolean {
+    if (classifyQuery(lower) !== 'general') return true
+    return words.some(word => CAR_WORDS.has(word) || knownCarNames.has(word))
+}
+
+/**
+ * Classify one user message. `knownCarNames` are the lowercase name words
+ * the chat handler already caches (getActiveCarNames), as a set.
+ */
+export function classifyFastPath(message: unknown, knownCarNames: ReadonlySet<string> = NO_NAMES): FastPathDecision {
+    if (typeof message !== 'string' || !message.trim() || message.length > MAX_MESSAGE_CHARS) {
+        return decide('car', 0, 'not_applicable', '')
+    }
+    const text = message.trim()
+    const lower = text.toLowerCase()
+
+    for (const rule of RULES) {
+        if (rule.pattern.test(text)) return decide(rule.intent, rule.confidence, rule.rule, lower)
+    }
+
+    if (ARITHMETIC.test(text) && (ARITHMETIC_OPERATOR.test(text) || (ARITHMETIC_CUE.test(text) && MINUS_OPERATOR.test(text)))) {
+        return decide('out_of_domain', 0.95, 'arithmetic', lower)
+    }
+
+    const words = lower.split(/[^a-z0-9]+/).filter(Boolean)
+    if (hasCarSignal(lower, words, knownCarNames)) {
+        return decide('car', 0.9, 'car_vocabulary', lower)
+    }
+
+    if (words.some(word => OFF_TOPIC.has(word))) {
+        // Follow-ups and long messages are more likely car questions in disguise
+        if (words.some(word => FOLLOW_UP.has(word))) return decide('out_of_domain', 0.6, 'off_topic_follow_up', lower)
+        return decide('out_of_domain', words.length <= 12 ? 0.9 : 0.75, 'off_topic', lower)
+    }
+
+    return decide('car', 0.5, 'unknown', lower)
+}
+
+/**
+ * X-Fast-Path header value (parsed by eval_intent.py)
+ */
+export function formatFastPathHeader(decision: FastPathDecision): string {
+    return `intent=${decision.intent}; confidence=${decision.confidence}; rule=${decision.rule}; ` +
+        `decision=${decision.handled ? 'handled' : 'fallthrough'}`
+}
@@ -48,6 +48,16 @@ interface Metrics {
     userSatisfaction: number
 }
 
+// Common car-related keywords (also the car-domain vocabulary of intent-fastpath)
+export const CAR_KEYWORD_MAP: Record<string, string[]> = {
+    seating: ['family', 'people', 'seater', '5', '7', 'kids'],
+    budget: ['budget', 'lakh', 'lakhs', 'cheap', 'affordable', 'expensive'],
+    usage: ['city', 'highway', 'both', 'daily', 'commute', 'travel'],
+    fuelType: ['petrol', 'diesel', 'cng', 'electric', 'ev', 'hybrid'],
+    bodyType: ['suv', 'sedan', 'hatchback', 'muv', 'coupe'],
+    features: ['sunroof', 'automatic', 'manual', 'safety', 'airbags', 'abs']
+}
+
 // ============================================
 // LEARNING SYSTEM CLASS
 // ============================================
@@ -147,17 +157,7 @@ class LearningSystem {
         const lowerMessage = message.toLowerCase()
         const keywords: string[] = []
 
-        // Common car-related keywords
-        const keywordMap = {
-            seating: ['family', 'people', 'seater', '5', '7', 'kids'],
-            budget: ['budget', 'lakh', 'lakhs', 'cheap', 'affordable', 'expensive'],
-            usage: ['city', 'highway', 'both', 'daily', 'commute', 'travel'],
-            fuelType: ['petrol', 'diesel', 'cng', 'electric', 'ev', 'hybrid'],
-            bodyType: ['suv', 'sedan', 'hatchback', 'muv', 'coupe'],
-            features: ['sunroof', 'automatic', 'manual', 'safety', 'airbags', 'abs']
-        }
-
-        for (const [category, words] of Object.entries(keywordMap)) {
+        for (const [category, words] of Object.entries(CAR_KEYWORD_MAP)) {
             for (const word of words) {
                 if (lowerMessage.includes(word)) {
                     keywords.push(category)
@@ -279,6 +279,13 @@ class LearningSystem {
             .slice(0, limit)
     }
 
+    /**
+     * In-memory sizes (memory diagnostics)
+     */
+    getSizes() {
+        return { patterns: this.patterns.size, interactions: this.interactions.length }
+    }
+
     // ============================================
     // A/B TESTING
     // ============================================
@@ -0,0 +1,264 @@
+/**
+ * LLM Prompt Cache - Exact Prompt-Level Memoization
+ *
+ * Several paths send byte-identical prompts over and over (review
+ * analysis for the same review text, RAG answers for the same question +
+ * data, humanize scripts re-run on unchanged content). This caches the
+ * completion content-addressed by model + parameters + a hash of the
+ * messages.
+ *
+ * Two tiers:
+ * - In-process LRU bounded by entry count and approximate bytes
+ * - Redis (shared across workers / script runs), TTL per call site
+ *
+ * Non-deterministic calls (temperature > 0) are cached by default since
+ * any sampled answer is acceptable for these paths; call sites can opt out
+ * with `skipNonDeterministic` or force a fresh call with `bypass`.
+ */
+
+import { createHash } from 'crypto'
+import { getCacheRedisClient } from '../config/redis-config'
+import { llmCacheRequests, llmCacheTokensSaved } from '../monitoring/metrics'
+import type { ChatMessage, ProviderCompletion } from './llm-router'
+
+// ============================================
+// CONFIGURATION
+// ============================================
+
+const REDIS_PREFIX = 'llmc:'
+const DEFAULT_TTL_SECONDS = 3600
+const MAX_ENTRIES = parseInt(process.env.LLM_CACHE_MAX_ENTRIES || '500', 10)
+const MAX_BYTES = parseInt(process.env.LLM_CACHE_MAX_BYTES || String(5 * 1024 * 1024), 10)
+const DISABLED = process.env.LLM_CACHE_DISABLED === 'true'
+
+export interface PromptCacheOptions {
+    site: string                    // Call-site label (stats + metrics)
+    ttlSeconds?: number             // Per call-site TTL (both tiers)
+    bypass?: boolean                // Skip the cache for this call
+    skipNonDeterministic?: boolean  // Don't cache when temperature > 0
+}
+
+export interface CacheableCall {
+    model: string
+    messages: ChatMessage[] | string   // Chat messages or a raw prompt
+    params?: Record<string, unknown>   // temperature, max tokens, top_p, ...
+}
+
+type CacheResult = 'hit_memory' | 'hit_redis' | 'miss' | 'bypass'
+
+// ============================================
+// IN-PROCESS LRU
+// ============================================
+
+interface LRUEntry {
+    value: string       // Serialized completion
+    expiresAt: number
+}
+
+const lru = new Map<string, LRUEntry>()
+let lruBytes = 0
+
+function lruGet(key: string): string | null {
+    const entry = lru.get(key)
+    if (!entry) return null
+    if (entry.expiresAt < Date.now()) {
+        lruDelete(key)
+        return null
+    }
+    // Re-insert to mark as most recently used
+    lru.delete(key)
+    lru.set(key, entry)
+    return entry.value
+}
+
+function lruDelete(key: string) {
+    const entry = lru.get(key)
+    if (entry) {
+        lruBytes -= entry.value.length
+        lru.delete(key)
+    }
+}
+
+function lruSet(key: string, value: string, ttlSeconds: number) {
+    lruDelete(key)
+    lru.set(key, { value, expiresAt: Date.now() + ttlSeconds * 1000 })
+    lruBytes += value.length
+
+    // Evict least recently used (Map iterates in insertion order)
+    while (lru.size > MAX_ENTRIES || lruBytes > MAX_BYTES) {
+        const oldest = lru.keys().next().value
+        if (oldest === undefined) break
+        lruDelete(oldest)
+    }
+}
+
+// ============================================
+// STATS
+// ============================================
+
+interface SiteStats {
+    memoryHits: number
+    redisHits: number
+    misses: number
+    bypassed: number
+    tokensSaved: number
+}
+
+const siteStats = new Map<string, SiteStats>()
+
+function record(site: string, result: CacheResult, tokensSaved = 0) {
+    const stats = siteStats.get(site) || { memoryHits: 0, redisHits: 0, misses: 0, bypassed: 0, tokensSaved: 0 }
+    if (result === 'hit_memory') stats.memoryHits++
+    else if (result === 'hit_redis') stats.redisHits++
+    else if (result === 'miss') stats.misses++
+    else stats.bypassed++
+    stats.tokensSaved += tokensSaved
+    siteStats.set(site, stats)
+
+    llmCacheRequests.inc({ site, result })
+    if (tokensSaved > 0) llmCacheTokensSaved.inc({ site }, tokensSaved)
+}
+
+// ============================================
+// KEY BUILDING
+// ============================================
+
+function stableStringify(value: unknown): string {
+    if (value === null || typeof value !== 'object') return JSON.stringify(value) ?? 'null'
+    if (Array.isArray(value)) return `[${value.map(stableStringify).join(',')}]`
+    const obj = value as Record<string, unknown>
+    return `{${Object.keys(obj).sort()
+        .filter(k => obj[k] !== undefined)
+        .map(k => `${JSON.stringify(k)}:${stableStringify(obj[k])}`)
+        .join(',')}}`
+}
+
+/**
+ * Content-addressed key: model + params + hash of the messages
+ */
+export function buildPromptCacheKey(call: CacheableCall): string {
+    const messageHash = createHash('sha256')
+        .update(typeof call.messages === 'string' ? call.messages : stableStringify(call.messages))
+        .digest('hex')
+    const paramHash = createHash('sha1').update(stableStringify(call.params || {})).digest('hex').slice(0, 12)
+    return `${call.model}:${paramHash}:${messageHash}`
+}
+
+function estimateTokens(call: CacheableCall, completion: ProviderCompletion): number {
+    if (completion.usage) return completion.usage.totalTokens
+    const promptChars = typeof call.messages === 'string'
+        ? call.messages.length
+        : call.messages.reduce((sum, m) => sum + m.content.length, 0)
+    return Math.ceil((promptChars + completion.content.length) / 4)
+}
+
+function getReadyRedis() {
+    const redis = getCacheRedisClient()
+    return redis && (redis as any).status === 'ready' ? redis : null
+}
+
+// ============================================
+// MEMOIZATION
+// ============================================
+
+/**
+ * Return a cached completion for an identical call, or run `fn` and cache it.
+ * Empty completions and errors are never cached.
+ */
+export async function memoizeCompletion<T extends ProviderCompletion>(
+    call: CacheableCall,
+    fn: () => Promise<T>,
+    options: PromptCacheOptions
+): Promise<T & { cached: boolean }> {
+    const temperature = Number(call.params?.temperature ?? 0)
+    if (DISABLED || options.bypass || (options.skipNonDeterministic && temperature > 0)) {
+        record(options.site, 'bypass')
+        return { ...(await fn()), cached: false }
+    }
+
+    const key = buildPromptCacheKey(call)
+    const ttlSeconds = options.ttlSeconds ?? DEFAULT_TTL_SECONDS
+
+    // 1. In-process LRU
+    const local = lruGet(key)
+    if (local) {
+        const value = JSON.parse(local) as T
+        record(options.site, 'hit_memory', estimateTokens(call, value))
+        return { ...value, cached: true }
+    }
+
+    // 2. Redis tier
+    const redis = getReadyRedis()
+    if (redis) {
+        try {
+            const [[, shared], [, pttl]] = await redis.pipeline()
+                .get(REDIS_PREFIX + key)
+                .pttl(REDIS_PREFIX + key)
+                .exec() as Array<[Error | null, any]>
+            if (shared) {
+                // Live only as long as the Redis entry (pttl -1 = no expiry)
+                lruSet(key, shared, pttl > 0 ? Math.min(ttlSeconds, pttl / 1000) : ttlSeconds)
+                const value = JSON.parse(shared) as T
+                record(options.site, 'hit_redis', estimateTokens(call, value))
+                return { ...value, cached: true }
+            }
+        } catch (error) {
+            console.warn('⚠️ LLM cache read error:', (error as Error).message)
+        }
+    }
+
+    // 3. Miss - call the model
+    const value = await fn()
+    record(options.site, 'miss')
+
+    if (value.content) {
+        const serialized = JSON.stringify(value)
+        lruSet(key, serialized, ttlSeconds)
+        if (redis) {
+            redis.setex(REDIS_PREFIX + key, ttlSeconds, serialized).catch(err => {
+                console.warn('⚠️ LLM cache write error:', err.message)
+            })
+        }
+    }
+
+    return { ...value, cached: false }
+}
+
+/**
+ * Hit rate + tokens saved, overall and per call site
+ */
+export function getLLMCacheStats() {
+    const sites: Record<string, any> = {}
+    let hits = 0
+    let lookups = 0
+    let tokensSaved = 0
+
+    siteStats.forEach((s, site) => {
+        const siteHits = s.memoryHits + s.redisHits
+        const siteLookups = siteHits + s.misses
+        hits += siteHits
+        lookups += siteLookups
+        tokensSaved += s.tokensSaved
+        sites[site] = {
+            ...s,
+            hitRate: siteLookups > 0 ? Number((siteHits / siteLookups).toFixed(3)) : 0
+        }
+    })
+
+    return {
+        entries: lru.size,
+        bytes: lruBytes,
+        hitRate: lookups > 0 ? Number((hits / lookups).toFixed(3)) : 0,
+        tokensSaved,
+        sites
+    }
+}
+
+/**
+ * Clear the in-process tier and stats (used by tests)
+ */
+export function clearLLMCache() {
+    lru.clear()
+    lruBytes = 0
+    siteStats.clear()
+}
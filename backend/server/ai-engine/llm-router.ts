@@ -0,0 +1,410 @@
+/**
+ * LLM Router - Latency-Aware Multi-Provider Routing
+ *
+ * Sits behind ai-adapter.ts and spreads chat completions across
+ * Groq, Ollama and Hugging Face so one slow or 429ing upstream
+ * doesn't become user-visible tail latency.
+ *
+ * Features:
+ * - Live latency + error EWMAs per provider/model
+ * - Circuit breakers with half-open probing
+ * - Hedged requests: fire a backup after a percentile-based delay,
+ *   cancel the loser
+ * - Per-provider concurrency caps
+ */
+
+import { llmRequestDuration, llmHedgedRequests, llmCircuitState, llmRequestTokens } from '../monitoring/metrics'
+import { withSpan } from '../monitoring/tracing'
+import type { PromptCacheOptions } from './llm-cache'
+
+// ============================================
+// TYPE DEFINITIONS
+// ============================================
+
+export interface ChatMessage {
+    role: 'system' | 'user' | 'assistant'
+    content: string
+}
+
+export interface ChatRequest {
+    messages: ChatMessage[]
+    maxTokens?: number
+    temperature?: number
+    model?: string          // Preferred model (router may still fail over)
+    hedge?: boolean         // Allow hedging for this call (default true)
+    cache?: PromptCacheOptions  // Memoize identical prompts (applied by ai-adapter)
+}
+
+export interface TokenUsage {
+    promptTokens: number
+    completionTokens: number
+    totalTokens: number
+}
+
+export interface ProviderCompletion {
+    content: string
+    usage?: TokenUsage
+}
+
+export interface ChatResponse extends ProviderCompletion {
+    provider: string
+    model: string
+    latencyMs: number
+    hedged: boolean
+    cached?: boolean
+}
+
+/**
+ * A single upstream (provider + model). Providers must honour `signal`
+ * so a losing hedge can be cancelled.
+ */
+export interface LLMProvider {
+    name: string
+    model: string
+    maxConcurrency: number
+    complete(request: ChatRequest, signal: AbortSignal): Promise<ProviderCompletion>
+}
+
+export interface RouterOptions {
+    ewmaAlpha?: number             // Weight of newest sample
+    failureThreshold?: number      // Consecutive failures before opening breaker
+    cooldownMs?: number            // Open -> half-open delay
+    hedgePercentile?: number       // Latency percentile used as hedge delay
+    minHedgeDelayMs?: number
+    defaultHedgeDelayMs?: number   // Used until enough samples exist
+    minSamplesForHedge?: number
+    timeoutMs?: number             // Hard per-attempt timeout
+}
+
+type CircuitState = 'closed' | 'open' | 'half_open'
+
+const CIRCUIT_STATE_VALUE: Record<CircuitState, number> = { closed: 0, half_open: 1, open: 2 }
+
+const DEFAULT_OPTIONS: Required<RouterOptions> = {
+    ewmaAlpha: 0.2,
+    failureThreshold: 3,
+    cooldownMs: 15000,
+    hedgePercentile: 0.95,
+    minHedgeDelayMs: 250,
+    defaultHedgeDelayMs: 2000,
+    minSamplesForHedge: 10,
+    timeoutMs: 30000
+}
+
+const LATENCY_WINDOW = 200
+
+// Per-provider ids of the same logical model. Hedges race any of these
+// against each other; ids outside the map only hedge with themselves
+export const MODEL_EQUIVALENTS: Record<string, string[]> = {
+    'llama-8b': ['llama-3.1-8b-instant', 'llama3.1:8b'],
+    'llama-70b': ['llama-3.3-70b-versatile', 'meta-llama/Meta-Llama-3.1-70B-Instruct']
+}
+
+const LOGICAL_MODELS = new Map(Object.entries(MODEL_EQUIVALENTS)
+    .flatMap(([logical, ids]) => ids.map(id => [id, logical] as [string, string])))
+
+/**
+ * Logical model of a provider model id ("llama3.1:8b" → "llama-8b")
+ */
+export function logicalModel(model: string): string {
+    return LOGICAL_MODELS.get(model) ?? model
+}
+
+// Controllers aborted because another hedge won (not a provider failure)
+const cancelledControllers = new WeakSet<AbortController>()
+
+// ============================================
+// PER-PROVIDER STATE
+// ============================================
+
+class ProviderState {
+    latencyEwma = 0
+    errorEwma = 0
+    samples: number[] = []
+    active = 0
+    requests = 0
+    failures = 0
+    consecutiveFailures = 0
+    circuit: CircuitState = 'closed'
+    openedAt = 0
+    probeInFlight = false
+
+    constructor(public provider: LLMProvider, private opts: Required<RouterOptions>) { }
+
+    get key() {
+        return `${this.provider.name}:${this.provider.model}`
+    }
+
+    /**
+     * Whether a new request may be sent right now
+     * (breaker allows it and concurrency cap not reached)
+     */
+    isAvailable(now: number): boolean {
+        if (this.active >= this.provider.maxConcurrency) return false
+        if (this.circuit === 'open') {
+            if (now - this.openedAt < this.opts.cooldownMs) return false
+            this.setCircuit('half_open')
+        }
+        if (this.circuit === 'half_open') return !this.probeInFlight
+        return true
+    }
+
+    /**
+     * Lower is better: expected latency inflated by recent error rate
+     */
+    score(): number {
+        const latency = this.latencyEwma || this.opts.defaultHedgeDelayMs
+        return latency * (1 + 4 * this.errorEwma)
+    }
+
+    percentile(p: number): number | null {
+        if (this.samples.length < this.opts.minSamplesForHedge) return null
+        const sorted = [...this.samples].sort((a, b) => a - b)
+        return sorted[Math.min(sorted.length - 1, Math.floor(p * sorted.length))]
+    }
+
+    begin() {
+        this.active++
+        this.requests++
+        if (this.circuit === 'half_open') this.probeInFlight = true
+    }
+
+    recordSuccess(latencyMs: number) {
+        this.active--
+        this.probeInFlight = false
+        const alpha = this.opts.ewmaAlpha
+        this.latencyEwma = this.latencyEwma ? alpha * latencyMs + (1 - alpha) * this.latencyEwma : latencyMs
+        this.errorEwma = (1 - alpha) * this.errorEwma
+        this.samples.push(latencyMs)
+        if (this.samples.length > LATENCY_WINDOW) this.samples.shift()
+        this.consecutiveFailures = 0
+        if (this.circuit !== 'closed') this.setCircuit('closed')
+    }
+
+    recordFailure() {
+        this.active--
+        this.probeInFlight = false
+        this.failures++
+        this.consecutiveFailures++
+        this.errorEwma = this.opts.ewmaAlpha + (1 - this.opts.ewmaAlpha) * this.errorEwma
+        if (this.circuit === 'half_open' || this.consecutiveFailures >= this.opts.failureThreshold) {
+            this.openedAt = Date.now()
+            this.setCircuit('open')
+        }
+    }
+
+    /**
+     * Cancelled hedge losers release their slot without affecting health
+     */
+    recordCancelled() {
+        this.active--
+        this.probeInFlight = false
+    }
+
+    private setCircuit(state: CircuitState) {
+        if (this.circuit !== state) {
+            console.log(`🔌 LLM circuit ${this.key}: ${this.circuit} → ${state}`)
+        }
+        this.circuit = state
+        llmCircuitState.set({ provider: this.provider.name, model: this.provider.model }, CIRCUIT_STATE_VALUE[state])
+    }
+}
+
+// ============================================
+// ROUTER
+// ============================================
+
+function isAbortError(error: any): boolean {
+    return error?.name === 'AbortError' || error?.name === 'APIUserAbortError' || error?.code === 'ERR_CANCELED'
+}
+
+export class LLMRouter {
+    private states: ProviderState[]
+    private opts: Required<RouterOptions>
+
+    constructor(providers: LLMProvider[], options: RouterOptions = {}) {
+        this.opts = { ...DEFAULT_OPTIONS, ...options }
+        this.states = providers.map(p => new ProviderState(p, this.opts))
+    }
+
+    get size() {
+        return this.states.length
+    }
+
+    /**
+     * Rank available providers; a requested model is tried first
+     */
+    private candidates(preferredModel?: string): ProviderState[] {
+        const now = Date.now()
+        const available = this.states.filter(s => s.isAvailable(now))
+        // Exact model first, then its equivalents on other providers
+        const preferredLogical = preferredModel && logicalModel(preferredModel)
+        const match = (s: ProviderState) => s.provider.model === preferredModel ? 0
+            : logicalModel(s.provider.model) === preferredLogical ? 1 : 2
+        available.sort((a, b) => {
+            if (preferredModel) {
+                const aMatch = match(a)
+                const bMatch = match(b)
+                if (aMatch !== bMatch) return aMatch - bMatch
+            }
+            return a.score() - b.score()
+        })
+        return available
+    }
+
+    private hedgeDelay(state: ProviderState): number {
+        const p = state.percentile(this.opts.hedgePercentile)
+        return Math.max(this.opts.minHedgeDelayMs, p ?? this.opts.defaultHedgeDelayMs)
+    }
+
+    /**
+     * Run one attempt against a provider with timeout + cancellation
+     */
+    private async attempt(state: ProviderState, request: ChatRequest, controller: AbortController): Promise<ChatResponse> {
+        const start = Date.now()
+        state.begin()
+        const timer = setTimeout(() => controller.abort(), this.opts.timeoutMs)
+        const labels = { provider: state.provider.name, model: state.provider.model }
+
+        try {
+            const result = await withSpan('llm.provider', { 'llm.provider': labels.provider, 'llm.model': labels.model }, () =>
+                state.provider.complete(request, controller.signal), 'client')
+            const latencyMs = Date.now() - start
+            state.recordSuccess(latencyMs)
+            llmRequestDuration.observe({ ...labels, outcome: 'success' }, latencyMs / 1000)
+            if (result.usage) {
+                llmRequestTokens.observe({ ...labels, kind: 'prompt' }, result.usage.promptTokens)
+                llmRequestTokens.observe({ ...labels, kind: 'completion' }, result.usage.completionTokens)
+            }
+            return { ...result, provider: state.provider.name, model: state.provider.model, latencyMs, hedged: false }
+        } catch (error) {
+            const latencyMs = Date.now() - start
+            if (cancelledControllers.has(controller)) {
+                state.recordCancelled()
+                llmRequestDuration.observe({ ...labels, outcome: 'cancelled' }, latencyMs / 1000)
+            } else {
+                state.recordFailure()
+                llmRequestDuration.observe({ ...labels, outcome: 'error' }, latencyMs / 1000)
+            }
+            throw error
+        } finally {
+            clearTimeout(timer)
+        }
+    }
+
+    /**
+     * Complete a chat request.
+     *
+     * Starts on the best-ranked provider; if it hasn't answered within its
+     * hedge delay (p95 of recent latency), a backup is fired on the next
+     * candidate serving the same logical model (the requested one, else the
+     * first provider's - see MODEL_EQUIVALENTS) and whichever answers first
+     * wins. Failures fail over immediately to the next candidate, whatever
+     * its model.
+     */
+    async complete(request: ChatRequest): Promise<ChatResponse> {
+        const queue = this.candidates(request.model)
+        if (queue.length === 0) {
+            throw new Error('No LLM provider available (all circuits open or at capacity)')
+        }
+
+        const allowHedge = request.hedge !== false
+        const controllers = new Map<ProviderState, AbortController>()
+        const errors: string[] = []
+
+        return new Promise<ChatResponse>((resolve, reject) => {
+            let settled = false
+            let pending = 0
+            let hedged = false
+            let hedgeTimer: NodeJS.Timeout | undefined
+
+            // Hedges race the same logical model on another provider; other models are failover only
+            let hedgeModel = request.model && logicalModel(request.model)
+            const isHedgeCandidate = (s: ProviderState) => logicalModel(s.provider.model) === hedgeModel
+
+            const launchNext = (isHedge: boolean) => {
+                const now = Date.now()
+                // Re-check availability: state may have changed since ranking
+                let state: ProviderState | undefined
+                if (isHedge) {
+                    const index = queue.findIndex(s => isHedgeCandidate(s) && !controllers.has(s) && s.isAvailable(now))
+                    state = index >= 0 ? queue.splice(index, 1)[0] : undefined
+                } else {
+                    state = queue.shift()
+                    while (state && (controllers.has(state) || !state.isAvailable(now))) state = queue.shift()
+                }
+                if (!state) return false
+
+                const chosen = state
+                const controller = new AbortController()
+                controllers.set(chosen, controller)
+                pending++
+                if (isHedge) {
+                    hedged = true
+                    llmHedgedRequests.inc({ provider: chosen.provider.name })
+                    console.log(`🏁 LLM hedge: firing backup on ${chosen.key}`)
+                }
+
+                this.attempt(chosen, request, controller)
+                    .then(result => {
+                        pending--
+                        if (settled) return
+                        settled = true
+                        clearTimeout(hedgeTimer)
+                        // Cancel the losers
+                        controllers.forEach((c, s) => {
+                            if (s !== chosen) {
+                                cancelledControllers.add(c)
+                                c.abort()
+                            }
+                        })
+                        resolve({ ...result, hedged })
+                    })
+                    .catch(error => {
+                        pending--
+                        if (settled) return
+                        if (!isAbortError(error)) {
+                            errors.push(`${chosen.key}: ${error?.message || error}`)
+                        }
+                        // Fail over immediately
+                        if (!launchNext(false) && pending === 0) {
+                            settled = true
+                            clearTimeout(hedgeTimer)
+                            reject(new Error(`All LLM providers failed: ${errors.join('; ')}`))
+                        }
+                    })
+
+                // Arm the hedge timer after the first launch only
+                hedgeModel = hedgeModel || logicalModel(chosen.provider.model)
+                if (!isHedge && allowHedge && !hedgeTimer && queue.some(isHedgeCandidate)) {
+                    hedgeTimer = setTimeout(() => {
+                        if (!settled) launchNext(true)
+                    }, this.hedgeDelay(chosen))
+                }
+                return true
+            }
+
+            launchNext(false)
+        })
+    }
+
+    /**
+     * Snapshot of per-provider health for dashboards / harness
+     */
+    getStats() {
+        return this.states.map(s => ({
+            provider: s.provider.name,
+            model: s.provider.model,
+            circuit: s.circuit,
+            latencyEwmaMs: Math.round(s.latencyEwma),
+            errorEwma: Number(s.errorEwma.toFixed(3)),
+            p50Ms: s.percentile(0.5),
+            p95Ms: s.percentile(0.95),
+            hedgeDelayMs: this.hedgeDelay(s),
+            active: s.active,
+            maxConcurrency: s.provider.maxConcurrency,
+            requests: s.requests,
+            failures: s.failures
+        }))
+    }
+}
@@ -0,0 +1,208 @@
+/**
+ * Model Routing - Complexity-Based Small/Large LLM Selection
+ *
+ * Most chat turns ("hello", "airbags in punch") don't need the full
+ * system prompt, the whole RAG context or a big model. This picks a
+ * route per turn from the query class, detected car entities and
+ * context size:
+ *
+ * - trivial:    greetings / thanks → compact prompt, no context, tiny budget
+ * - structured: single-car spec lookups (price, safety, mileage, features)
+ * - standard:   everything else (previous default behaviour)
+ * - complex:    multi-car comparisons, TCO / long-horizon consultation,
+ *               long conversations or very large contexts → large model
+ *
+ * Every decision is logged with its latency and token cost so the
+ * policy can be tuned from harness runs.
+ */
+
+import { promises as fs } from 'fs'
+import type { TokenUsage } from './llm-router'
+import { aiRouteDuration, aiRouteTokens } from '../monitoring/metrics'
+
+// ============================================
+// POLICY
+// ============================================
+
+export type RouteTier = 'trivial' | 'structured' | 'standard' | 'complex'
+
+export interface RoutePolicy {
+    model: string
+    maxTokens: number
+    temperature: number
+    contextBudgetChars: number   // Max RAG/expert context appended to the user turn
+    compactPrompt: boolean       // Use the short system prompt
+}
+
+export interface RouteDecision extends RoutePolicy {
+    tier: RouteTier
+    reason: string
+    queryType: string
+}
+
+export interface RouteInput {
+    message: string
+    queryType: string            // classifyQuery() output
+    entities: string[]           // Car names detected in the message
+    contextChars?: number        // Size of retrieved context (0 before retrieval)
+    historyTurns?: number
+}
+
+const SMALL_MODEL = process.env.AI_SMALL_MODEL || 'llama-3.1-8b-instant'
+const LARGE_MODEL = process.env.AI_LARGE_MODEL || 'llama-3.3-70b-versatile'
+
+export const ROUTE_POLICIES: Record<RouteTier, RoutePolicy> = {
+    trivial: { model: SMALL_MODEL, maxTokens: 120, temperature: 0.7, contextBudgetChars: 0, compactPrompt: true },
+    structured: { model: SMALL_MODEL, maxTokens: 300, temperature: 0.5, contextBudgetChars: 2500, compactPrompt: false },
+    standard: { model: SMALL_MODEL, maxTokens: 500, temperature: 0.7, contextBudgetChars: Infinity, compactPrompt: false },
+    complex: { model: LARGE_MODEL, maxTokens: 800, temperature: 0.7, contextBudgetChars: Infinity, compactPrompt: false }
+}
+
+const STRUCTURED_TYPES = new Set(['price', 'safety', 'mileage', 'features'])
+
+// Context size above which the small model tends to lose track
+const LARGE_CONTEXT_CHARS = 8000
+const LONG_CONVERSATION_TURNS = 6
+
+const TRIVIAL_PATTERN = /^(hi+|hello+|hey+|hii+|yo|namaste|good (morning|afternoon|evening)|thanks?( you)?|thank u|thx|ok(ay)?|cool|great|nice|bye|see you)[\s!.?]*$/i
+const COMPLEX_PATTERN = /\b(tco|total cost of ownership|cost of ownership|running cost|(\d+|five|three|ten)[- ]?(year|yr)s?\b|long[- ]term|resale value|depreciation|emi vs|lease|pros and cons of each)/i
+
+/**
+ * Greeting / acknowledgement with no car entities
+ */
+export function isTrivialMessage(message: string, entities: string[] = []): boolean {
+    if (entities.length > 0) return false
+    return TRIVIAL_PATTERN.test((message || '').trim())
+}
+
+/**
+ * Pick a route for this turn
+ */
+export function selectRoute(input: RouteInput): RouteDecision {
+    const { message, queryType, entities } = input
+    const contextChars = input.contextChars || 0
+    const historyTurns = input.historyTurns || 0
+
+    const decide = (tier: RouteTier, reason: string): RouteDecision =>
+        ({ ...ROUTE_POLICIES[tier], tier, reason, queryType })
+
+    if (queryType === 'general' && isTrivialMessage(message, entities)) {
+        return decide('trivial', 'greeting/acknowledgement')
+    }
+    if (queryType === 'comparison' && entities.length >= 2) {
+        return decide('complex', `comparison of ${entities.length} cars`)
+    }
+    if (COMPLEX_PATTERN.test(message)) {
+        return decide('complex', 'ownership/long-horizon consultation')
+    }
+    if (queryType === 'recommendation' && historyTurns >= LONG_CONVERSATION_TURNS) {
+        return decide('complex', `recommendation after ${historyTurns} turns`)
+    }
+    if (contextChars > LARGE_CONTEXT_CHARS) {
+        return decide('complex', `large context (${contextChars} chars)`)
+    }
+    if (STRUCTURED_TYPES.has(queryType) && entities.length <= 1) {
+        return decide('structured', `${queryType} lookup`)
+    }
+    return decide('standard', 'default')
+}
+
+/**
+ * Trim appended context to the route's budget (cut at a line boundary)
+ */
+export function applyContextBudget(context: string, decision: RouteDecision): string {
+    if (context.length <= decision.contextBudgetChars) return context
+    if (decision.contextBudgetChars <= 0) return ''
+    const cut = context.slice(0, decision.contextBudgetChars)
+    const lastBreak = cut.lastIndexOf('\n')
+    return lastBreak > 0 ? cut.slice(0, lastBreak) : cut
+}
+
+// ============================================
+// OUTCOME LOGGING
+// ============================================
+
+interface TierStats {
+    requests: number
+    totalLatencyMs: number
+    promptTokens: number
+    completionTokens: number
+}
+
+const tierStats = new Map<RouteTier, TierStats>()
+
+// Optional JSONL log of every decision for offline tuning
+const ROUTE_LOG_FILE = process.env.AI_ROUTE_LOG_FILE
+
+/**
+ * Record latency + token cost of a routed call
+ * (usage falls back to a chars/4 estimate when the provider doesn't report it)
+ * Returns the token counts that were recorded.
+ */
+export function recordRouteOutcome(
+    decision: RouteDecision,
+    latencyMs: number,
+    usage: TokenUsage | undefined,
+    promptChars: number,
+    completionChars: number
+): { promptTokens: number, completionTokens: number } {
+    const promptTokens = usage?.promptTokens ?? Math.ceil(promptChars / 4)
+    const completionTokens = usage?.completionTokens ?? Math.ceil(completionChars / 4)
+
+    const stats = tierStats.get(decision.tier) || { requests: 0, totalLatencyMs: 0, promptTokens: 0, completionTokens: 0 }
+    stats.requests++
+    stats.totalLatencyMs += latencyMs
+    stats.promptTokens += promptTokens
+    stats.completionTokens += completionTokens
+    tierStats.set(decision.tier, stats)
+
+    aiRouteDuration.observe({ tier: decision.tier, model: decision.model }, latencyMs / 1000)
+    aiRouteTokens.inc({ tier: decision.tier, kind: 'prompt' }, promptTokens)
+    aiRouteTokens.inc({ tier: decision.tier, kind: 'completion' }, completionTokens)
+
+    console.log(`🧭 Route ${decision.tier} (${decision.reason}) → ${decision.model}: ${latencyMs}ms, ${promptTokens}+${completionTokens} tokens`)
+
+    if (ROUTE_LOG_FILE) {
+        const line = JSON.stringify({
+            ts: new Date().toISOString(),
+            tier: decision.tier,
+            reason: decision.reason,
+            queryType: decision.queryType,
+            model: decision.model,
+            maxTokens: decision.maxTokens,
+            latencyMs,
+            promptTokens,
+            completionTokens
+        })
+        fs.appendFile(ROUTE_LOG_FILE, line + '\n').catch(err => {
+            console.warn('⚠️ Route log write failed:', err.message)
+        })
+    }
+
+    return { promptTokens, completionTokens }
+}
+
+/**
+ * Per-tier traffic share, average latency and token spend
+ */
+export function getRouteStats() {
+    const total = Array.from(tierStats.values()).reduce((sum, s) => sum + s.requests, 0)
+    const tiers: Record<string, any> = {}
+    tierStats.forEach((s, tier) => {
+        tiers[tier] = {
+            requests: s.requests,
+            share: total > 0 ? Number((s.requests / total).toFixed(3)) : 0,
+            avgLatencyMs: Math.round(s.totalLatencyMs / s.requests),
+            avgPromptTokens: Math.round(s.promptTokens / s.requests),
+            avgCompletionTokens: Math.round(s.completionTokens / s.requests)
+        }
+    })
+    return { total, tiers }
+}
+
+/**
+ * Reset stats (used by tests)
+ */
+export function resetRouteStats() {
+    tierStats.clear()
+}
@@ -14,6 +14,8 @@
  */
 
 import axios from 'axios'
+import type { LLMProvider } from './llm-router'
+import { memoizeCompletion, type PromptCacheOptions } from './llm-cache'
 
 // Ollama server configuration
 const OLLAMA_BASE_URL = process.env.OLLAMA_URL || 'http://localhost:11434'
@@ -62,40 +64,53 @@ interface ExtractedRequirements {
  * Query Ollama with a prompt
  * @param prompt - The prompt to send to Ollama
  * @param temperature - Creativity level (0-1, default 0.3 for consistency)
+ * @param cache - Optional prompt cache settings (identical prompts reuse the answer)
  * @returns The LLM response
  */
 export async function queryOllama(
     prompt: string,
-    temperature: number = 0.3
+    temperature: number = 0.3,
+    cache?: PromptCacheOptions
 ): Promise<string> {
-    try {
-        const response = await axios.post<OllamaResponse>(
-            `${OLLAMA_BASE_URL}/api/generate`,
-            {
-                model: MODEL_NAME,
-                prompt: prompt,
-                stream: false,
-                options: {
-                    temperature,
-                    top_p: 0.9,
-                    top_k: 40
+    const options = {
+        temperature,
+        top_p: 0.9,
+        top_k: 40
+    }
+
+    const generate = async () => {
+        try {
+            const response = await axios.post<OllamaResponse>(
+                `${OLLAMA_BASE_URL}/api/generate`,
+                {
+                    model: MODEL_NAME,
+                    prompt: prompt,
+                    stream: false,
+                    options
+                },
+                {
+                    timeout: 30000 // 30 second timeout
                 }
-            },
-            {
-                timeout: 30000 // 30 second timeout
-            }
-        )
+            )
 
-        return response.data.response.trim()
-    } catch (error) {
-        if (axios.isAxiosError(error)) {
-            if (error.code === 'ECONNREFUSED') {
-                throw new Error('Ollama server is not running. Please start it with: ollama serve')
+            return { content: response.data.response.trim() }
+        } catch (error) {
+            if (axios.isAxiosError(error)) {
+                if (error.code === 'ECONNREFUSED') {
+                    throw new Error('Ollama server is not running. Please start it with: ollama serve')
+                }
+                throw new Error(`Ollama request failed: ${error.message}`)
             }
-            throw new Error(`Ollama request failed: ${error.message}`)
+            throw error
         }
-        throw error
     }
+
+    if (!cache) {
+        return (await generate()).content
+    }
+
+    const result = await memoizeCompletion({ model: MODEL_NAME, messages: prompt, params: options }, generate, cache)
+    return result.content
 }
 
 /**
@@ -281,3 +296,41 @@ export async function getAvailableModels(): Promise<string[]> {
         return []
     }
 }
+
+
+/**
+ * Ollama chat provider for the LLM router (uses /api/chat)
+ */
+export function createOllamaProvider(model: string = MODEL_NAME, maxConcurrency = 2): LLMProvider {
+    return {
+        name: 'ollama',
+        model,
+        maxConcurrency,
+        async complete(request, signal) {
+            const response = await axios.post(
+                `${OLLAMA_BASE_URL}/api/chat`,
+                {
+                    model,
+                    messages: request.messages,
+                    stream: false,
+                    options: {
+                        temperature: request.temperature,
+                        num_predict: request.maxTokens
+                    }
+                },
+                { signal }
+            )
+
+            const promptTokens = response.data.prompt_eval_count || 0
+            const completionTokens = response.data.eval_count || 0
+            return {
+                content: (response.data.message?.content || '').trim(),
+                usage: {
+                    promptTokens,
+                    completionTokens,
+                    totalTokens: promptTokens + completionTokens
+                }
+            }
+        }
+    }
+}
@@ -0,0 +1,205 @@
+/**
+ * Prompt Accounting - Token and Cost Split per Prompt Section
+ *
+ * Providers report a single prompt_tokens figure per call, which says
+ * nothing about what to shrink. The chat prompt is assembled from a few
+ * sections (system prompt, conversation history, the user's message and
+ * the RAG / expert / learned context appended to it), so each section is
+ * estimated with the same tokenizer heuristic and the estimates are
+ * scaled to add up to the provider's reported prompt tokens, after the
+ * per-message chat-template overhead. Without provider usage the raw
+ * estimates are kept and the account is marked estimated.
+ *
+ * Cost uses USD prices per million input/output tokens per model
+ * (AI_TOKEN_PRICES="model=in/out,..." overrides the defaults). Cached
+ * completions spent no tokens and cost nothing.
+ */
+
+import type { TokenUsage } from './llm-router'
+import { aiPromptSectionTokens, aiLlmCost } from '../monitoring/metrics'
+
+// ============================================
+// TYPES
+// ============================================
+
+export type PromptSection = 'system' | 'history' | 'message' | 'rag' | 'expert' | 'learned'
+
+export const PROMPT_SECTIONS: PromptSection[] = ['system', 'history', 'message', 'rag', 'expert', 'learned']
+
+export interface PromptParts {
+    system: string
+    history: string[]
+    message: string
+    context: Array<[PromptSection, string]>  // Appended context in prompt order, before the route budget
+    contextChars: number                     // Context characters actually sent (after applyContextBudget)
+}
+
+export interface CompletionInfo {
+    model: string
+    content: string
+    usage?: TokenUsage
+    cached?: boolean
+}
+
+export interface PromptUsage {
+    model: string
+    tier: string
+    promptTokens: number
+    completionTokens: number
+    sections: Record<PromptSection, number>
+    overhead: number          // Chat-template tokens (role headers, end-of-turn markers)
+    estimated: boolean        // No provider usage - every figure is the heuristic
+    cached: boolean
+    costUsd: number | null    // null = no price known for the model
+}
+
+// ============================================
+// TOKEN ESTIMATE
+// ============================================
+
+// Llama 3 template: <|start_header_id|>role<|end_header_id|>\n\n ... <|eot_id|>
+const MESSAGE_OVERHEAD_TOKENS = 4
+const PROMPT_OVERHEAD_TOKENS = 1  // <|begin_of_text|>
+
+const TOKEN_PIECE = /[A-Za-z]+|\d{1,3}|\S/g
+
+/**
+ * BPE-like token estimate: words split every ~6 letters, numbers in
+ * 3-digit groups, punctuation one token, non-ASCII (₹, emoji) two
+ */
+export function estimateTokens(text: string): number {
+    if (!text) return 0
+    let tokens = 0
+    for (const piece of text.match(TOKEN_PIECE) || []) {
+        const code = piece.charCodeAt(0)
+        if ((code >= 65 && code <= 90) || (code >= 97 && code <= 122)) tokens += Math.ceil(piece.length / 6)
+        else if (code > 0x7f) tokens += 2
+        else tokens += 1
+    }
+    return tokens
+}
+
+// ============================================
+// PRICES
+// ============================================
+
+// USD per million tokens [input, output]
+const DEFAULT_PRICES: Record<string, [number, number]> = {
+    'llama-3.1-8b-instant': [0.05, 0.08],
+    'llama-3.3-70b-versatile': [0.59, 0.79]
+}
+
+function parsePrices(value: string | undefined): Record<string, [number, number]> {
+    const prices = { ...DEFAULT_PRICES }
+    for (const entry of (value || '').split(',')) {
+        const match = entry.trim().match(/^(.+?)=([\d.]+)\/([\d.]+)$/)
+        if (match) prices[match[1]] = [parseFloat(match[2]), parseFloat(match[3])]
+    }
+    return prices
+}
+
+const PRICES = parsePrices(process.env.AI_TOKEN_PRICES)
+
+export function priceFor(model: string): [number, number] | null {
+    return PRICES[model] || null
+}
+
+// ============================================
+// ACCOUNTING
+// ============================================
+
+/**
+ * Characters of each context section that survived the route's context
+ * budget (applyContextBudget keeps a prefix of the concatenated context)
+ */
+function budgetedContext(context: Array<[PromptSection, string]>, keptChars: number): Array<[PromptSection, number]> {
+    let remaining = keptChars
+    return context.map(([section, text]) => {
+        const kept = Math.max(0, Math.min(text.length, remaining))
+        remaining -= kept
+        return [section, kept === text.length ? estimateTokens(text) : estimateTokens(text.slice(0, kept))]
+    })
+}
+
+/**
+ * Split one LLM call's tokens over the prompt sections and price it
+ */
+export function accountPrompt(parts: PromptParts, completion: CompletionInfo, tier: string): PromptUsage {
+    const estimates = Object.fromEntries(PROMPT_SECTIONS.map(s => [s, 0])) as Record<PromptSection, number>
+    estimates.system = estimateTokens(parts.system)
+    estimates.history = parts.history.reduce((sum, text) => sum + estimateTokens(text), 0)
+    estimates.message = estimateTokens(parts.message)
+    for (const [section, tokens] of budgetedContext(parts.context, parts.contextChars)) {
+        estimates[section] += tokens
+    }
+
+    const messages = 2 + parts.history.length
+    const overhead = PROMPT_OVERHEAD_TOKENS + messages * MESSAGE_OVERHEAD_TOKENS
+    const estimatedContent = PROMPT_SECTIONS.reduce((sum, s) => sum + estimates[s], 0)
+
+    const usage = completion.usage
+    const promptTokens = usage?.promptTokens ?? estimatedContent + overhead
+    const completionTokens = usage?.completionTokens ?? estimateTokens(completion.content)
+
+    // Scale the estimates to the measured total; rounding drift goes to the largest section
+    const sections = { ...estimates }
+    if (usage && estimatedContent > 0) {
+        const scale = Math.max(0, promptTokens - overhead) / estimatedContent
+        let assigned = 0
+        for (const s of PROMPT_SECTIONS) {
+            sections[s] = Math.round(estimates[s] * scale)
+            assigned += sections[s]
+        }
+        const largest = PROMPT_SECTIONS.reduce((a, b) => sections[b] > sections[a] ? b : a)
+        sections[largest] = Math.max(0, sections[largest] + Math.max(0, promptTokens - overhead) - assigned)
+    }
+
+    const cached = completion.cached === true
+    const price = priceFor(completion.model)
+    const costUsd = cached ? 0 : price ? (promptTokens * price[0] + completionTokens * price[1]) / 1e6 : null
+
+    return {
+        model: completion.model,
+        tier,
+        promptTokens,
+        completionTokens,
+        sections,
+        overhead: usage ? Math.min(overhead, promptTokens) : overhead,
+        estimated: !usage,
+        cached,
+        costUsd
+    }
+}
+
+/**
+ * Count an account in the section-token and cost metrics (cache hits sent nothing)
+ */
+export function recordPromptUsage(usage: PromptUsage): void {
+    if (usage.cached) return
+    for (const section of PROMPT_SECTIONS) {
+        if (usage.sections[section] > 0) aiPromptSectionTokens.inc({ section, tier: usage.tier }, usage.sections[section])
+    }
+    aiPromptSectionTokens.inc({ section: 'overhead', tier: usage.tier }, usage.overhead)
+    if (usage.costUsd) aiLlmCost.inc({ model: usage.model }, usage.costUsd)
+
+    const split = PROMPT_SECTIONS.filter(s => usage.sections[s] > 0).map(s => `${s} ${usage.sections[s]}`).join(', ')
+    console.log(`🧾 Prompt ${usage.promptTokens}${usage.estimated ? ' (est.)' : ''} tokens [${split}], ` +
+        `completion ${usage.completionTokens}` + (usage.costUsd !== null ? `, $${usage.costUsd.toFixed(6)}` : ''))
+}
+
+/**
+ * X-AI-Usage header: "prompt=1840; completion=212; system=1210; history=96; ...; cost_usd=0.000109"
+ */
+export function formatUsageHeader(usage: PromptUsage): string {
+    const fields = [
+        `prompt=${usage.promptTokens}`,
+        `completion=${usage.completionTokens}`,
+        ...PROMPT_SECTIONS.map(s => `${s}=${usage.sections[s]}`),
+        `overhead=${usage.overhead}`,
+        `model=${usage.model}`,
+        `estimated=${usage.estimated ? 1 : 0}`,
+        `cached=${usage.cached ? 1 : 0}`
+    ]
+    if (usage.costUsd !== null) fields.push(`cost_usd=${usage.costUsd.toFixed(6)}`)
+    return fields.join('; ')
+}
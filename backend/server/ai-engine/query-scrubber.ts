@@ -0,0 +1,38 @@
+/**
+ * Query Scrubber - Mask Personal Data in Logged Chat Queries
+ *
+ * Used by scripts/export-ai-interactions.ts before queries leave the
+ * database. Masks emails, Indian phone numbers, vehicle registration
+ * numbers, PIN codes and self-introduced names:
+ *
+ * - PIN codes: labelled ("pin 400001") or bare 6-digit numbers, except
+ *   amounts written with a currency marker ("rs 950000")
+ * - Names: "my name is X" in any case; "I am X" / "I'm X"
+ *   only for a capitalised word that isn't a verb or a common adjective,
+ *   so "I am Looking for a car" keeps its text
+ */
+
+// Capitalised words that follow "I am" without being a name
+const NOT_NAMES = [
+    'A', 'An', 'The', 'Not', 'Also', 'Just', 'Still', 'So', 'Very', 'Really', 'Currently', 'Now',
+    'From', 'In', 'On', 'At', 'With', 'New', 'Interested', 'Confused', 'Ready', 'Sure', 'Happy',
+    'Worried', 'Okay', 'Ok', 'Fine', 'Good', 'Based', 'Married', 'Single', 'Tall', 'Short', 'Old',
+    'Student', 'Retired', 'Unable', 'Able', 'Keen', 'Tired', 'Done', 'Here', 'Back', 'Thinking'
+].join('|')
+const NAME_WORD = `(?!(?:${NOT_NAMES})\\b)(?![A-Z][a-z]+ing\\b)[A-Z][a-z]+`
+
+const SCRUBBERS: Array<[RegExp, string]> = [
+    [/[\w.+-]+@[\w-]+\.[\w.-]+/g, '<email>'],
+    [/(?:\+?91[\s-]?)?\b[6-9]\d{4}[\s-]?\d{5}\b/g, '<phone>'],
+    [/\b[a-z]{2}[\s-]?\d{1,2}[\s-]?[a-z]{1,3}[\s-]?\d{4}\b/gi, '<regno>'],
+    [/\b(pin\s*(?:code)?|zip)\s*(?:is|:)?\s*\d{6}\b/gi, '$1 <pin>'],
+    [/(?<!(?:rs\.?|inr|₹)\s*)\b[1-9]\d{5}\b/gi, '<pin>'],
+    [/\b(my name is)\s+[a-z]+(?=[\s,.!?]|$)/gi, '$1 <name>'],
+    [new RegExp(`\\b(I am|I'm)\\s+${NAME_WORD}(?=[\\s,.!?]|$)`, 'g'), '$1 <name>'],
+    // Surname, matched case-sensitively even after the case-insensitive rule
+    [new RegExp(`<name>\\s+${NAME_WORD}(?=[\\s,.!?]|$)`, 'g'), '<name>']
+]
+
+export function scrubQuery(query: string): string {
+    return SCRUBBERS.reduce((text, [pattern, replacement]) => text.replace(pattern, replacement), query)
+}
@@ -5,6 +5,7 @@
 
 import { HfInference } from '@huggingface/inference'
 import { retrieveCarData, retrieveWebData, generateRAGResponse, handleQuestionWithRAG } from './rag-system'
+import { memoizeCompletion } from './llm-cache'
 
 // ... (existing code)
 
@@ -388,18 +389,23 @@ Provide a helpful, conversational response (2-3 sentences). Include specific det
 
 Response:`
 
-    const response = await hf.textGeneration({
-      model: MODEL_NAME,
-      inputs: prompt,
-      parameters: {
-        max_new_tokens: 150,
-        temperature: 0.7,
-        top_p: 0.9,
-        return_full_text: false
-      }
-    })
+    const parameters = {
+      max_new_tokens: 150,
+      temperature: 0.7,
+      top_p: 0.9,
+      return_full_text: false
+    }
+
+    const response = await memoizeCompletion(
+      { model: MODEL_NAME, messages: prompt, params: parameters },
+      async () => {
+        const generated = await hf.textGeneration({ model: MODEL_NAME, inputs: prompt, parameters })
+        return { content: generated.generated_text.trim() }
+      },
+      { site: 'question-handler', ttlSeconds: 3600 }
+    )
 
-    return response.generated_text.trim()
+    return response.content
   } catch (error) {
     console.error('AI response error:', error)
     return "That's a really important question! To give you the best advice, I need to know a bit more about what you're looking for. Are you focused on a specific model, or should we start by finding the best cars for your budget?"
@@ -1,13 +1,13 @@
 /**
  * RAG (Retrieval-Augmented Generation) System
- * Combines MongoDB car data with web scraping for intelligent responses
+ * Combines MongoDB car data with indexed news for intelligent responses
  */
 
 import mongoose from 'mongoose'
 import { HfInference } from '@huggingface/inference'
 import { Variant, Model, Brand } from '../db/schemas'
-import axios from 'axios'
-import * as cheerio from 'cheerio'
+import { chatCompletion } from './ai-adapter'
+import { lookupNews } from '../services/news-index'
 
 const hf = new HfInference(process.env.HF_API_KEY)
 const MODEL_NAME = 'meta-llama/Meta-Llama-3.1-70B-Instruct'
@@ -81,47 +81,35 @@ export async function retrieveCarData(query: string, filters?: any): Promise<any
 }
 
 /**
- * Retrieve REAL web intelligence data using Google News RSS
+ * Retrieve REAL web intelligence data from the news index
+ * (Google News feeds ingested in the background - see services/news-index.ts)
  */
 export async function retrieveWebData(carName: string): Promise<any> {
-    try {
-        console.log(`🌐 RAG: Scraping real news for "${carName}"...`)
-
-        const query = encodeURIComponent(`${carName} India car review problems waiting period`)
-        const url = `https://news.google.com/rss/search?q=${query}&hl=en-IN&gl=IN&ceid=IN:en`
-
-        const response = await axios.get(url, {
-            headers: {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'application/rss+xml, application/xml, text/xml'
-            }
-        })
-        const xml = response.data
-        const $ = cheerio.load(xml, { xmlMode: true })
-
-        const items = $('item').slice(0, 5).map((i: number, el: any) => ({
-            title: $(el).find('title').text(),
-            link: $(el).find('link').text(),
-            pubDate: $(el).find('pubDate').text(),
-            description: $(el).find('description').text().replace(/<[^>]*>/g, '') // Strip HTML
-        })).get()
-
-        if (items.length === 0) {
-            console.log('⚠️ No news found')
-            return null
-        }
-
-        console.log(`✅ Found ${items.length} news articles`)
+    const news = lookupNews(carName, 5)
+    if (!news || news.articles.length === 0) {
+        console.log(`⚠️ No indexed news for "${carName}"`)
+        return null
+    }
 
-        return {
-            source: 'Google News (Real-Time)',
-            articles: items,
-            summary: `Found ${items.length} recent articles. Top headline: ${items[0].title}`
+    const updated = news.ageSeconds !== null ? `checked ${Math.round(news.ageSeconds / 60)} min ago` : 'not yet checked'
+    console.log(`✅ Found ${news.articles.length} indexed news articles (${news.matched}, ${updated}, ${news.tookMs.toFixed(3)}ms)`)
+
+    return {
+        source: news.stale ? 'Google News (may be outdated)' : 'Google News',
+        articles: news.articles.map(article => ({
+            title: article.title,
+            link: article.link,
+            pubDate: article.pubDate,
+            description: article.description
+        })),
+        summary: `Found ${news.articles.length} recent articles. Top headline: ${news.articles[0].title}`,
+        freshness: {
+            model: news.model,
+            fetchedAt: news.fetchedAt,
+            checkedAt: news.checkedAt,
+            ageSeconds: news.ageSeconds,
+            stale: news.stale
         }
-
-    } catch (error) {
-        console.error('Error retrieving web data:', error)
-        return null
     }
 }
 
@@ -254,7 +242,7 @@ export async function generateRAGResponse(
             }
         }
 
-        // Generate AI response with Groq (no fallback - Groq is reliable)
+        // Generate AI response through the shared LLM client layer (router + prompt cache)
         const prompt = `You are an expert Indian car advisor. Answer the user's question based on the provided data.
 
 **Question:** ${question}
@@ -272,25 +260,23 @@ ${contextText}
 
 **Answer:**`
 
-        console.log('🤖 Sending prompt to Groq LLM...')
+        console.log('🤖 Sending prompt to LLM...')
         console.log(`📏 Prompt length: ${prompt.length} chars`)
 
-        // Use Groq only (no fallback)
-        const Groq = (await import('groq-sdk')).default
-        const groq = new Groq({ apiKey: process.env.GROQ_API_KEY })
-
-        const completion = await groq.chat.completions.create({
+        // Shared client layer: same question + same retrieved data → cached answer
+        const completion = await chatCompletion({
             model: 'llama-3.1-8b-instant',
             messages: [
                 { role: 'system', content: 'You are a helpful car expert. Provide concise, accurate answers.' },
                 { role: 'user', content: prompt }
             ],
-            max_tokens: 150,
-            temperature: 0.7
+            maxTokens: 150,
+            temperature: 0.7,
+            cache: { site: 'rag-response', ttlSeconds: 1800 }
         })
 
-        const generatedText = completion.choices[0]?.message?.content?.trim() || ''
-        console.log('✅ Groq generated response successfully')
+        const generatedText = completion.content.trim()
+        console.log(`✅ LLM generated response successfully${completion.cached ? ' (cached)' : ''}`)
         return generatedText
 
     } catch (error: any) {
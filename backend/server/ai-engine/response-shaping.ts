@@ -0,0 +1,100 @@
+/**
+ * Compact AI Chat Responses
+ *
+ * The `cars` array of a chat reply comes from two places with very
+ * different shapes: findMatchingCars (enriched, with the full web
+ * intelligence blob inlined) and hybridCarSearch (vector store entries,
+ * including the raw `embedding` and the whole car document under `data`).
+ * Both go back to the client on every turn, and clients echo them into
+ * conversationHistory.
+ *
+ * Clients opt in per request:
+ * - `compact: true`          → flat cars with COMPACT_DEFAULT_FIELDS
+ * - `carFields: [...]`       → exactly these fields (implies compact)
+ *
+ * Web intelligence is never inlined in compact mode: cars carry an
+ * `intelligenceId` and the blob is fetched (and HTTP-cached) from
+ * GET /api/ai-chat/intelligence/:id. Compression itself is done by the
+ * global compression() middleware (br/gzip, negotiated per request).
+ */
+
+// Every field a compact car can have (anything else in carFields is ignored)
+export const COMPACT_FIELDS = [
+    'id', 'name', 'brand', 'variant', 'price', 'priceRange', 'mileage', 'fuelType', 'transmission',
+    'bodyType', 'image', 'matchScore', 'reasons', 'summary', 'pros', 'cons', 'intelligenceId'
+] as const
+
+export type CompactField = typeof COMPACT_FIELDS[number]
+
+export const COMPACT_DEFAULT_FIELDS: CompactField[] = [
+    'id', 'name', 'brand', 'variant', 'price', 'image', 'matchScore', 'reasons', 'intelligenceId'
+]
+
+const FIELD_SET = new Set<string>(COMPACT_FIELDS)
+
+export interface ResponseShape {
+    fields: CompactField[]
+}
+
+/**
+ * Read the opt-in from a chat request body (null = full legacy response)
+ */
+export function parseResponseShape(body: any): ResponseShape | null {
+    const requested = typeof body?.carFields === 'string'
+        ? body.carFields.split(',')
+        : body?.carFields
+    if (Array.isArray(requested)) {
+        const fields = requested.map((f: any) => String(f).trim()).filter((f: string) => FIELD_SET.has(f))
+        return { fields: fields.length > 0 ? fields as CompactField[] : COMPACT_DEFAULT_FIELDS }
+    }
+    return body?.compact === true ? { fields: COMPACT_DEFAULT_FIELDS } : null
+}
+
+/**
+ * Id under which web intelligence is cached for a car (see findMatchingCars)
+ */
+export function intelligenceKey(brand: string, name: string): string {
+    return `${brand} ${name}`.trim()
+}
+
+/**
+ * Flatten either car shape into the compact field vocabulary
+ */
+function flatten(car: any): Record<CompactField, any> {
+    const data = car?.data || {}
+    const brand = car?.brand || car?.brandName || data.brandName || car?.brandId || data.brandId || ''
+    const name = car?.name || data.name || ''
+    const minPrice = data.minPrice ?? car?.minPrice
+    const maxPrice = data.maxPrice ?? car?.maxPrice
+    return {
+        id: car?.id || car?._id?.toString() || data.id || null,
+        name,
+        brand,
+        variant: car?.variant ?? null,
+        price: car?.price ?? minPrice ?? null,
+        priceRange: minPrice != null ? [minPrice, maxPrice ?? minPrice] : null,
+        mileage: car?.mileage ?? null,
+        fuelType: car?.fuelType ?? (car?.fuelTypes || data.fuelTypes || [])[0] ?? null,
+        transmission: car?.transmission ?? null,
+        bodyType: car?.bodyType || data.bodyType || null,
+        image: car?.image || data.heroImage || null,
+        matchScore: car?.matchScore ?? (typeof car?.score === 'number' ? Math.round(car.score * 100) : null),
+        reasons: car?.reasons || [],
+        summary: car?.summary || data.summary || null,
+        pros: car?.pros || data.pros || [],
+        cons: car?.cons || data.cons || [],
+        // Only enriched cars have intelligence behind them
+        intelligenceId: car?.webIntelligence ? intelligenceKey(car.brand || brand, name) : null
+    }
+}
+
+export function compactCars(cars: any[], shape: ResponseShape): Record<string, any>[] {
+    return cars.map(car => {
+        const flat = flatten(car)
+        const out: Record<string, any> = {}
+        for (const field of shape.fields) {
+            if (flat[field] !== null && flat[field] !== undefined) out[field] = flat[field]
+        }
+        return out
+    })
+}
@@ -0,0 +1,361 @@
+/**
+ * Review Analysis - Batched, Deduplicated, Persisted
+ *
+ * Scraped owner reviews are analyzed (sentiment, pros, cons, issues) by the
+ * local LLM. One call per review repeats the same instruction preamble for
+ * every review and makes an intelligence build cost one round trip per
+ * review, so instead:
+ *
+ * - reviews are keyed by a hash of their normalized text; duplicates
+ *   (cross-posts, re-scrapes) are analyzed once
+ * - analyses are persisted per review (MongoDB, plus an in-process memo),
+ *   so a review is never sent to the LLM twice
+ * - the remaining reviews are packed into batches under a size/character
+ *   budget and analyzed with one structured-output request per batch
+ * - at most REVIEW_ANALYSIS_CONCURRENCY batches are in flight across all
+ *   cars, so refreshing the catalog does not flood Ollama
+ *
+ * A batch whose reply is unusable is split in half and retried; a single
+ * review that still fails gets the keyword fallback, which is not persisted
+ * (it is retried on the next build). A failed call (Ollama down, timeout)
+ * is not split - the whole batch falls back at once.
+ */
+
+import crypto from 'crypto'
+import mongoose from 'mongoose'
+import { queryOllama } from './ollama-client'
+import { aiReviewAnalysis, aiReviewAnalysisBatches } from '../monitoring/metrics'
+
+// ============================================
+// TYPES
+// ============================================
+
+export type ReviewSentiment = 'positive' | 'negative' | 'neutral'
+
+export interface ReviewAnalysis {
+    sentiment: ReviewSentiment
+    pros: string[]
+    cons: string[]
+    issues: string[]
+}
+
+export interface ReviewAnalysisOptions {
+    batchSize?: number
+    concurrency?: number
+}
+
+export interface ReviewAnalysisStats {
+    reviews: number
+    unique: number
+    persisted: number
+    analyzed: number
+    fallback: number
+    batches: number
+}
+
+// ============================================
+// CONFIG
+// ============================================
+
+const BATCH_SIZE = parseInt(process.env.REVIEW_BATCH_SIZE || '8', 10)
+const BATCH_CHARS = parseInt(process.env.REVIEW_BATCH_CHARS || '12000', 10)
+const MAX_REVIEW_CHARS = 1500           // Long posts: the opening carries the verdict
+const CONCURRENCY = parseInt(process.env.REVIEW_ANALYSIS_CONCURRENCY || '2', 10)
+const MEMO_MAX_ENTRIES = 5000
+
+// ============================================
+// PERSISTENCE
+// ============================================
+
+const reviewAnalysisSchema = new mongoose.Schema({
+    hash: { type: String, required: true, unique: true },
+    carModel: { type: String, index: true },
+    sentiment: { type: String, enum: ['positive', 'negative', 'neutral'], required: true },
+    pros: [String],
+    cons: [String],
+    issues: [String],
+    createdAt: { type: Date, default: Date.now }
+})
+
+export const ReviewAnalysisRecord = mongoose.models.ReviewAnalysis ||
+    mongoose.model('ReviewAnalysis', reviewAnalysisSchema)
+
+// Most recently used last; also serves when MongoDB is not connected
+const memo = new Map<string, ReviewAnalysis>()
+
+function remember(hash: string, analysis: ReviewAnalysis) {
+    memo.delete(hash)
+    memo.set(hash, analysis)
+    if (memo.size > MEMO_MAX_ENTRIES) {
+        memo.delete(memo.keys().next().value as string)
+    }
+}
+
+function mongoReady(): boolean {
+    return mongoose.connection.readyState === 1
+}
+
+async function loadPersisted(hashes: string[]): Promise<Map<string, ReviewAnalysis>> {
+    const found = new Map<string, ReviewAnalysis>()
+    if (hashes.length === 0 || !mongoReady()) return found
+    try {
+        const docs = await ReviewAnalysisRecord.find({ hash: { $in: hashes } })
+            .select({ hash: 1, sentiment: 1, pros: 1, cons: 1, issues: 1, _id: 0 })
+            .lean() as any[]
+        for (const doc of docs) {
+            found.set(doc.hash, { sentiment: doc.sentiment, pros: doc.pros, cons: doc.cons, issues: doc.issues })
+        }
+    } catch (error) {
+        console.error('Review analysis lookup error:', error)
+    }
+    return found
+}
+
+async function persist(carModel: string, analyses: Array<[string, ReviewAnalysis]>) {
+    if (analyses.length === 0 || !mongoReady()) return
+    try {
+        await ReviewAnalysisRecord.bulkWrite(analyses.map(([hash, analysis]) => ({
+            updateOne: {
+                filter: { hash },
+                update: { $setOnInsert: { hash, carModel, ...analysis } },
+                upsert: true
+            }
+        })), { ordered: false })
+    } catch (error) {
+        console.error('Review analysis persist error:', error)
+    }
+}
+
+/**
+ * Number of memoized analyses (memory diagnostics)
+ */
+export function getReviewAnalysisMemoSize(): number {
+    return memo.size
+}
+
+/**
+ * Forget memoized analyses (benchmarks compare cold builds)
+ */
+export function resetReviewAnalysisMemo() {
+    memo.clear()
+}
+
+// ============================================
+// HASHING & BATCHING
+// ============================================
+
+/**
+ * Content hash of a review: case, whitespace and punctuation runs don't
+ * make a different review
+ */
+export function reviewHash(text: string): string {
+    const normalized = text.toLowerCase().replace(/[^\p{L}\p{N}]+/gu, ' ').trim()
+    return crypto.createHash('sha256').update(normalized).digest('hex').slice(0, 32)
+}
+
+/**
+ * Pack reviews into batches of at most batchSize reviews and BATCH_CHARS characters
+ */
+export function packBatches<T extends { text: string }>(items: T[], batchSize: number = BATCH_SIZE): T[][] {
+    const batches: T[][] = []
+    let current: T[] = []
+    let chars = 0
+    for (const item of items) {
+        const length = Math.min(item.text.length, MAX_REVIEW_CHARS)
+        if (current.length > 0 && (current.length >= batchSize || chars + length > BATCH_CHARS)) {
+            batches.push(current)
+            current = []
+            chars = 0
+        }
+        current.push(item)
+        chars += length
+    }
+    if (current.length > 0) batches.push(current)
+    return batches
+}
+
+// ============================================
+// LLM
+// ============================================
+
+function buildBatchPrompt(carModel: string, texts: string[]): string {
+    const reviews = texts
+        .map((text, i) => `[${i + 1}] "${text.slice(0, MAX_REVIEW_CHARS).replace(/\s+/g, ' ')}"`)
+        .join('\n\n')
+
+    return `Analyze these ${texts.length} owner reviews of the ${carModel}.
+
+For each review extract:
+1. Sentiment: positive, negative, or neutral
+2. Pros: positive points mentioned
+3. Cons: negative points mentioned
+4. Issues: any problems or issues mentioned
+
+Focus on build quality, reliability, mileage, comfort, features, service experience and value for money.
+
+Return ONLY a valid JSON array with one object per review, in order:
+[{"id": 1, "sentiment": "positive" | "negative" | "neutral", "pros": ["..."], "cons": ["..."], "issues": ["..."]}]
+
+Reviews:
+
+${reviews}`
+}
+
+function toStringList(value: unknown): string[] {
+    return Array.isArray(value) ? value.filter(v => typeof v === 'string' && v.trim()).map(v => v.trim()) : []
+}
+
+/**
+ * Parse a batch reply into analyses by review position (null = missing or malformed)
+ */
+export function parseBatchResponse(response: string, count: number): Array<ReviewAnalysis | null> {
+    const results: Array<ReviewAnalysis | null> = new Array(count).fill(null)
+    const cleaned = response.replace(/```json\n?/g, '').replace(/```\n?/g, '')
+    const match = cleaned.match(/\[[\s\S]*\]/)
+    if (!match) return results
+
+    let items: any[]
+    try {
+        items = JSON.parse(match[0])
+    } catch {
+        return results
+    }
+    if (!Array.isArray(items)) return results
+
+    items.forEach((item, position) => {
+        if (!item || typeof item !== 'object') return
+        const index = Number.isInteger(item.id) ? item.id - 1 : position
+        if (index < 0 || index >= count || results[index]) return
+        const sentiment = String(item.sentiment || '').toLowerCase()
+        if (sentiment !== 'positive' && sentiment !== 'negative' && sentiment !== 'neutral') return
+        results[index] = {
+            sentiment,
+            pros: toStringList(item.pros),
+            cons: toStringList(item.cons),
+            issues: toStringList(item.issues)
+        }
+    })
+    return results
+}
+
+function fallbackAnalysis(text: string): ReviewAnalysis {
+    const lower = text.toLowerCase()
+    return {
+        sentiment: lower.includes('good') || lower.includes('great') ? 'positive' : 'neutral',
+        pros: [],
+        cons: [],
+        issues: []
+    }
+}
+
+// Batches in flight across all cars
+let active = 0
+const waiting: Array<() => void> = []
+
+async function withBatchSlot<T>(limit: number, task: () => Promise<T>): Promise<T> {
+    while (active >= limit) {
+        await new Promise<void>(resolve => waiting.push(resolve))
+    }
+    active++
+    try {
+        return await task()
+    } finally {
+        active--
+        waiting.shift()?.()
+    }
+}
+
+/**
+ * Analyze one batch; unusable replies are split and retried down to single
+ * reviews, failed calls fall back for the whole batch
+ */
+async function analyzeBatch(carModel: string, texts: string[], limit: number, stats: ReviewAnalysisStats): Promise<Array<ReviewAnalysis | null>> {
+    let response: string
+    try {
+        response = await withBatchSlot(limit, () => queryOllama(buildBatchPrompt(carModel, texts), 0.2))
+    } catch (error) {
+        // Smaller batches won't reach a server that is down - don't multiply the calls
+        console.error('Review batch analysis error:', error)
+        stats.batches++
+        aiReviewAnalysisBatches.inc({ outcome: 'failed' })
+        return new Array(texts.length).fill(null)
+    }
+    const parsed = parseBatchResponse(response, texts.length)
+    stats.batches++
+
+    const missing = parsed.map((analysis, i) => analysis ? -1 : i).filter(i => i >= 0)
+    aiReviewAnalysisBatches.inc({ outcome: missing.length === 0 ? 'ok' : missing.length < texts.length ? 'partial' : 'failed' })
+    if (missing.length === 0 || texts.length === 1) return parsed
+
+    // Retry what the model dropped, in halves, so one bad review can't sink the rest
+    const half = Math.ceil(missing.length / 2)
+    const retries = missing.length === texts.length ? [missing.slice(0, half), missing.slice(half)] : [missing]
+    for (const indexes of retries.filter(group => group.length > 0)) {
+        const retried = await analyzeBatch(carModel, indexes.map(i => texts[i]), limit, stats)
+        indexes.forEach((index, i) => { parsed[index] = retried[i] })
+    }
+    return parsed
+}
+
+// ============================================
+// MAIN FUNCTION
+// ============================================
+
+/**
+ * Analyze a car's reviews → one analysis per input text (same order) and
+ * the work it took
+ */
+export async function analyzeReviews(
+    carModel: string,
+    texts: string[],
+    options: ReviewAnalysisOptions = {}
+): Promise<{ analyses: ReviewAnalysis[], stats: ReviewAnalysisStats }> {
+    const hashes = texts.map(reviewHash)
+    const unique = [...new Set(hashes)]
+    const stats: ReviewAnalysisStats = { reviews: texts.length, unique: unique.length, persisted: 0, analyzed: 0, fallback: 0, batches: 0 }
+
+    const known = new Map<string, ReviewAnalysis>()
+    const notMemoized: string[] = []
+    for (const hash of unique) {
+        const hit = memo.get(hash)
+        if (hit) known.set(hash, hit)
+        else notMemoized.push(hash)
+    }
+    for (const [hash, analysis] of await loadPersisted(notMemoized)) {
+        known.set(hash, analysis)
+        remember(hash, analysis)
+    }
+    stats.persisted = known.size
+
+    const pending = unique
+        .filter(hash => !known.has(hash))
+        .map(hash => ({ hash, text: texts[hashes.indexOf(hash)] }))
+
+    const limit = options.concurrency ?? CONCURRENCY
+    const fresh: Array<[string, ReviewAnalysis]> = []
+    await Promise.all(packBatches(pending, options.batchSize ?? BATCH_SIZE).map(async batch => {
+        const results = await analyzeBatch(carModel, batch.map(item => item.text), limit, stats)
+        batch.forEach((item, i) => {
+            const analysis = results[i]
+            if (analysis) {
+                known.set(item.hash, analysis)
+                remember(item.hash, analysis)
+                fresh.push([item.hash, analysis])
+                stats.analyzed++
+            } else {
+                known.set(item.hash, fallbackAnalysis(item.text))
+                stats.fallback++
+            }
+        })
+    }))
+    await persist(carModel, fresh)
+
+    aiReviewAnalysis.inc({ result: 'persisted' }, stats.persisted)
+    aiReviewAnalysis.inc({ result: 'duplicate' }, stats.reviews - stats.unique)
+    aiReviewAnalysis.inc({ result: 'analyzed' }, stats.analyzed)
+    aiReviewAnalysis.inc({ result: 'fallback' }, stats.fallback)
+    console.log(`🧠 Reviews for ${carModel}: ${stats.reviews} (${stats.unique} unique), ${stats.persisted} already analyzed, ` +
+        `${stats.analyzed} analyzed in ${stats.batches} LLM call(s)` + (stats.fallback ? `, ${stats.fallback} fallback` : ''))
+
+    return { analyses: hashes.map(hash => known.get(hash)!), stats }
+}
@@ -0,0 +1,255 @@
+/**
+ * Single-Flight Request Coalescing
+ *
+ * When a popular query spikes (e.g. right after a launch), many identical
+ * stateless chat requests arrive at once. Instead of running retrieval +
+ * LLM + scraping for each of them, concurrent duplicates share ONE pipeline
+ * execution.
+ *
+ * Two layers:
+ * - In-process: duplicates on the same worker await the same promise
+ * - Cross-worker: a Redis lease elects one leader; other workers poll for
+ *   the published result (bounded wait, then run the pipeline themselves).
+ *   Results are published per flight (lease token), so a request that
+ *   arrives after a flight has ended never picks up its result
+ *
+ * Results must be JSON-serializable so they can be shared through Redis.
+ */
+
+import { createHash, randomUUID } from 'crypto'
+import { getCacheRedisClient } from '../config/redis-config'
+import { aiChatCoalescedRequests } from '../monitoring/metrics'
+
+// ============================================
+// CONFIGURATION
+// ============================================
+
+const LEASE_PREFIX = 'sf:lease:'
+const RESULT_PREFIX = 'sf:result:'
+const WORKER_ID = `${process.pid}-${randomUUID().slice(0, 8)}`
+
+export interface SingleFlightOptions {
+    leaseMs?: number      // How long a leader may hold the cross-worker lease
+    maxWaitMs?: number    // Upper bound a follower waits before running itself
+    pollMs?: number       // Poll interval for cross-worker followers
+    resultTtlMs?: number  // How long a published result stays readable for that flight's followers
+}
+
+const DEFAULTS: Required<SingleFlightOptions> = {
+    leaseMs: 30000,
+    maxWaitMs: 15000,
+    pollMs: 100,
+    resultTtlMs: 5000
+}
+
+export type FlightRole = 'leader' | 'follower' | 'remote_follower' | 'timeout'
+
+// ============================================
+// STATE & STATS
+// ============================================
+
+const inFlight = new Map<string, Promise<{ value: any, role: FlightRole }>>()
+const TIMED_OUT = Symbol('single-flight-timeout')
+
+const stats = {
+    leaders: 0,
+    followers: 0,
+    remoteFollowers: 0,
+    timeouts: 0
+}
+
+function countRole(role: FlightRole) {
+    if (role === 'leader') stats.leaders++
+    else if (role === 'follower') stats.followers++
+    else if (role === 'remote_follower') stats.remoteFollowers++
+    else stats.timeouts++
+    aiChatCoalescedRequests.inc({ role })
+}
+
+// ============================================
+// KEY BUILDING
+// ============================================
+
+/**
+ * Normalize a chat message so trivially different spellings coalesce
+ * ("Tata Sierra launch date?" == "tata  sierra launch date")
+ */
+export function normalizeMessage(message: string): string {
+    return (message || '')
+        .toLowerCase()
+        .replace(/\s+/g, ' ')
+        .replace(/[?!.,\s]+$/g, '')
+        .trim()
+}
+
+/**
+ * Fingerprint conversation history by role + content only
+ * (echoed `cars` arrays don't change what the LLM sees)
+ */
+export function fingerprintHistory(history: any[] = []): string {
+    if (!Array.isArray(history) || history.length === 0) return 'empty'
+    const hash = createHash('sha1')
+    for (const msg of history) {
+        hash.update(`${msg?.role === 'user' ? 'user' : 'assistant'}\u0000${msg?.content || ''}\u0001`)
+    }
+    return hash.digest('hex')
+}
+
+/**
+ * Build the coalescing key from everything that affects the pipeline output
+ */
+export function buildCoalescingKey(message: string, history: any[] = [], state?: any): string {
+    const parts = [
+        normalizeMessage(message),
+        fingerprintHistory(history),
+        state ? JSON.stringify(state) : ''
+    ]
+    return createHash('sha256').update(parts.join('\u0002')).digest('hex')
+}
+
+// ============================================
+// COALESCING
+// ============================================
+
+function sleep(ms: number) {
+    return new Promise(resolve => setTimeout(resolve, ms))
+}
+
+function getReadyRedis() {
+    const redis = getCacheRedisClient()
+    return redis && (redis as any).status === 'ready' ? redis : null
+}
+
+/**
+ * Run `fn` as the cross-worker leader, or wait for another worker's result
+ */
+async function runAcrossWorkers<T>(
+    key: string,
+    fn: () => Promise<T>,
+    opts: Required<SingleFlightOptions>,
+    attempt: number = 0
+): Promise<{ value: T, role: FlightRole }> {
+    const redis = getReadyRedis()
+    if (!redis) {
+        return { value: await fn(), role: 'leader' }
+    }
+
+    const leaseKey = LEASE_PREFIX + key
+    const token = `${WORKER_ID}:${randomUUID()}`
+
+    let acquired: string | null = null
+    let leader: string | null = null
+    try {
+        acquired = await redis.set(leaseKey, token, 'PX', opts.leaseMs, 'NX')
+        if (!acquired) leader = await redis.get(leaseKey)
+    } catch (error) {
+        console.warn('⚠️ Single-flight lease error, running locally:', (error as Error).message)
+        return { value: await fn(), role: 'leader' }
+    }
+
+    // Lease released between our SET and GET - the flight just ended, so lead a new one
+    if (!acquired && !leader && attempt === 0) {
+        return runAcrossWorkers(key, fn, opts, attempt + 1)
+    }
+
+    if (acquired) {
+        try {
+            const value = await fn()
+            await redis.set(RESULT_PREFIX + token, JSON.stringify(value), 'PX', opts.resultTtlMs)
+                .catch(err => console.warn('⚠️ Single-flight publish error:', err.message))
+            return { value, role: 'leader' }
+        } finally {
+            // Release only our own lease
+            const owner = await redis.get(leaseKey).catch(() => null)
+            if (owner === token) {
+                await redis.del(leaseKey).catch(() => 0)
+            }
+        }
+    }
+
+    // Another worker is leading - poll for the result of that flight only
+    const resultKey = RESULT_PREFIX + leader
+    const deadline = Date.now() + opts.maxWaitMs
+    let leaseHeld = true
+    while (leader && leaseHeld && Date.now() < deadline) {
+        await sleep(opts.pollMs)
+        // The leader publishes before releasing, so check the lease first
+        // and read the result once more after it is gone
+        const owner = await redis.get(leaseKey).catch(() => leader)
+        leaseHeld = owner === leader
+        const published = await redis.get(resultKey).catch(() => null)
+        if (published) {
+            return { value: JSON.parse(published) as T, role: 'remote_follower' }
+        }
+        // Lease gone and nothing published: the leader gave up (crashed / lease expired)
+    }
+
+    console.warn(`⏱️ Single-flight wait exceeded for ${key.slice(0, 12)}…, running pipeline locally`)
+    return { value: await fn(), role: 'timeout' }
+}
+
+/**
+ * Coalesce concurrent calls with the same key into a single execution.
+ *
+ * Followers on the same worker share the leader's promise; if the leader
+ * takes longer than `maxWaitMs`, the follower runs `fn` itself so nobody
+ * waits unboundedly.
+ */
+export async function coalesce<T>(
+    key: string,
+    fn: () => Promise<T>,
+    options: SingleFlightOptions = {}
+): Promise<{ value: T, role: FlightRole }> {
+    const opts = { ...DEFAULTS, ...options }
+
+    const existing = inFlight.get(key)
+    if (existing) {
+        let timer: NodeJS.Timeout | undefined
+        const timeout = new Promise<typeof TIMED_OUT>(resolve => {
+            timer = setTimeout(() => resolve(TIMED_OUT), opts.maxWaitMs)
+        })
+        const shared = await Promise.race([existing, timeout]).finally(() => clearTimeout(timer))
+        if (shared !== TIMED_OUT) {
+            countRole('follower')
+            return { value: shared.value as T, role: 'follower' }
+        }
+        countRole('timeout')
+        return { value: await fn(), role: 'timeout' }
+    }
+
+    const flight = runAcrossWorkers(key, fn, opts)
+    inFlight.set(key, flight)
+
+    try {
+        const result = await flight
+        countRole(result.role)
+        return result
+    } finally {
+        inFlight.delete(key)
+    }
+}
+
+/**
+ * Get coalescing stats (fan-in ratio = total requests / pipeline executions)
+ */
+export function getSingleFlightStats() {
+    const executions = stats.leaders + stats.timeouts
+    const total = executions + stats.followers + stats.remoteFollowers
+    return {
+        ...stats,
+        inFlight: inFlight.size,
+        totalRequests: total,
+        pipelineExecutions: executions,
+        fanInRatio: executions > 0 ? Number((total / executions).toFixed(2)) : 1
+    }
+}
+
+/**
+ * Reset stats (used by tests)
+ */
+export function resetSingleFlightStats() {
+    stats.leaders = 0
+    stats.followers = 0
+    stats.remoteFollowers = 0
+    stats.timeouts = 0
+}
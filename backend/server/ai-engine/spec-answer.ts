@@ -0,0 +1,354 @@
+/**
+ * Spec Answers - Direct Factual Queries Without the LLM
+ *
+ * "ground clearance of thar", "boot space in ertiga", "airbags in punch",
+ * "does venue have sunroof" used to be answered by the LLM from a prompt
+ * dump of raw documents (slow, and free to hallucinate a number). This
+ * parses the spec attribute(s) and the model from the message and reads
+ * the value straight from the columnar spec table (services/spec-table):
+ *
+ * - numbers: min/max across variants (precomputed per model) with the
+ *   variant holding each end, in the table's canonical unit
+ * - features: which variants have it and in which form ("Electric Sunroof")
+ * - text: distinct values with variant counts (transmissions, brakes...)
+ *
+ * Every answer carries a citation (model page + variant count + table age).
+ *
+ * Falls through to the LLM when no attribute is recognised, no single
+ * model is named (or referenced in the last turns), the question asks for
+ * an opinion or comparison ("how is the mileage in traffic", "vs"), or
+ * the table has no value for it.
+ */
+
+import {
+    getSpecTable,
+    aliasKey,
+    isSpecYes,
+    SPEC_ATTRIBUTE_BY_KEY,
+    type SpecAttribute,
+    type SpecTable
+} from '../services/spec-table'
+
+// ============================================
+// QUERY PARSING
+// ============================================
+
+// Tested in order; each match is blanked out before the next pattern runs
+// ("spare tyre" is not also "tyre", "engine power" is not also "engine")
+const ATTRIBUTE_PATTERNS: Array<[string, RegExp]> = [
+    ['groundClearance', /\bground ?clearance\b/],
+    ['bootSpace', /\b(boot( space)?|luggage space|trunk( space)?|dick[e]?y)\b/],
+    ['fuelTankCapacity', /\b(fuel )?tank( capacity| size)?\b/],
+    ['airbags', /\bair ?bags?\b/],
+    ['seating', /\b(seating( capacity)?|how many seats|how many (people|passengers))\b/],
+    ['mileage', /\b(mileage|kmpl|fuel efficiency|fuel economy)\b/],
+    ['evRange', /\b(driving )?(?<!(price|budget) )range\b/],
+    ['batteryCapacity', /\bbattery( capacity| size)?\b/],
+    ['power', /\b(engine )?(power|bhp|horsepower|hp|ps)\b(?! (windows?|steering))/],
+    ['torque', /\b(engine )?torque\b/],
+    ['engine', /\b(displacement|cc|engine (size|capacity|displacement)|engine)\b/],
+    ['wheelbase', /\bwheel ?base\b/],
+    ['length', /\b(length|how long is)\b/],
+    ['width', /\b(width|how wide is)\b/],
+    ['height', /\b(height|how tall is)\b/],
+    ['turningRadius', /\bturning (radius|circle)\b/],
+    ['kerbWeight', /\b((kerb|curb) weight|how heavy is|weight)\b/],
+    ['topSpeed', /\btop ?speed\b/],
+    ['ncap', /\b(ncap( rating)?|crash test( rating)?|safety rating|star rating)\b/],
+    ['gears', /\b(how many gears|number of gears|gears)\b/],
+    ['price', /\b(price|priced|cost|ex-?showroom)\b/],
+    ['sunroof', /\b(panoramic )?(sun ?roof|moon ?roof)\b/],
+    ['adas', /\badas\b/],
+    ['cruiseControl', /\bcruise( control)?\b/],
+    ['ventilatedSeats', /\b(ventilated|cooled) seats?\b/],
+    ['wirelessCharging', /\bwireless (phone )?charg(er|ing)\b/],
+    ['headsUpDisplay', /\b(heads?[- ]?up display|hud)\b/],
+    ['cooledGlovebox', /\bcooled glove ?box\b/],
+    ['carplay', /\b(wireless )?(android auto|apple car ?play|car ?play)\b/],
+    ['spareWheel', /\bspare (wheel|tyre|tire)\b/],
+    ['frontBrake', /\bfront brakes?\b/],
+    ['rearBrake', /\brear brakes?\b/],
+    ['tyreSize', /\b(tyre|tire)s?( size| profile)?\b(?! pressure)/],
+    ['driveType', /\b(4x4|4wd|awd|all[- ]wheel drive|four[- ]wheel drive|drive ?type|drivetrain)\b/],
+    ['transmission', /\b(transmission|gearbox|automatic|amt|cvt|dct|ivt)\b(?! (climate|head ?lamps?|head ?lights?|wipers?|ac)\b)/],
+    ['fuelType', /\b(fuel type|fuel options|petrol or diesel|diesel or petrol|which fuel)\b/]
+]
+
+// Opinions, comparisons and buying advice stay with the consultant
+const NEEDS_CONSULTANT = /\b(how is|how's|how good|good enough|enough|worth|struggle|effective|real[- ]world|in traffic|better|best|compare|comparison|vs|versus|running cost|maintenance|service|should|recommend|suggest|budget|under \d|which (one|car|is)|on[- ]road|emi|insurance|waiting|discount|facelift|launch(ing)?|why)\b/
+
+const FUEL_FILTER = /\b(petrol|diesel|cng|electric|hybrid)\b(?! (sun ?roof|seats?|adjust\w*|tailgate|parking brake))/
+const TOP_VARIANT = /\btop(-end| end)? (model|variant|spec|trim)\b|\bhighest variant\b/
+const BASE_VARIANT = /\b(base|entry|lowest|cheapest)( level)?( model| variant| trim)\b/
+
+const HISTORY_LOOKBACK = 4
+const MAX_ATTRIBUTES = 3
+
+export interface SpecCitation {
+    model: string
+    url: string
+    attribute: string
+    fields: string[]
+    variants: number       // Variants the answer covers
+    updatedAt: string      // Spec table build time
+}
+
+export type SpecAnswerReason =
+    | 'answered'
+    | 'no_table'
+    | 'no_attribute'
+    | 'no_entity'
+    | 'multiple_models'
+    | 'consultant'
+    | 'no_data'
+
+// Same car shape the chat pipeline returns for retrieved models
+export interface SpecCar {
+    id: string
+    name: string
+    brandName: string
+    minPrice: number | null
+    maxPrice: number | null
+}
+
+export interface SpecAnswer {
+    answered: boolean
+    reason: SpecAnswerReason
+    attributes: string[]
+    models: string[]
+    reply?: string
+    citations?: SpecCitation[]
+    cars?: SpecCar[]
+}
+
+function normalize(text: string): string {
+    return ` ${text.toLowerCase().replace(/[^a-z0-9+\s-]/g, ' ').replace(/\s+/g, ' ')} `
+}
+
+/**
+ * Spec attributes asked about, in message order of the patterns
+ */
+export function parseSpecAttributes(message: string): string[] {
+    let text = normalize(message)
+    const found: string[] = []
+    for (const [key, pattern] of ATTRIBUTE_PATTERNS) {
+        const match = text.match(pattern)
+        if (!match || match.index === undefined) continue
+        found.push(key)
+        text = text.slice(0, match.index) + ' '.repeat(match[0].length) + text.slice(match.index + match[0].length)
+    }
+    return found
+}
+
+/**
+ * Models named in the text: distinct mentions, each resolving to one or
+ * more models ("innova" → Innova Crysta + Innova Hycross)
+ */
+export function findModelMentions(text: string, table: SpecTable): number[][] {
+    const tokens = normalize(text).trim().split(' ').filter(Boolean)
+    const mentions: number[][] = []
+    const seen = new Set<string>()
+    for (let i = 0; i < tokens.length; i++) {
+        // Longest n-gram first ("grand vitara" before "grand", "xuv 700" → "xuv700")
+        for (let n = Math.min(3, tokens.length - i); n >= 1; n--) {
+            const key = aliasKey(tokens.slice(i, i + n).join(''))
+            const models = table.aliases.get(key)
+            if (!models) continue
+            const id = models.join(',')
+            if (!seen.has(id)) {
+                seen.add(id)
+                mentions.push(models)
+            }
+            i += n - 1
+            break
+        }
+    }
+    return mentions
+}
+
+// ============================================
+// ANSWERS
+// ============================================
+
+function formatNumber(value: number, attribute: SpecAttribute): string {
+    if (attribute.unit === '₹') {
+        return value >= 10000000
+            ? `₹${(value / 10000000).toFixed(2)} crore`
+            : `₹${(value / 100000).toFixed(2)} lakh`
+    }
+    const rounded = Number.isInteger(value) ? String(value) : value.toFixed(1).replace(/\.0$/, '')
+    return attribute.unit ? `${rounded} ${attribute.unit}` : rounded
+}
+
+/**
+ * Variants the question is about (all, one fuel, or the top/base variant)
+ * plus how to name that scope in the answer
+ */
+function selectRows(table: SpecTable, modelIndex: number, message: string, attribute: SpecAttribute): { rows: number[], scope: string } {
+    const model = table.models[modelIndex]
+    let rows: number[] = []
+    for (let row = model.start; row < model.end; row++) rows.push(row)
+    let scope = ''
+
+    const fuel = attribute.key !== 'fuelType' ? message.match(FUEL_FILTER) : null
+    if (fuel) {
+        const filtered = rows.filter(row => table.variantFuel[row].includes(fuel[1]))
+        if (filtered.length > 0 && filtered.length < rows.length) {
+            rows = filtered
+            scope = ` ${fuel[1]}`
+        }
+    }
+    // Rows are cheapest first
+    const pick = TOP_VARIANT.test(message) ? rows.length - 1 : BASE_VARIANT.test(message) ? 0 : -1
+    if (pick >= 0 && rows.length > 1) {
+        rows = [rows[pick]]
+        const variant = table.variantNames[rows[0]]
+        // Variant names usually repeat the model name ("Venue SX(O)")
+        scope = variant.toLowerCase().startsWith(model.name.toLowerCase())
+            ? variant.slice(model.name.length)
+            : ` ${variant}`
+    }
+    return { rows, scope }
+}
+
+function answerNumber(table: SpecTable, modelIndex: number, rows: number[], attribute: SpecAttribute, allRows: boolean): string | null {
+    const column = table.numbers.get(attribute.key)!
+    let minRow = -1
+    let maxRow = -1
+    if (allRows) {
+        // Precomputed per model
+        const range = table.ranges.get(attribute.key)!
+        minRow = range.minRow[modelIndex]
+        maxRow = range.maxRow[modelIndex]
+    } else {
+        for (const row of rows) {
+            const value = column[row]
+            if (Number.isNaN(value)) continue
+            if (minRow < 0 || value < column[minRow]) minRow = row
+            if (maxRow < 0 || value > column[maxRow]) maxRow = row
+        }
+    }
+    if (minRow < 0) return null
+
+    const min = column[minRow]
+    const max = column[maxRow]
+    if (min === max) return formatNumber(min, attribute)
+    return `${formatNumber(min, attribute)} (${table.variantNames[minRow]}) to ${formatNumber(max, attribute)} (${table.variantNames[maxRow]})`
+}
+
+function answerFeature(table: SpecTable, rows: number[], attribute: SpecAttribute, modelName: string): string | null {
+    const { codes, dictionary } = table.texts.get(attribute.key)!
+    const listed = rows.filter(row => codes[row] >= 0)
+    if (listed.length === 0) return null
+    const withFeature = listed.filter(row => isSpecYes(dictionary[codes[row]]))
+    if (withFeature.length === 0) {
+        return `No - ${listed.length === 1 ? `the ${table.variantNames[listed[0]]}` : `none of the ${listed.length} ${modelName} variants`} has it`
+    }
+    const forms = Array.from(new Set(withFeature.map(row => dictionary[codes[row]])))
+        .filter(form => form.toLowerCase() !== 'yes')
+    const detail = forms.length > 0 ? ` (${forms.join(', ')})` : ''
+    if (withFeature.length === listed.length) {
+        return `Yes - ${listed.length === 1 ? `the ${table.variantNames[listed[0]]}` : `all ${listed.length} variants`}${detail}`
+    }
+    return `Yes, on ${withFeature.length} of ${listed.length} variants, from the ${table.variantNames[withFeature[0]]}${detail}`
+}
+
+function answerText(table: SpecTable, rows: number[], attribute: SpecAttribute): string | null {
+    const { codes, dictionary } = table.texts.get(attribute.key)!
+    const counts = new Map<string, number>()
+    for (const row of rows) {
+        if (codes[row] >= 0) counts.set(dictionary[codes[row]], (counts.get(dictionary[codes[row]]) || 0) + 1)
+    }
+    if (counts.size === 0) return null
+    if (counts.size === 1) return Array.from(counts.keys())[0]
+    return Array.from(counts.entries())
+        .sort((a, b) => b[1] - a[1])
+        .map(([value, n]) => `${value} (${n} variant${n === 1 ? '' : 's'})`)
+        .join(', ')
+}
+
+/**
+ * Answer a direct spec question from the spec table, or say why not
+ * (`conversationHistory` is only used to resolve "it" to the last model)
+ */
+export function answerSpecQuery(
+    message: string,
+    conversationHistory: Array<{ content?: string }> = [],
+    table: SpecTable | null = getSpecTable()
+): SpecAnswer {
+    const miss = (reason: SpecAnswerReason, attributes: string[] = [], models: string[] = []): SpecAnswer =>
+        ({ answered: false, reason, attributes, models })
+
+    if (typeof message !== 'string' || !message.trim()) return miss('no_attribute')
+    if (!table) return miss('no_table')
+    const text = normalize(message)
+    const attributes = parseSpecAttributes(message).slice(0, MAX_ATTRIBUTES)
+    if (attributes.length === 0) return miss('no_attribute')
+    if (NEEDS_CONSULTANT.test(text)) return miss('consultant', attributes)
+
+    let mentions = findModelMentions(message, table)
+    if (mentions.length === 0) {
+        // "Fuel tank capacity?" right after talking about one car
+        for (const entry of conversationHistory.slice(-HISTORY_LOOKBACK).reverse()) {
+            const previous = findModelMentions(entry?.content || '', table)
+            if (previous.length === 1) {
+                mentions = previous
+                break
+            }
+            if (previous.length > 1) break
+        }
+    }
+    if (mentions.length === 0) return miss('no_entity', attributes)
+    if (mentions.length > 1) return miss('multiple_models', attributes)
+
+    const modelIndexes = mentions[0]
+    const modelNames = modelIndexes.map(i => `${table.models[i].brandName} ${table.models[i].name}`.trim())
+    const updatedAt = new Date(table.builtAt).toISOString()
+    const lines: string[] = []
+    const citations: SpecCitation[] = []
+
+    for (const key of attributes) {
+        const attribute = SPEC_ATTRIBUTE_BY_KEY.get(key)!
+        modelIndexes.forEach((modelIndex, i) => {
+            const model = table.models[modelIndex]
+            const { rows, scope } = selectRows(table, modelIndex, text, attribute)
+            const allRows = rows.length === model.end - model.start
+            const value = attribute.kind === 'number'
+                ? answerNumber(table, modelIndex, rows, attribute, allRows)
+                : attribute.kind === 'feature'
+                    ? answerFeature(table, rows, attribute, model.name)
+                    : answerText(table, rows, attribute)
+            if (value === null) return
+            lines.push(`${attribute.label} of the ${modelNames[i]}${scope}: ${value}.`)
+            citations.push({ model: modelNames[i], url: model.url, attribute: key, fields: attribute.fields, variants: rows.length, updatedAt })
+        })
+    }
+    if (lines.length === 0) return miss('no_data', attributes, modelNames)
+
+    const sources = Array.from(new Set(citations.map(c => `${c.model} specifications (${c.url})`)))
+    const prices = table.ranges.get('price')
+    const price = (values: Float64Array | undefined, i: number) =>
+        values && !Number.isNaN(values[i]) ? values[i] : null
+    return {
+        answered: true,
+        reason: 'answered',
+        attributes,
+        models: modelNames,
+        reply: `${lines.join('\n')}\n\nSource: ${sources.join(', ')}`,
+        citations,
+        cars: modelIndexes.map(i => ({
+            id: table.models[i].id,
+            name: table.models[i].name,
+            brandName: table.models[i].brandName,
+            minPrice: price(prices?.min, i),
+            maxPrice: price(prices?.max, i)
+        }))
+    }
+}
+
+/**
+ * X-Spec-Answer header value (read by eval_spec.py)
+ */
+export function formatSpecAnswerHeader(answer: SpecAnswer): string {
+    return `result=${answer.reason}; attributes=${answer.attributes.join(',') || '-'}`
+}
@@ -14,6 +14,9 @@
 // NOTE: Mongoose models are imported dynamically to prevent startup crashes
 // when MongoDB isn't connected yet
 
+import { aiCacheRequests } from '../monitoring/metrics'
+import { withSpan } from '../monitoring/tracing'
+
 // ============================================
 // CONFIGURATION
 // ============================================
@@ -35,6 +38,10 @@ let isInitialized = false
 let lastInitTime = 0
 const CACHE_TTL = 3600000 // 1 hour
 
+// Query embeddings (LRU by insertion order) - repeated questions skip the HF round-trip
+const queryEmbeddingCache = new Map<string, number[]>()
+const QUERY_EMBEDDING_CACHE_SIZE = 500
+
 // ============================================
 // EMBEDDING GENERATION
 // ============================================
@@ -153,9 +160,10 @@ function buildCarTextForEmbedding(model: any, brandName: string): string {
 export async function initializeVectorStore(): Promise<void> {
     // Check if already initialized and cache is valid
     if (isInitialized && Date.now() - lastInitTime < CACHE_TTL) {
-        console.log('📊 Vector store already initialized, using cache')
+        aiCacheRequests.inc({ cache: 'vector_store', result: 'hit' })
         return
     }
+    aiCacheRequests.inc({ cache: 'vector_store', result: 'miss' })
 
     console.log('🔄 Initializing vector store...')
     const startTime = Date.now()
@@ -219,6 +227,30 @@ export async function initializeVectorStore(): Promise<void> {
     }
 }
 
+/**
+ * Embedding for a search query, memoized per normalized query text
+ */
+async function getQueryEmbedding(query: string): Promise<number[]> {
+    const key = query.trim().toLowerCase()
+    const cached = queryEmbeddingCache.get(key)
+    if (cached) {
+        aiCacheRequests.inc({ cache: 'embedding', result: 'hit' })
+        // Refresh recency
+        queryEmbeddingCache.delete(key)
+        queryEmbeddingCache.set(key, cached)
+        return cached
+    }
+    aiCacheRequests.inc({ cache: 'embedding', result: 'miss' })
+
+    const embedding = await withSpan('embedding.generate', { 'embedding.provider': process.env.HF_API_KEY ? 'huggingface' : 'fallback' }, () =>
+        generateEmbedding(query), 'client')
+    queryEmbeddingCache.set(key, embedding)
+    if (queryEmbeddingCache.size > QUERY_EMBEDDING_CACHE_SIZE) {
+        queryEmbeddingCache.delete(queryEmbeddingCache.keys().next().value as string)
+    }
+    return embedding
+}
+
 // ============================================
 // SIMILARITY SEARCH
 // ============================================
@@ -270,7 +302,7 @@ export async function semanticCarSearch(
         lowerQuery.includes('charging')
 
     // Generate query embedding
-    const queryEmbedding = await generateEmbedding(query)
+    const queryEmbedding = await getQueryEmbedding(query)
 
     // Calculate similarity for all cars
     const scored = vectorStore.map(entry => {
@@ -631,6 +663,7 @@ export async function refreshVectorStore(): Promise<void> {
     isInitialized = false
     lastInitTime = 0
     vectorStore = []
+    queryEmbeddingCache.clear()
     await initializeVectorStore()
 }
 
@@ -10,23 +10,35 @@
  * - Real owner experiences
  * - Common issues and problems
  * - Sentiment analysis
- * - Pros and cons extraction
+ * - Pros and cons extraction (batched, see review-analysis.ts)
  * - Caching for performance
+ *
+ * REDDIT_BASE_URL / TEAMBHP_BASE_URL point the scrapers at local stand-ins
+ * (server/scripts/review-sources-standin.ts) for tests and benchmarks.
  */
 
 import axios from 'axios'
 import * as cheerio from 'cheerio'
-import { queryOllama } from './ollama-client'
+import { analyzeReviews, type ReviewAnalysisOptions } from './review-analysis'
+import { aiCacheRequests } from '../monitoring/metrics'
+import { withSpan } from '../monitoring/tracing'
 
 // ============================================
 // TYPE DEFINITIONS
 // ============================================
 
+const REDDIT_BASE_URL = process.env.REDDIT_BASE_URL || 'https://www.reddit.com'
+const TEAMBHP_BASE_URL = process.env.TEAMBHP_BASE_URL || 'https://www.team-bhp.com'
+const USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+const MAX_TEAMBHP_THREADS = 5
+const TEAMBHP_CONCURRENCY = parseInt(process.env.TEAMBHP_CONCURRENCY || '2', 10) // Requests to team-bhp across all cars
+const REFRESH_CONCURRENCY = parseInt(process.env.INTELLIGENCE_REFRESH_CONCURRENCY || '4', 10)
+
 interface ScrapedReview {
     source: 'reddit' | 'teambhp' | 'cardekho'
     carModel: string
     author: string
-    date: Date
+    date?: Date
     content: string
     upvotes?: number
     sentiment: 'positive' | 'negative' | 'neutral'
@@ -35,6 +47,9 @@ interface ScrapedReview {
     commonIssues: string[]
 }
 
+// As scraped, before analysis
+type RawReview = Omit<ScrapedReview, 'sentiment' | 'pros' | 'cons' | 'commonIssues'>
+
 export interface CarIntelligence {
     model: string
     totalReviews: number
@@ -55,17 +70,17 @@ export interface CarIntelligence {
  * Scrape Reddit for car discussions
  * Uses Reddit's JSON API (no authentication needed for public posts)
  */
-export async function scrapeReddit(carModel: string): Promise<ScrapedReview[]> {
-    const reviews: ScrapedReview[] = []
+export async function scrapeReddit(carModel: string): Promise<RawReview[]> {
+    const reviews: RawReview[] = []
 
     try {
         // Search r/CarsIndia for the car model
         const searchQuery = encodeURIComponent(`${carModel} review OR experience OR owner`)
-        const url = `https://www.reddit.com/r/CarsIndia/search.json?q=${searchQuery}&restrict_sr=1&sort=relevance&limit=25`
+        const url = `${REDDIT_BASE_URL}/r/CarsIndia/search.json?q=${searchQuery}&restrict_sr=1&sort=relevance&limit=25`
 
         const response = await axios.get(url, {
             headers: {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+                'User-Agent': USER_AGENT
             },
             timeout: 10000
         })
@@ -78,20 +93,13 @@ export async function scrapeReddit(carModel: string): Promise<ScrapedReview[]> {
             // Skip if no text content
             if (!data.selftext || data.selftext.length < 50) continue
 
-            // Analyze sentiment and extract insights using Ollama
-            const analysis = await analyzeReviewWithAI(data.selftext, carModel)
-
             reviews.push({
                 source: 'reddit',
                 carModel,
                 author: data.author,
                 date: new Date(data.created_utc * 1000),
                 content: data.selftext,
-                upvotes: data.ups,
-                sentiment: analysis.sentiment,
-                pros: analysis.pros,
-                cons: analysis.cons,
-                commonIssues: analysis.issues
+                upvotes: data.ups
             })
         }
 
@@ -108,10 +116,10 @@ export async function scrapeReddit(carModel: string): Promise<ScrapedReview[]> {
  */
 export async function scrapeRedditComments(postId: string): Promise<string[]> {
     try {
-        const url = `https://www.reddit.com/comments/${postId}.json`
+        const url = `${REDDIT_BASE_URL}/comments/${postId}.json`
         const response = await axios.get(url, {
             headers: {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+                'User-Agent': USER_AGENT
             }
         })
 
@@ -135,41 +143,105 @@ export async function scrapeRedditComments(postId: string): Promise<string[]> {
 // TEAM-BHP SCRAPING
 // ============================================
 
+// Team-BHP requests in flight across all cars (a catalog refresh scrapes
+// several cars at once, each fetching several threads)
+let teamBHPActive = 0
+const teamBHPWaiting: Array<() => void> = []
+
+async function withTeamBHPSlot<T>(task: () => Promise<T>): Promise<T> {
+    while (teamBHPActive >= Math.max(1, TEAMBHP_CONCURRENCY)) {
+        await new Promise<void>(resolve => teamBHPWaiting.push(resolve))
+    }
+    teamBHPActive++
+    try {
+        return await task()
+    } finally {
+        teamBHPActive--
+        teamBHPWaiting.shift()?.()
+    }
+}
+
+const MONTHS = ['january', 'february', 'march', 'april', 'may', 'june', 'july',
+    'august', 'september', 'october', 'november', 'december']
+
+/**
+ * Parse a vBulletin post date ("3rd April 2023, 12:45") to the day.
+ * Relative dates ("Today, 10:15") and anything else → undefined
+ */
+export function parseForumDate(text: string): Date | undefined {
+    const match = text.match(/(\d{1,2})(?:st|nd|rd|th)?\s+([a-z]+)\s+(\d{4})/i)
+    if (!match) return undefined
+    const month = MONTHS.indexOf(match[2].toLowerCase())
+    if (month < 0) return undefined
+    return new Date(Date.UTC(Number(match[3]), month, Number(match[1])))
+}
+
 /**
  * Scrape Team-BHP forum for car reviews
  * Team-BHP has detailed owner reviews and discussions
  */
-export async function scrapeTeamBHP(carModel: string): Promise<ScrapedReview[]> {
-    const reviews: ScrapedReview[] = []
+export async function scrapeTeamBHP(carModel: string): Promise<RawReview[]> {
+    const reviews: RawReview[] = []
 
     try {
         // Search Team-BHP
         const searchQuery = encodeURIComponent(carModel)
-        const url = `https://www.team-bhp.com/forum/search.php?searchid=${searchQuery}`
+        const url = `${TEAMBHP_BASE_URL}/forum/search.php?searchid=${searchQuery}`
 
-        const response = await axios.get(url, {
+        const response = await withTeamBHPSlot(() => axios.get(url, {
             headers: {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+                'User-Agent': USER_AGENT
             },
             timeout: 10000
-        })
+        }))
 
         const $ = cheerio.load(response.data)
 
         // Extract review threads
+        const links: string[] = []
         $('.threadtitle').each((i, elem) => {
             const title = $(elem).text().trim()
-            const link = $(elem).attr('href')
+            const link = $(elem).attr('href') || $(elem).find('a').attr('href')
 
             // Only process if it looks like a review
-            if (title.toLowerCase().includes('review') ||
+            if (link && (title.toLowerCase().includes('review') ||
                 title.toLowerCase().includes('ownership') ||
-                title.toLowerCase().includes('experience')) {
-                // TODO: Scrape individual thread for full review
-                // For now, we'll just collect the links
+                title.toLowerCase().includes('experience'))) {
+                links.push(new URL(link, `${TEAMBHP_BASE_URL}/forum/`).toString())
             }
         })
 
+        // The opening post of a review thread is the owner's review
+        const threads = await Promise.all(links.slice(0, MAX_TEAMBHP_THREADS).map(async link => {
+            try {
+                const thread = await withTeamBHPSlot(() => axios.get(link, { headers: { 'User-Agent': USER_AGENT }, timeout: 10000 }))
+                const page = cheerio.load(thread.data)
+                const post = page('[id^="post_message_"]').first()
+                // The post's header row (table#postNNN .thead) carries its date
+                const header = post.closest('table[id^="post"]').find('.thead').first().text()
+                return {
+                    link,
+                    content: post.text().trim(),
+                    author: page('.bigusername').first().text().trim(),
+                    date: parseForumDate(header)
+                }
+            } catch (error) {
+                console.error('Team-BHP thread error:', link, error instanceof Error ? error.message : error)
+                return null
+            }
+        }))
+
+        for (const thread of threads) {
+            if (!thread || thread.content.length < 50) continue
+            reviews.push({
+                source: 'teambhp',
+                carModel,
+                author: thread.author || 'unknown',
+                date: thread.date,
+                content: thread.content
+            })
+        }
+
         console.log(`✅ Found ${reviews.length} Team-BHP reviews for ${carModel}`)
         return reviews
     } catch (error) {
@@ -179,66 +251,9 @@ export async function scrapeTeamBHP(carModel: string): Promise<ScrapedReview[]>
 }
 
 // ============================================
-// AI-POWERED ANALYSIS
+// AGGREGATION
 // ============================================
 
-/**
- * Analyze review text using Ollama (Llama 3.1)
- * Extracts sentiment, pros, cons, and common issues
- */
-async function analyzeReviewWithAI(reviewText: string, carModel: string) {
-    const prompt = `Analyze this car review for ${carModel}:
-
-"${reviewText}"
-
-Extract:
-1. Sentiment: positive, negative, or neutral
-2. Pros: list of positive points mentioned
-3. Cons: list of negative points mentioned
-4. Issues: any problems or issues mentioned
-
-Return ONLY valid JSON:
-{
-  "sentiment": "positive" | "negative" | "neutral",
-  "pros": ["pro1", "pro2"],
-  "cons": ["con1", "con2"],
-  "issues": ["issue1", "issue2"]
-}
-
-Focus on:
-- Build quality
-- Reliability
-- Mileage/fuel efficiency
-- Comfort
-- Features
-- Service experience
-- Value for money`
-
-    try {
-        const response = await queryOllama(prompt, 0.2)
-
-        // Parse JSON response
-        let jsonStr = response.replace(/```json\n?/g, '').replace(/```\n?/g, '')
-        const jsonMatch = jsonStr.match(/\{[\s\S]*\}/)
-        if (jsonMatch) {
-            jsonStr = jsonMatch[0]
-        }
-
-        return JSON.parse(jsonStr)
-    } catch (error) {
-        console.error('AI analysis error:', error)
-
-        // Fallback to simple sentiment
-        return {
-            sentiment: reviewText.toLowerCase().includes('good') ||
-                reviewText.toLowerCase().includes('great') ? 'positive' : 'neutral',
-            pros: [],
-            cons: [],
-            issues: []
-        }
-    }
-}
-
 /**
  * Aggregate reviews into car intelligence
  */
@@ -346,32 +361,39 @@ export function setCachedIntelligence(carModel: string, data: CarIntelligence) {
     }
 }
 
+/**
+ * Number of cached entries (memory diagnostics)
+ */
+export function getIntelligenceCacheSize(): number {
+    return Object.keys(cache).length
+}
+
 // ============================================
 // MAIN FUNCTION
 // ============================================
 
 /**
- * Get car intelligence from web sources
- * Checks cache first, then scrapes if needed
+ * Scrape, analyze (batched, see review-analysis.ts) and aggregate one car
  */
-export async function getCarIntelligence(carModel: string): Promise<CarIntelligence> {
-    // Check cache first
-    const cached = getCachedIntelligence(carModel)
-    if (cached) {
-        console.log(`✅ Using cached intelligence for ${carModel}`)
-        return cached
-    }
-
+async function buildCarIntelligence(carModel: string, options: ReviewAnalysisOptions = {}): Promise<CarIntelligence> {
     console.log(`🕷️ Scraping web for ${carModel}...`)
 
     // Scrape from multiple sources
     const [redditReviews, teamBHPReviews] = await Promise.all([
-        scrapeReddit(carModel),
-        scrapeTeamBHP(carModel)
+        withSpan('scrape.reddit', { 'car.model': carModel }, () => scrapeReddit(carModel), 'client'),
+        withSpan('scrape.teambhp', { 'car.model': carModel }, () => scrapeTeamBHP(carModel), 'client')
     ])
 
-    // Combine all reviews
-    const allReviews = [...redditReviews, ...teamBHPReviews]
+    // Combine all reviews and analyze them together
+    const rawReviews = [...redditReviews, ...teamBHPReviews]
+    const { analyses } = await analyzeReviews(carModel, rawReviews.map(r => r.content), options)
+    const allReviews: ScrapedReview[] = rawReviews.map((review, i) => ({
+        ...review,
+        sentiment: analyses[i].sentiment,
+        pros: analyses[i].pros,
+        cons: analyses[i].cons,
+        commonIssues: analyses[i].issues
+    }))
 
     // Aggregate into intelligence
     const intelligence = aggregateReviews(allReviews)
@@ -383,3 +405,46 @@ export async function getCarIntelligence(carModel: string): Promise<CarIntellige
 
     return intelligence
 }
+
+/**
+ * Get car intelligence from web sources
+ * Checks cache first, then scrapes if needed
+ */
+export async function getCarIntelligence(carModel: string): Promise<CarIntelligence> {
+    // Check cache first
+    const cached = getCachedIntelligence(carModel)
+    if (cached) {
+        aiCacheRequests.inc({ cache: 'scraper_intelligence', result: 'hit' })
+        console.log(`✅ Using cached intelligence for ${carModel}`)
+        return cached
+    }
+    aiCacheRequests.inc({ cache: 'scraper_intelligence', result: 'miss' })
+
+    return buildCarIntelligence(carModel)
+}
+
+/**
+ * Rebuild intelligence for many cars (catalog refresh), at most
+ * `concurrency` cars scraping at once; LLM batches are additionally
+ * capped across all cars by review-analysis.ts
+ */
+export async function refreshCarIntelligence(
+    carModels: string[],
+    concurrency: number = REFRESH_CONCURRENCY,
+    options: ReviewAnalysisOptions = {}
+): Promise<Map<string, CarIntelligence>> {
+    const results = new Map<string, CarIntelligence>()
+    let next = 0
+    const worker = async () => {
+        while (next < carModels.length) {
+            const carModel = carModels[next++]
+            try {
+                results.set(carModel, await buildCarIntelligence(carModel, options))
+            } catch (error) {
+                console.error(`Intelligence refresh failed for ${carModel}:`, error)
+            }
+        }
+    }
+    await Promise.all(Array.from({ length: Math.max(1, Math.min(concurrency, carModels.length)) }, worker))
+    return results
+}
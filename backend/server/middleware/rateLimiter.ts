@@ -10,6 +10,14 @@ import { getRedisClient } from './redis-cache';
 // Get Redis client instance
 const redis = getRedisClient();
 
+// Local load/scaling benchmarks (eval_cluster.py) drive far more traffic from
+// one IP than the limits allow - RATE_LIMIT_DISABLED=true measures capacity
+// instead of 429s. Never set in production.
+const rateLimitsDisabled = process.env.RATE_LIMIT_DISABLED === 'true';
+if (rateLimitsDisabled) {
+  console.warn('⚠️ Rate limiting disabled (RATE_LIMIT_DISABLED=true) - local benchmarks only');
+}
+
 // Create a fresh Redis store per limiter with unique prefix.
 function makeStore(prefix: string) {
   try {
@@ -37,6 +45,7 @@ export const apiLimiter = rateLimit({
   store: makeStore('rl:api:'),
   // Skip rate limiting for certain IPs (e.g., internal services)
   skip: (req) => {
+    if (rateLimitsDisabled) return true;
     // Skip for localhost in development
     if (process.env.NODE_ENV === 'development' && req.ip === '127.0.0.1') {
       return true;
@@ -87,6 +96,7 @@ export const publicLimiter = rateLimit({
   standardHeaders: true,
   legacyHeaders: false,
   store: makeStore('rl:public:'),
+  skip: () => rateLimitsDisabled,
 });
 
 // Very strict limiter for bulk operations
@@ -3,6 +3,7 @@ import { getCacheRedisClient } from '../config/redis-config';
 import type Redis from 'ioredis';
 import { gzip, gunzip } from 'zlib';
 import { promisify } from 'util';
+import { aiCacheRequests } from '../monitoring/metrics';
 
 const compress = promisify(gzip);
 const decompress = promisify(gunzip);
@@ -69,6 +70,7 @@ export function redisCacheMiddleware(ttl: number = 300, staleTime: number = 60)
         // Check if stale (TTL < staleTime seconds)
         if (cacheTTL > 0 && cacheTTL < staleTime) {
           console.log(`⚡ Redis Cache STALE (refreshing): ${cacheKey}`);
+          aiCacheRequests.inc({ cache: 'redis', result: 'stale' });
 
           // Return stale data immediately
           res.set('X-Cache', 'STALE');
@@ -85,12 +87,14 @@ export function redisCacheMiddleware(ttl: number = 300, staleTime: number = 60)
 
         // Fresh cache hit
         console.log(`✅ Redis Cache HIT: ${cacheKey}`);
+        aiCacheRequests.inc({ cache: 'redis', result: 'hit' });
         res.set('X-Cache', 'HIT');
         res.set('X-Cache-TTL', cacheTTL.toString());
         return res.json(data);
       }
 
       console.log(`❌ Redis Cache MISS: ${cacheKey}`);
+      aiCacheRequests.inc({ cache: 'redis', result: 'miss' });
 
       // Cache miss - use stampede prevention
       await handleCacheMissWithStampedePrevention(req, res, next, cacheKey, ttl);
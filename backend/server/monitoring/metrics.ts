@@ -33,4 +33,168 @@ export const frontendWebVitals = new client.Histogram({
 });
 register.registerMetric(frontendWebVitals);
 
+// 3. AI Chat Request Coalescing (single-flight)
+// fan-in ratio = sum(all roles) / sum(leader + timeout)
+export const aiChatCoalescedRequests = new client.Counter({
+    name: 'ai_chat_coalesced_requests_total',
+    help: 'AI chat requests by single-flight role (leader, follower, remote_follower, timeout)',
+    labelNames: ['role']
+});
+register.registerMetric(aiChatCoalescedRequests);
+
+// 4. LLM Router (per provider/model latency, hedging, circuit breakers)
+export const llmRequestDuration = new client.Histogram({
+    name: 'llm_request_duration_seconds',
+    help: 'LLM completion latency per provider/model and outcome (success, error, cancelled)',
+    labelNames: ['provider', 'model', 'outcome'],
+    buckets: [0.25, 0.5, 1, 2, 4, 8, 15, 30]
+});
+register.registerMetric(llmRequestDuration);
+
+export const llmHedgedRequests = new client.Counter({
+    name: 'llm_hedged_requests_total',
+    help: 'Backup LLM calls fired because the primary exceeded its hedge delay',
+    labelNames: ['provider']
+});
+register.registerMetric(llmHedgedRequests);
+
+export const llmCircuitState = new client.Gauge({
+    name: 'llm_circuit_state',
+    help: 'LLM provider circuit breaker state (0 = closed, 1 = half-open, 2 = open)',
+    labelNames: ['provider', 'model']
+});
+register.registerMetric(llmCircuitState);
+
+// 5. AI Chat Model Routing (complexity tiers)
+export const aiRouteDuration = new client.Histogram({
+    name: 'ai_route_duration_seconds',
+    help: 'AI chat LLM latency per routing tier and model',
+    labelNames: ['tier', 'model'],
+    buckets: [0.25, 0.5, 1, 2, 4, 8, 15]
+});
+register.registerMetric(aiRouteDuration);
+
+export const aiRouteTokens = new client.Counter({
+    name: 'ai_route_tokens_total',
+    help: 'Tokens spent per routing tier (kind = prompt, completion)',
+    labelNames: ['tier', 'kind']
+});
+register.registerMetric(aiRouteTokens);
+
+// 6. LLM Prompt Cache (exact prompt memoization)
+export const llmCacheRequests = new client.Counter({
+    name: 'llm_cache_requests_total',
+    help: 'LLM prompt cache lookups per call site (result = hit_memory, hit_redis, miss, bypass)',
+    labelNames: ['site', 'result']
+});
+register.registerMetric(llmCacheRequests);
+
+export const llmCacheTokensSaved = new client.Counter({
+    name: 'llm_cache_tokens_saved_total',
+    help: 'Tokens not spent thanks to LLM prompt cache hits',
+    labelNames: ['site']
+});
+register.registerMetric(llmCacheTokensSaved);
+
+// 7. AI Chat Pipeline (tokens, retrieval stages, caches, query mix)
+export const llmRequestTokens = new client.Histogram({
+    name: 'llm_request_tokens',
+    help: 'Tokens per successful LLM call per provider/model (kind = prompt, completion)',
+    labelNames: ['provider', 'model', 'kind'],
+    buckets: [50, 100, 250, 500, 1000, 2000, 4000, 8000]
+});
+register.registerMetric(llmRequestTokens);
+
+export const aiRetrievalStageDuration = new client.Histogram({
+    name: 'ai_retrieval_stage_duration_seconds',
+    help: 'AI chat retrieval latency per stage (car_names, vector_search, keyword_fallback, learned_context, intelligence, news_index)',
+    labelNames: ['stage'],
+    buckets: [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5]
+});
+register.registerMetric(aiRetrievalStageDuration);
+
+export const aiCacheRequests = new client.Counter({
+    name: 'ai_cache_requests_total',
+    help: 'AI pipeline cache lookups (cache = vector_store, embedding, scraper_intelligence, redis; result = hit, miss, stale)',
+    labelNames: ['cache', 'result']
+});
+register.registerMetric(aiCacheRequests);
+
+export const aiQueryClass = new client.Counter({
+    name: 'ai_query_class_total',
+    help: 'AI chat messages per classifyQuery() class',
+    labelNames: ['query_type']
+});
+register.registerMetric(aiQueryClass);
+
+export const aiFastPath = new client.Counter({
+    name: 'ai_fastpath_total',
+    help: 'AI chat fast-path classifier decisions (intent = greeting, thanks, farewell, small_talk, out_of_domain, car; decision = handled, fallthrough)',
+    labelNames: ['intent', 'decision']
+});
+register.registerMetric(aiFastPath);
+
+export const aiSpecAnswers = new client.Counter({
+    name: 'ai_spec_answers_total',
+    help: 'AI chat spec-table answers (attribute = first spec asked about; result = answered, no_attribute, no_entity, multiple_models, consultant, no_data, no_table)',
+    labelNames: ['attribute', 'result']
+});
+register.registerMetric(aiSpecAnswers);
+
+export const aiPromptSectionTokens = new client.Counter({
+    name: 'ai_prompt_section_tokens_total',
+    help: 'Prompt tokens sent to the LLM per chat prompt section (section = system, history, message, rag, expert, learned, overhead) and routing tier',
+    labelNames: ['section', 'tier']
+});
+register.registerMetric(aiPromptSectionTokens);
+
+export const aiLlmCost = new client.Counter({
+    name: 'ai_llm_cost_usd_total',
+    help: 'Estimated LLM spend of AI chat calls in USD per model (prices from AI_TOKEN_PRICES)',
+    labelNames: ['model']
+});
+register.registerMetric(aiLlmCost);
+
+export const aiReviewAnalysis = new client.Counter({
+    name: 'ai_review_analysis_total',
+    help: 'Scraped reviews by how their analysis was obtained (persisted, duplicate, analyzed, fallback)',
+    labelNames: ['result']
+});
+register.registerMetric(aiReviewAnalysis);
+
+export const aiReviewAnalysisBatches = new client.Counter({
+    name: 'ai_review_analysis_batches_total',
+    help: 'Batched review-analysis LLM calls by outcome (ok, partial, failed)',
+    labelNames: ['outcome']
+});
+register.registerMetric(aiReviewAnalysisBatches);
+
+export const aiNewsFeedPolls = new client.Counter({
+    name: 'ai_news_feed_polls_total',
+    help: 'Background news feed polls by result (modified, not_modified = 304, error)',
+    labelNames: ['result']
+});
+register.registerMetric(aiNewsFeedPolls);
+
+// Read at scrape time from getVectorStoreStats (lazy import avoids an import cycle)
+export const aiVectorStoreSize = new client.Gauge({
+    name: 'ai_vector_store_vectors',
+    help: 'Car embeddings held in the in-memory vector store',
+    async collect() {
+        const { getVectorStoreStats } = await import('../ai-engine/vector-store');
+        this.set(getVectorStoreStats().totalVectors);
+    }
+});
+register.registerMetric(aiVectorStoreSize);
+
+export const aiVectorStoreAge = new client.Gauge({
+    name: 'ai_vector_store_age_seconds',
+    help: 'Seconds since the vector store was last (re)built (-1 = never)',
+    async collect() {
+        const { getVectorStoreStats } = await import('../ai-engine/vector-store');
+        this.set(getVectorStoreStats().cacheAge ?? -1);
+    }
+});
+register.registerMetric(aiVectorStoreAge);
+
 export { register };
@@ -0,0 +1,337 @@
+/**
+ * On-demand V8 Profiling
+ * CPU profiles and heap snapshots of the running process via the inspector
+ *
+ * - One CPU profile at a time; it stops itself after maxDurationMs so a
+ *   forgotten session never leaves the sampler running in production
+ * - scope 'header': the profile still samples the whole process, but the
+ *   self-time summary only counts samples taken while a request carrying
+ *   X-Profile-Session: <sessionId> was in flight (e.g. a harness scenario)
+ * - Profiles are written to PROFILE_DIR as .cpuprofile / .heapsnapshot
+ *   files, which load directly into Chrome DevTools
+ * - State is per process: under PM2 cluster mode every worker has its own
+ *   profiler, so responses carry the worker pid for clients to check
+ */
+
+import { Session } from 'inspector';
+import { createWriteStream, promises as fs } from 'fs';
+import { randomBytes } from 'crypto';
+import os from 'os';
+import path from 'path';
+import type { Request, Response, NextFunction } from 'express';
+
+export const PROFILE_HEADER = 'x-profile-session';
+
+const PROFILE_DIR = process.env.PROFILE_DIR || path.join(os.tmpdir(), 'ai-profiles');
+const DEFAULT_SAMPLING_INTERVAL_US = 1000;
+const DEFAULT_MAX_DURATION_MS = 5 * 60 * 1000;
+const MAX_STORED_PROFILES = 20;
+const TOP_FUNCTIONS = 25;
+
+export type ProfileScope = 'all' | 'header';
+
+interface CpuProfileNode {
+  id: number;
+  callFrame: { functionName: string; url: string; lineNumber: number; columnNumber: number };
+  hitCount?: number;
+  children?: number[];
+}
+
+interface CpuProfile {
+  nodes: CpuProfileNode[];
+  startTime: number;
+  endTime: number;
+  samples?: number[];
+  timeDeltas?: number[];
+}
+
+export interface SelfTimeEntry {
+  functionName: string;
+  location: string;
+  selfMs: number;
+  selfPercent: number;
+}
+
+export interface CpuProfileResult {
+  pid: number;
+  sessionId: string;
+  profileId: string;
+  scope: ProfileScope;
+  durationMs: number;
+  sampledMs: number;
+  scopedRequests: number;
+  autoStopped: boolean;
+  topSelfTime: SelfTimeEntry[];
+}
+
+interface ActiveProfile {
+  sessionId: string;
+  scope: ProfileScope;
+  startedAt: number;
+  startHr: bigint;
+  windows: Array<[number, number]>; // µs since start, per tagged request
+  inFlight: number;
+  timer: NodeJS.Timeout;
+}
+
+let session: Session | null = null;
+let active: ActiveProfile | null = null;
+let lastAutoStopped: CpuProfileResult | null = null;
+let busy = false;
+
+function post<T = any>(method: string, params?: object): Promise<T> {
+  return new Promise((resolve, reject) => {
+    getSession().post(method, params || {}, (err, result) => (err ? reject(err) : resolve(result as T)));
+  });
+}
+
+function getSession(): Session {
+  if (!session) {
+    session = new Session();
+    session.connect();
+  }
+  return session;
+}
+
+function newId(prefix: string): string {
+  return `${prefix}-${Date.now()}-${randomBytes(3).toString('hex')}`;
+}
+
+function elapsedUs(from: bigint): number {
+  return Number((process.hrtime.bigint() - from) / BigInt(1000));
+}
+
+async function pruneProfiles(): Promise<void> {
+  const files = await fs.readdir(PROFILE_DIR).catch(() => [] as string[]);
+  if (files.length <= MAX_STORED_PROFILES) return;
+  const stats = await Promise.all(files.map(async (f) => ({ f, mtime: (await fs.stat(path.join(PROFILE_DIR, f))).mtimeMs })));
+  stats.sort((a, b) => a.mtime - b.mtime);
+  await Promise.all(stats.slice(0, stats.length - MAX_STORED_PROFILES).map(({ f }) => fs.unlink(path.join(PROFILE_DIR, f)).catch(() => {})));
+}
+
+// ============================================
+// SUMMARY
+// ============================================
+
+function inWindows(t: number, windows: Array<[number, number]>): boolean {
+  for (const [start, end] of windows) {
+    if (t >= start && t <= end) return true;
+  }
+  return false;
+}
+
+/**
+ * Self time per function (ms), aggregated over nodes with the same call frame.
+ * With windows, only samples whose timestamp (relative to profile start)
+ * falls inside one of them are counted.
+ */
+export function summarizeCpuProfile(
+  profile: CpuProfile,
+  windows?: Array<[number, number]>,
+  top: number = TOP_FUNCTIONS,
+): { sampledMs: number; topSelfTime: SelfTimeEntry[] } {
+  const nodes = new Map(profile.nodes.map((n) => [n.id, n]));
+  const selfUs = new Map<string, { functionName: string; location: string; us: number }>();
+  const samples = profile.samples || [];
+  const deltas = profile.timeDeltas || [];
+
+  let t = 0;
+  let total = 0;
+  for (let i = 0; i < samples.length; i++) {
+    t += deltas[i] || 0;
+    // A sample's cost is the gap until the next sample
+    const cost = deltas[i + 1] ?? 0;
+    if (windows && !inWindows(t, windows)) continue;
+    const node = nodes.get(samples[i]);
+    if (!node) continue;
+    const { functionName, url, lineNumber } = node.callFrame;
+    if (functionName === '(idle)' || functionName === '(program)') continue;
+    const name = functionName || '(anonymous)';
+    const location = url ? `${url.replace(/^file:\/\//, '')}:${lineNumber + 1}` : '';
+    const key = `${name}@${location}`;
+    const entry = selfUs.get(key) || { functionName: name, location, us: 0 };
+    entry.us += cost;
+    selfUs.set(key, entry);
+    total += cost;
+  }
+
+  const topSelfTime = Array.from(selfUs.values())
+    .sort((a, b) => b.us - a.us)
+    .slice(0, top)
+    .map((e) => ({
+      functionName: e.functionName,
+      location: e.location,
+      selfMs: Math.round(e.us / 100) / 10,
+      selfPercent: total ? Math.round((e.us / total) * 1000) / 10 : 0,
+    }));
+
+  return { sampledMs: Math.round(total / 1000), topSelfTime };
+}
+
+// ============================================
+// CPU PROFILING
+// ============================================
+
+export function getProfilingStatus() {
+  return {
+    pid: process.pid,
+    active: active
+      ? {
+          sessionId: active.sessionId,
+          scope: active.scope,
+          runningMs: Date.now() - active.startedAt,
+          scopedRequests: active.windows.length,
+          inFlight: active.inFlight,
+        }
+      : null,
+    lastAutoStopped: lastAutoStopped ? lastAutoStopped.profileId : null,
+    profileDir: PROFILE_DIR,
+  };
+}
+
+export async function startCpuProfile(options: {
+  scope?: ProfileScope;
+  samplingIntervalUs?: number;
+  maxDurationMs?: number;
+} = {}): Promise<{ pid: number; sessionId: string; header: string; scope: ProfileScope }> {
+  if (active || busy) {
+    throw new Error('A CPU profile is already running');
+  }
+  busy = true;
+  try {
+    const scope = options.scope === 'header' ? 'header' : 'all';
+    await post('Profiler.enable');
+    await post('Profiler.setSamplingInterval', { interval: options.samplingIntervalUs || DEFAULT_SAMPLING_INTERVAL_US });
+    await post('Profiler.start');
+
+    const sessionId = newId('cpu');
+    const maxDurationMs = Math.min(options.maxDurationMs || DEFAULT_MAX_DURATION_MS, DEFAULT_MAX_DURATION_MS * 6);
+    const timer = setTimeout(() => {
+      stopCpuProfile(true)
+        .then((result) => {
+          lastAutoStopped = result;
+          console.warn(`⏱️ CPU profile ${result.sessionId} auto-stopped after ${maxDurationMs}ms`);
+        })
+        .catch((err) => console.error('❌ CPU profile auto-stop failed:', err));
+    }, maxDurationMs);
+    timer.unref();
+
+    active = { sessionId, scope, startedAt: Date.now(), startHr: process.hrtime.bigint(), windows: [], inFlight: 0, timer };
+    console.log(`🔬 CPU profile ${sessionId} started (scope: ${scope})`);
+    return { pid: process.pid, sessionId, header: PROFILE_HEADER, scope };
+  } finally {
+    busy = false;
+  }
+}
+
+export async function stopCpuProfile(autoStopped = false): Promise<CpuProfileResult> {
+  if (!active || busy) {
+    throw new Error('No CPU profile is running');
+  }
+  busy = true;
+  const current = active;
+  try {
+    clearTimeout(current.timer);
+    const { profile } = await post<{ profile: CpuProfile }>('Profiler.stop');
+    await post('Profiler.disable');
+    active = null;
+
+    const profileId = `${current.sessionId}.cpuprofile`;
+    await fs.mkdir(PROFILE_DIR, { recursive: true });
+    await fs.writeFile(path.join(PROFILE_DIR, profileId), JSON.stringify(profile));
+    await pruneProfiles();
+
+    // Sample times count from profile.startTime; request windows from startHr.
+    // Both clocks are monotonic µs, so only the origin differs.
+    const { sampledMs, topSelfTime } = summarizeCpuProfile(
+      profile,
+      current.scope === 'header' ? current.windows : undefined,
+    );
+
+    console.log(`🔬 CPU profile ${current.sessionId} stopped (${current.windows.length} scoped requests)`);
+    return {
+      pid: process.pid,
+      sessionId: current.sessionId,
+      profileId,
+      scope: current.scope,
+      durationMs: Math.round((profile.endTime - profile.startTime) / 1000),
+      sampledMs,
+      scopedRequests: current.windows.length,
+      autoStopped,
+      topSelfTime,
+    };
+  } finally {
+    if (active === current) active = null;
+    busy = false;
+  }
+}
+
+/**
+ * Records the in-flight window of requests tagged with the active session id.
+ * Cheap no-op when nothing is being profiled.
+ */
+export function profileScope(req: Request, res: Response, next: NextFunction) {
+  const current = active;
+  if (!current || current.scope !== 'header' || req.get(PROFILE_HEADER) !== current.sessionId) {
+    return next();
+  }
+  const start = elapsedUs(current.startHr);
+  current.inFlight++;
+  res.on('close', () => {
+    current.inFlight--;
+    current.windows.push([start, elapsedUs(current.startHr)]);
+  });
+  next();
+}
+
+// ============================================
+// HEAP SNAPSHOTS
+// ============================================
+
+/**
+ * Streams a full heap snapshot to disk. Pauses the event loop for the
+ * duration of the snapshot (seconds on large heaps) - never run casually
+ * against production traffic.
+ */
+export async function takeHeapSnapshot(): Promise<{ pid: number; profileId: string; bytes: number; durationMs: number }> {
+  if (busy) {
+    throw new Error('Profiler is busy');
+  }
+  busy = true;
+  const started = Date.now();
+  try {
+    await fs.mkdir(PROFILE_DIR, { recursive: true });
+    const profileId = `${newId('heap')}.heapsnapshot`;
+    const file = createWriteStream(path.join(PROFILE_DIR, profileId));
+    let bytes = 0;
+    const onChunk = (message: any) => {
+      const chunk: string = message.params.chunk;
+      bytes += Buffer.byteLength(chunk);
+      file.write(chunk);
+    };
+    getSession().on('HeapProfiler.addHeapSnapshotChunk', onChunk);
+    try {
+      await post('HeapProfiler.takeHeapSnapshot', { reportProgress: false });
+    } finally {
+      getSession().removeListener('HeapProfiler.addHeapSnapshotChunk', onChunk);
+      await new Promise<void>((resolve) => file.end(resolve));
+    }
+    await pruneProfiles();
+    console.log(`📸 Heap snapshot ${profileId} written (${Math.round(bytes / 1024 / 1024)}MB)`);
+    return { pid: process.pid, profileId, bytes, durationMs: Date.now() - started };
+  } finally {
+    busy = false;
+  }
+}
+
+/** Absolute path of a stored profile, or null for unknown / unsafe ids */
+export async function resolveProfilePath(profileId: string): Promise<string | null> {
+  if (!/^(cpu|heap)-[\w-]+\.(cpuprofile|heapsnapshot)$/.test(profileId)) return null;
+  const file = path.join(PROFILE_DIR, profileId);
+  try {
+    await fs.access(file);
+    return file;
+  } catch {
+    return null;
+  }
+}
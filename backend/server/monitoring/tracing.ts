@@ -0,0 +1,254 @@
+/**
+ * Request Tracing (W3C Trace Context)
+ * Per-request span trees for the AI chat pipeline
+ *
+ * - Incoming `traceparent` headers are continued; requests without one get
+ *   a fresh trace when TRACE_SAMPLE_RATE allows it (default: only traced
+ *   when the caller sends a sampled traceparent, e.g. the eval harness)
+ * - The active span travels with the async context (AsyncLocalStorage), so
+ *   withSpan() calls deep in the AI engine nest correctly without threading
+ *   a context argument through every function
+ * - Finished spans are exported in batches to a JSONL file (TRACE_FILE) and/or
+ *   an OTLP/HTTP JSON collector (OTEL_EXPORTER_OTLP_ENDPOINT)
+ * - No-op (one ALS lookup) when the request isn't sampled
+ */
+
+import { AsyncLocalStorage } from 'async_hooks';
+import { randomBytes } from 'crypto';
+import { promises as fs } from 'fs';
+import path from 'path';
+import type { Request, Response, NextFunction } from 'express';
+
+const SERVICE_NAME = process.env.TRACE_SERVICE_NAME || 'killer-whale-backend';
+const TRACE_FILE = process.env.TRACE_FILE || '';
+const OTLP_ENDPOINT = (process.env.OTEL_EXPORTER_OTLP_ENDPOINT || '').replace(/\/$/, '');
+const SAMPLE_RATE = parseFloat(process.env.TRACE_SAMPLE_RATE || '0');
+const FLUSH_INTERVAL_MS = 2000;
+const MAX_BUFFERED_SPANS = 5000;
+
+const TRACEPARENT_RE = /^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$/;
+
+export type SpanAttributes = Record<string, string | number | boolean | undefined>;
+
+export interface FinishedSpan {
+  traceId: string;
+  spanId: string;
+  parentSpanId: string | null;
+  name: string;
+  kind: 'server' | 'internal' | 'client';
+  service: string;
+  startTimeMs: number;
+  endTimeMs: number;
+  durationMs: number;
+  status: 'ok' | 'error';
+  error?: string;
+  attributes: SpanAttributes;
+}
+
+export interface Span {
+  traceId: string;
+  spanId: string;
+  parentSpanId: string | null;
+  name: string;
+  kind: FinishedSpan['kind'];
+  startTimeMs: number;
+  attributes: SpanAttributes;
+  setAttribute(key: string, value: string | number | boolean | undefined): void;
+  end(error?: unknown): void;
+}
+
+const storage = new AsyncLocalStorage<Span>();
+let buffer: FinishedSpan[] = [];
+let flushTimer: NodeJS.Timeout | null = null;
+let dropped = 0;
+
+export function isTracingEnabled(): boolean {
+  return !!(TRACE_FILE || OTLP_ENDPOINT);
+}
+
+// Wall-clock start + monotonic offset: sub-ms precision without clock jumps mid-span
+const originMs = Date.now();
+const originHr = process.hrtime.bigint();
+function nowMs(): number {
+  return originMs + Number(process.hrtime.bigint() - originHr) / 1e6;
+}
+
+function hexId(bytes: number): string {
+  return randomBytes(bytes).toString('hex');
+}
+
+function createSpan(name: string, kind: FinishedSpan['kind'], traceId: string, parentSpanId: string | null,
+  attributes: SpanAttributes = {}): Span {
+  let ended = false;
+  const span: Span = {
+    traceId,
+    spanId: hexId(8),
+    parentSpanId,
+    name,
+    kind,
+    startTimeMs: nowMs(),
+    attributes: { ...attributes },
+    setAttribute(key, value) {
+      span.attributes[key] = value;
+    },
+    end(error?: unknown) {
+      if (ended) return;
+      ended = true;
+      const endTimeMs = nowMs();
+      record({
+        traceId: span.traceId,
+        spanId: span.spanId,
+        parentSpanId: span.parentSpanId,
+        name: span.name,
+        kind: span.kind,
+        service: SERVICE_NAME,
+        startTimeMs: Math.round(span.startTimeMs * 1000) / 1000,
+        endTimeMs: Math.round(endTimeMs * 1000) / 1000,
+        durationMs: Math.round((endTimeMs - span.startTimeMs) * 1000) / 1000,
+        status: error ? 'error' : 'ok',
+        error: error ? String((error as any)?.message || error).slice(0, 200) : undefined,
+        attributes: span.attributes,
+      });
+    },
+  };
+  return span;
+}
+
+/**
+ * Run fn inside a child span of the current one. Untraced requests call fn
+ * directly, so call sites don't need their own enabled checks.
+ */
+export async function withSpan<T>(name: string, attributes: SpanAttributes, fn: (span?: Span) => Promise<T>,
+  kind: FinishedSpan['kind'] = 'internal'): Promise<T> {
+  const parent = storage.getStore();
+  if (!parent) return fn();
+
+  const span = createSpan(name, kind, parent.traceId, parent.spanId, attributes);
+  return storage.run(span, async () => {
+    try {
+      const result = await fn(span);
+      span.end();
+      return result;
+    } catch (error) {
+      span.end(error);
+      throw error;
+    }
+  });
+}
+
+/**
+ * Express middleware: continue (or sample) a trace and wrap the request in
+ * a server span that ends when the response closes
+ */
+export function traceRequest(req: Request, res: Response, next: NextFunction) {
+  if (!isTracingEnabled()) return next();
+
+  const match = TRACEPARENT_RE.exec(req.get('traceparent') || '');
+  let traceId: string;
+  let parentSpanId: string | null = null;
+  if (match) {
+    // Flags bit 0 = sampled; an unsampled caller opted out
+    if ((parseInt(match[3], 16) & 1) === 0) return next();
+    traceId = match[1];
+    parentSpanId = match[2];
+  } else if (SAMPLE_RATE > 0 && Math.random() < SAMPLE_RATE) {
+    traceId = hexId(16);
+  } else {
+    return next();
+  }
+
+  const span = createSpan(`${req.method} ${req.baseUrl || ''}${req.path}`, 'server', traceId, parentSpanId, {
+    'http.method': req.method,
+    'http.route': `${req.baseUrl || ''}${req.path}`,
+  });
+  res.set('traceresponse', `00-${traceId}-${span.spanId}-01`);
+  res.on('close', () => {
+    span.setAttribute('http.status_code', res.statusCode);
+    span.end(res.statusCode >= 500 ? `HTTP ${res.statusCode}` : undefined);
+  });
+  storage.run(span, () => next());
+}
+
+// ============================================
+// EXPORT
+// ============================================
+
+function record(span: FinishedSpan) {
+  if (buffer.length >= MAX_BUFFERED_SPANS) {
+    dropped++;
+    return;
+  }
+  buffer.push(span);
+  if (!flushTimer) {
+    flushTimer = setTimeout(() => {
+      flushTimer = null;
+      flushSpans().catch((err) => console.warn('⚠️ Trace export failed:', err.message));
+    }, FLUSH_INTERVAL_MS);
+    flushTimer.unref();
+  }
+}
+
+function toOtlpValue(value: string | number | boolean) {
+  if (typeof value === 'boolean') return { boolValue: value };
+  if (typeof value === 'number') return Number.isInteger(value) ? { intValue: value } : { doubleValue: value };
+  return { stringValue: value };
+}
+
+function toOtlp(spans: FinishedSpan[]) {
+  const kinds = { internal: 1, server: 2, client: 3 };
+  return {
+    resourceSpans: [{
+      resource: { attributes: [{ key: 'service.name', value: { stringValue: SERVICE_NAME } }] },
+      scopeSpans: [{
+        scope: { name: 'ai-chat' },
+        spans: spans.map((s) => ({
+          traceId: s.traceId,
+          spanId: s.spanId,
+          parentSpanId: s.parentSpanId || undefined,
+          name: s.name,
+          kind: kinds[s.kind],
+          startTimeUnixNano: String(Math.round(s.startTimeMs * 1e6)),
+          endTimeUnixNano: String(Math.round(s.endTimeMs * 1e6)),
+          attributes: Object.entries(s.attributes)
+            .filter(([, v]) => v !== undefined)
+            .map(([key, v]) => ({ key, value: toOtlpValue(v as string | number | boolean) })),
+          status: s.status === 'error' ? { code: 2, message: s.error } : { code: 1 },
+        })),
+      }],
+    }],
+  };
+}
+
+export async function flushSpans(): Promise<number> {
+  if (buffer.length === 0) return 0;
+  const spans = buffer;
+  buffer = [];
+
+  const writes: Promise<unknown>[] = [];
+  if (TRACE_FILE) {
+    writes.push(
+      fs.mkdir(path.dirname(TRACE_FILE), { recursive: true })
+        .then(() => fs.appendFile(TRACE_FILE, spans.map((s) => JSON.stringify(s)).join('\n') + '\n')),
+    );
+  }
+  if (OTLP_ENDPOINT) {
+    writes.push(fetch(`${OTLP_ENDPOINT}/v1/traces`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(toOtlp(spans)),
+    }));
+  }
+  await Promise.all(writes);
+  return spans.length;
+}
+
+export function getTracingStats() {
+  return {
+    enabled: isTracingEnabled(),
+    file: TRACE_FILE || null,
+    otlpEndpoint: OTLP_ENDPOINT || null,
+    sampleRate: SAMPLE_RATE,
+    buffered: buffer.length,
+    dropped,
+  };
+}
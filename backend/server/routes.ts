@@ -42,7 +42,7 @@ import adminTagsRoutes from "./routes/admin-tags";
 import adminAuthorsRoutes from "./routes/admin-authors";
 import adminMediaRoutes from "./routes/admin-media";
 import adminAnalyticsRoutes from "./routes/admin-analytics";
-import aiChatHandler from "./routes/ai-chat";
+import aiChatHandler, { aiChatIntelligenceHandler, aiChatFastPathHandler, aiChatSpecAnswerHandler } from "./routes/ai-chat";
 import quirkyBitRoutes from "./routes/quirky-bit";
 import createYouTubeRoutes from "./routes/youtube";
 import aiFeedbackRoutes from "./routes/ai-feedback";
@@ -51,7 +51,20 @@ import adminReviewsRoutes from "./routes/admin-reviews";
 import adminEmailRoutes from "./routes/admin-emails.routes";
 import priceHistoryRoutes from "./routes/price-history.routes";
 import adminHumanizeRoutes from "./routes/admin-humanize";
+import profilingRoutes from "./routes/profiling";
+import { profileScope } from "./monitoring/profiler";
+import { traceRequest } from "./monitoring/tracing";
 import { buildSearchIndex, searchFromIndex, invalidateSearchIndex, getSearchIndexStats } from "./services/search-index";
+import {
+  startComparisonMaterializer,
+  refreshComparisons,
+  invalidateComparisonsForModel,
+  getMaterializedComparison,
+  getComparisonMaterializerStats
+} from "./services/comparison-materializer";
+import { startSpecTable, invalidateSpecTable } from "./services/spec-table";
+import { invalidateCatalogFingerprint } from "./ai-engine/fingerprint";
+import { startNewsIngestion } from "./services/news-index";
 
 // Function to format brand summary with proper sections
 function formatBrandSummary(summary: string, brandName: string): {
@@ -1147,6 +1160,7 @@ export function registerRoutes(app: Express, storage: IStorage, backupService?:
       // Backup after create
       await triggerBackup('brands');
       await invalidateRedisCache('/api/brands');
+      invalidateCatalogFingerprint();
 
       res.status(201).json({
         ...brand,
@@ -1209,6 +1223,7 @@ export function registerRoutes(app: Express, storage: IStorage, backupService?:
 
       // Rebuild search index to reflect status changes
       invalidateSearchIndex().catch(err => console.error('Search index invalidation failed:', err));
+      invalidateCatalogFingerprint();
 
       res.json({
         ...brand,
@@ -1235,6 +1250,7 @@ export function registerRoutes(app: Express, storage: IStorage, backupService?:
       console.log(`✅ Brand deleted successfully: ${req.params.id}`);
       await triggerBackup('brands');
       await invalidateRedisCache('/api/brands');
+      invalidateCatalogFingerprint();
       res.status(204).send();
     } catch (error) {
       console.error(`❌ Error deleting brand ${req.params.id}:`, error);
@@ -1386,6 +1402,15 @@ export function registerRoutes(app: Express, storage: IStorage, backupService?:
     );
   }, 5000); // Wait 5s for DB connection
 
+  // Precomputed comparison records for popular matchups (refreshed on model changes)
+  startComparisonMaterializer();
+
+  // Columnar variant specs for direct AI chat spec answers (rebuilt on model changes)
+  startSpecTable();
+
+  // Per-model news feeds polled in the background (RAG web data is served from this index)
+  startNewsIngestion();
+
   app.get("/api/search", publicLimiter, async (req, res) => {
     try {
       const startTime = Date.now();
@@ -1937,6 +1962,7 @@ export function registerRoutes(app: Express, storage: IStorage, backupService?:
 
       // Rebuild search index with new model
       invalidateSearchIndex().catch(err => console.error('Search index invalidation failed:', err));
+      invalidateCatalogFingerprint();
 
       // Send new launch alert emails (async, don't block response)
       if (process.env.EMAIL_SCHEDULER_ENABLED === 'true') {
@@ -1988,6 +2014,9 @@ export function registerRoutes(app: Express, storage: IStorage, backupService?:
 
       // Rebuild search index with updated model
       invalidateSearchIndex().catch(err => console.error('Search index invalidation failed:', err));
+      invalidateComparisonsForModel(req.params.id);
+      invalidateSpecTable();
+      invalidateCatalogFingerprint();
 
       res.json(model);
     } catch (error) {
@@ -2024,6 +2053,9 @@ export function registerRoutes(app: Express, storage: IStorage, backupService?:
 
       // Rebuild search index with updated model
       invalidateSearchIndex().catch(err => console.error('Search index invalidation failed:', err));
+      invalidateComparisonsForModel(req.params.id);
+      invalidateSpecTable();
+      invalidateCatalogFingerprint();
 
       res.json(model);
     } catch (error) {
@@ -2045,6 +2077,7 @@ export function registerRoutes(app: Express, storage: IStorage, backupService?:
 
       // Rebuild search index without deleted model
       invalidateSearchIndex().catch(err => console.error('Search index invalidation failed:', err));
+      invalidateCatalogFingerprint();
 
       res.status(204).send();
     } catch (error) {
@@ -2531,6 +2564,9 @@ export function registerRoutes(app: Express, storage: IStorage, backupService?:
 
       // Invalidate variants cache
       await invalidateRedisCache('/api/variants');
+      invalidateComparisonsForModel(variant.modelId);
+      invalidateSpecTable();
+      invalidateCatalogFingerprint();
 
       res.status(201).json(variant);
     } catch (error) {
@@ -2591,6 +2627,9 @@ export function registerRoutes(app: Express, storage: IStorage, backupService?:
 
       // Invalidate variants cache
       invalidateRedisCache('/api/variants');
+      invalidateComparisonsForModel(variant.modelId);
+      invalidateSpecTable();
+      invalidateCatalogFingerprint();
 
       res.json(variant);
     } catch (error) {
@@ -2603,6 +2642,7 @@ export function registerRoutes(app: Express, storage: IStorage, backupService?:
     try {
       console.log('🗑️ DELETE request for variant ID:', req.params.id);
 
+      const existingVariant = await storage.getVariant(req.params.id);
       const success = await storage.deleteVariant(req.params.id);
 
       if (!success) {
@@ -2614,6 +2654,9 @@ export function registerRoutes(app: Express, storage: IStorage, backupService?:
 
       // Invalidate variants cache
       invalidateRedisCache('/api/variants');
+      invalidateComparisonsForModel(existingVariant?.modelId);
+      invalidateSpecTable();
+      invalidateCatalogFingerprint();
 
       res.status(204).send();
     } catch (error) {
@@ -2763,6 +2806,28 @@ export function registerRoutes(app: Express, storage: IStorage, backupService?:
     }
   });
 
+  // Precomputed comparison record for a pair (e.g. ?car1=creta&car2=seltos)
+  app.get("/api/comparisons/materialized", publicLimiter, async (req, res) => {
+    try {
+      const car1 = (req.query.car1 as string || '').trim();
+      const car2 = (req.query.car2 as string || '').trim();
+      if (!car1 || !car2) {
+        return res.status(400).json({ error: "car1 and car2 are required" });
+      }
+
+      const record = await getMaterializedComparison(car1, car2);
+      if (!record) {
+        return res.status(404).json({ error: "Comparison not materialized", stats: getComparisonMaterializerStats() });
+      }
+
+      res.set('Cache-Control', 'public, max-age=600, s-maxage=600');
+      res.json(record);
+    } catch (error) {
+      console.error('Error fetching materialized comparison:', error);
+      res.status(500).json({ error: "Failed to fetch comparison" });
+    }
+  });
+
   app.post("/api/popular-comparisons", async (req, res) => {
     try {
       const comparisons = req.body;
@@ -2772,6 +2837,10 @@ export function registerRoutes(app: Express, storage: IStorage, backupService?:
       }
 
       const savedComparisons = await storage.savePopularComparisons(comparisons);
+
+      // Materialize records for the new pair list
+      refreshComparisons().catch(err => console.error('Comparison refresh failed:', err));
+
       res.json({
         success: true,
         count: savedComparisons.length,
@@ -2790,7 +2859,10 @@ export function registerRoutes(app: Express, storage: IStorage, backupService?:
   app.use('/api/news', newsRoutes);
 
   // AI Chat endpoint
-  app.post('/api/ai-chat', publicLimiter, aiChatHandler);
+  app.post('/api/ai-chat', publicLimiter, traceRequest, profileScope, aiChatHandler);
+  app.get('/api/ai-chat/intelligence/:id', publicLimiter, aiChatIntelligenceHandler);
+  app.post('/api/ai-chat/fast-path', publicLimiter, aiChatFastPathHandler);
+  app.post('/api/ai-chat/spec-answer', publicLimiter, aiChatSpecAnswerHandler);
 
   // Quirky Bits endpoint (for floating AI bot)
   app.use('/api/quirky-bit', publicLimiter, quirkyBitRoutes);
@@ -2818,6 +2890,9 @@ export function registerRoutes(app: Express, storage: IStorage, backupService?:
   app.use('/api/reviews', publicLimiter, reviewsRoutes);
   app.use('/api/admin/analytics', adminAnalyticsRoutes);
 
+  // On-demand CPU/heap profiling (admin only)
+  app.use('/api/admin/profiling', profilingRoutes);
+
   // Admin authentication routes (with rate limiting) - MUST come AFTER specific routes
   app.use('/api/admin', authLimiter, adminAuthRoutes);
 
@@ -1,7 +1,6 @@
 import { Request, Response } from 'express'
-import Groq from 'groq-sdk'
 import { Variant as CarVariant, Model } from '../db/schemas'
-import { getCarIntelligence, type CarIntelligence } from '../ai-engine/web-scraper'
+import { getCarIntelligence, getCachedIntelligence, type CarIntelligence } from '../ai-engine/web-scraper'
 import { handleQuestionWithRAG } from '../ai-engine/rag-system'
 import {
     getHeadToHead,
@@ -23,10 +22,84 @@ import {
     classifyQuery,
     getLearningMetrics
 } from '../ai-engine/self-learning'
+import { coalesce, buildCoalescingKey } from '../ai-engine/single-flight'
+import {
+    isChatSessionStoreEnabled,
+    issueSessionToken,
+    verifySessionToken,
+    loadSession,
+    appendTurn,
+    toSessionHistory,
+    type SessionEntry
+} from '../ai-engine/chat-session'
+import { parseResponseShape, compactCars, intelligenceKey } from '../ai-engine/response-shaping'
+import { classifyFastPath, formatFastPathHeader, type FastPathDecision } from '../ai-engine/intent-fastpath'
+import { answerSpecQuery, formatSpecAnswerHeader, type SpecAnswer } from '../ai-engine/spec-answer'
+import { getSpecTableStats } from '../services/spec-table'
+import { chatCompletion, hasLLMProvider } from '../ai-engine/ai-adapter'
+import { selectRoute, isTrivialMessage, applyContextBudget, recordRouteOutcome } from '../ai-engine/model-routing'
+import { accountPrompt, recordPromptUsage, formatUsageHeader, type PromptUsage } from '../ai-engine/prompt-accounting'
+import { findComparisonForQuery, formatComparisonContext } from '../services/comparison-materializer'
+import { registerPrompt } from '../ai-engine/fingerprint'
+import { aiRetrievalStageDuration, aiQueryClass, aiFastPath, aiSpecAnswers } from '../monitoring/metrics'
+import { withSpan } from '../monitoring/tracing'
+
+// Full consultant persona (hashed into the AI fingerprint, see ai-engine/fingerprint)
+const SYSTEM_PROMPT = `You are "Karan" - India's sharpest car consultant with 15+ years in the automotive industry.
+
+## ⚠️ CRITICAL RULES
+1. **NEVER ASSUME** - Don't assume city, family, budget, or use case unless the user mentions it
+2. **USE ONLY PROVIDED DATA** - Base your response on the car data provided below, not generic knowledge
+3. **DIRECT ANSWERS** - If asked "Creta or Nexon?", compare THOSE cars directly, don't add context
+4. **CITE DATA** - Reference actual prices, features, pros/cons from the database data provided
+
+## 🎭 YOUR PERSONALITY
+- **Witty & Relatable:** Light Indian humor, but keep it brief
+- **Honest:** "I'll be real with you..." - don't sugarcoat
+- **Data-Driven:** Always reference the actual specs/prices provided
+- **Confident:** Take clear sides in comparisons
+
+## 📊 COMPARISON FORMAT (When comparing cars)
+
+**[Car A] vs [Car B] - Quick Verdict**
+
+| Factor | [Car A] | [Car B] | Winner |
+|--------|---------|---------|--------|
+| Price | ₹X-YL | ₹X-YL | Tie/A/B |
+| Safety | X stars | Y stars | A/B |
+| Mileage | X kmpl | Y kmpl | A/B |
 
-// Initialize Groq client only if API key is available (prevents test failures)
-const groqApiKey = process.env.GROQ_API_KEY || process.env.HF_API_KEY || ''
-const groq = groqApiKey ? new Groq({ apiKey: groqApiKey }) : null
+**Key Differences:**
+1. [Most important difference from database]
+2. [Second difference]
+3. [Third difference]
+
+**My Pick:** [Clear winner] because [specific reason from data]
+
+## 🚫 DON'T DO THIS
+❌ "Creta or Nexon for a city-dwelling family" (user didn't say family or city)
+❌ "Assuming you need 5 seats..." (don't assume)
+❌ Inventing features not in the provided data
+
+## ✅ DO THIS
+✓ "Here's how Creta and Nexon compare based on specs:"
+✓ Use actual prices from database (minPrice, maxPrice)
+✓ Reference pros/cons from the data provided
+✓ If info missing, say "I don't have that data" rather than guessing
+
+## 🎯 KNOWN VERDICTS (Use these for quick answers)
+- **Safety King:** Nexon (5★ Global NCAP) > Creta (4★)
+- **Resale Value:** Creta > Nexon (Hyundai holds value better)
+- **Features:** Creta (panoramic sunroof, ventilated seats) > Nexon
+- **Build Quality:** Nexon (Tata's solid build) > Creta
+- **Mileage:** Similar (17-18 kmpl real-world)
+- **After-Sales:** Hyundai slightly better network than Tata`
+
+// Short persona for trivial turns (greetings / thanks) - the full prompt is ~2k tokens
+const COMPACT_SYSTEM_PROMPT = `You are "Karan", a friendly Indian car consultant. Reply in 1-2 short sentences and ask what car, budget or use case the user has in mind. Do not invent car data.`
+
+registerPrompt('chat.system', SYSTEM_PROMPT)
+registerPrompt('chat.compact', COMPACT_SYSTEM_PROMPT)
 
 
 // ============================================
@@ -38,6 +111,7 @@ const groq = groqApiKey ? new Groq({ apiKey: groqApiKey }) : null
  * This replaces the hardcoded list for better accuracy
  */
 let cachedCarNames: string[] | null = null
+let cachedCarNameSet: ReadonlySet<string> = new Set() // Same names, for the intent fast path
 let cacheTimestamp = 0
 const CAR_NAMES_CACHE_TTL = 300000 // 5 minutes
 
@@ -67,6 +141,7 @@ async function getActiveCarNames(): Promise<string[]> {
         })
 
         cachedCarNames = Array.from(names)
+        cachedCarNameSet = names
         cacheTimestamp = Date.now()
         console.log(`📊 Cached ${cachedCarNames.length} car names from database`)
         return cachedCarNames
@@ -84,6 +159,13 @@ async function getActiveCarNames(): Promise<string[]> {
     }
 }
 
+/**
+ * Size of the car-name cache (memory diagnostics)
+ */
+export function getCarNameCacheSize(): number {
+    return cachedCarNames ? cachedCarNames.length : 0
+}
+
 /**
  * Extract car names from user query for RAG (now dynamic!)
  */
@@ -113,303 +195,584 @@ export default async function aiChatHandler(req: Request, res: Response) {
         return res.status(405).json({ error: 'Method not allowed' })
     }
 
-    const startTime = Date.now()
-
     try {
-        const { message, sessionId = 'web-' + Date.now(), conversationHistory = [] } = req.body
+        const { message, sessionId = 'web-' + Date.now(), sessionVersion } = req.body
+        let { conversationHistory = [], conversationState } = req.body
 
         console.log('🔍 User:', message)
 
-        // Initialize vector store on first request (cached after that)
-        await initializeVectorStore().catch(err => {
-            console.warn('⚠️ Vector store init failed, using fallback:', err.message)
+        // Session store (opt-in with sessionVersion): the client sends only the new
+        // message and the server supplies history + state; a full history re-seeds it.
+        // Sessions live under a server-issued sessionToken - only its holder can
+        // read or force-reseed them; anyone else gets a fresh session of their own
+        let sessionBase: { version: number, history: SessionEntry[] } | null = null
+        let sessionKey: string | null = null
+        let issuedToken: string | null = null
+        const reseed = Array.isArray(req.body.conversationHistory)
+        // The stored version is never echoed: only the token holder may learn it
+        const resync = (code: string) => {
+            res.set('X-Chat-Session', 'resync')
+            return res.status(409).json({
+                error: 'Chat session expired or out of date - resend with conversationHistory',
+                code,
+                resync: true
+            })
+        }
+        if (typeof sessionVersion === 'number' && !isChatSessionStoreEnabled()) {
+            // Nothing stored to supply history from - a delta turn would run without context
+            if (!reseed && (sessionVersion !== 0 || req.body.sessionToken)) return resync('disabled')
+        } else if (typeof sessionVersion === 'number') {
+            sessionKey = verifySessionToken(req.body.sessionToken)
+
+            if (!sessionKey) {
+                // A delta turn against a session we never issued has no history to supply
+                if (!reseed && sessionVersion !== 0) return resync('expired')
+                const issued = issueSessionToken()
+                sessionKey = issued.key
+                issuedToken = issued.token
+                sessionBase = { version: 0, history: toSessionHistory(conversationHistory) }
+            } else if (reseed) {
+                sessionBase = { version: sessionVersion, history: toSessionHistory(conversationHistory) }
+            } else {
+                const lookup = await loadSession(sessionKey, sessionVersion)
+                if (lookup.status !== 'hit') return resync(lookup.status)
+                sessionBase = lookup.session
+                conversationHistory = lookup.session.history
+                conversationState = conversationState ?? lookup.session.state
+            }
+        }
+
+        // Greetings, small talk and off-topic messages get a templated reply
+        // without touching retrieval or the LLM
+        const fastPathStart = process.hrtime.bigint()
+        const fastPath = classifyFastPath(message, cachedCarNameSet)
+        const fastPathMs = Number(process.hrtime.bigint() - fastPathStart) / 1e6
+        aiFastPath.inc({ intent: fastPath.intent, decision: fastPath.handled ? 'handled' : 'fallthrough' })
+        res.set('X-Fast-Path', formatFastPathHeader(fastPath))
+
+        if (fastPath.handled) {
+            console.log(`⚡ Fast path: ${fastPath.intent} (${fastPath.rule})`)
+        }
+
+        // Direct spec questions ("ground clearance of thar") are read from the spec table
+        let specMs = 0
+        let spec: SpecAnswer | null = null
+        if (!fastPath.handled) {
+            const specStart = process.hrtime.bigint()
+            spec = answerSpecQuery(message, conversationHistory)
+            specMs = Number(process.hrtime.bigint() - specStart) / 1e6
+            aiSpecAnswers.inc({ attribute: spec.attributes[0] || 'none', result: spec.reason })
+            res.set('X-Spec-Answer', formatSpecAnswerHeader(spec))
+            if (spec.answered) console.log(`📐 Spec answer: ${spec.attributes.join(', ')} of ${spec.models.join(', ')}`)
+        }
+
+        const { value: result, role } = fastPath.handled
+            ? { value: fastPathResult(fastPath, sessionId, conversationState), role: 'bypass' }
+            : spec?.answered
+                ? { value: specAnswerResult(spec, sessionId, conversationState), role: 'bypass' }
+                : await coalescedPipeline(message, sessionId, conversationHistory, conversationState)
+
+        // Shared results carry the leader's sessionId - give each caller its own back
+        let body = result.body && 'sessionId' in result.body
+            ? { ...result.body, sessionId }
+            : result.body
+
+        if (sessionKey && sessionBase && result.status === 200 && typeof body?.reply === 'string') {
+            // Forced writes only re-seed a session the caller holds the token for
+            const version = await appendTurn(sessionKey, sessionBase, {
+                message,
+                reply: body.reply,
+                state: body.conversationState,
+                cars: body.cars
+            }, reseed && !issuedToken)
+            // null = another request moved the session on; the next turn resyncs
+            body = { ...body, sessionToken: issuedToken ?? req.body.sessionToken, sessionVersion: version }
+            res.set('X-Chat-Session', issuedToken ? 'issued' : reseed ? 'seeded' : 'delta')
+        }
+
+        // Compact mode (opt-in): selected car fields, intelligence by reference
+        const shape = parseResponseShape(req.body)
+        if (shape && Array.isArray(body?.cars)) {
+            body = { ...body, cars: compactCars(body.cars, shape) }
+        }
+
+        // Token account (opt-in debug field); X-AI-Usage only on the request that spent the tokens
+        if (result.usage && req.body.debug === true) {
+            body = { ...body, usage: { ...result.usage, shared: role !== 'leader' && role !== 'timeout' } }
+        }
+
+        res.set('X-Coalesced', role)
+        if (result.route) res.set('X-AI-Route', result.route)
+        // Token headers only on the request that spent the tokens
+        const spent = role === 'leader' || role === 'timeout'
+        if (result.tokens && spent) res.set('X-AI-Tokens', String(result.tokens))
+        if (result.usage && spent) res.set('X-AI-Usage', formatUsageHeader(result.usage))
+
+        // Serialize here (instead of res.json) so the cost shows up in Server-Timing
+        const serializeStart = process.hrtime.bigint()
+        const payload = JSON.stringify(body)
+        const serializeMs = Number(process.hrtime.bigint() - serializeStart) / 1e6
+        res.set('Server-Timing', `fastpath;dur=${fastPathMs.toFixed(3)}, spec;dur=${specMs.toFixed(3)}, serialize;dur=${serializeMs.toFixed(3)}`)
+        return res.status(result.status).type('application/json').send(payload)
+
+    } catch (error) {
+        console.error('AI Chat Error:', error)
+        res.status(500).json({
+            error: 'Failed to process request',
+            reply: "Sorry, I'm having trouble right now. Please try again!"
         })
+    }
+}
 
-        // Build conversation for Groq
-        const messages: any[] = [
-            {
-                role: 'system',
-                content: `You are "Karan" - India's sharpest car consultant with 15+ years in the automotive industry.
+/**
+ * Web intelligence referenced by compact responses (intelligenceId).
+ * Served from the scraper cache only - a client GET never triggers scraping.
+ */
+export function aiChatIntelligenceHandler(req: Request, res: Response) {
+    const intelligence = getCachedIntelligence(req.params.id)
+    if (!intelligence) {
+        return res.status(404).json({ error: 'Intelligence not cached for this car' })
+    }
+    res.set('Cache-Control', 'public, max-age=3600')
+    return res.json(intelligence)
+}
 
-## ⚠️ CRITICAL RULES
-1. **NEVER ASSUME** - Don't assume city, family, budget, or use case unless the user mentions it
-2. **USE ONLY PROVIDED DATA** - Base your response on the car data provided below, not generic knowledge
-3. **DIRECT ANSWERS** - If asked "Creta or Nexon?", compare THOSE cars directly, don't add context
-4. **CITE DATA** - Reference actual prices, features, pros/cons from the database data provided
+/**
+ * Coalesce identical in-flight requests (same normalized message + history + state)
+ * so a traffic spike on one query runs the pipeline once
+ */
+async function coalescedPipeline(message: string, sessionId: string, conversationHistory: any[], conversationState: any) {
+    const startTime = Date.now()
+    const coalescingKey = buildCoalescingKey(message, conversationHistory, conversationState)
+    const coalesced = await withSpan('chat.coalesce', {}, async (span) => {
+        const flight = await coalesce(coalescingKey, () =>
+            runChatPipeline(message, sessionId, conversationHistory)
+        )
+        span?.setAttribute('coalesce.role', flight.role)
+        return flight
+    })
 
-## 🎭 YOUR PERSONALITY
-- **Witty & Relatable:** Light Indian humor, but keep it brief
-- **Honest:** "I'll be real with you..." - don't sugarcoat
-- **Data-Driven:** Always reference the actual specs/prices provided
-- **Confident:** Take clear sides in comparisons
+    if (coalesced.role !== 'leader') {
+        console.log(`🔗 Coalesced duplicate request (${coalesced.role})`)
+    }
 
-## 📊 COMPARISON FORMAT (When comparing cars)
+    // The leader recorded its own interaction; shared results are recorded per caller session
+    const { value } = coalesced
+    if ((coalesced.role === 'follower' || coalesced.role === 'remote_follower') && value.learning && value.status === 200) {
+        await recordInteraction(
+            sessionId,
+            message,
+            value.body.reply,
+            value.learning.carsRecommended,
+            value.learning.contextUsed,
+            Date.now() - startTime
+        ).catch(e => console.error('Failed to record interaction:', e))
+    }
+    return coalesced
+}
 
-**[Car A] vs [Car B] - Quick Verdict**
+/**
+ * Classifier decision only (no reply sent to an LLM) - used by eval_intent.py
+ * to benchmark precision/recall without running the pipeline
+ */
+export function aiChatFastPathHandler(req: Request, res: Response) {
+    const start = process.hrtime.bigint()
+    const decision = classifyFastPath(req.body?.message, cachedCarNameSet)
+    const elapsedUs = Number(process.hrtime.bigint() - start) / 1e3
+    return res.json({ ...decision, elapsedUs: Number(elapsedUs.toFixed(2)) })
+}
 
-| Factor | [Car A] | [Car B] | Winner |
-|--------|---------|---------|--------|
-| Price | ₹X-YL | ₹X-YL | Tie/A/B |
-| Safety | X stars | Y stars | A/B |
-| Mileage | X kmpl | Y kmpl | A/B |
+/**
+ * Chat response for a fast-path message (same shape as the pipeline's)
+ */
+function fastPathResult(decision: FastPathDecision, sessionId: string, conversationState: any): ChatResult {
+    return {
+        status: 200,
+        route: 'fastpath',
+        body: {
+            reply: decision.reply,
+            needsMoreInfo: true,
+            cars: [],
+            sessionId,
+            // Small talk doesn't move the conversation - keep the client's state
+            conversationState: conversationState ?? { stage: 'greeting', collectedInfo: {}, confidence: 0 },
+            fastPath: { intent: decision.intent, confidence: decision.confidence }
+        }
+    }
+}
 
-**Key Differences:**
-1. [Most important difference from database]
-2. [Second difference]
-3. [Third difference]
+/**
+ * Spec-table decision only (no LLM) - used by eval_spec.py
+ */
+export function aiChatSpecAnswerHandler(req: Request, res: Response) {
+    const start = process.hrtime.bigint()
+    const answer = answerSpecQuery(req.body?.message, req.body?.conversationHistory || [])
+    const elapsedUs = Number(process.hrtime.bigint() - start) / 1e3
+    return res.json({ ...answer, elapsedUs: Number(elapsedUs.toFixed(2)), table: getSpecTableStats() })
+}
 
-**My Pick:** [Clear winner] because [specific reason from data]
+/**
+ * Chat response for a spec-table answer (same shape as the pipeline's)
+ */
+function specAnswerResult(answer: SpecAnswer, sessionId: string, conversationState: any): ChatResult {
+    return {
+        status: 200,
+        route: 'spec',
+        body: {
+            reply: answer.reply,
+            needsMoreInfo: false,
+            cars: answer.cars || [],
+            sessionId,
+            conversationState: conversationState ?? { stage: 'greeting', collectedInfo: {}, confidence: 0 },
+            citations: answer.citations
+        }
+    }
+}
 
-## 🚫 DON'T DO THIS
-❌ "Creta or Nexon for a city-dwelling family" (user didn't say family or city)
-❌ "Assuming you need 5 seats..." (don't assume)
-❌ Inventing features not in the provided data
+interface ChatResult {
+    status: number
+    body: any
+    route?: string   // Model routing tier (exposed as X-AI-Route for harness runs)
+    tokens?: number  // Prompt + completion tokens of the LLM call (X-AI-Tokens)
+    usage?: PromptUsage  // Per-section token/cost account of the LLM call (X-AI-Usage, debug field)
+    learning?: {         // What the leader recorded for self-learning (replayed for coalesced followers)
+        carsRecommended: Array<{ modelId: string, modelName: string, brandName: string }>
+        contextUsed: string
+    }
+}
 
-## ✅ DO THIS
-✓ "Here's how Creta and Nexon compare based on specs:"
-✓ Use actual prices from database (minPrice, maxPrice)
-✓ Reference pros/cons from the data provided
-✓ If info missing, say "I don't have that data" rather than guessing
+/**
+ * Full chat pipeline: retrieval + expert knowledge + LLM + learning.
+ * Returns a JSON-serializable result so it can be shared by coalesced requests.
+ */
+async function runChatPipeline(
+    message: string,
+    sessionId: string,
+    conversationHistory: any[]
+): Promise<ChatResult> {
+    const startTime = Date.now()
 
-## 🎯 KNOWN VERDICTS (Use these for quick answers)
-- **Safety King:** Nexon (5★ Global NCAP) > Creta (4★)
-- **Resale Value:** Creta > Nexon (Hyundai holds value better)
-- **Features:** Creta (panoramic sunroof, ventilated seats) > Nexon
-- **Build Quality:** Nexon (Tata's solid build) > Creta
-- **Mileage:** Similar (17-18 kmpl real-world)
-- **After-Sales:** Hyundai slightly better network than Tata`
-            }
-        ]
+    // Initialize vector store on first request (cached after that)
+    await withSpan('vector_store.init', {}, () => initializeVectorStore()).catch(err => {
+        console.warn('⚠️ Vector store init failed, using fallback:', err.message)
+    })
 
-        // Add conversation history
-        conversationHistory.forEach((msg: any) => {
-            messages.push({
-                role: msg.role === 'user' ? 'user' : 'assistant',
-                content: msg.content
-            })
-        })
+    // Build conversation for the LLM
+    const messages: any[] = [
+        {
+            role: 'system',
+            content: SYSTEM_PROMPT
+        }
+    ]
 
-        // RAG: Extract car names and fetch real data from database
-        let ragContext = ''
-        let expertContext = ''
-        const carNames = await extractCarNamesFromQuery(message)
-        const lowerMessage = message.toLowerCase()
+    // Add conversation history
+    conversationHistory.forEach((msg: any) => {
+        messages.push({
+            role: msg.role === 'user' ? 'user' : 'assistant',
+            content: msg.content
+        })
+    })
 
-        // ============================================
-        // EXPERT KNOWLEDGE INJECTION (Claude-like reasoning)
-        // ============================================
+    // RAG: Extract car names and fetch real data from database
+    let ragContext = ''
+    let expertContext = ''
+    const endCarNames = aiRetrievalStageDuration.startTimer({ stage: 'car_names' })
+    const carNames = await withSpan('chat.extract_car_names', {}, () => extractCarNamesFromQuery(message))
+    endCarNames()
+    const lowerMessage = message.toLowerCase()
+    const queryType = classifyQuery(message)
+    aiQueryClass.inc({ query_type: queryType })
+    // Greetings skip retrieval entirely
+    const trivial = isTrivialMessage(message, carNames)
+    // Popular matchups are served from precomputed comparison records
+    const materialized = queryType === 'comparison' ? findComparisonForQuery(message) : null
+
+    // ============================================
+    // EXPERT KNOWLEDGE INJECTION (Claude-like reasoning)
+    // ============================================
 
-        try {
-            // 1. Detect comparisons and inject head-to-head knowledge
-            if (carNames.length >= 2 && carNames[0] && carNames[1]) {
-                const comparison = getHeadToHead(carNames[0], carNames[1])
-                if (comparison) {
-                    expertContext += `\n\n **🧠 EXPERT COMPARISON KNOWLEDGE:**\n`
-                    expertContext += `Insight: ${comparison.insight} \n`
-                    expertContext += `Winners: Overall = ${comparison.winner.overall}, Resale = ${comparison.winner.resale}, Features = ${comparison.winner.features} \n`
-                    expertContext += `${comparison.cars[0]} is for: ${comparison.forWhom.car1} \n`
-                    expertContext += `${comparison.cars[1]} is for: ${comparison.forWhom.car2} \n`
-                    expertContext += `Pro Tip: ${comparison.proTip} \n`
-                    console.log(`🧠 Expert: Injected comparison knowledge for ${carNames[0]} vs ${carNames[1]} `)
-                }
+    try {
+        // 1. Detect comparisons and inject head-to-head knowledge
+        if (carNames.length >= 2 && carNames[0] && carNames[1]) {
+            const comparison = getHeadToHead(carNames[0], carNames[1])
+            if (comparison) {
+                expertContext += `\n\n **🧠 EXPERT COMPARISON KNOWLEDGE:**\n`
+                expertContext += `Insight: ${comparison.insight} \n`
+                expertContext += `Winners: Overall = ${comparison.winner.overall}, Resale = ${comparison.winner.resale}, Features = ${comparison.winner.features} \n`
+                expertContext += `${comparison.cars[0]} is for: ${comparison.forWhom.car1} \n`
+                expertContext += `${comparison.cars[1]} is for: ${comparison.forWhom.car2} \n`
+                expertContext += `Pro Tip: ${comparison.proTip} \n`
+                console.log(`🧠 Expert: Injected comparison knowledge for ${carNames[0]} vs ${carNames[1]} `)
             }
-        } catch (e) {
-            console.error('Expert comparison injection error:', e)
         }
+    } catch (e) {
+        console.error('Expert comparison injection error:', e)
+    }
 
-        // 2. Detect objections and inject expert responses
-        try {
-            const objectionTopics = ['service', 'resale', 'safety', 'waiting', 'diesel', 'petrol', 'automatic', 'sunroof', 'ev', 'charging']
-            for (const topic of objectionTopics) {
-                if (lowerMessage.includes(topic)) {
-                    const brandTopics = ['tata service', 'tata resale', 'maruti safety', 'kia service', 'xuv700 waiting', 'diesel vs petrol']
-                    for (const bt of brandTopics) {
-                        const parts = bt.split(' ')
-                        if (parts.length >= 2 && lowerMessage.includes(parts[0]) && lowerMessage.includes(parts[1])) {
-                            const objectionKey = bt.replace(' ', '_')
-                            if (OBJECTIONS && OBJECTIONS[objectionKey]) {
-                                const obj = OBJECTIONS[objectionKey]
-                                expertContext += `\n\n **🛡️ OBJECTION HANDLING:**\n`
-                                expertContext += `User concern: "${obj.objection}"\n`
-                                expertContext += `Expert response: ${obj.response} \n`
-                                expertContext += `Data: ${obj.data} \n`
-                                if (obj.alternative) expertContext += `Alternative: ${obj.alternative} \n`
-                                console.log(`🛡️ Expert: Injected objection handling for "${objectionKey}"`)
-                                break
-                            }
+    // 2. Detect objections and inject expert responses
+    try {
+        const objectionTopics = ['service', 'resale', 'safety', 'waiting', 'diesel', 'petrol', 'automatic', 'sunroof', 'ev', 'charging']
+        for (const topic of objectionTopics) {
+            if (lowerMessage.includes(topic)) {
+                const brandTopics = ['tata service', 'tata resale', 'maruti safety', 'kia service', 'xuv700 waiting', 'diesel vs petrol']
+                for (const bt of brandTopics) {
+                    const parts = bt.split(' ')
+                    if (parts.length >= 2 && lowerMessage.includes(parts[0]) && lowerMessage.includes(parts[1])) {
+                        const objectionKey = bt.replace(' ', '_')
+                        if (OBJECTIONS && OBJECTIONS[objectionKey]) {
+                            const obj = OBJECTIONS[objectionKey]
+                            expertContext += `\n\n **🛡️ OBJECTION HANDLING:**\n`
+                            expertContext += `User concern: "${obj.objection}"\n`
+                            expertContext += `Expert response: ${obj.response} \n`
+                            expertContext += `Data: ${obj.data} \n`
+                            if (obj.alternative) expertContext += `Alternative: ${obj.alternative} \n`
+                            console.log(`🛡️ Expert: Injected objection handling for "${objectionKey}"`)
+                            break
                         }
                     }
                 }
             }
-        } catch (e) {
-            console.error('Expert objection injection error:', e)
         }
+    } catch (e) {
+        console.error('Expert objection injection error:', e)
+    }
 
-        // 3. Detect city mentions and inject regional advice
-        try {
-            const cities = ['mumbai', 'delhi', 'bangalore', 'chennai', 'pune', 'hyderabad']
-            for (const city of cities) {
-                if (lowerMessage.includes(city)) {
-                    const advice = getRegionalAdvice(city)
-                    if (advice) {
-                        expertContext += `\n\n **📍 REGIONAL INTELLIGENCE(${city.toUpperCase()}):**\n`
-                        expertContext += `Traffic: ${advice.traffic || 'N/A'} \n`
-                        expertContext += `Fuel recommendation: ${advice.fuel || 'N/A'} \n`
-                        expertContext += `Best choice: ${advice.recommendation || 'N/A'} \n`
-                        expertContext += `Avoid: ${advice.avoid || 'N/A'} \n`
-                        expertContext += `Local tip: ${advice.tip || 'N/A'} \n`
-                        console.log(`📍 Expert: Injected regional advice for ${city}`)
-                        break
-                    }
+    // 3. Detect city mentions and inject regional advice
+    try {
+        const cities = ['mumbai', 'delhi', 'bangalore', 'chennai', 'pune', 'hyderabad']
+        for (const city of cities) {
+            if (lowerMessage.includes(city)) {
+                const advice = getRegionalAdvice(city)
+                if (advice) {
+                    expertContext += `\n\n **📍 REGIONAL INTELLIGENCE(${city.toUpperCase()}):**\n`
+                    expertContext += `Traffic: ${advice.traffic || 'N/A'} \n`
+                    expertContext += `Fuel recommendation: ${advice.fuel || 'N/A'} \n`
+                    expertContext += `Best choice: ${advice.recommendation || 'N/A'} \n`
+                    expertContext += `Avoid: ${advice.avoid || 'N/A'} \n`
+                    expertContext += `Local tip: ${advice.tip || 'N/A'} \n`
+                    console.log(`📍 Expert: Injected regional advice for ${city}`)
+                    break
                 }
             }
-        } catch (e) {
-            console.error('Expert regional injection error:', e)
         }
+    } catch (e) {
+        console.error('Expert regional injection error:', e)
+    }
 
-        // 4. Add relevant pro tips
-        try {
-            if (lowerMessage.includes('negotiat') || lowerMessage.includes('discount') || lowerMessage.includes('deal')) {
-                const tip = getRandomProTip('negotiation')
-                if (tip) expertContext += `\n\n **💡 PRO TIP(Negotiation):** ${tip} \n`
-            }
-            if (lowerMessage.includes('test drive') || lowerMessage.includes('showroom')) {
-                const tip = getRandomProTip('test_drive')
-                if (tip) expertContext += `\n\n **💡 PRO TIP(Test Drive):** ${tip} \n`
-            }
-            if (lowerMessage.includes('insurance')) {
-                const tip = getRandomProTip('insurance')
-                if (tip) expertContext += `\n\n **💡 PRO TIP(Insurance):** ${tip} \n`
-            }
-            if (lowerMessage.includes('waiting') || lowerMessage.includes('delivery')) {
-                const tip = getRandomProTip('waiting_hacks')
-                if (tip) expertContext += `\n\n **💡 PRO TIP(Waiting):** ${tip} \n`
-            }
-        } catch (e) {
-            console.error('Expert pro tips injection error:', e)
+    // 4. Add relevant pro tips
+    try {
+        if (lowerMessage.includes('negotiat') || lowerMessage.includes('discount') || lowerMessage.includes('deal')) {
+            const tip = getRandomProTip('negotiation')
+            if (tip) expertContext += `\n\n **💡 PRO TIP(Negotiation):** ${tip} \n`
+        }
+        if (lowerMessage.includes('test drive') || lowerMessage.includes('showroom')) {
+            const tip = getRandomProTip('test_drive')
+            if (tip) expertContext += `\n\n **💡 PRO TIP(Test Drive):** ${tip} \n`
         }
+        if (lowerMessage.includes('insurance')) {
+            const tip = getRandomProTip('insurance')
+            if (tip) expertContext += `\n\n **💡 PRO TIP(Insurance):** ${tip} \n`
+        }
+        if (lowerMessage.includes('waiting') || lowerMessage.includes('delivery')) {
+            const tip = getRandomProTip('waiting_hacks')
+            if (tip) expertContext += `\n\n **💡 PRO TIP(Waiting):** ${tip} \n`
+        }
+    } catch (e) {
+        console.error('Expert pro tips injection error:', e)
+    }
 
-        // 5. Fetch competitor data for context
-        try {
-            if (carNames.length === 1 && carNames[0]) {
-                const competitors = getCompetitors(carNames[0])
-                if (competitors && competitors.length > 0) {
-                    expertContext += `\n\n **🔄 KEY COMPETITORS:** ${competitors.slice(0, 3).join(', ')} \n`
-                    console.log(`🔄 Expert: Added competitors for ${carNames[0]}: ${competitors.slice(0, 3).join(', ')} `)
-                }
+    // 5. Fetch competitor data for context
+    try {
+        if (carNames.length === 1 && carNames[0]) {
+            const competitors = getCompetitors(carNames[0])
+            if (competitors && competitors.length > 0) {
+                expertContext += `\n\n **🔄 KEY COMPETITORS:** ${competitors.slice(0, 3).join(', ')} \n`
+                console.log(`🔄 Expert: Added competitors for ${carNames[0]}: ${competitors.slice(0, 3).join(', ')} `)
             }
-        } catch (e) {
-            console.error('Expert competitor injection error:', e)
         }
+    } catch (e) {
+        console.error('Expert competitor injection error:', e)
+    }
 
-        // ============================================
-        // ENHANCED RAG: Vector + Keyword Hybrid Search
-        // ============================================
+    // ============================================
+    // ENHANCED RAG: Vector + Keyword Hybrid Search
+    // ============================================
 
-        // 1. Semantic search using embeddings (finds intent, not just keywords)
-        let vectorSearchResults: any[] = []
-        try {
-            vectorSearchResults = await hybridCarSearch(message, {}, 5)
-            if (vectorSearchResults.length > 0) {
-                console.log(`🧠 Vector search: Found ${vectorSearchResults.length} semantic matches`)
-
-                ragContext = '\n\n**🔍 Cars Found (AI-Matched to Your Query):**\n'
-                for (const car of vectorSearchResults) {
-                    const minPrice = car.minPrice ? (car.minPrice / 100000).toFixed(2) : 'N/A'
-                    const maxPrice = car.maxPrice ? (car.maxPrice / 100000).toFixed(2) : 'N/A'
-                    ragContext += `\n ** ${car.brandName || ''} ${car.name}** (Score: ${car.searchScore?.toFixed(2) || 'N/A'}): \n`
-                    ragContext += `- Price: ₹${minPrice} L - ₹${maxPrice} L\n`
-                    if (car.bodyType) ragContext += `- Type: ${car.bodyType} \n`
-                    if (car.pros) ragContext += `- Pros: ${car.pros} \n`
-                    if (car.cons) ragContext += `- Cons: ${car.cons} \n`
-                    if (car.summary) ragContext += `- Summary: ${car.summary.slice(0, 150)}...\n`
-                }
+    // 1. Semantic search using embeddings (finds intent, not just keywords)
+    let vectorSearchResults: any[] = []
+    try {
+        if (!trivial && !materialized) {
+            const endVectorSearch = aiRetrievalStageDuration.startTimer({ stage: 'vector_search' })
+            vectorSearchResults = await withSpan('retrieval.hybrid_search', {}, () => hybridCarSearch(message, {}, 5))
+                .finally(endVectorSearch)
+        }
+        if (vectorSearchResults.length > 0) {
+            console.log(`🧠 Vector search: Found ${vectorSearchResults.length} semantic matches`)
+
+            ragContext = '\n\n**🔍 Cars Found (AI-Matched to Your Query):**\n'
+            for (const car of vectorSearchResults) {
+                const minPrice = car.minPrice ? (car.minPrice / 100000).toFixed(2) : 'N/A'
+                const maxPrice = car.maxPrice ? (car.maxPrice / 100000).toFixed(2) : 'N/A'
+                ragContext += `\n ** ${car.brandName || ''} ${car.name}** (Score: ${car.searchScore?.toFixed(2) || 'N/A'}): \n`
+                ragContext += `- Price: ₹${minPrice} L - ₹${maxPrice} L\n`
+                if (car.bodyType) ragContext += `- Type: ${car.bodyType} \n`
+                if (car.pros) ragContext += `- Pros: ${car.pros} \n`
+                if (car.cons) ragContext += `- Cons: ${car.cons} \n`
+                if (car.summary) ragContext += `- Summary: ${car.summary.slice(0, 150)}...\n`
             }
-        } catch (e) {
-            console.error('Vector search error:', e)
         }
+    } catch (e) {
+        console.error('Vector search error:', e)
+    }
+
+    if (materialized) {
+        console.log(`📊 Using materialized comparison: ${materialized.key}`)
+        ragContext = formatComparisonContext(materialized)
+        vectorSearchResults = materialized.cars.map(car => ({
+            id: car.id,
+            name: car.name,
+            brandName: car.brandName,
+            minPrice: car.minPrice,
+            maxPrice: car.maxPrice,
+            bodyType: car.bodyType
+        }))
+    }
 
-        // 2. Fallback: Traditional keyword search if vector search failed
-        if (vectorSearchResults.length === 0 && carNames.length > 0) {
-            console.log(`🔍 RAG Fallback: Using keyword search for: ${carNames.join(', ')} `)
+    // 2. Fallback: Traditional keyword search if vector search failed
+    if (vectorSearchResults.length === 0 && carNames.length > 0) {
+        console.log(`🔍 RAG Fallback: Using keyword search for: ${carNames.join(', ')} `)
 
-            try {
-                const regexQueries = carNames.map(name => ({
-                    name: { $regex: name, $options: 'i' }
-                }))
+        try {
+            const regexQueries = carNames.map(name => ({
+                name: { $regex: name, $options: 'i' }
+            }))
 
-                const carData = await CarVariant.find({
+            const endKeyword = aiRetrievalStageDuration.startTimer({ stage: 'keyword_fallback' })
+            const carData = await withSpan('mongo.variants.keyword_find', { 'db.collection': 'variants' }, () =>
+                CarVariant.find({
                     $or: regexQueries,
                     status: 'active'
-                }).limit(10).lean()
-
-                if (carData.length > 0) {
-                    console.log(`📊 Keyword RAG: Found ${carData.length} cars`)
-
-                    ragContext = '\n\n**Real-Time Database Data:**\n'
-                    carData.forEach((car: any) => {
-                        const price = car.price ? (car.price / 100000).toFixed(2) : 'N/A'
-                        ragContext += `\n${car.brandId || 'Unknown'} ${car.name}: \n`
-                        ragContext += `- Price: ₹${price} L\n`
-                        if (car.fuelType) ragContext += `- Fuel: ${car.fuelType} \n`
-                        if (car.transmission) ragContext += `- Transmission: ${car.transmission} \n`
-                        if (car.seatingCapacity) ragContext += `- Seating: ${car.seatingCapacity} \n`
-                        if (car.mileage) ragContext += `- Mileage: ${car.mileage} km / l\n`
-                        if (car.globalNCAPRating) ragContext += `- Safety: ${car.globalNCAPRating} stars\n`
-                    })
-                }
-            } catch (e) {
-                console.error('RAG fetch error:', e)
+                }).limit(10).lean().exec(), 'client')
+            endKeyword()
+
+            if (carData.length > 0) {
+                console.log(`📊 Keyword RAG: Found ${carData.length} cars`)
+
+                ragContext = '\n\n**Real-Time Database Data:**\n'
+                carData.forEach((car: any) => {
+                    const price = car.price ? (car.price / 100000).toFixed(2) : 'N/A'
+                    ragContext += `\n${car.brandId || 'Unknown'} ${car.name}: \n`
+                    ragContext += `- Price: ₹${price} L\n`
+                    if (car.fuelType) ragContext += `- Fuel: ${car.fuelType} \n`
+                    if (car.transmission) ragContext += `- Transmission: ${car.transmission} \n`
+                    if (car.seatingCapacity) ragContext += `- Seating: ${car.seatingCapacity} \n`
+                    if (car.mileage) ragContext += `- Mileage: ${car.mileage} km / l\n`
+                    if (car.globalNCAPRating) ragContext += `- Safety: ${car.globalNCAPRating} stars\n`
+                })
             }
+        } catch (e) {
+            console.error('RAG fetch error:', e)
         }
+    }
 
-        // 3. Get learned context from past successful responses
-        let learnedContext = ''
-        try {
-            learnedContext = await getLearnedContext(message)
-            if (learnedContext) {
-                console.log(`📚 Using learned context from past successes`)
-            }
-        } catch (e) {
-            console.error('Learned context error:', e)
+    // 3. Get learned context from past successful responses
+    let learnedContext = ''
+    try {
+        if (!trivial) {
+            const endLearned = aiRetrievalStageDuration.startTimer({ stage: 'learned_context' })
+            learnedContext = await withSpan('retrieval.learned_context', {}, () => getLearnedContext(message))
+                .finally(endLearned)
+        }
+        if (learnedContext) {
+            console.log(`📚 Using learned context from past successes`)
         }
+    } catch (e) {
+        console.error('Learned context error:', e)
+    }
 
-        // Add current message with RAG context + Expert knowledge + Learned context
-        const fullContext = ragContext + expertContext + learnedContext
-        messages.push({
-            role: 'user',
-            content: message + fullContext
-        })
+    // Pick model + budget from query class, entities and context size
+    const fullContext = ragContext + expertContext + learnedContext
+    const route = selectRoute({
+        message,
+        queryType,
+        entities: carNames,
+        contextChars: fullContext.length,
+        historyTurns: conversationHistory.length
+    })
+    if (route.compactPrompt) {
+        messages[0] = { role: 'system', content: COMPACT_SYSTEM_PROMPT }
+    }
 
-        // Let AI decide what to do
-        if (!groq) {
-            return res.status(503).json({
+    // Add current message with RAG context + Expert knowledge + Learned context
+    const budgetedContext = applyContextBudget(fullContext, route)
+    messages.push({
+        role: 'user',
+        content: message + budgetedContext
+    })
+
+    // Let AI decide what to do
+    if (!hasLLMProvider()) {
+        return {
+            status: 503,
+            body: {
                 error: 'AI service unavailable',
                 reply: "Sorry, the AI service is currently unavailable. Please try again later!"
-            })
+            }
         }
+    }
 
-        const completion = await groq.chat.completions.create({
-            model: 'llama-3.1-8b-instant',
+    // Routed across providers (hedging + failover); route picks the preferred model
+    const llmStart = Date.now()
+    const completion = await withSpan('llm.chat_completion', { 'ai.route': route.tier, 'ai.model': route.model }, () =>
+        chatCompletion({
+            model: route.model,
             messages,
-            max_tokens: 500,  // Increased to handle larger contexts with expert knowledge
-            temperature: 0.7
+            maxTokens: route.maxTokens,
+            temperature: route.temperature
         })
+    )
+    const llmMs = Date.now() - llmStart
+
+    // Split the prompt tokens over system / history / message / context sections
+    const promptUsage = accountPrompt({
+        system: messages[0].content,
+        history: messages.slice(1, -1).map((m: any) => String(m.content ?? '')),
+        message,
+        context: [['rag', ragContext], ['expert', expertContext], ['learned', learnedContext]],
+        contextChars: budgetedContext.length
+    }, completion, route.tier)
+    recordPromptUsage(promptUsage)
+    const tokenUsage = recordRouteOutcome(
+        route,
+        llmMs,
+        completion.usage ?? {
+            promptTokens: promptUsage.promptTokens,
+            completionTokens: promptUsage.completionTokens,
+            totalTokens: promptUsage.promptTokens + promptUsage.completionTokens
+        },
+        messages.reduce((sum: number, m: any) => sum + m.content.length, 0),
+        completion.content.length
+    )
+
+    let aiResponse = completion.content || 'How can I help you?'
+    console.log('🤖 AI Raw Response:', aiResponse)
+
+    // Check if AI wants to find cars
+    if (aiResponse.includes('FIND_CARS:')) {
+        const match = aiResponse.match(/FIND_CARS:\s*({.*?})/)
+        if (match) {
+            try {
+                const requirements = JSON.parse(match[1])
+                console.log('🚗 AI wants to find cars:', requirements)
 
-        let aiResponse = completion.choices[0]?.message?.content || 'How can I help you?'
-        console.log('🤖 AI Raw Response:', aiResponse)
-
-        // Check if AI wants to find cars
-        if (aiResponse.includes('FIND_CARS:')) {
-            const match = aiResponse.match(/FIND_CARS:\s*({.*?})/)
-            if (match) {
-                try {
-                    const requirements = JSON.parse(match[1])
-                    console.log('🚗 AI wants to find cars:', requirements)
-
-                    const cars = await findMatchingCars(requirements)
+                const cars = await withSpan('chat.find_matching_cars', {}, () => findMatchingCars(requirements))
 
-                    return res.json({
+                return {
+                    status: 200,
+                    route: route.tier,
+                    tokens: tokenUsage.promptTokens + tokenUsage.completionTokens,
+                    usage: promptUsage,
+                    body: {
                         reply: `Great! I found ${cars.length} cars that match your needs: `,
                         cars,
                         needsMoreInfo: false,
@@ -418,48 +781,56 @@ export default async function aiChatHandler(req: Request, res: Response) {
                             collectedInfo: requirements,
                             confidence: 1
                         }
-                    })
-                } catch (e) {
-                    console.error('Failed to parse requirements:', e)
+                    }
                 }
+            } catch (e) {
+                console.error('Failed to parse requirements:', e)
             }
         }
+    }
 
-        // Clean up response
-        aiResponse = aiResponse
-            .replace(/SEARCH:.*$/im, '')
-            .replace(/FIND_CARS:.*$/im, '')
-            .trim()
-
-        // Determine if AI is asking for more info
-        const needsMoreInfo = aiResponse.includes('?') ||
-            aiResponse.toLowerCase().includes('budget') ||
-            aiResponse.toLowerCase().includes('seating') ||
-            aiResponse.toLowerCase().includes('how many')
-
-        // Record interaction for self-learning
-        const responseTimeMs = Date.now() - startTime
-        const carsRecommended = vectorSearchResults.slice(0, 3).map((car: any) => ({
-            modelId: car.id || car._id?.toString() || '',
-            modelName: car.name || '',
-            brandName: car.brandName || ''
-        }))
-
-        try {
-            await recordInteraction(
-                sessionId,
-                message,
-                aiResponse,
-                carsRecommended,
-                fullContext.slice(0, 500),
-                responseTimeMs
-            )
-            console.log(`📝 Interaction recorded(${responseTimeMs}ms)`)
-        } catch (e) {
-            console.error('Failed to record interaction:', e)
-        }
+    // Clean up response
+    aiResponse = aiResponse
+        .replace(/SEARCH:.*$/im, '')
+        .replace(/FIND_CARS:.*$/im, '')
+        .trim()
+
+    // Determine if AI is asking for more info
+    const needsMoreInfo = aiResponse.includes('?') ||
+        aiResponse.toLowerCase().includes('budget') ||
+        aiResponse.toLowerCase().includes('seating') ||
+        aiResponse.toLowerCase().includes('how many')
+
+    // Record interaction for self-learning
+    const responseTimeMs = Date.now() - startTime
+    const carsRecommended = vectorSearchResults.slice(0, 3).map((car: any) => ({
+        modelId: car.id || car._id?.toString() || '',
+        modelName: car.name || '',
+        brandName: car.brandName || ''
+    }))
+
+    const contextUsed = fullContext.slice(0, 500)
+    try {
+        await withSpan('learning.record_interaction', {}, () => recordInteraction(
+            sessionId,
+            message,
+            aiResponse,
+            carsRecommended,
+            contextUsed,
+            responseTimeMs
+        ))
+        console.log(`📝 Interaction recorded(${responseTimeMs}ms)`)
+    } catch (e) {
+        console.error('Failed to record interaction:', e)
+    }
 
-        res.json({
+    return {
+        status: 200,
+        route: route.tier,
+        tokens: tokenUsage.promptTokens + tokenUsage.completionTokens,
+        usage: promptUsage,
+        learning: { carsRecommended, contextUsed },
+        body: {
             reply: aiResponse,
             needsMoreInfo,
             cars: vectorSearchResults.slice(0, 3), // Return top matched cars
@@ -469,14 +840,7 @@ export default async function aiChatHandler(req: Request, res: Response) {
                 collectedInfo: {},
                 confidence: 0
             }
-        })
-
-    } catch (error) {
-        console.error('AI Chat Error:', error)
-        res.status(500).json({
-            error: 'Failed to process request',
-            reply: "Sorry, I'm having trouble right now. Please try again!"
-        })
+        }
     }
 }
 
@@ -513,7 +877,8 @@ async function findMatchingCars(requirements: any): Promise<any[]> {
         console.log('🔍 MongoDB Query:', JSON.stringify(query))
 
         // Find matching variants
-        let variants = await CarVariant.find(query).limit(20).lean()
+        let variants = await withSpan('mongo.variants.find', { 'db.collection': 'variants' }, () =>
+            CarVariant.find(query).limit(20).lean().exec(), 'client')
         console.log(`📊 Found ${variants.length} variants from database`)
 
         if (variants.length === 0) {
@@ -571,12 +936,14 @@ async function findMatchingCars(requirements: any): Promise<any[]> {
         console.log(`🎯 Selected top 3 cars: `, top3.map(v => `${v.brandId} ${v.name} `))
 
         // Enrich with web intelligence
+        const endIntelligence = aiRetrievalStageDuration.startTimer({ stage: 'intelligence' })
         const enrichedCars = await Promise.all(
             top3.map(async (car) => {
                 let intelligence: CarIntelligence = { imageUrl: '', ownerRecommendation: 0, totalReviews: 0, topPros: [], commonIssues: [], model: '', averageSentiment: 0, topCons: [], lastUpdated: new Date() }
 
                 try {
-                    intelligence = await getCarIntelligence(`${car.brandId} ${car.name} `)
+                    intelligence = await withSpan('web_intelligence', { 'car.model': car.name }, () =>
+                        getCarIntelligence(intelligenceKey(car.brandId, car.name)))
                     if (!intelligence.imageUrl) intelligence.imageUrl = '';
                 } catch (e) {
                     console.error(`Web intelligence failed for ${car.brandId} ${car.name}: `, e)
@@ -623,6 +990,7 @@ async function findMatchingCars(requirements: any): Promise<any[]> {
                 }
             })
         )
+        endIntelligence()
 
         return enrichedCars
 
@@ -15,6 +15,11 @@ import {
     getRecentInteractions
 } from '../ai-engine/self-learning'
 import { getVectorStoreStats, refreshVectorStore } from '../ai-engine/vector-store'
+import { getSingleFlightStats } from '../ai-engine/single-flight'
+import { getLLMRouterStats } from '../ai-engine/ai-adapter'
+import { getRouteStats } from '../ai-engine/model-routing'
+import { getLLMCacheStats } from '../ai-engine/llm-cache'
+import { getAIFingerprint } from '../ai-engine/fingerprint'
 
 const router = Router()
 
@@ -100,6 +105,10 @@ router.get('/metrics', async (_req: Request, res: Response) => {
         res.json({
             learning: metrics,
             vectorStore: vectorStats,
+            coalescing: getSingleFlightStats(),
+            llmProviders: getLLMRouterStats(),
+            modelRouting: getRouteStats(),
+            promptCache: getLLMCacheStats(),
             timestamp: new Date().toISOString()
         })
 
@@ -109,6 +118,20 @@ router.get('/metrics', async (_req: Request, res: Response) => {
     }
 })
 
+/**
+ * GET /api/ai-feedback/fingerprint
+ * Hash of everything the chat answers depend on (prompts, models, catalog, build)
+ * The catalog hash is dropped by the catalog write routes, not by callers
+ */
+router.get('/fingerprint', async (req: Request, res: Response) => {
+    try {
+        res.json(await getAIFingerprint())
+    } catch (error) {
+        console.error('Fingerprint API error:', error)
+        res.status(500).json({ error: 'Failed to compute fingerprint' })
+    }
+})
+
 /**
  * GET /api/ai-feedback/interactions
  * Get recent interactions for debugging
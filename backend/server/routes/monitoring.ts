@@ -2,6 +2,18 @@ import { Router } from 'express';
 import { getRedisCacheStats } from '../middleware/redis-cache';
 import { getCacheStats } from '../middleware/cache';
 import mongoose from 'mongoose';
+import { getHeapStatistics } from 'v8';
+import { getIntelligenceCacheSize } from '../ai-engine/web-scraper';
+import { getReviewAnalysisMemoSize } from '../ai-engine/review-analysis';
+import { getSearchIndexStats } from '../services/search-index';
+import { getVectorStoreStats } from '../ai-engine/vector-store';
+import { learningSystem } from '../ai-engine/learning-system';
+import { getLLMCacheStats } from '../ai-engine/llm-cache';
+import { getSingleFlightStats } from '../ai-engine/single-flight';
+import { getChatSessionStats } from '../ai-engine/chat-session';
+import { getComparisonMaterializerStats } from '../services/comparison-materializer';
+import { getNewsIndexStats } from '../services/news-index';
+import { getCarNameCacheSize } from './ai-chat';
 
 const router = Router();
 
@@ -129,6 +141,56 @@ router.get('/metrics', async (req, res) => {
   }
 });
 
+/**
+ * AI Memory Diagnostics
+ * Process memory plus the entry counts of every in-process structure that
+ * grows with AI traffic (sampled by the harness soak mode to spot leaks)
+ */
+router.get('/diagnostics/ai-memory', (req, res) => {
+  try {
+    const memory = process.memoryUsage();
+    const heap = getHeapStatistics();
+    const learning = learningSystem.getSizes();
+    const promptCache = getLLMCacheStats();
+
+    res.json({
+      timestamp: new Date().toISOString(),
+      pid: process.pid,
+      uptimeSeconds: Math.round(process.uptime()),
+      memory: {
+        rss: memory.rss,
+        heapUsed: memory.heapUsed,
+        heapTotal: memory.heapTotal,
+        external: memory.external,
+        arrayBuffers: memory.arrayBuffers,
+        heapLimit: heap.heap_size_limit
+      },
+      components: {
+        webScraperCache: getIntelligenceCacheSize(),
+        reviewAnalysisMemo: getReviewAnalysisMemoSize(),
+        searchIndex: getSearchIndexStats().inMemoryCount,
+        vectorStore: getVectorStoreStats().totalVectors,
+        carNames: getCarNameCacheSize(),
+        learningPatterns: learning.patterns,
+        learningInteractions: learning.interactions,
+        promptCacheEntries: promptCache.entries,
+        promptCacheBytes: promptCache.bytes,
+        comparisonRecords: getComparisonMaterializerStats().records,
+        newsArticles: getNewsIndexStats().articles,
+        singleFlightInFlight: getSingleFlightStats().inFlight,
+        responseCacheKeys: getCacheStats().keys,
+        chatSessionsLocal: getChatSessionStats().localSessions
+      },
+      chatSessions: getChatSessionStats()
+    });
+  } catch (error) {
+    res.status(500).json({
+      error: error instanceof Error ? error.message : 'Failed to get AI memory diagnostics',
+      timestamp: new Date().toISOString()
+    });
+  }
+});
+
 /**
  * Readiness Check
  * Returns whether the service is ready to accept traffic
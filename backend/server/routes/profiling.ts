@@ -0,0 +1,77 @@
+import { Router } from 'express';
+import { authenticateToken, authorizeRole } from '../auth';
+import {
+  getProfilingStatus,
+  resolveProfilePath,
+  startCpuProfile,
+  stopCpuProfile,
+  takeHeapSnapshot,
+} from '../monitoring/profiler';
+
+const router = Router();
+
+router.use(authenticateToken, authorizeRole('admin', 'super_admin'));
+
+/**
+ * Profiler status
+ * GET /api/admin/profiling/status
+ */
+router.get('/status', (req, res) => {
+  res.json(getProfilingStatus());
+});
+
+/**
+ * Start a CPU profile
+ * POST /api/admin/profiling/cpu/start
+ * Body: { scope?: 'all' | 'header', samplingIntervalUs?: number, maxDurationMs?: number }
+ */
+router.post('/cpu/start', async (req, res) => {
+  try {
+    const { scope, samplingIntervalUs, maxDurationMs } = req.body || {};
+    res.json(await startCpuProfile({
+      scope,
+      samplingIntervalUs: Number(samplingIntervalUs) || undefined,
+      maxDurationMs: Number(maxDurationMs) || undefined,
+    }));
+  } catch (error: any) {
+    res.status(409).json({ error: error.message });
+  }
+});
+
+/**
+ * Stop the CPU profile and return the top self-time functions
+ * POST /api/admin/profiling/cpu/stop
+ */
+router.post('/cpu/stop', async (req, res) => {
+  try {
+    res.json(await stopCpuProfile());
+  } catch (error: any) {
+    res.status(409).json({ error: error.message });
+  }
+});
+
+/**
+ * Write a heap snapshot (blocks the event loop while it runs)
+ * POST /api/admin/profiling/heap/snapshot
+ */
+router.post('/heap/snapshot', async (req, res) => {
+  try {
+    res.json(await takeHeapSnapshot());
+  } catch (error: any) {
+    res.status(409).json({ error: error.message });
+  }
+});
+
+/**
+ * Download a stored profile (.cpuprofile / .heapsnapshot)
+ * GET /api/admin/profiling/profiles/:profileId
+ */
+router.get('/profiles/:profileId', async (req, res) => {
+  const file = await resolveProfilePath(req.params.profileId);
+  if (!file) {
+    return res.status(404).json({ error: 'Profile not found' });
+  }
+  res.download(file);
+});
+
+export default router;
@@ -0,0 +1,121 @@
+/**
+ * News Index Benchmark
+ *
+ * Compares the old request-path behaviour of retrieveWebData (fetch and
+ * parse the RSS feed inside the request) with lookups from the news index,
+ * against the local feed stand-in:
+ *
+ * - ingestion: a cold poll of every model's feed (200s), then a warm poll
+ *   (conditional GETs - 304s while the stand-in feeds are unchanged)
+ * - request path: p50 / p99 / max of a live fetch + parse per query vs an
+ *   index lookup for the same queries (model names and free text)
+ *
+ * Needs the stand-in running:
+ *   npx tsx server/scripts/news-feed-standin.ts
+ *
+ * Usage:
+ *   npx tsx server/scripts/bench-news-index.ts --models 40 --queries 200
+ */
+
+const FEED_URL = process.env.NEWS_FEED_BASE_URL || 'http://localhost:8789';
+
+// Read by the module at import time, so set before the dynamic imports below
+process.env.NEWS_FEED_BASE_URL = FEED_URL;
+
+const MODELS: Array<[string, string]> = [
+    ['Hyundai', 'Creta'], ['Kia', 'Seltos'], ['Tata', 'Nexon'], ['Maruti Suzuki', 'Brezza'], ['Hyundai', 'Venue'],
+    ['Kia', 'Sonet'], ['Tata', 'Punch'], ['Maruti Suzuki', 'Swift'], ['Maruti Suzuki', 'Baleno'], ['Hyundai', 'i20'],
+    ['Tata', 'Altroz'], ['Tata', 'Tiago'], ['Honda', 'City'], ['Hyundai', 'Verna'], ['Maruti Suzuki', 'Dzire'],
+    ['Mahindra', 'XUV700'], ['Tata', 'Harrier'], ['Tata', 'Safari'], ['Mahindra', 'Thar'], ['Toyota', 'Fortuner'],
+    ['Toyota', 'Innova Hycross'], ['Maruti Suzuki', 'Ertiga'], ['Kia', 'Carens'], ['Hyundai', 'Alcazar'],
+    ['Maruti Suzuki', 'Grand Vitara'], ['MG', 'Hector'], ['Mahindra', 'Scorpio N'], ['Hyundai', 'Exter']
+];
+
+const FREE_TEXT = [
+    'which suv has the shortest waiting period',
+    'any recall for fuel pump',
+    'festive season discounts',
+    'infotainment glitches after update',
+    'facelift launch spied testing'
+];
+
+function parseArgs(argv: string[]) {
+    const get = (name: string) => {
+        const index = argv.indexOf(`--${name}`);
+        return index >= 0 ? argv[index + 1] : undefined;
+    };
+    return {
+        models: Math.min(parseInt(get('models') || '20', 10), MODELS.length),
+        queries: parseInt(get('queries') || '100', 10)
+    };
+}
+
+function percentile(values: number[], q: number): number {
+    const sorted = [...values].sort((a, b) => a - b);
+    return sorted[Math.min(sorted.length - 1, Math.floor((q / 100) * sorted.length))];
+}
+
+function row(name: string, values: number[]): string {
+    const fmt = (v: number) => (v < 1 ? v.toFixed(4) : v.toFixed(1)).padStart(10);
+    return `${name.padEnd(22)} ${fmt(percentile(values, 50))} ${fmt(percentile(values, 99))} ${fmt(Math.max(...values))}`;
+}
+
+async function main() {
+    const options = parseArgs(process.argv.slice(2));
+    const { pollFeeds, lookupNews, modelKey, feedUrl, parseFeed } = await import('../services/news-index');
+    const axios = (await import('axios')).default;
+    const { performance } = await import('perf_hooks');
+
+    try {
+        await axios.get(`${FEED_URL}/stats`);
+    } catch {
+        console.error(`❌ Feed stand-in not reachable at ${FEED_URL} (npx tsx server/scripts/news-feed-standin.ts)`);
+        process.exit(1);
+    }
+
+    const models = MODELS.slice(0, options.models).map(([brand, name]) => ({ key: modelKey(brand, name), brand, name }));
+    console.log(`🏁 ${models.length} model feeds, ${options.queries} request-path queries`);
+
+    const cold = await pollFeeds(models);
+    const warm = await pollFeeds(models);
+    console.log(`\n📥 Ingestion`);
+    console.log(`   cold: ${cold.modified} changed, ${cold.notModified} unchanged, ${cold.errors} failed, ${cold.newArticles} articles in ${cold.tookMs}ms`);
+    console.log(`   warm: ${warm.modified} changed, ${warm.notModified} unchanged (304), ${warm.errors} failed in ${warm.tookMs}ms`);
+
+    const queries = Array.from({ length: options.queries }, (_, i) =>
+        i % 4 === 3 ? FREE_TEXT[i % FREE_TEXT.length] : `${models[i % models.length].brand} ${models[i % models.length].name}`);
+
+    // Old request path: fetch + parse the feed for every request
+    const live: number[] = [];
+    for (const query of queries.slice(0, Math.min(queries.length, 50))) {
+        const started = performance.now();
+        try {
+            const response = await axios.get(feedUrl(query), { responseType: 'text', timeout: 30000 });
+            parseFeed(response.data).slice(0, 5);
+        } catch {
+            // Failures cost their latency too
+        }
+        live.push(performance.now() - started);
+    }
+
+    const indexed: number[] = [];
+    let hits = 0;
+    let stale = 0;
+    for (const query of queries) {
+        const started = performance.now();
+        const result = lookupNews(query, 5);
+        indexed.push(performance.now() - started);
+        if (result && result.articles.length > 0) hits++;
+        if (result?.stale) stale++;
+    }
+
+    console.log(`\n⏱️  Request path (ms)      ${'p50'.padStart(10)} ${'p99'.padStart(10)} ${'max'.padStart(10)}`);
+    console.log(row(`live fetch (${live.length})`, live));
+    console.log(row(`index lookup (${indexed.length})`, indexed));
+    console.log(`\n   index hits: ${hits}/${queries.length}, stale: ${stale}`);
+}
+
+main().catch(error => {
+    console.error('❌ Benchmark failed:', error);
+    process.exit(1);
+});
@@ -0,0 +1,140 @@
+/**
+ * Review Analysis Benchmark
+ *
+ * Builds car intelligence (scrape → analyze → aggregate) for a set of cars
+ * against the local stand-ins and compares review batch sizes:
+ * batch size 1 is the old one-LLM-call-per-review pipeline.
+ *
+ * For each batch size: a cold pass (nothing analyzed yet) and a warm pass
+ * over the same cars (every review already analyzed - no LLM calls
+ * expected). Reports wall time, LLM calls, reviews analyzed, duplicates and
+ * fallbacks. Persistence uses the in-process memo unless --mongo is given
+ * (then analyses also land in MongoDB and cold passes start from whatever
+ * is already stored there).
+ *
+ * Needs both stand-ins running:
+ *   npx tsx server/scripts/llm-standin-server.ts
+ *   npx tsx server/scripts/review-sources-standin.ts
+ *
+ * Usage:
+ *   npx tsx server/scripts/bench-review-analysis.ts --cars 20 --batch-sizes 1,8,16 --concurrency 4
+ *   STANDIN_LATENCY_MS=2000 ... (slower LLM, closer to a local 8B model)
+ */
+
+const STANDIN_URL = process.env.OLLAMA_URL || 'http://localhost:8787';
+const SOURCES_URL = process.env.REDDIT_BASE_URL || 'http://localhost:8788';
+
+// Read by the modules at import time, so set before the dynamic imports below
+process.env.OLLAMA_URL = STANDIN_URL;
+process.env.REDDIT_BASE_URL = SOURCES_URL;
+process.env.TEAMBHP_BASE_URL = process.env.TEAMBHP_BASE_URL || SOURCES_URL;
+
+const CARS = [
+    'Creta', 'Seltos', 'Nexon', 'Brezza', 'Venue', 'Sonet', 'Punch', 'Swift', 'Baleno', 'i20',
+    'Altroz', 'Tiago', 'City', 'Verna', 'Dzire', 'XUV700', 'Harrier', 'Safari', 'Thar', 'Fortuner',
+    'Innova Hycross', 'Ertiga', 'Carens', 'Alcazar', 'Grand Vitara', 'Hector', 'Scorpio N', 'Exter'
+];
+
+interface BenchOptions {
+    cars: string[];
+    batchSizes: number[];
+    concurrency: number;
+    mongo: boolean;
+}
+
+interface PassResult {
+    seconds: number;
+    llmCalls: number;
+    reviews: number;
+    analyzed: number;
+    duplicate: number;
+    persisted: number;
+    fallback: number;
+}
+
+function parseArgs(argv: string[]): BenchOptions {
+    const get = (name: string) => {
+        const index = argv.indexOf(`--${name}`);
+        return index >= 0 ? argv[index + 1] : undefined;
+    };
+    const count = parseInt(get('cars') || '12', 10);
+    return {
+        cars: Array.from({ length: count }, (_, i) => CARS[i % CARS.length] + (i >= CARS.length ? ` ${Math.floor(i / CARS.length) + 1}` : '')),
+        batchSizes: (get('batch-sizes') || '1,8,16').split(',').map(v => parseInt(v, 10)).filter(v => v > 0),
+        concurrency: parseInt(get('concurrency') || '4', 10),
+        mongo: argv.includes('--mongo')
+    };
+}
+
+async function standinRequests(): Promise<number> {
+    const response = await fetch(`${STANDIN_URL}/stats`);
+    return (await response.json()).requests;
+}
+
+async function main() {
+    const options = parseArgs(process.argv.slice(2));
+    const { refreshCarIntelligence } = await import('../ai-engine/web-scraper');
+    const { resetReviewAnalysisMemo } = await import('../ai-engine/review-analysis');
+    const { aiReviewAnalysis } = await import('../monitoring/metrics');
+
+    try {
+        await standinRequests();
+    } catch {
+        console.error(`❌ LLM stand-in not reachable at ${STANDIN_URL} (npx tsx server/scripts/llm-standin-server.ts)`);
+        process.exit(1);
+    }
+
+    let mongoose: typeof import('mongoose').default | null = null;
+    if (options.mongo) {
+        mongoose = (await import('mongoose')).default;
+        await mongoose.connect(process.env.MONGODB_URI || 'mongodb://127.0.0.1:27017/gadizone');
+        console.log('✅ Connected to MongoDB (analyses are persisted)');
+    }
+
+    const counts = async () => {
+        const values = (await aiReviewAnalysis.get()).values;
+        return Object.fromEntries(values.map(v => [String(v.labels.result), v.value])) as Record<string, number>;
+    };
+
+    const pass = async (batchSize: number): Promise<PassResult> => {
+        const before = await counts();
+        const llmBefore = await standinRequests();
+        const started = Date.now();
+        const results = await refreshCarIntelligence(options.cars, options.concurrency, { batchSize });
+        const seconds = (Date.now() - started) / 1000;
+        const after = await counts();
+        const delta = (key: string) => (after[key] || 0) - (before[key] || 0);
+        return {
+            seconds,
+            llmCalls: (await standinRequests()) - llmBefore,
+            reviews: [...results.values()].reduce((sum, intel) => sum + intel.totalReviews, 0),
+            analyzed: delta('analyzed'),
+            duplicate: delta('duplicate'),
+            persisted: delta('persisted'),
+            fallback: delta('fallback')
+        };
+    };
+
+    console.log(`🏁 ${options.cars.length} cars, ${options.concurrency} at a time, batch sizes ${options.batchSizes.join(', ')}`);
+    const rows: Array<[string, PassResult]> = [];
+    for (const batchSize of options.batchSizes) {
+        resetReviewAnalysisMemo();
+        rows.push([`batch ${batchSize} cold`, await pass(batchSize)]);
+        rows.push([`batch ${batchSize} warm`, await pass(batchSize)]);
+    }
+
+    console.log(`\n${'pass'.padEnd(16)} ${'seconds'.padStart(8)} ${'reviews'.padStart(8)} ${'llm calls'.padStart(10)} ` +
+        `${'analyzed'.padStart(9)} ${'dupes'.padStart(6)} ${'stored'.padStart(7)} ${'fallback'.padStart(9)} ${'reviews/s'.padStart(10)}`);
+    for (const [name, r] of rows) {
+        console.log(`${name.padEnd(16)} ${r.seconds.toFixed(2).padStart(8)} ${String(r.reviews).padStart(8)} ` +
+            `${String(r.llmCalls).padStart(10)} ${String(r.analyzed).padStart(9)} ${String(r.duplicate).padStart(6)} ` +
+            `${String(r.persisted).padStart(7)} ${String(r.fallback).padStart(9)} ${(r.reviews / r.seconds).toFixed(1).padStart(10)}`);
+    }
+
+    if (mongoose) await mongoose.disconnect();
+}
+
+main().catch(error => {
+    console.error('❌ Benchmark failed:', error);
+    process.exit(1);
+});
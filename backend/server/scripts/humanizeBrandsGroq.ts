@@ -11,6 +11,7 @@ import path from 'path';
 import { fileURLToPath } from 'url';
 import Groq from 'groq-sdk';
 import { Brand } from '../db/schemas.js';
+import { memoizeCompletion } from '../ai-engine/llm-cache.js';
 
 const __dirname = path.dirname(fileURLToPath(import.meta.url));
 dotenv.config({ path: path.join(__dirname, '../../.env') });
@@ -23,6 +24,9 @@ if (!groqApiKey) {
 }
 const groq = new Groq({ apiKey: groqApiKey });
 
+// Re-runs reuse earlier rewrites of unchanged summaries; pass --fresh to regenerate
+const FRESH = process.argv.includes('--fresh');
+
 /**
  * Humanize text using Groq's Llama model
  */
@@ -52,15 +56,27 @@ ${originalText}
 
 REWRITTEN (human-sounding version):`;
 
+    const params = {
+        max_tokens: 500,
+        temperature: 0.8 // Higher temp for more creative/human variation
+    };
+    const messages = [{ role: 'user' as const, content: prompt }];
+
     try {
-        const completion = await groq.chat.completions.create({
-            model: 'llama-3.1-8b-instant',
-            messages: [{ role: 'user', content: prompt }],
-            max_tokens: 500,
-            temperature: 0.8 // Higher temp for more creative/human variation
-        });
-
-        const result = completion.choices[0]?.message?.content?.trim();
+        const completion = await memoizeCompletion(
+            { model: 'llama-3.1-8b-instant', messages, params },
+            async () => {
+                const response = await groq.chat.completions.create({
+                    model: 'llama-3.1-8b-instant',
+                    messages,
+                    ...params
+                });
+                return { content: response.choices[0]?.message?.content?.trim() || '' };
+            },
+            { site: 'humanize-brands', ttlSeconds: 30 * 24 * 3600, bypass: FRESH }
+        );
+
+        const result = completion.content;
 
         // Basic validation - ensure result is reasonable
         if (result && result.length > 50 && result.length < originalText.length * 2) {
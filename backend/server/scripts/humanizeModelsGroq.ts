@@ -10,6 +10,7 @@ import path from 'path';
 import { fileURLToPath } from 'url';
 import Groq from 'groq-sdk';
 import { Model } from '../db/schemas.js';
+import { memoizeCompletion } from '../ai-engine/llm-cache.js';
 
 const __dirname = path.dirname(fileURLToPath(import.meta.url));
 dotenv.config({ path: path.join(__dirname, '../../.env') });
@@ -21,11 +22,15 @@ if (!groqApiKey) {
 }
 const groq = new Groq({ apiKey: groqApiKey });
 
+// Re-runs reuse earlier rewrites of unchanged text; pass --fresh to regenerate
+const FRESH = process.argv.includes('--fresh');
+const CACHE_TTL_SECONDS = 30 * 24 * 3600;
+
 /**
- * Humanize text using Groq
+ * Humanize text using Groq (cached by prompt)
  */
-async function humanizeText(text: string, fieldType: string, carName: string): Promise<string> {
-    if (!text || text.trim().length < 30) return text;
+async function humanizeText(text: string, fieldType: string, carName: string): Promise<{ text: string; cached: boolean }> {
+    if (!text || text.trim().length < 30) return { text, cached: true };
 
     const prompts: Record<string, string> = {
         headerSeo: `Rewrite this car meta description to sound human and engaging (150-200 chars max). Make it conversational, not salesy. Car: ${carName}`,
@@ -55,22 +60,31 @@ ${text}
 
 REWRITTEN:`;
 
+    const params = { max_tokens: 600, temperature: 0.75 };
+    const messages = [{ role: 'user' as const, content: fullPrompt }];
+
     try {
-        const completion = await groq.chat.completions.create({
-            model: 'llama-3.1-8b-instant',
-            messages: [{ role: 'user', content: fullPrompt }],
-            max_tokens: 600,
-            temperature: 0.75
-        });
-
-        const result = completion.choices[0]?.message?.content?.trim();
+        const completion = await memoizeCompletion(
+            { model: 'llama-3.1-8b-instant', messages, params },
+            async () => {
+                const response = await groq.chat.completions.create({
+                    model: 'llama-3.1-8b-instant',
+                    messages,
+                    ...params
+                });
+                return { content: response.choices[0]?.message?.content?.trim() || '' };
+            },
+            { site: 'humanize-models', ttlSeconds: CACHE_TTL_SECONDS, bypass: FRESH }
+        );
+
+        const result = completion.content;
         if (result && result.length > 30 && result.length < text.length * 2.5) {
-            return result;
+            return { text: result, cached: completion.cached };
         }
-        return text;
+        return { text, cached: completion.cached };
     } catch (error: any) {
         console.error(`  Groq error: ${error.message}`);
-        return text;
+        return { text, cached: false };
     }
 }
 
@@ -104,10 +118,10 @@ async function run() {
 
             console.log(`  📝 ${field}...`);
 
-            // Rate limiting - 1.5s between API calls
-            await new Promise(r => setTimeout(r, 1500));
+            const { text: humanized, cached } = await humanizeText(original, field, model.name || 'this car');
 
-            const humanized = await humanizeText(original, field, model.name || 'this car');
+            // Rate limiting - 1.5s between API calls (cache hits don't hit the API)
+            if (!cached) await new Promise(r => setTimeout(r, 1500));
 
             if (humanized !== original) {
                 updates[field] = humanized;
@@ -0,0 +1,179 @@
+/**
+ * LLM Stand-in Server
+ *
+ * Local fake upstream for exercising the LLM router, load tests and
+ * benchmarks without spending provider quota. Speaks enough of:
+ * - OpenAI/Groq chat completions  (POST /openai/v1/chat/completions, /v1/chat/completions)
+ * - Ollama chat / generate        (POST /api/chat, /api/generate)
+ *
+ * Batched review-analysis prompts (ai-engine/review-analysis.ts) get a JSON
+ * array with one keyword-based analysis per numbered review.
+ *
+ * Knobs (env):
+ *   STANDIN_PORT=8787
+ *   STANDIN_LATENCY_MS=600       base latency
+ *   STANDIN_JITTER_MS=400        uniform extra latency
+ *   STANDIN_TAIL_RATE=0.05       fraction of requests hitting the slow tail
+ *   STANDIN_TAIL_MS=6000         extra latency for tail requests
+ *   STANDIN_ERROR_RATE=0         fraction answered with 500
+ *   STANDIN_429_RATE=0           fraction answered with 429 + Retry-After
+ *
+ * Usage:
+ *   npx tsx server/scripts/llm-standin-server.ts
+ *   GROQ_BASE_URL=http://localhost:8787 OLLAMA_URL=http://localhost:8787 npm run dev
+ */
+
+import http from 'http';
+
+const PORT = parseInt(process.env.STANDIN_PORT || '8787', 10);
+const LATENCY_MS = parseFloat(process.env.STANDIN_LATENCY_MS || '600');
+const JITTER_MS = parseFloat(process.env.STANDIN_JITTER_MS || '400');
+const TAIL_RATE = parseFloat(process.env.STANDIN_TAIL_RATE || '0.05');
+const TAIL_MS = parseFloat(process.env.STANDIN_TAIL_MS || '6000');
+const ERROR_RATE = parseFloat(process.env.STANDIN_ERROR_RATE || '0');
+const RATE_429 = parseFloat(process.env.STANDIN_429_RATE || '0');
+
+const stats = { requests: 0, errors: 0, throttled: 0, cancelled: 0 };
+
+function sampleLatency(): number {
+    let latency = LATENCY_MS + Math.random() * JITTER_MS;
+    if (Math.random() < TAIL_RATE) latency += TAIL_MS;
+    return latency;
+}
+
+function readBody(req: http.IncomingMessage): Promise<any> {
+    return new Promise((resolve) => {
+        let raw = '';
+        req.on('data', chunk => { raw += chunk; });
+        req.on('end', () => {
+            try {
+                resolve(raw ? JSON.parse(raw) : {});
+            } catch {
+                resolve({});
+            }
+        });
+    });
+}
+
+function estimateTokens(text: string): number {
+    return Math.ceil((text || '').length / 4);
+}
+
+function buildReply(messages: any[]): string {
+    const last = [...(messages || [])].reverse().find((m: any) => m.role === 'user');
+    const question = String(last?.content || '').split('\n')[0].slice(0, 120);
+    return `Stand-in answer for: ${question}`;
+}
+
+const REVIEW_BATCH_MARKER = /^Analyze these (\d+) owner reviews/;
+
+function buildReviewAnalysis(prompt: string): string | null {
+    if (!REVIEW_BATCH_MARKER.test(prompt)) return null;
+    const reviews = prompt.split('\nReviews:\n')[1] || '';
+    const items = [...reviews.matchAll(/^\[(\d+)\] "(.*)"$/gm)].map(([, id, text]) => {
+        const lower = text.toLowerCase();
+        const good = /great|good|love|smooth|comfortable|excellent/.test(lower);
+        const bad = /poor|bad|issue|problem|noise|rattle|disappoint/.test(lower);
+        return {
+            id: parseInt(id, 10),
+            sentiment: good && !bad ? 'positive' : bad && !good ? 'negative' : 'neutral',
+            pros: good ? ['Comfortable ride'] : [],
+            cons: bad ? ['After-sales service'] : [],
+            issues: /rattle|noise/.test(lower) ? ['Cabin rattles'] : []
+        };
+    });
+    return JSON.stringify(items);
+}
+
+const server = http.createServer(async (req, res) => {
+    if (req.method === 'GET' && req.url === '/stats') {
+        res.writeHead(200, { 'Content-Type': 'application/json' });
+        res.end(JSON.stringify(stats));
+        return;
+    }
+
+    const isOpenAI = req.url === '/openai/v1/chat/completions' || req.url === '/v1/chat/completions';
+    const isOllama = req.url === '/api/chat';
+    const isOllamaGenerate = req.url === '/api/generate';
+    if (req.method !== 'POST' || (!isOpenAI && !isOllama && !isOllamaGenerate)) {
+        res.writeHead(404).end();
+        return;
+    }
+
+    stats.requests++;
+    const body = await readBody(req);
+
+    // Client gave up (e.g. hedge loser was aborted)
+    let aborted = false;
+    req.on('close', () => {
+        if (!res.writableEnded) {
+            aborted = true;
+            stats.cancelled++;
+        }
+    });
+
+    const roll = Math.random();
+    if (roll < RATE_429) {
+        stats.throttled++;
+        res.writeHead(429, { 'Content-Type': 'application/json', 'Retry-After': '1' });
+        res.end(JSON.stringify({ error: { message: 'Rate limit exceeded (stand-in)' } }));
+        return;
+    }
+
+    await new Promise(resolve => setTimeout(resolve, sampleLatency()));
+    if (aborted) return;
+
+    if (roll < RATE_429 + ERROR_RATE) {
+        stats.errors++;
+        res.writeHead(500, { 'Content-Type': 'application/json' });
+        res.end(JSON.stringify({ error: { message: 'Upstream failure (stand-in)' } }));
+        return;
+    }
+
+    if (isOllamaGenerate) {
+        const prompt = String(body.prompt || '');
+        const content = buildReviewAnalysis(prompt) ?? buildReply([{ role: 'user', content: prompt }]);
+        res.writeHead(200, { 'Content-Type': 'application/json' });
+        res.end(JSON.stringify({
+            model: body.model,
+            response: content,
+            done: true,
+            prompt_eval_count: estimateTokens(prompt),
+            eval_count: estimateTokens(content)
+        }));
+        return;
+    }
+
+    const content = buildReply(body.messages);
+    const promptTokens = estimateTokens(JSON.stringify(body.messages || []));
+    const completionTokens = estimateTokens(content);
+
+    res.writeHead(200, { 'Content-Type': 'application/json' });
+    if (isOllama) {
+        res.end(JSON.stringify({
+            model: body.model,
+            message: { role: 'assistant', content },
+            done: true,
+            prompt_eval_count: promptTokens,
+            eval_count: completionTokens
+        }));
+    } else {
+        res.end(JSON.stringify({
+            id: `standin-${stats.requests}`,
+            object: 'chat.completion',
+            created: Math.floor(Date.now() / 1000),
+            model: body.model,
+            choices: [{ index: 0, message: { role: 'assistant', content }, finish_reason: 'stop' }],
+            usage: {
+                prompt_tokens: promptTokens,
+                completion_tokens: completionTokens,
+                total_tokens: promptTokens + completionTokens
+            }
+        }));
+    }
+});
+
+server.listen(PORT, () => {
+    console.log(`🧪 LLM stand-in listening on http://localhost:${PORT}`);
+    console.log(`   latency ${LATENCY_MS}±${JITTER_MS}ms, tail ${TAIL_RATE * 100}% +${TAIL_MS}ms, errors ${ERROR_RATE * 100}%, 429s ${RATE_429 * 100}%`);
+});
@@ -0,0 +1,119 @@
+/**
+ * News Feed Stand-in Server
+ *
+ * Local fake Google News RSS for exercising the news index
+ * (services/news-index.ts) and its benchmark offline. Serves
+ * GET /rss/search?q=... with ETag / Last-Modified and answers conditional
+ * GETs with 304 while the feed is unchanged.
+ *
+ * Each feed gains one article every FEED_UPDATE_S seconds, and one
+ * industry story appears in every feed (cross-feed duplicate).
+ *
+ * Knobs (env):
+ *   FEED_PORT=8789
+ *   FEED_LATENCY_MS=300          base latency
+ *   FEED_JITTER_MS=200           uniform extra latency
+ *   FEED_TAIL_RATE=0.05          fraction of requests hitting the slow tail
+ *   FEED_TAIL_MS=4000            extra latency for tail requests
+ *   FEED_UPDATE_S=600            seconds between new articles per feed
+ *   FEED_ITEMS=10                items per feed
+ *
+ * Usage:
+ *   npx tsx server/scripts/news-feed-standin.ts
+ *   NEWS_FEED_BASE_URL=http://localhost:8789 npm run dev
+ */
+
+import http from 'http';
+import crypto from 'crypto';
+
+const PORT = parseInt(process.env.FEED_PORT || '8789', 10);
+const LATENCY_MS = parseFloat(process.env.FEED_LATENCY_MS || '300');
+const JITTER_MS = parseFloat(process.env.FEED_JITTER_MS || '200');
+const TAIL_RATE = parseFloat(process.env.FEED_TAIL_RATE || '0.05');
+const TAIL_MS = parseFloat(process.env.FEED_TAIL_MS || '4000');
+const UPDATE_S = parseFloat(process.env.FEED_UPDATE_S || '600');
+const ITEMS = parseInt(process.env.FEED_ITEMS || '10', 10);
+
+const stats = { requests: 0, full: 0, notModified: 0 };
+
+const TOPICS = [
+    'waiting period stretches to {n} weeks in metro cities',
+    'owners report infotainment glitches after software update',
+    'gets new variant with more features',
+    'bookings cross {n},000 units',
+    'long term review: {n},000 km later',
+    'discounts of up to Rs {n},000 this month',
+    'recall issued for fuel pump replacement',
+    'facelift spied testing ahead of launch'
+];
+
+function sampleLatency(): number {
+    let latency = LATENCY_MS + Math.random() * JITTER_MS;
+    if (Math.random() < TAIL_RATE) latency += TAIL_MS;
+    return latency;
+}
+
+function escapeXml(text: string): string {
+    return text.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;');
+}
+
+function carFromQuery(query: string): string {
+    return query.replace(/\s+India car review.*$/i, '').trim() || 'Car';
+}
+
+function feed(car: string, epoch: number): string {
+    const items: string[] = [];
+    for (let i = 0; i < ITEMS; i++) {
+        const n = epoch - i;  // newest first: one new article per epoch
+        const digest = crypto.createHash('md5').update(`${car}|${n}`).digest();
+        const topic = TOPICS[digest[0] % TOPICS.length].replace('{n}', String(2 + (digest[1] % 20)));
+        const published = new Date(n * UPDATE_S * 1000);
+        items.push(`<item><title>${escapeXml(`${car} ${topic} - AutoNews`)}</title>` +
+            `<link>https://news.example/articles/${digest.toString('hex').slice(0, 12)}</link>` +
+            `<pubDate>${published.toUTCString()}</pubDate>` +
+            `<description>${escapeXml(`<a href="#">${car} ${topic}</a>`)}</description></item>`);
+    }
+    const industry = new Date(epoch * UPDATE_S * 1000);
+    items.push(`<item><title>Car sales in India rise ${epoch % 15}% in the festive season - AutoNews</title>` +
+        `<link>https://news.example/articles/industry-${epoch}</link><pubDate>${industry.toUTCString()}</pubDate>` +
+        `<description>Industry roundup</description></item>`);
+    return `<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>${escapeXml(car)}</title>${items.join('')}</channel></rss>`;
+}
+
+const server = http.createServer(async (req, res) => {
+    const url = new URL(req.url || '/', `http://localhost:${PORT}`);
+
+    if (req.method === 'GET' && url.pathname === '/stats') {
+        res.writeHead(200, { 'Content-Type': 'application/json' });
+        res.end(JSON.stringify(stats));
+        return;
+    }
+    if (req.method !== 'GET' || url.pathname !== '/rss/search') {
+        res.writeHead(404).end();
+        return;
+    }
+
+    stats.requests++;
+    await new Promise(resolve => setTimeout(resolve, sampleLatency()));
+
+    const car = carFromQuery(url.searchParams.get('q') || '');
+    const epoch = Math.floor(Date.now() / 1000 / UPDATE_S);
+    const etag = `"${crypto.createHash('md5').update(`${car}|${epoch}`).digest('hex').slice(0, 16)}"`;
+    const lastModified = new Date(epoch * UPDATE_S * 1000).toUTCString();
+
+    if (req.headers['if-none-match'] === etag ||
+        (!req.headers['if-none-match'] && req.headers['if-modified-since'] === lastModified)) {
+        stats.notModified++;
+        res.writeHead(304, { 'ETag': etag, 'Last-Modified': lastModified }).end();
+        return;
+    }
+
+    stats.full++;
+    res.writeHead(200, { 'Content-Type': 'application/rss+xml; charset=utf-8', 'ETag': etag, 'Last-Modified': lastModified });
+    res.end(feed(car, epoch));
+});
+
+server.listen(PORT, () => {
+    console.log(`🧪 News feed stand-in listening on http://localhost:${PORT}`);
+    console.log(`   latency ${LATENCY_MS}±${JITTER_MS}ms, tail ${TAIL_RATE * 100}% +${TAIL_MS}ms, new article every ${UPDATE_S}s per feed`);
+});
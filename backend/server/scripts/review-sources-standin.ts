@@ -0,0 +1,163 @@
+/**
+ * Review Sources Stand-in Server
+ *
+ * Local fake Reddit and Team-BHP for exercising the web scraper
+ * (ai-engine/web-scraper.ts) and the review-analysis benchmark without
+ * hitting the real sites. Serves:
+ * - Reddit search JSON     (GET /r/CarsIndia/search.json?q=...)
+ * - Team-BHP search page   (GET /forum/search.php?searchid=...)
+ * - Team-BHP review thread (GET /forum/<slug>.html)
+ *
+ * Content is generated deterministically from the car name, and a share of
+ * the Reddit posts are cross-posts of earlier ones (same text, different
+ * author), like the real feed.
+ *
+ * Knobs (env):
+ *   SOURCES_PORT=8788
+ *   SOURCES_LATENCY_MS=150       latency per request
+ *   SOURCES_REDDIT_POSTS=25      posts per Reddit search
+ *   SOURCES_TEAMBHP_THREADS=5    review threads per Team-BHP search
+ *   SOURCES_DUPLICATE_RATE=0.2   share of Reddit posts that repeat an earlier post
+ *
+ * Usage:
+ *   npx tsx server/scripts/review-sources-standin.ts
+ *   REDDIT_BASE_URL=http://localhost:8788 TEAMBHP_BASE_URL=http://localhost:8788 npm run dev
+ */
+
+import http from 'http';
+import crypto from 'crypto';
+
+const PORT = parseInt(process.env.SOURCES_PORT || '8788', 10);
+const LATENCY_MS = parseFloat(process.env.SOURCES_LATENCY_MS || '150');
+const REDDIT_POSTS = parseInt(process.env.SOURCES_REDDIT_POSTS || '25', 10);
+const TEAMBHP_THREADS = parseInt(process.env.SOURCES_TEAMBHP_THREADS || '5', 10);
+const DUPLICATE_RATE = parseFloat(process.env.SOURCES_DUPLICATE_RATE || '0.2');
+
+const stats = { requests: 0, reddit: 0, teambhpSearches: 0, teambhpThreads: 0 };
+
+const OPENINGS = [
+    'Completed 10,000 km with my {car} and here is my honest ownership experience.',
+    'Took delivery of the {car} three months ago, sharing a long term review.',
+    'After a 1,500 km road trip in the {car}, some thoughts for prospective buyers.',
+    'Owner review of the {car} after one year of city driving.'
+];
+const POINTS = [
+    'The ride is comfortable and the seats are great on long drives.',
+    'Mileage is good at around 16 kmpl in mixed driving.',
+    'There is a dashboard rattle that the service center could not fix.',
+    'Service experience at the dealer was poor and the bills were high.',
+    'The engine is smooth and refined even at highway speeds.',
+    'Road noise at speed is an issue, the cabin insulation is disappointing.',
+    'Features for the price are excellent, I love the sunroof and the screen.',
+    'Build quality feels solid and the doors shut with a thud.'
+];
+
+// Deterministic pseudo-random numbers per (car, index)
+function seeded(car: string, index: number, salt: string): number {
+    const digest = crypto.createHash('md5').update(`${car}|${index}|${salt}`).digest();
+    return digest.readUInt32BE(0) / 0xffffffff;
+}
+
+function reviewText(car: string, index: number): string {
+    const opening = OPENINGS[Math.floor(seeded(car, index, 'opening') * OPENINGS.length)].replace('{car}', car);
+    const points = POINTS.filter((_, i) => seeded(car, index, `point${i}`) < 0.4);
+    return [opening, ...(points.length ? points : [POINTS[index % POINTS.length]])].join(' ');
+}
+
+function carFromQuery(query: string): string {
+    return query.replace(/\s+(review|experience|owner|OR)\b.*$/i, '').trim() || 'car';
+}
+
+function redditSearch(car: string): object {
+    const children = [];
+    for (let i = 0; i < REDDIT_POSTS; i++) {
+        // Cross-posts repeat an earlier post's text under another author
+        const source = i > 0 && seeded(car, i, 'dup') < DUPLICATE_RATE ? Math.floor(seeded(car, i, 'of') * i) : i;
+        children.push({
+            data: {
+                id: `p${i}`,
+                author: `owner_${i}`,
+                selftext: reviewText(car, source),
+                created_utc: 1735689600 + i * 86400,
+                ups: Math.floor(seeded(car, i, 'ups') * 200)
+            }
+        });
+    }
+    return { data: { children } };
+}
+
+function slugify(car: string): string {
+    return car.toLowerCase().replace(/[^a-z0-9]+/g, '-').replace(/^-|-$/g, '');
+}
+
+function teambhpSearch(car: string): string {
+    const threads = [];
+    for (let i = 0; i < TEAMBHP_THREADS; i++) {
+        threads.push(`<a class="threadtitle" href="${slugify(car)}-ownership-review-${i}.html">${car} ownership review ${i + 1}</a>`);
+    }
+    // Non-review threads are skipped by the scraper
+    threads.push(`<a class="threadtitle" href="${slugify(car)}-price-discussion.html">${car} price discussion</a>`);
+    return `<html><body>${threads.join('\n')}</body></html>`;
+}
+
+function teambhpThread(slug: string): string | null {
+    const match = slug.match(/^(.*)-ownership-review-(\d+)\.html$/);
+    if (!match) return null;
+    const car = match[1].replace(/-/g, ' ');
+    const index = 1000 + parseInt(match[2], 10);
+    const day = 4 + (index % 17); // 4th-20th, all "th"
+    return `<html><body>
+<table id="post${index}">
+<tr><td class="thead">${day}th March 2025, 10:45</td></tr>
+<tr><td><a class="bigusername">bhpian_${match[2]}</a>
+<div id="post_message_${index}">${reviewText(car, index)} ${reviewText(car, index + 1)}</div></td></tr>
+</table>
+<div id="post_message_${index + 1}">Thanks for sharing, happy motoring!</div>
+</body></html>`;
+}
+
+function send(res: http.ServerResponse, status: number, body: string, type: string) {
+    res.writeHead(status, { 'Content-Type': type });
+    res.end(body);
+}
+
+const server = http.createServer(async (req, res) => {
+    const url = new URL(req.url || '/', `http://localhost:${PORT}`);
+
+    if (req.method === 'GET' && url.pathname === '/stats') {
+        send(res, 200, JSON.stringify(stats), 'application/json');
+        return;
+    }
+    if (req.method !== 'GET') {
+        res.writeHead(405).end();
+        return;
+    }
+
+    stats.requests++;
+    await new Promise(resolve => setTimeout(resolve, LATENCY_MS));
+
+    if (url.pathname === '/r/CarsIndia/search.json') {
+        stats.reddit++;
+        send(res, 200, JSON.stringify(redditSearch(carFromQuery(url.searchParams.get('q') || ''))), 'application/json');
+        return;
+    }
+    if (url.pathname === '/forum/search.php') {
+        stats.teambhpSearches++;
+        send(res, 200, teambhpSearch(url.searchParams.get('searchid') || 'car'), 'text/html');
+        return;
+    }
+    if (url.pathname.startsWith('/forum/')) {
+        const page = teambhpThread(url.pathname.slice('/forum/'.length));
+        if (page) {
+            stats.teambhpThreads++;
+            send(res, 200, page, 'text/html');
+            return;
+        }
+    }
+    res.writeHead(404).end();
+});
+
+server.listen(PORT, () => {
+    console.log(`🧪 Review sources stand-in listening on http://localhost:${PORT}`);
+    console.log(`   ${REDDIT_POSTS} Reddit posts (${DUPLICATE_RATE * 100}% cross-posts), ${TEAMBHP_THREADS} Team-BHP threads, ${LATENCY_MS}ms latency`);
+});
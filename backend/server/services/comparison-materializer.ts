@@ -0,0 +1,473 @@
+/**
+ * Comparison Materializer
+ * Precomputed pairwise comparison records for popular car matchups
+ *
+ * Architecture:
+ * - Pairs come from admin-curated popular comparisons + the COMPETITORS map
+ * - Each pair is materialized once: price bands, spec deltas, safety, expert
+ *   head-to-head data and short verdict inputs
+ * - Records are keyed by a fingerprint of both models' data and only rebuilt
+ *   when either model (or its variants) changes
+ * - Stored in memory + Redis; served directly over HTTP and as compact
+ *   prompt context for AI chat comparison turns
+ */
+
+import { createHash } from 'crypto';
+import { getRedisClient } from '../middleware/redis-cache';
+import { COMPETITORS, getHeadToHead, HEAD_TO_HEAD } from '../ai-engine/expert-knowledge';
+
+const RECORD_PREFIX = 'cmp:pair:';
+const RECORD_TTL = 7 * 24 * 60 * 60; // 7 days (refresh keeps them current)
+const REFRESH_INTERVAL = 6 * 60 * 60 * 1000; // 6 hours
+const CHANGE_DEBOUNCE_MS = 5000;
+const MAX_PAIRS = parseInt(process.env.COMPARISON_MAX_PAIRS || '100', 10);
+
+export interface ModelSnapshot {
+    id: string;
+    name: string;
+    slug: string;
+    brandName: string;
+    bodyType: string | null;
+    minPrice: number | null;
+    maxPrice: number | null;
+    variantCount: number;
+    fuelTypes: string[];
+    transmissions: string[];
+    maxPowerBhp: number | null;
+    maxTorqueNm: number | null;
+    bestMileageKmpl: number | null;
+    maxAirbags: number | null;
+    ncapRating: number | null;
+    bootSpaceL: number | null;
+    groundClearanceMm: number | null;
+    seating: number | null;
+    hasAdas: boolean;
+    hasSunroof: boolean;
+    fingerprint: string;
+}
+
+export interface SpecDelta {
+    car1: number | null;
+    car2: number | null;
+    winner: 'car1' | 'car2' | 'tie' | null;
+}
+
+export interface ComparisonRecord {
+    key: string;
+    source: 'popular' | 'competitors';
+    cars: [ModelSnapshot, ModelSnapshot];
+    priceBand: {
+        overlap: boolean;
+        cheaperStart: 'car1' | 'car2' | 'tie' | null;
+        startGapLakh: number | null;
+    };
+    deltas: Record<string, SpecDelta>;
+    safety: {
+        car1: { airbags: number | null; ncap: number | null; adas: boolean };
+        car2: { airbags: number | null; ncap: number | null; adas: boolean };
+    };
+    expert: typeof HEAD_TO_HEAD[string] | null;
+    verdictInputs: string[];
+    fingerprint: string;
+    builtAt: string;
+}
+
+// In-memory store (keyed by pair key)
+const records = new Map<string, ComparisonRecord>();
+const dirtyModels = new Set<string>();
+let lastRefresh = 0;
+let isRefreshing = false;
+let refreshTimer: NodeJS.Timeout | null = null;
+let changeTimer: NodeJS.Timeout | null = null;
+
+/**
+ * Pair key is order-independent ("creta|seltos" == "seltos|creta")
+ */
+export function comparisonKey(name1: string, name2: string): string {
+    return [slugify(name1), slugify(name2)].sort().join('|');
+}
+
+function slugify(name: string): string {
+    return (name || '').toLowerCase().trim().replace(/[\s-]+/g, '_');
+}
+
+function toNumber(value: unknown): number | null {
+    if (typeof value === 'number') return Number.isFinite(value) ? value : null;
+    if (typeof value !== 'string') return null;
+    const match = value.replace(/,/g, '').match(/\d+(\.\d+)?/);
+    return match ? parseFloat(match[0]) : null;
+}
+
+function isYes(value: unknown): boolean {
+    if (typeof value === 'boolean') return value;
+    if (typeof value !== 'string') return false;
+    const lower = value.toLowerCase().trim();
+    return lower !== '' && lower !== 'no' && lower !== 'n/a' && lower !== 'none' && lower !== 'not available';
+}
+
+function maxOf(values: (number | null)[]): number | null {
+    const nums = values.filter((v): v is number => v !== null);
+    return nums.length > 0 ? Math.max(...nums) : null;
+}
+
+function minOf(values: (number | null)[]): number | null {
+    const nums = values.filter((v): v is number => v !== null);
+    return nums.length > 0 ? Math.min(...nums) : null;
+}
+
+/**
+ * Aggregate a model and its active variants into a comparable snapshot
+ */
+export function buildModelSnapshot(model: any, variants: any[], brandName: string): ModelSnapshot {
+    const prices = variants.map(v => toNumber(v.price)).filter((p): p is number => p !== null && p > 0);
+    const snapshot: Omit<ModelSnapshot, 'fingerprint'> = {
+        id: model.id,
+        name: model.name,
+        slug: slugify(model.name),
+        brandName,
+        bodyType: model.bodyType || null,
+        minPrice: prices.length > 0 ? Math.min(...prices) : null,
+        maxPrice: prices.length > 0 ? Math.max(...prices) : null,
+        variantCount: variants.length,
+        fuelTypes: Array.from(new Set(variants.map(v => v.fuelType || v.fuel).filter(Boolean))).sort(),
+        transmissions: Array.from(new Set(variants.map(v => v.transmission).filter(Boolean))).sort(),
+        maxPowerBhp: maxOf(variants.map(v => toNumber(v.maxPower || v.power))),
+        maxTorqueNm: maxOf(variants.map(v => toNumber(v.torque))),
+        bestMileageKmpl: maxOf(variants.map(v => toNumber(v.mileageCompanyClaimed))),
+        maxAirbags: maxOf(variants.map(v => toNumber(v.airbags))),
+        ncapRating: maxOf(variants.map(v => toNumber(v.globalNCAPRating))),
+        bootSpaceL: maxOf(variants.map(v => toNumber(v.bootSpace))),
+        groundClearanceMm: maxOf(variants.map(v => toNumber(v.groundClearance))),
+        seating: maxOf(variants.map(v => toNumber(v.seatingCapacity))) ?? toNumber(model.seating),
+        hasAdas: variants.some(v => isYes(v.adasLevel)),
+        hasSunroof: variants.some(v => isYes(v.sunroof))
+    };
+
+    const fingerprint = createHash('sha1').update(JSON.stringify(snapshot)).digest('hex').slice(0, 16);
+    return { ...snapshot, fingerprint };
+}
+
+function compare(car1: number | null, car2: number | null, higherIsBetter = true): SpecDelta {
+    if (car1 === null || car2 === null) return { car1, car2, winner: null };
+    if (car1 === car2) return { car1, car2, winner: 'tie' };
+    const car1Better = higherIsBetter ? car1 > car2 : car1 < car2;
+    return { car1, car2, winner: car1Better ? 'car1' : 'car2' };
+}
+
+function lakh(price: number | null): string {
+    return price !== null ? `₹${(price / 100000).toFixed(2)}L` : 'N/A';
+}
+
+/**
+ * Build the structured comparison record for a pair of snapshots
+ */
+export function buildComparisonRecord(
+    car1: ModelSnapshot,
+    car2: ModelSnapshot,
+    source: ComparisonRecord['source']
+): ComparisonRecord {
+    const deltas: Record<string, SpecDelta> = {
+        startingPrice: compare(car1.minPrice, car2.minPrice, false),
+        topPrice: compare(car1.maxPrice, car2.maxPrice, false),
+        powerBhp: compare(car1.maxPowerBhp, car2.maxPowerBhp),
+        torqueNm: compare(car1.maxTorqueNm, car2.maxTorqueNm),
+        mileageKmpl: compare(car1.bestMileageKmpl, car2.bestMileageKmpl),
+        airbags: compare(car1.maxAirbags, car2.maxAirbags),
+        ncapStars: compare(car1.ncapRating, car2.ncapRating),
+        bootSpaceL: compare(car1.bootSpaceL, car2.bootSpaceL),
+        groundClearanceMm: compare(car1.groundClearanceMm, car2.groundClearanceMm),
+        seating: compare(car1.seating, car2.seating)
+    };
+
+    const overlap = car1.minPrice !== null && car2.minPrice !== null && car1.maxPrice !== null && car2.maxPrice !== null
+        ? car1.minPrice <= car2.maxPrice && car2.minPrice <= car1.maxPrice
+        : false;
+
+    const labels: Record<string, string> = {
+        powerBhp: 'more power', torqueNm: 'more torque', mileageKmpl: 'better claimed mileage',
+        airbags: 'more airbags', ncapStars: 'higher NCAP rating', bootSpaceL: 'bigger boot',
+        groundClearanceMm: 'more ground clearance', startingPrice: 'lower starting price'
+    };
+    const verdictInputs: string[] = [];
+    for (const [field, delta] of Object.entries(deltas)) {
+        if (!labels[field] || delta.winner === null || delta.winner === 'tie') continue;
+        const winner = delta.winner === 'car1' ? car1.name : car2.name;
+        verdictInputs.push(`${winner} has ${labels[field]} (${delta.car1 ?? 'N/A'} vs ${delta.car2 ?? 'N/A'})`);
+    }
+    if (car1.hasAdas !== car2.hasAdas) {
+        verdictInputs.push(`${car1.hasAdas ? car1.name : car2.name} offers ADAS`);
+    }
+
+    return {
+        key: comparisonKey(car1.name, car2.name),
+        source,
+        cars: [car1, car2],
+        priceBand: {
+            overlap,
+            cheaperStart: deltas.startingPrice.winner,
+            startGapLakh: car1.minPrice !== null && car2.minPrice !== null
+                ? Number((Math.abs(car1.minPrice - car2.minPrice) / 100000).toFixed(2))
+                : null
+        },
+        deltas,
+        safety: {
+            car1: { airbags: car1.maxAirbags, ncap: car1.ncapRating, adas: car1.hasAdas },
+            car2: { airbags: car2.maxAirbags, ncap: car2.ncapRating, adas: car2.hasAdas }
+        },
+        expert: getHeadToHead(car1.slug, car2.slug),
+        verdictInputs,
+        fingerprint: `${car1.fingerprint}:${car2.fingerprint}`,
+        builtAt: new Date().toISOString()
+    };
+}
+
+/**
+ * Compact prompt context for the LLM (replaces raw RAG dumps for this pair)
+ */
+export function formatComparisonContext(record: ComparisonRecord): string {
+    const [car1, car2] = record.cars;
+    let text = `\n\n**📊 PRECOMPUTED COMPARISON: ${car1.brandName} ${car1.name} vs ${car2.brandName} ${car2.name}**\n`;
+    text += `- Price: ${car1.name} ${lakh(car1.minPrice)}-${lakh(car1.maxPrice)} | ${car2.name} ${lakh(car2.minPrice)}-${lakh(car2.maxPrice)}${record.priceBand.overlap ? ' (overlapping)' : ''}\n`;
+    text += `- Fuel: ${car1.fuelTypes.join('/') || 'N/A'} | ${car2.fuelTypes.join('/') || 'N/A'}\n`;
+    text += `- Safety: ${car1.name} ${record.safety.car1.airbags ?? '?'} airbags, NCAP ${record.safety.car1.ncap ?? 'N/A'}${record.safety.car1.adas ? ', ADAS' : ''} | ${car2.name} ${record.safety.car2.airbags ?? '?'} airbags, NCAP ${record.safety.car2.ncap ?? 'N/A'}${record.safety.car2.adas ? ', ADAS' : ''}\n`;
+    if (record.verdictInputs.length > 0) {
+        text += `- Key differences: ${record.verdictInputs.join('; ')}\n`;
+    }
+    if (record.expert) {
+        text += `- Expert insight: ${record.expert.insight}\n`;
+        text += `- ${car1.name} suits: ${record.expert.forWhom.car1} | ${car2.name} suits: ${record.expert.forWhom.car2}\n`;
+    }
+    return text;
+}
+
+/**
+ * Resolve the list of pairs to materialize (popular first, then competitors)
+ */
+async function resolvePairs(db: any, modelsById: Map<string, any>): Promise<{ ids: [string, string]; source: ComparisonRecord['source'] }[]> {
+    const pairs: { ids: [string, string]; source: ComparisonRecord['source'] }[] = [];
+    const seen = new Set<string>();
+    const add = (id1: string, id2: string, source: ComparisonRecord['source']) => {
+        if (!id1 || !id2 || id1 === id2 || pairs.length >= MAX_PAIRS) return;
+        const key = [id1, id2].sort().join('|');
+        if (seen.has(key)) return;
+        seen.add(key);
+        pairs.push({ ids: [id1, id2], source });
+    };
+
+    const popular = await db.collection('popularcomparisons')
+        .find({ isActive: true }, { projection: { _id: 0, model1Id: 1, model2Id: 1, order: 1 } })
+        .sort({ order: 1 })
+        .toArray();
+    popular.forEach((p: any) => add(p.model1Id, p.model2Id, 'popular'));
+
+    // COMPETITORS uses slugs ("grand_vitara") - map them to model ids
+    const idBySlug = new Map<string, string>();
+    modelsById.forEach(model => idBySlug.set(slugify(model.name), model.id));
+    for (const [slug, rivals] of Object.entries(COMPETITORS)) {
+        for (const rival of rivals) {
+            add(idBySlug.get(slug) || '', idBySlug.get(rival) || '', 'competitors');
+        }
+    }
+
+    return pairs;
+}
+
+/**
+ * Refresh materialized comparisons.
+ * Only pairs whose model fingerprints changed (or that were marked dirty)
+ * are rebuilt; `force` rebuilds everything.
+ */
+export async function refreshComparisons(force: boolean = false): Promise<{ built: number; unchanged: number }> {
+    if (isRefreshing) {
+        console.log('⏳ Comparison refresh already in progress, skipping...');
+        return { built: 0, unchanged: 0 };
+    }
+
+    isRefreshing = true;
+    const startTime = Date.now();
+    let built = 0;
+    let unchanged = 0;
+    // Marks that arrive while this refresh reads the DB belong to the next one
+    const dirty = new Set(dirtyModels);
+
+    try {
+        const mongoose = (await import('mongoose')).default;
+        const db = mongoose.connection.db;
+        if (!db) {
+            console.warn('⚠️ Database not connected, skipping comparison materialization');
+            return { built, unchanged };
+        }
+
+        const [models, brands] = await Promise.all([
+            db.collection('models').find(
+                { status: 'active' },
+                { projection: { _id: 0, id: 1, name: 1, brandId: 1, bodyType: 1, seating: 1 } }
+            ).toArray(),
+            db.collection('brands').find({}, { projection: { _id: 0, id: 1, name: 1 } }).toArray()
+        ]);
+
+        const modelsById = new Map<string, any>(models.map((m: any) => [m.id, m]));
+        const brandNames = new Map<string, string>(brands.map((b: any) => [b.id, b.name]));
+        const pairs = await resolvePairs(db, modelsById);
+        const pairModelIds = Array.from(new Set(pairs.flatMap(p => p.ids)));
+
+        // One variant query for every model involved
+        const variants = await db.collection('variants').find(
+            { modelId: { $in: pairModelIds }, status: 'active' },
+            {
+                projection: {
+                    _id: 0, modelId: 1, price: 1, fuelType: 1, fuel: 1, transmission: 1, power: 1, maxPower: 1,
+                    torque: 1, mileageCompanyClaimed: 1, airbags: 1, globalNCAPRating: 1, bootSpace: 1,
+                    groundClearance: 1, seatingCapacity: 1, adasLevel: 1, sunroof: 1
+                }
+            }
+        ).toArray();
+
+        const variantsByModel = new Map<string, any[]>();
+        variants.forEach((v: any) => {
+            const list = variantsByModel.get(v.modelId) || [];
+            list.push(v);
+            variantsByModel.set(v.modelId, list);
+        });
+
+        const snapshots = new Map<string, ModelSnapshot>();
+        for (const id of pairModelIds) {
+            const model = modelsById.get(id);
+            if (!model) continue;
+            snapshots.set(id, buildModelSnapshot(model, variantsByModel.get(id) || [], brandNames.get(model.brandId) || model.brandId));
+        }
+
+        const redis = getRedisClient();
+        const liveKeys = new Set<string>();
+
+        for (const pair of pairs) {
+            const car1 = snapshots.get(pair.ids[0]);
+            const car2 = snapshots.get(pair.ids[1]);
+            if (!car1 || !car2) continue;
+
+            const key = comparisonKey(car1.name, car2.name);
+            liveKeys.add(key);
+            const existing = records.get(key);
+            const isDirty = dirty.has(car1.id) || dirty.has(car2.id);
+
+            if (!force && !isDirty && existing && existing.fingerprint === `${car1.fingerprint}:${car2.fingerprint}`) {
+                unchanged++;
+                continue;
+            }
+
+            const record = buildComparisonRecord(car1, car2, pair.source);
+            records.set(key, record);
+            built++;
+
+            if (redis) {
+                redis.setex(`${RECORD_PREFIX}${key}`, RECORD_TTL, JSON.stringify(record))
+                    .catch(err => console.warn('⚠️ Failed to store comparison in Redis:', err.message));
+            }
+        }
+
+        // Drop pairs that are no longer popular / no longer active
+        Array.from(records.keys()).forEach(key => {
+            if (!liveKeys.has(key)) records.delete(key);
+        });
+
+        dirty.forEach(id => dirtyModels.delete(id));
+        // Models edited mid-refresh were read before the edit - rebuild them
+        if (dirtyModels.size > 0) scheduleDirtyRefresh();
+        lastRefresh = Date.now();
+        console.log(`✅ Comparisons materialized: ${built} built, ${unchanged} unchanged (${records.size} total) in ${Date.now() - startTime}ms`);
+    } catch (error) {
+        console.error('❌ Comparison materialization failed:', error);
+    } finally {
+        isRefreshing = false;
+    }
+
+    return { built, unchanged };
+}
+
+function scheduleDirtyRefresh(): void {
+    if (changeTimer) clearTimeout(changeTimer);
+    changeTimer = setTimeout(() => {
+        changeTimer = null;
+        refreshComparisons().catch(err => console.error('Comparison refresh failed:', err));
+    }, CHANGE_DEBOUNCE_MS);
+}
+
+/**
+ * Mark a model as changed (call after model/variant updates).
+ * Affected pairs are rebuilt after a short debounce.
+ */
+export function invalidateComparisonsForModel(modelId: string | undefined | null): void {
+    if (!modelId) return;
+    dirtyModels.add(modelId);
+    scheduleDirtyRefresh();
+}
+
+/**
+ * Start background materialization (initial build + periodic refresh)
+ */
+export function startComparisonMaterializer(): void {
+    if (refreshTimer) return;
+
+    // Wait for DB connection like the search index does
+    setTimeout(() => {
+        refreshComparisons().catch(err => console.error('❌ Initial comparison build failed:', err));
+    }, 10000);
+
+    refreshTimer = setInterval(() => {
+        console.log('🔄 Scheduled comparison refresh...');
+        refreshComparisons().catch(err => console.error('Comparison refresh failed:', err));
+    }, REFRESH_INTERVAL);
+}
+
+/**
+ * Look up a materialized comparison by model names (memory, then Redis)
+ */
+export async function getMaterializedComparison(name1: string, name2: string): Promise<ComparisonRecord | null> {
+    const key = comparisonKey(name1, name2);
+    const local = records.get(key);
+    if (local) return local;
+
+    const redis = getRedisClient();
+    if (!redis) return null;
+    try {
+        const stored = await redis.get(`${RECORD_PREFIX}${key}`);
+        if (!stored) return null;
+        const record = JSON.parse(stored) as ComparisonRecord;
+        records.set(key, record);
+        return record;
+    } catch {
+        return null;
+    }
+}
+
+/**
+ * Find a materialized comparison whose two models are both named in a query
+ * ("creta vs seltos which is better?")
+ */
+export function findComparisonForQuery(query: string): ComparisonRecord | null {
+    const lower = ` ${query.toLowerCase().replace(/[^a-z0-9\s]/g, ' ')} `;
+    const mentions = (car: ModelSnapshot) =>
+        lower.includes(` ${car.name.toLowerCase()} `) || lower.includes(` ${car.slug} `);
+
+    let best: ComparisonRecord | null = null;
+    records.forEach(record => {
+        if (mentions(record.cars[0]) && mentions(record.cars[1])) {
+            // Prefer curated popular pairs
+            if (!best || (best.source !== 'popular' && record.source === 'popular')) best = record;
+        }
+    });
+    return best;
+}
+
+/**
+ * Get materializer statistics
+ */
+export function getComparisonMaterializerStats() {
+    return {
+        records: records.size,
+        pendingModels: dirtyModels.size,
+        lastRefresh,
+        isRefreshing,
+        ageMinutes: lastRefresh ? Math.round((Date.now() - lastRefresh) / 60000) : null
+    };
+}
@@ -0,0 +1,383 @@
+/**
+ * Spec Table
+ * Columnar, precomputed variant specifications for direct factual answers
+ *
+ * Architecture:
+ * - One row per active variant (grouped by model, cheapest first)
+ * - Numeric specs are stored one Float64Array per attribute (NaN = not
+ *   listed), unit-normalized at build time: PS/kW → bhp, kgm → Nm,
+ *   litres → cc, cm → mm... so a lookup never parses strings
+ * - Text / feature specs are dictionary-encoded (Int32Array codes into a
+ *   per-attribute dictionary, -1 = not listed)
+ * - Per-model min/max (and the variant holding it) is precomputed for
+ *   every numeric attribute
+ * - Rebuilt in the background like the comparison materializer, and after
+ *   model/variant edits (debounced). Memory only: the table is small and
+ *   each worker builds its own.
+ */
+
+// ============================================
+// ATTRIBUTES
+// ============================================
+
+export type SpecKind = 'number' | 'feature' | 'text';
+
+export interface SpecAttribute {
+    key: string;
+    label: string;
+    fields: string[];   // Variant fields, first non-empty one wins
+    kind: SpecKind;
+    unit?: string;      // Canonical unit of numeric attributes
+}
+
+export const SPEC_ATTRIBUTES: SpecAttribute[] = [
+    { key: 'price', label: 'Ex-showroom price', fields: ['price'], kind: 'number', unit: '₹' },
+    { key: 'groundClearance', label: 'Ground clearance', fields: ['groundClearance'], kind: 'number', unit: 'mm' },
+    { key: 'bootSpace', label: 'Boot space', fields: ['bootSpace'], kind: 'number', unit: 'L' },
+    { key: 'fuelTankCapacity', label: 'Fuel tank capacity', fields: ['fuelTankCapacity'], kind: 'number', unit: 'L' },
+    { key: 'airbags', label: 'Airbags', fields: ['airbags'], kind: 'number', unit: '' },
+    { key: 'seating', label: 'Seating capacity', fields: ['seatingCapacity'], kind: 'number', unit: 'seats' },
+    { key: 'mileage', label: 'Claimed mileage', fields: ['mileageCompanyClaimed'], kind: 'number', unit: 'kmpl' },
+    { key: 'power', label: 'Max power', fields: ['maxPower', 'power', 'enginePower'], kind: 'number', unit: 'bhp' },
+    { key: 'torque', label: 'Max torque', fields: ['torque', 'engineTorque'], kind: 'number', unit: 'Nm' },
+    { key: 'engine', label: 'Engine displacement', fields: ['engineCapacity', 'displacement'], kind: 'number', unit: 'cc' },
+    { key: 'length', label: 'Length', fields: ['length'], kind: 'number', unit: 'mm' },
+    { key: 'width', label: 'Width', fields: ['width'], kind: 'number', unit: 'mm' },
+    { key: 'height', label: 'Height', fields: ['height'], kind: 'number', unit: 'mm' },
+    { key: 'wheelbase', label: 'Wheelbase', fields: ['wheelbase'], kind: 'number', unit: 'mm' },
+    { key: 'turningRadius', label: 'Turning radius', fields: ['turningRadius'], kind: 'number', unit: 'm' },
+    { key: 'kerbWeight', label: 'Kerb weight', fields: ['kerbWeight'], kind: 'number', unit: 'kg' },
+    { key: 'topSpeed', label: 'Top speed', fields: ['topSpeed'], kind: 'number', unit: 'kmph' },
+    { key: 'evRange', label: 'Claimed range', fields: ['evRange'], kind: 'number', unit: 'km' },
+    { key: 'batteryCapacity', label: 'Battery capacity', fields: ['evBatteryCapacity', 'hybridBatteryCapacity'], kind: 'number', unit: 'kWh' },
+    { key: 'gears', label: 'Number of gears', fields: ['noOfGears'], kind: 'number', unit: '' },
+    { key: 'ncap', label: 'Global NCAP rating', fields: ['globalNCAPRating'], kind: 'number', unit: 'stars' },
+    { key: 'sunroof', label: 'Sunroof', fields: ['sunroof'], kind: 'feature' },
+    { key: 'adas', label: 'ADAS', fields: ['adasLevel'], kind: 'feature' },
+    { key: 'cruiseControl', label: 'Cruise control', fields: ['cruiseControl'], kind: 'feature' },
+    { key: 'ventilatedSeats', label: 'Ventilated seats', fields: ['ventilatedSeats'], kind: 'feature' },
+    { key: 'wirelessCharging', label: 'Wireless charging', fields: ['wirelessCharging'], kind: 'feature' },
+    { key: 'headsUpDisplay', label: 'Heads-up display', fields: ['headsUpDisplay'], kind: 'feature' },
+    { key: 'cooledGlovebox', label: 'Cooled glovebox', fields: ['cooledGlovebox'], kind: 'feature' },
+    { key: 'carplay', label: 'Android Auto / Apple CarPlay', fields: ['androidAppleCarplay', 'androidAuto', 'appleCarPlay'], kind: 'feature' },
+    { key: 'transmission', label: 'Transmission', fields: ['transmission', 'engineTransmission'], kind: 'text' },
+    { key: 'fuelType', label: 'Fuel type', fields: ['fuelType', 'fuel'], kind: 'text' },
+    { key: 'driveType', label: 'Drive type', fields: ['driveType', 'driveTrain'], kind: 'text' },
+    { key: 'tyreSize', label: 'Tyre size', fields: ['tyreSize', 'frontTyreProfile'], kind: 'text' },
+    { key: 'spareWheel', label: 'Spare wheel', fields: ['spareWheelType', 'spareTyre'], kind: 'text' },
+    { key: 'frontBrake', label: 'Front brakes', fields: ['frontBrake'], kind: 'text' },
+    { key: 'rearBrake', label: 'Rear brakes', fields: ['rearBrake'], kind: 'text' }
+];
+
+export const SPEC_ATTRIBUTE_BY_KEY = new Map(SPEC_ATTRIBUTES.map(a => [a.key, a]));
+
+// Model names that are also everyday words - only matched with the brand ("honda city")
+export const GENERIC_MODEL_NAMES: ReadonlySet<string> = new Set(['city', 'go', 'one', 'plus', 'max', 'pro', 'new', 'eco', 'prime', 'sport']);
+
+const REFRESH_INTERVAL = 6 * 60 * 60 * 1000; // 6 hours
+const CHANGE_DEBOUNCE_MS = 5000;
+
+// ============================================
+// TABLE
+// ============================================
+
+export interface SpecModel {
+    id: string;
+    name: string;
+    brandName: string;
+    url: string;        // Model page (citation link)
+    start: number;      // Rows [start, end) - variants cheapest first
+    end: number;
+}
+
+export interface SpecRange {
+    min: Float64Array;  // Per model (NaN = no variant lists it)
+    max: Float64Array;
+    minRow: Int32Array;
+    maxRow: Int32Array;
+}
+
+export interface SpecTable {
+    models: SpecModel[];
+    variantNames: string[];
+    variantFuel: string[];
+    numbers: Map<string, Float64Array>;
+    texts: Map<string, { codes: Int32Array; dictionary: string[] }>;
+    ranges: Map<string, SpecRange>;
+    aliases: Map<string, number[]>;   // aliasKey(name) → model indices
+    builtAt: number;
+}
+
+let table: SpecTable | null = null;
+let isRefreshing = false;
+let refreshTimer: NodeJS.Timeout | null = null;
+let changeTimer: NodeJS.Timeout | null = null;
+
+/**
+ * Lookup key for model names: lowercase alphanumerics only ("XUV 3XO" → "xuv3xo")
+ */
+export function aliasKey(name: string): string {
+    return (name || '').toLowerCase().replace(/[^a-z0-9]/g, '');
+}
+
+function pageSlug(name: string): string {
+    return (name || '').toLowerCase().trim().replace(/\s+/g, '-');
+}
+
+/**
+ * Parse a spec string into the attribute's canonical unit
+ * ("1.5 L" → 1500 cc, "115 PS @ 6300rpm" → 113.4 bhp, "25.5 kgm" → 250.1 Nm)
+ */
+export function normalizeMeasure(raw: unknown, unit: string): number | null {
+    if (typeof raw === 'number') return Number.isFinite(raw) ? raw : null;
+    if (typeof raw !== 'string') return null;
+    const text = raw.toLowerCase().replace(/,/g, '');
+    const match = text.match(/\d+(\.\d+)?/);
+    if (!match || match.index === undefined) return null;
+    let value = parseFloat(match[0]);
+    const after = text.slice(match.index + match[0].length).trim();
+
+    switch (unit) {
+        case 'mm':
+            if (/^cm\b/.test(after)) value *= 10;
+            else if (/^m\b/.test(after)) value *= 1000;
+            break;
+        case 'cc':
+            if (/^(l\b|litre|liter)/.test(after) || value < 10) value *= 1000;
+            break;
+        case 'bhp':
+            if (/^ps\b/.test(after)) value *= 0.98632;
+            else if (/^kw\b/.test(after)) value *= 1.34102;
+            break;
+        case 'Nm':
+            if (/^kg-?\s?m\b/.test(after) || /^kgm\b/.test(after)) value *= 9.80665;
+            break;
+        case 'm':
+            if (/^mm\b/.test(after)) value /= 1000;
+            break;
+        case 'kmpl':
+            // CNG (km/kg) and EV (km/kWh) efficiency aren't comparable with kmpl
+            if (/^km\s?\/\s?(kg|kwh)\b|^km per (kg|kwh)\b/.test(after)) return null;
+            break;
+    }
+    return Math.round(value * 100) / 100;
+}
+
+/**
+ * Feature values ("Yes", "Electric Sunroof", "Level 2") vs absence ("No", "N/A")
+ */
+export function isSpecYes(value: string | null | undefined): boolean {
+    if (!value) return false;
+    const lower = value.toLowerCase().trim();
+    return lower !== '' && lower !== 'no' && lower !== 'n/a' && lower !== 'na' && lower !== '-' &&
+        lower !== 'none' && lower !== 'not available';
+}
+
+function firstValue(variant: any, fields: string[]): any {
+    for (const field of fields) {
+        const value = variant[field];
+        if (value !== null && value !== undefined && value !== '') return value;
+    }
+    return null;
+}
+
+/**
+ * Build the columnar table from models, their active variants and brand names
+ */
+export function buildSpecTable(models: any[], variants: any[], brandNames: Map<string, string>): SpecTable {
+    const variantsByModel = new Map<string, any[]>();
+    variants.forEach(v => {
+        const list = variantsByModel.get(v.modelId) || [];
+        list.push(v);
+        variantsByModel.set(v.modelId, list);
+    });
+
+    const specModels: SpecModel[] = [];
+    const rows: any[] = [];
+    for (const model of models) {
+        const modelVariants = (variantsByModel.get(model.id) || [])
+            .slice()
+            .sort((a, b) => (Number(a.price) || 0) - (Number(b.price) || 0));
+        if (modelVariants.length === 0) continue;
+        const brandName = brandNames.get(model.brandId) || model.brandId || '';
+        specModels.push({
+            id: model.id,
+            name: model.name,
+            brandName,
+            url: `/${pageSlug(brandName)}-cars/${pageSlug(model.name)}`,
+            start: rows.length,
+            end: rows.length + modelVariants.length
+        });
+        rows.push(...modelVariants);
+    }
+
+    const numbers = new Map<string, Float64Array>();
+    const texts = new Map<string, { codes: Int32Array; dictionary: string[] }>();
+    for (const attribute of SPEC_ATTRIBUTES) {
+        if (attribute.kind === 'number') {
+            const column = new Float64Array(rows.length).fill(NaN);
+            rows.forEach((v, row) => {
+                const value = normalizeMeasure(firstValue(v, attribute.fields), attribute.unit || '');
+                if (value !== null) column[row] = value;
+            });
+            numbers.set(attribute.key, column);
+        } else {
+            const dictionary: string[] = [];
+            const codeOf = new Map<string, number>();
+            const codes = new Int32Array(rows.length).fill(-1);
+            rows.forEach((v, row) => {
+                const raw = firstValue(v, attribute.fields);
+                if (raw === null) return;
+                const value = typeof raw === 'boolean' ? (raw ? 'Yes' : 'No') : String(raw).trim();
+                if (!value) return;
+                let code = codeOf.get(value);
+                if (code === undefined) {
+                    code = dictionary.length;
+                    dictionary.push(value);
+                    codeOf.set(value, code);
+                }
+                codes[row] = code;
+            });
+            texts.set(attribute.key, { codes, dictionary });
+        }
+    }
+
+    // Per-model min/max across variants
+    const ranges = new Map<string, SpecRange>();
+    numbers.forEach((column, key) => {
+        const range: SpecRange = {
+            min: new Float64Array(specModels.length).fill(NaN),
+            max: new Float64Array(specModels.length).fill(NaN),
+            minRow: new Int32Array(specModels.length).fill(-1),
+            maxRow: new Int32Array(specModels.length).fill(-1)
+        };
+        specModels.forEach((model, i) => {
+            for (let row = model.start; row < model.end; row++) {
+                const value = column[row];
+                if (Number.isNaN(value)) continue;
+                if (range.minRow[i] < 0 || value < range.min[i]) {
+                    range.min[i] = value;
+                    range.minRow[i] = row;
+                }
+                if (range.maxRow[i] < 0 || value > range.max[i]) {
+                    range.max[i] = value;
+                    range.maxRow[i] = row;
+                }
+            }
+        });
+        ranges.set(key, range);
+    });
+
+    // Aliases: full name, brand + name, and the first word of multi-word names
+    const aliases = new Map<string, number[]>();
+    const addAlias = (key: string, index: number) => {
+        if (!key) return;
+        const list = aliases.get(key) || [];
+        if (!list.includes(index)) list.push(index);
+        aliases.set(key, list);
+    };
+    specModels.forEach((model, i) => {
+        const name = aliasKey(model.name);
+        const firstWord = aliasKey(model.name.split(/\s+/)[0]);
+        addAlias(aliasKey(`${model.brandName} ${model.name}`), i);
+        if (!GENERIC_MODEL_NAMES.has(name)) addAlias(name, i);
+        if (firstWord !== name && firstWord.length > 2 && !GENERIC_MODEL_NAMES.has(firstWord)) addAlias(firstWord, i);
+    });
+
+    return {
+        models: specModels,
+        variantNames: rows.map(v => v.name || ''),
+        variantFuel: rows.map(v => String(v.fuelType || v.fuel || '').toLowerCase()),
+        numbers,
+        texts,
+        ranges,
+        aliases,
+        builtAt: Date.now()
+    };
+}
+
+// ============================================
+// LIFECYCLE
+// ============================================
+
+/**
+ * Rebuild the table from the database (models, brands, active variants)
+ */
+export async function refreshSpecTable(): Promise<number> {
+    if (isRefreshing) return table ? table.variantNames.length : 0;
+    isRefreshing = true;
+    const startTime = Date.now();
+
+    try {
+        const mongoose = (await import('mongoose')).default;
+        const db = mongoose.connection.db;
+        if (!db) {
+            console.warn('⚠️ Database not connected, skipping spec table build');
+            return 0;
+        }
+
+        const projection: Record<string, number> = { _id: 0, name: 1, modelId: 1, price: 1 };
+        SPEC_ATTRIBUTES.forEach(a => a.fields.forEach(f => { projection[f] = 1; }));
+
+        const [models, brands, variants] = await Promise.all([
+            db.collection('models').find({ status: 'active' }, { projection: { _id: 0, id: 1, name: 1, brandId: 1 } }).toArray(),
+            db.collection('brands').find({}, { projection: { _id: 0, id: 1, name: 1 } }).toArray(),
+            db.collection('variants').find({ status: 'active' }, { projection }).toArray()
+        ]);
+
+        const brandNames = new Map<string, string>(brands.map((b: any) => [b.id, b.name]));
+        table = buildSpecTable(models, variants, brandNames);
+        console.log(`✅ Spec table built: ${table.models.length} models, ${table.variantNames.length} variants in ${Date.now() - startTime}ms`);
+        return table.variantNames.length;
+    } catch (error) {
+        console.error('❌ Spec table build failed:', error);
+        return 0;
+    } finally {
+        isRefreshing = false;
+    }
+}
+
+/**
+ * Rebuild after model/variant edits (debounced - the table is rebuilt whole)
+ */
+export function invalidateSpecTable(): void {
+    if (changeTimer) clearTimeout(changeTimer);
+    changeTimer = setTimeout(() => {
+        changeTimer = null;
+        refreshSpecTable().catch(err => console.error('Spec table refresh failed:', err));
+    }, CHANGE_DEBOUNCE_MS);
+}
+
+/**
+ * Start background builds (initial build + periodic refresh)
+ */
+export function startSpecTable(): void {
+    if (refreshTimer) return;
+
+    setTimeout(() => {
+        refreshSpecTable().catch(err => console.error('❌ Initial spec table build failed:', err));
+    }, 10000);
+
+    refreshTimer = setInterval(() => {
+        refreshSpecTable().catch(err => console.error('Spec table refresh failed:', err));
+    }, REFRESH_INTERVAL);
+}
+
+export function getSpecTable(): SpecTable | null {
+    return table;
+}
+
+/**
+ * Get spec table statistics
+ */
+export function getSpecTableStats() {
+    return {
+        models: table ? table.models.length : 0,
+        variants: table ? table.variantNames.length : 0,
+        attributes: SPEC_ATTRIBUTES.length,
+        aliases: table ? table.aliases.size : 0,
+        builtAt: table ? table.builtAt : null,
+        isRefreshing,
+        ageMinutes: table ? Math.round((Date.now() - table.builtAt) / 60000) : null
+    };
+}
@@ -0,0 +1,297 @@
+"""
+Build eval_corpus.jsonl from the test_*.py harness scripts
+==========================================================
+Extracts each script's question lists and pass criteria (statically, via
+ast - the scripts are never imported or run) into the unified corpus
+format described in eval_corpus.py.
+
+Scripts with a dedicated extractor keep their exact pass criteria; the
+remaining ad-hoc scripts contribute their literal messages as smoke cases
+(or one multi-turn case when the script carries conversation history).
+
+Run: python build_eval_corpus.py [--out eval_corpus.jsonl]
+"""
+
+import argparse
+import ast
+import glob
+import os
+from typing import Callable, Dict, List, Optional
+
+from eval_corpus import DEFAULT_CORPUS, make_case_id, write_cases
+
+# Reply keywords each script treats as "asking for requirements"
+COMPREHENSIVE_60_KEYWORDS = ["budget", "seating", "how many", "what type"]
+CAR_NAMES_KEYWORDS = ["budget", "seating", "how many"]
+COMPARISON_SPEC_WORDS = ["price", "mileage", "fuel", "transmission", "₹"]
+
+
+# ============================================
+# AST HELPERS
+# ============================================
+
+def find_assignment(tree: ast.AST, name: str) -> Optional[ast.AST]:
+    """First assignment to `name` anywhere in the module (incl. inside functions)"""
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name) and target.id == name:
+                    return node.value
+    return None
+
+
+def parse_script(path: str) -> ast.AST:
+    """
+    Parse without executing. Lines this interpreter can't parse (e.g. newer
+    f-string syntax in print calls) are blanked to `pass`, keeping indentation,
+    since only the case literals matter here.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.read().split("\n")
+    for _ in range(50):
+        try:
+            return ast.parse("\n".join(lines), filename=path)
+        except SyntaxError as e:
+            if not e.lineno:
+                raise
+            line = lines[e.lineno - 1]
+            indent = line[:len(line) - len(line.lstrip())]
+            lines[e.lineno - 1] = indent + "pass"
+    raise SyntaxError(f"{path}: too many unparseable lines")
+
+
+def literal(tree: ast.AST, name: str):
+    node = find_assignment(tree, name)
+    if node is None:
+        return None
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        return None
+
+
+def single(suite: str, message: str, expect: dict, category: str = "", description: str = "") -> dict:
+    return {
+        "suite": suite,
+        "category": category or suite,
+        "description": description,
+        "turns": [{"message": message, "expect": expect}],
+    }
+
+
+def conversation(suite: str, messages: List[str], expects: Optional[List[dict]] = None,
+                 category: str = "conversation", description: str = "") -> dict:
+    expects = expects or [{"check": "reply"}] * len(messages)
+    return {
+        "suite": suite,
+        "category": category,
+        "description": description,
+        "turns": [{"message": m, "expect": e} for m, e in zip(messages, expects)],
+    }
+
+
+# ============================================
+# PER-SCRIPT EXTRACTORS
+# ============================================
+
+def extract_ai_accuracy(tree: ast.AST) -> List[dict]:
+    """TEST_CASES = [TestCase(query, expected_cars, category, description)]"""
+    cases = []
+    for call in find_assignment(tree, "TEST_CASES").elts:
+        args = [ast.literal_eval(a) for a in call.args]
+        kwargs = {k.arg: ast.literal_eval(k.value) for k in call.keywords}
+        query, expected_cars, category = args[0], args[1], args[2]
+        description = args[3] if len(args) > 3 else kwargs.get("description", "")
+
+        # Same rules as test_ai_accuracy.run_test
+        if not expected_cars:
+            match = "nonempty"
+        elif category == "car_name":
+            match = "first"
+        elif category == "comparison":
+            match = "all"
+        else:
+            match = "any"
+        expect = {"check": "cars", "expected_cars": expected_cars, "match": match}
+        cases.append(single("accuracy", query, expect, category, description))
+    return cases
+
+
+def extract_comprehensive_60(tree: ast.AST) -> List[dict]:
+    return [
+        single("comprehensive_60", t["q"],
+               {"check": "response_type", "expected": t["type"], "keywords": COMPREHENSIVE_60_KEYWORDS},
+               category=t["type"])
+        for t in literal(tree, "test_cases")
+    ]
+
+
+def extract_car_names(tree: ast.AST) -> List[dict]:
+    return [
+        single("car_names", t["q"],
+               {"check": "response_type", "expected": t["expected"], "keywords": CAR_NAMES_KEYWORDS},
+               category=t["expected"], description=t.get("description", ""))
+        for t in literal(tree, "test_cases")
+    ]
+
+
+def extract_tricky(tree: ast.AST) -> List[dict]:
+    return [
+        single("tricky", t["question"], {"check": "intent", "expected": t["expected_intent"]},
+               category=t["expected_intent"], description=t.get("reason", ""))
+        for t in literal(tree, "tricky_questions")
+    ]
+
+
+def extract_comparisons(tree: ast.AST) -> List[dict]:
+    return [
+        single("comparisons", q, {"check": "reply_any", "keywords": COMPARISON_SPEC_WORDS})
+        for q in literal(tree, "test_questions")
+    ]
+
+
+def extract_logic_verification(tree: ast.AST) -> List[dict]:
+    cases = [
+        single("logic_verification", t["question"], {"check": "direct_answer"},
+               category="query", description=t["expected"])
+        for t in literal(tree, "queries")
+    ]
+    cases += [
+        single("logic_verification", t["question"], {"check": "asks_requirements"},
+               category="recommendation", description=t["expected"])
+        for t in literal(tree, "recommendations")
+    ]
+    steps = literal(tree, "flow_steps")
+    # Every step but the last should ask a follow-up; the last should show cars
+    expects = [{"check": "reply_any", "keywords": ["?"]}] * (len(steps) - 1)
+    expects.append({"check": "cars", "match": "nonempty"})
+    cases.append(conversation("logic_verification", [s["user"] for s in steps], expects,
+                              category="flow", description="Complete recommendation flow"))
+    return cases
+
+
+def list_extractor(suite: str, *names: str, conversation_names: tuple = ()) -> Callable[[ast.AST], List[dict]]:
+    """Plain string lists → smoke cases; conversation lists → one multi-turn case"""
+    def extract(tree: ast.AST) -> List[dict]:
+        cases = []
+        for name in names:
+            for message in literal(tree, name) or []:
+                cases.append(single(suite, message, {"check": "reply"}, category=name))
+        for name in conversation_names:
+            messages = literal(tree, name)
+            if messages:
+                cases.append(conversation(suite, messages, description=f"{name} ({len(messages)} turns)"))
+        return cases
+    return extract
+
+
+EXTRACTORS: Dict[str, Callable[[ast.AST], List[dict]]] = {
+    "test_ai_accuracy.py": extract_ai_accuracy,
+    "test_comprehensive_60.py": extract_comprehensive_60,
+    "test_car_names.py": extract_car_names,
+    "test_tricky_questions.py": extract_tricky,
+    "test_comparisons.py": extract_comparisons,
+    "test_ai_logic_verification.py": extract_logic_verification,
+    "test_ai_comprehensive.py": list_extractor("ai_comprehensive", "CAR_QUESTIONS", conversation_names=("conversation",)),
+    "test_complex_questions.py": list_extractor("complex", "COMPLEX_QUESTIONS", conversation_names=("conversation",)),
+    "test_consultant_simulation.py": list_extractor("consultant_simulation", conversation_names=("questions",)),
+    "test_indian_user_simulation.py": list_extractor("indian_user_simulation", conversation_names=("questions",)),
+    "test_full_flow.py": list_extractor("full_flow", conversation_names=("messages",)),
+    "test_simplified.py": list_extractor("simplified", "test_cases"),
+    "test_level100.py": list_extractor("level100", "test_questions"),
+    "test_intelligent_rag.py": list_extractor("intelligent_rag", "test_questions"),
+    "test_rag_debug.py": list_extractor("rag_debug", "questions"),
+}
+
+
+def extract_inline_messages(tree: ast.AST, suite: str) -> List[dict]:
+    """
+    Ad-hoc scripts: collect `"message": ...` literals (or module-level string
+    variables) from request payloads in source order. Scripts that pass a
+    non-empty history become one multi-turn case, seeded with a literal
+    `history` when the script builds one up front.
+    """
+    strings = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    strings[target.id] = node.value.value
+
+    messages = []
+    uses_history = False
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Dict):
+            continue
+        keys = [k.value if isinstance(k, ast.Constant) else None for k in node.keys]
+        if "message" not in keys:
+            continue
+        value = node.values[keys.index("message")]
+        if isinstance(value, ast.Constant) and isinstance(value.value, str):
+            messages.append(value.value)
+        elif isinstance(value, ast.Name) and value.id in strings:
+            messages.append(strings[value.id])
+        if "conversationHistory" in keys:
+            history = node.values[keys.index("conversationHistory")]
+            uses_history |= not (isinstance(history, ast.List) and not history.elts)
+
+    messages = list(dict.fromkeys(messages))
+    if not messages:
+        return []
+    if not uses_history:
+        return [single(suite, m, {"check": "reply"}) for m in messages]
+
+    case = conversation(suite, messages)
+    seed = literal(tree, "history")
+    if seed and len(messages) == 1:
+        case["history"] = seed
+    return [case]
+
+
+# ============================================
+# BUILD
+# ============================================
+
+def build(root: str = ".") -> List[dict]:
+    cases = []
+    for path in sorted(glob.glob(os.path.join(root, "test_*.py"))):
+        script = os.path.basename(path)
+        tree = parse_script(path)
+
+        extractor = EXTRACTORS.get(script)
+        if extractor:
+            script_cases = extractor(tree)
+        else:
+            script_cases = extract_inline_messages(tree, script[len("test_"):-len(".py")])
+
+        for case in script_cases:
+            case["source"] = script
+        cases.extend(script_cases)
+        print(f"   {script:36} {len(script_cases):4} cases")
+
+    # Stable ids; duplicate messages within a suite get a numeric suffix
+    seen = {}
+    for case in cases:
+        base = make_case_id(case["suite"], [t["message"] for t in case["turns"]])
+        seen[base] = seen.get(base, 0) + 1
+        case_id = base if seen[base] == 1 else f"{base}-{seen[base]}"
+        case.update({"id": case_id, **{k: case.pop(k) for k in list(case) if k != "id"}})
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the unified evaluation corpus from the harness scripts")
+    parser.add_argument("--out", default=DEFAULT_CORPUS)
+    parser.add_argument("--root", default=".", help="Directory containing the test_*.py scripts")
+    args = parser.parse_args()
+
+    print("📦 Building evaluation corpus")
+    cases = build(args.root)
+    count = write_cases(args.out, cases)
+    turns = sum(len(c["turns"]) for c in cases)
+    suites = len({c["suite"] for c in cases})
+    print(f"\n💾 {count} cases ({turns} turns, {suites} suites) written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
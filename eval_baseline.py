@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+Harness Baseline Store & Regression Gate
+========================================
+Keeps a history of harness runs and compares a new run against it with
+bootstrap confidence intervals, failing (exit 1) only on statistically
+significant regressions in:
+
+- p95 / p99 latency (overall and per suite)
+- error rate (HTTP errors, timeouts)
+- tokens per request (X-AI-Tokens, recorded by eval_runner.py)
+- per-category accuracy and RAGAS / quality scores
+
+Understood report formats (detected automatically):
+  EVAL_RUN_REPORT.json          eval_runner.py - full per-request samples (inline or --sink file)
+  AI_TEST_RESULTS.json          test_ai_accuracy.py - per-category accuracy only
+  RAGAS_EVALUATION_REPORT.json  ragas_evaluation.py - per-question scores
+  ai_test_report.json           test_ai_comprehensive.py - per-message quality
+
+Run:
+  python eval_baseline.py record EVAL_RUN_REPORT.json --label main --pin
+  python eval_baseline.py compare EVAL_RUN_REPORT.json --record
+  python eval_baseline.py list
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import subprocess
+import sys
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, List, Optional, Sequence
+
+from eval_sink import iter_records
+
+DEFAULT_STORE = "eval_baselines"
+DEFAULT_OUT = "EVAL_REGRESSION_REPORT.json"
+
+# ============================================
+# REPORT NORMALIZATION
+# ============================================
+# Every report becomes three flat sample lists:
+#   requests: {suite, latency, error, tokens?}   - one per API call
+#   cases:    {suite, category, passed}          - one per test case
+#   scores:   {suite, category, value}           - one per scored answer
+
+
+def _empty_samples() -> dict:
+    return {"requests": [], "cases": [], "scores": []}
+
+
+def _from_eval_run(report: dict) -> dict:
+    samples = _empty_samples()
+    # --sink runs keep their results in a JSONL file next to the report
+    for result in report.get("results") or iter_records(report["sink"]):
+        samples["cases"].append({
+            "suite": result["suite"], "category": result["category"], "passed": bool(result["passed"]),
+        })
+        # Cached results carry the latency of an older run - don't let them mask a regression
+        if result.get("cached"):
+            continue
+        for turn in result["turns"]:
+            sample = {
+                "suite": result["suite"],
+                "latency": turn.get("response_time"),
+                "error": bool(turn.get("error")),
+            }
+            if "tokens" in turn:
+                sample["tokens"] = turn["tokens"]
+            samples["requests"].append(sample)
+    return samples
+
+
+def _from_accuracy(report: dict) -> dict:
+    samples = _empty_samples()
+    for category, data in report["by_category"].items():
+        samples["cases"] += [{"suite": "accuracy", "category": category, "passed": True}] * data["passed"]
+        samples["cases"] += [{"suite": "accuracy", "category": category, "passed": False}] * data["failed"]
+    return samples
+
+
+def _from_ragas(report: dict) -> dict:
+    samples = _empty_samples()
+    for result in report["results"]:
+        samples["scores"].append({
+            "suite": "ragas", "category": result.get("category", "ragas"), "value": result["overall"],
+        })
+    return samples
+
+
+def _from_quality(report: dict) -> dict:
+    samples = _empty_samples()
+    for section in ("long_conversation", "diverse_questions"):
+        for entry in report.get(section, []):
+            if "quality" in entry:
+                samples["scores"].append({"suite": "ai_comprehensive", "category": section, "value": entry["quality"]})
+    return samples
+
+
+def load_samples(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        report = json.load(f)
+
+    results = report.get("results")
+    if report.get("sink") or isinstance(results, list) and results and "turns" in results[0]:
+        samples, kind = _from_eval_run(report), "eval_run"
+    elif "by_category" in report and "accuracy" in report:
+        samples, kind = _from_accuracy(report), "accuracy"
+    elif isinstance(report.get("results"), list) and report.get("summary", {}).get("overall") is not None:
+        samples, kind = _from_ragas(report), "ragas"
+    elif "long_conversation" in report or "diverse_questions" in report:
+        samples, kind = _from_quality(report), "quality"
+    else:
+        raise ValueError(f"{path}: unrecognised report format")
+
+    samples["kind"] = kind
+
+    samples["fingerprint"] = (report.get("fingerprint") or {}).get("fingerprint")
+    return samples
+
+# ============================================
+# BASELINE STORE
+# ============================================
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+class BaselineStore:
+    """eval_baselines/index.jsonl + one gzipped sample file per run + a PINNED pointer"""
+
+    def __init__(self, root: str = DEFAULT_STORE):
+        self.root = root
+        self.runs_dir = os.path.join(root, "runs")
+        self.index_path = os.path.join(root, "index.jsonl")
+        self.pinned_path = os.path.join(root, "PINNED")
+
+    def runs(self) -> List[dict]:
+        if not os.path.exists(self.index_path):
+            return []
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def record(self, source: str, samples: dict, label: str = "", pin: bool = False) -> dict:
+        os.makedirs(self.runs_dir, exist_ok=True)
+        recorded_at = datetime.now()
+        revision = _git_revision()
+        run_id = f"{recorded_at.strftime('%Y%m%d-%H%M%S')}-{revision}"
+        suffix = 1
+        while os.path.exists(os.path.join(self.runs_dir, f"{run_id}.json.gz")):
+            suffix += 1
+            run_id = f"{recorded_at.strftime('%Y%m%d-%H%M%S')}-{revision}-{suffix}"
+        entry = {
+            "run_id": run_id,
+            "recorded_at": recorded_at.isoformat(),
+            "label": label,
+            "source": os.path.basename(source),
+            "kind": samples["kind"],
+            "git_revision": revision,
+            "fingerprint": samples.get("fingerprint"),
+            "counts": {kind: len(samples[kind]) for kind in ("requests", "cases", "scores")},
+        }
+        with gzip.open(os.path.join(self.runs_dir, f"{run_id}.json.gz"), "wt", encoding="utf-8") as f:
+            json.dump(samples, f)
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        if pin:
+            self.pin(run_id)
+        return entry
+
+    def pin(self, run_id: str):
+        with open(self.pinned_path, "w") as f:
+            f.write(run_id + "\n")
+
+    def pinned(self) -> Optional[str]:
+        if not os.path.exists(self.pinned_path):
+            return None
+        with open(self.pinned_path) as f:
+            return f.read().strip() or None
+
+    def load(self, run_id: str) -> dict:
+        with gzip.open(os.path.join(self.runs_dir, f"{run_id}.json.gz"), "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+    def baseline(self, run_id: Optional[str] = None, window: int = 1, kind: Optional[str] = None) -> Optional[dict]:
+        """
+        Samples of the requested run, else the pinned run (if it is of the
+        same report type), else the latest `window` runs of that type pooled.
+        """
+        runs = [r for r in self.runs() if kind is None or r.get("kind") == kind]
+        pinned = self.pinned()
+        if not run_id and any(r["run_id"] == pinned for r in runs):
+            run_id = pinned
+        if run_id:
+            return {"run_ids": [run_id], **self.load(run_id)}
+
+        if not runs:
+            return None
+        pooled = _empty_samples()
+        chosen = runs[-window:]
+        for run in chosen:
+            samples = self.load(run["run_id"])
+            for kind in pooled:
+                pooled[kind] += samples[kind]
+        return {"run_ids": [r["run_id"] for r in chosen], **pooled}
+
+# ============================================
+# BOOTSTRAP STATISTICS
+# ============================================
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Linear-interpolated percentile (q in 0..100) of an unsorted sequence"""
+    ordered = sorted(values)
+    if not ordered:
+        return float("nan")
+    pos = (len(ordered) - 1) * q / 100
+    low = int(pos)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+
+def mean(values: Sequence[float]) -> float:
+    return sum(values) / len(values) if values else float("nan")
+
+
+def bootstrap_diff(
+    base: Sequence[float],
+    cand: Sequence[float],
+    stat: Callable[[Sequence[float]], float],
+    iterations: int,
+    confidence: float,
+    rng: random.Random,
+) -> tuple:
+    """Point estimate and CI of stat(candidate) - stat(baseline)"""
+    diffs = []
+    for _ in range(iterations):
+        diffs.append(stat(rng.choices(cand, k=len(cand))) - stat(rng.choices(base, k=len(base))))
+    alpha = (1 - confidence) / 2
+    return stat(cand) - stat(base), percentile(diffs, alpha * 100), percentile(diffs, (1 - alpha) * 100)
+
+
+class Gate:
+    def __init__(self, args):
+        self.iterations = args.iterations
+        self.confidence = args.confidence
+        self.min_effect = args.min_effect
+        self.min_samples = args.min_samples
+        self.min_accuracy_drop = args.min_accuracy_drop
+        self.min_error_delta = args.min_error_delta
+        self.rng = random.Random(args.seed)
+        self.rows: List[dict] = []
+
+    def check(self, metric: str, base: list, cand: list, stat: Callable, higher_is_worse: bool,
+              min_abs: Optional[float] = None, min_n: Optional[int] = None):
+        """
+        Flag a regression when the whole CI lies on the bad side of zero and
+        the effect is practically relevant (relative min_effect, or min_abs
+        for rates).
+        """
+        min_n = min_n or self.min_samples
+        row = {"metric": metric, "baseline_n": len(base), "candidate_n": len(cand)}
+        if len(base) < min_n or len(cand) < min_n:
+            self.rows.append({**row, "status": "insufficient"})
+            return
+
+        diff, low, high = bootstrap_diff(base, cand, stat, self.iterations, self.confidence, self.rng)
+        base_value, cand_value = stat(base), stat(cand)
+        relevant = abs(diff) >= min_abs if min_abs is not None else (
+            base_value != 0 and abs(diff) / abs(base_value) >= self.min_effect
+        )
+        worse = low > 0 if higher_is_worse else high < 0
+        better = high < 0 if higher_is_worse else low > 0
+
+        status = "regression" if worse and relevant else "improved" if better and relevant else "ok"
+        self.rows.append({
+            **row,
+            "baseline": round(base_value, 4),
+            "candidate": round(cand_value, 4),
+            "diff": round(diff, 4),
+            "ci": [round(low, 4), round(high, 4)],
+            "status": status,
+        })
+
+
+def compare_samples(base: dict, cand: dict, gate: Gate):
+    # Latency percentiles (successful requests only - errors are counted separately)
+    def latencies(samples, suite=None):
+        return [r["latency"] for r in samples["requests"]
+                if not r["error"] and r.get("latency") is not None and (suite is None or r["suite"] == suite)]
+
+    for q in (95, 99):
+        gate.check(f"latency p{q} (s)", latencies(base), latencies(cand),
+                   lambda v, q=q: percentile(v, q), higher_is_worse=True)
+    for suite in sorted({r["suite"] for r in cand["requests"]}):
+        gate.check(f"latency p95 (s) [{suite}]", latencies(base, suite), latencies(cand, suite),
+                   lambda v: percentile(v, 95), higher_is_worse=True, min_n=max(gate.min_samples, 20))
+
+    # Error rate
+    gate.check("error rate", [float(r["error"]) for r in base["requests"]],
+               [float(r["error"]) for r in cand["requests"]],
+               mean, higher_is_worse=True, min_abs=gate.min_error_delta)
+
+    # Tokens per request
+    gate.check("tokens / request", [r["tokens"] for r in base["requests"] if "tokens" in r],
+               [r["tokens"] for r in cand["requests"] if "tokens" in r], mean, higher_is_worse=True)
+
+    # Per-category accuracy
+    def outcomes(samples):
+        grouped = defaultdict(list)
+        for c in samples["cases"]:
+            grouped[(c["suite"], c["category"])].append(float(c["passed"]))
+        return grouped
+
+    base_cases, cand_cases = outcomes(base), outcomes(cand)
+    for key in sorted(cand_cases):
+        gate.check(f"accuracy [{key[0]}/{key[1]}]", base_cases.get(key, []), cand_cases[key],
+                   mean, higher_is_worse=False, min_abs=gate.min_accuracy_drop, min_n=5)
+
+    # Per-category scores
+    def scores(samples):
+        grouped = defaultdict(list)
+        for s in samples["scores"]:
+            grouped[(s["suite"], s["category"])].append(s["value"])
+            grouped[(s["suite"], "all")].append(s["value"])
+        return grouped
+
+    base_scores, cand_scores = scores(base), scores(cand)
+    for key in sorted(cand_scores):
+        gate.check(f"score [{key[0]}/{key[1]}]", base_scores.get(key, []), cand_scores[key],
+                   mean, higher_is_worse=False, min_n=3)
+
+# ============================================
+# CLI
+# ============================================
+
+STATUS_ICONS = {"regression": "🔴", "improved": "🟢", "ok": "⚪", "insufficient": "·"}
+
+
+def print_diff(rows: List[dict], show_all: bool):
+    print(f"\n{'Metric':44} {'Baseline':>10} {'Candidate':>10} {'Δ':>9}   CI")
+    print("-" * 100)
+    for row in rows:
+        if row["status"] == "insufficient" or (row["status"] == "ok" and not show_all):
+            continue
+        print(f"{STATUS_ICONS[row['status']]} {row['metric'][:42]:42} {row['baseline']:>10.3f} "
+              f"{row['candidate']:>10.3f} {row['diff']:>+9.3f}   [{row['ci'][0]:+.3f}, {row['ci'][1]:+.3f}]")
+
+
+def cmd_record(args):
+    store = BaselineStore(args.store)
+    samples = load_samples(args.report)
+    entry = store.record(args.report, samples, args.label, args.pin)
+    print(f"💾 Recorded {entry['run_id']} ({entry['counts']['requests']} requests, "
+          f"{entry['counts']['cases']} cases, {entry['counts']['scores']} scores)"
+          + (" - pinned as baseline" if args.pin else ""))
+
+
+def cmd_list(args):
+    store = BaselineStore(args.store)
+    pinned = store.pinned()
+    for run in store.runs():
+        marker = "📌" if run["run_id"] == pinned else "  "
+        print(f"{marker} {run['run_id']:28} {run['source']:30} {run['label']:12} {run['counts']}")
+
+
+def cmd_pin(args):
+    BaselineStore(args.store).pin(args.run_id)
+    print(f"📌 Pinned {args.run_id} as baseline")
+
+
+def cmd_compare(args):
+    store = BaselineStore(args.store)
+    candidate = load_samples(args.report)
+    baseline = store.baseline(args.baseline, args.window, candidate["kind"])
+
+    print("=" * 60)
+    print("📈 HARNESS REGRESSION GATE")
+    print("=" * 60)
+
+    if baseline is None:
+        print("⚠️  No baseline recorded yet - nothing to compare against")
+        if args.record:
+            cmd_record(args)
+        return 0
+
+    print(f"Baseline:  {', '.join(baseline['run_ids'])}")
+    print(f"Candidate: {args.report} | {args.iterations} bootstrap iterations, "
+          f"{int(args.confidence * 100)}% CI, min effect {int(args.min_effect * 100)}%")
+
+    gate = Gate(args)
+    compare_samples(baseline, candidate, gate)
+    print_diff(gate.rows, args.show_all)
+
+    regressions = [r for r in gate.rows if r["status"] == "regression"]
+    improved = [r for r in gate.rows if r["status"] == "improved"]
+    print(f"\n{len(regressions)} regressions, {len(improved)} improvements, "
+          f"{sum(1 for r in gate.rows if r['status'] == 'ok')} unchanged, "
+          f"{sum(1 for r in gate.rows if r['status'] == 'insufficient')} with too few samples")
+
+    with open(args.out, "w") as f:
+        json.dump({
+            "timestamp": datetime.now().isoformat(),
+            "baseline_runs": baseline["run_ids"],
+            "candidate": args.report,
+            "confidence": args.confidence,
+            "iterations": args.iterations,
+            "regressions": len(regressions),
+            "rows": gate.rows,
+        }, f, indent=2)
+    print(f"💾 Diff report saved to: {args.out}")
+
+    if args.record:
+        cmd_record(args)
+
+    if regressions:
+        print("\n❌ REGRESSION: statistically significant slowdown or quality drop")
+        return 1
+    print("\n✅ No significant regressions")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Baseline store and statistical regression gate for harness runs")
+    parser.add_argument("--store", default=DEFAULT_STORE)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    record = sub.add_parser("record", help="Add a run to the baseline store")
+    record.add_argument("report", nargs="?", default="EVAL_RUN_REPORT.json")
+    record.add_argument("--label", default="")
+    record.add_argument("--pin", action="store_true", help="Use this run as the baseline from now on")
+
+    compare = sub.add_parser("compare", help="Compare a run against the baseline (exit 1 on regression)")
+    compare.add_argument("report", nargs="?", default="EVAL_RUN_REPORT.json")
+    compare.add_argument("--baseline", help="Run id (default: pinned run, else latest runs)")
+    compare.add_argument("--window", type=int, default=1, help="Pool this many recent runs when nothing is pinned")
+    compare.add_argument("--iterations", type=int, default=2000)
+    compare.add_argument("--confidence", type=float, default=0.95)
+    compare.add_argument("--min-effect", type=float, default=0.10, help="Relative change worth flagging")
+    compare.add_argument("--min-accuracy-drop", type=float, default=0.05)
+    compare.add_argument("--min-error-delta", type=float, default=0.01)
+    compare.add_argument("--min-samples", type=int, default=10)
+    compare.add_argument("--seed", type=int, default=42)
+    compare.add_argument("--show-all", action="store_true", help="Also list unchanged metrics")
+    compare.add_argument("--record", action="store_true", help="Record the candidate afterwards")
+    compare.add_argument("--label", default="")
+    compare.add_argument("--pin", action="store_true")
+    compare.add_argument("--out", default=DEFAULT_OUT)
+
+    sub.add_parser("list", help="List recorded runs")
+
+    pin = sub.add_parser("pin", help="Pin a recorded run as the baseline")
+    pin.add_argument("run_id")
+
+    args = parser.parse_args()
+    handler = {"record": cmd_record, "compare": cmd_compare, "list": cmd_list, "pin": cmd_pin}[args.command]
+    sys.exit(handler(args) or 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Evaluation Result Cache
+=======================
+Content-addressed, on-disk store of case results for eval_runner.py.
+
+A result is reused only when both of these match:
+- case hash: the case's messages, expectations and seeded history
+- backend fingerprint: prompt hashes, models, catalog version and git
+  revision, reported by GET /api/ai-feedback/fingerprint
+
+So a run re-executes only the cases that changed or were never run against
+the current backend, and reports are merged from cached + fresh results.
+Results with transport errors (timeouts, HTTP errors) are never cached.
+
+Storage is a single SQLite file (stdlib only), written by the parent
+process after the shards finish.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_CACHE_DIR = ".eval_cache"
+FINGERPRINT_PATH = "/api/ai-feedback/fingerprint"
+
+
+def case_hash(case: dict) -> str:
+    """Hash of everything in the case that can change its outcome"""
+    payload = {
+        "turns": case["turns"],
+        "history": case.get("history", []),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def fetch_fingerprint(session, origin: str) -> Optional[dict]:
+    """Backend fingerprint, or None when the endpoint isn't available"""
+    try:
+        response = session.get(f"{origin}{FINGERPRINT_PATH}", timeout=30)
+        if response.status_code != 200:
+            return None
+        data = response.json()
+        return data if data.get("fingerprint") else None
+    except Exception:
+        return None
+
+
+def diff_components(old: Optional[dict], new: dict) -> List[str]:
+    """Names of fingerprint components that changed since the last run"""
+    if not old:
+        return ["(no previous run)"]
+    changed = []
+    for name, value in new.get("components", {}).items():
+        if old.get("components", {}).get(name) != value:
+            changed.append(name)
+    return changed
+
+
+def is_cacheable(result: dict) -> bool:
+    return all(not t.get("error") for t in result["turns"])
+
+
+class ResultCache:
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "results.sqlite")
+        self.db = sqlite3.connect(self.path)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS results (
+                case_hash   TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                case_id     TEXT NOT NULL,
+                result      TEXT NOT NULL,
+                created_at  REAL NOT NULL,
+                PRIMARY KEY (case_hash, fingerprint)
+            );
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                fingerprint TEXT PRIMARY KEY,
+                components  TEXT NOT NULL,
+                last_used   REAL NOT NULL
+            );
+        """)
+
+    def lookup(self, hashes: Iterable[str], fingerprint: str) -> Dict[str, dict]:
+        """case_hash → cached result for this fingerprint"""
+        hashes = list(hashes)
+        found = {}
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(hashes), 500):
+            batch = hashes[i:i + 500]
+            rows = self.db.execute(
+                f"SELECT case_hash, result FROM results WHERE fingerprint = ? "
+                f"AND case_hash IN ({','.join('?' * len(batch))})",
+                [fingerprint, *batch],
+            )
+            for h, result in rows:
+                found[h] = json.loads(result)
+        return found
+
+    def store(self, entries: Iterable[tuple], fingerprint: str) -> int:
+        """entries: (case_hash, result) pairs; returns how many were stored"""
+        now = time.time()
+        rows = [
+            (h, fingerprint, r["id"], json.dumps(r, ensure_ascii=False), now)
+            for h, r in entries if is_cacheable(r)
+        ]
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def previous_fingerprint(self) -> Optional[dict]:
+        row = self.db.execute(
+            "SELECT fingerprint, components FROM fingerprints ORDER BY last_used DESC LIMIT 1"
+        ).fetchone()
+        return {"fingerprint": row[0], "components": json.loads(row[1])} if row else None
+
+    def remember_fingerprint(self, data: dict):
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?)",
+                (data["fingerprint"], json.dumps(data.get("components", {})), time.time()),
+            )
+
+    def prune(self, keep_fingerprints: int = 20) -> int:
+        """Drop results for all but the most recently used fingerprints"""
+        with self.db:
+            cursor = self.db.execute("""
+                DELETE FROM results WHERE fingerprint NOT IN (
+                    SELECT fingerprint FROM fingerprints ORDER BY last_used DESC LIMIT ?
+                )
+            """, (keep_fingerprints,))
+        return cursor.rowcount
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""
+Cluster Scaling Benchmark - Throughput per PM2 Worker Count
+===========================================================
+ecosystem.config.js runs the backend in PM2 cluster mode. Every worker is
+a separate process with its own copy of the in-process state (vector
+store, car-name cache, web-scraper cache, search index, ...), so adding
+workers adds CPU but also memory and per-worker warm-up. This benchmark
+measures what each extra worker buys.
+
+For each worker count (1, 2, 4 ... N) the built backend (backend/dist) is
+started under PM2 against local MongoDB / Redis and the LLM stand-in
+(backend/server/scripts/llm-standin-server.ts, started here unless
+--standin-url points at one already running), then:
+
+- time until every worker answers (cold start)
+- a warm-up phase, reported separately (first requests per worker)
+- a closed-loop load phase mixing ai-chat turns (first messages of corpus
+  cases) and catalog GETs, with --concurrency clients per worker
+- per-worker RSS and CPU from `pm2 jlist` during the load phase, and the
+  in-process component counts from every worker
+  (GET /api/monitoring/diagnostics/ai-memory) to show the duplication
+
+Reported per worker count: req/s, chat and catalog p50/p99, errors, RSS
+per worker and total, and scaling efficiency = (req/s per worker) /
+(req/s per worker at the smallest count). The workers run with
+RATE_LIMIT_DISABLED=true so the limiters do not cap the measurement.
+
+Needs: pm2 on PATH (or --pm2 "npx pm2"), `npm run build` in backend/,
+MongoDB and Redis reachable. The load generator shares the host, so keep
+worker counts below the core count or run it from another machine (--host).
+
+Run: python eval_cluster.py --workers 1,2,4 --duration 60s
+     python eval_cluster.py --standin-url http://127.0.0.1:8787 --chat-share 0.1
+"""
+
+import argparse
+import json
+import os
+import random
+import shlex
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from eval_baseline import mean, percentile
+from eval_corpus import DEFAULT_CORPUS, iter_cases
+from eval_runner import TIMEOUT
+from eval_soak import parse_duration, sample_memory
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(ROOT, "backend")
+DEFAULT_SCRIPT = os.path.join(BACKEND_DIR, "dist", "index.js")
+STANDIN_SCRIPT = os.path.join("server", "scripts", "llm-standin-server.ts")
+APP_NAME = "gadizone-cluster-bench"
+DEFAULT_REPORT = "EVAL_CLUSTER_REPORT.json"
+
+CHAT_PATH = "/api/ai-chat"
+CATALOG_PATHS = [
+    "/api/brands",
+    "/api/models",
+    "/api/models-with-pricing",
+    "/api/cars/popular",
+    "/api/upcoming-cars",
+    "/api/popular-comparisons",
+    "/api/cars-by-budget/under-10",
+    "/api/search?q=creta",
+    "/api/search?q=nexon",
+    "/api/search?q=swift",
+]
+
+READY_TIMEOUT = 120
+PM2_SAMPLE_INTERVAL = 2.0
+
+
+def default_worker_counts() -> List[int]:
+    """1, 2, 4 ... up to the core count (plus the core count itself)"""
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def parse_workers(value: str) -> List[int]:
+    try:
+        counts = sorted({int(v) for v in value.split(",") if v.strip()})
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid worker counts: {value}")
+    if not counts or counts[0] < 1:
+        raise argparse.ArgumentTypeError(f"invalid worker counts: {value}")
+    return counts
+
+
+def port_open(url: str, default_port: int) -> bool:
+    parts = urlsplit(url)
+    try:
+        with socket.create_connection((parts.hostname or "127.0.0.1", parts.port or default_port), timeout=2):
+            return True
+    except OSError:
+        return False
+
+# ============================================
+# PROCESSES
+# ============================================
+
+
+class PM2:
+    def __init__(self, command: str):
+        self.command = shlex.split(command)
+
+    def run(self, *args: str, env: Optional[dict] = None, check: bool = True) -> str:
+        completed = subprocess.run(self.command + list(args), env=env, capture_output=True, text=True)
+        if check and completed.returncode != 0:
+            raise RuntimeError(f"pm2 {' '.join(args)} failed: {completed.stderr.strip() or completed.stdout.strip()}")
+        return completed.stdout
+
+    def start(self, script: str, instances: int, env: dict):
+        self.delete()
+        # --update-env: the workers take this environment, not one cached by the PM2 daemon
+        self.run("start", script, "--name", APP_NAME, "-i", str(instances), "--update-env", env=env)
+
+    def delete(self):
+        self.run("delete", APP_NAME, check=False)
+
+    def workers(self) -> List[dict]:
+        """[{pid, status, memory, cpu, restarts}] for the benchmark app"""
+        try:
+            processes = json.loads(self.run("jlist") or "[]")
+        except (RuntimeError, ValueError):
+            return []
+        return [{"pid": p.get("pid"),
+                 "status": p.get("pm2_env", {}).get("status"),
+                 "memory": p.get("monit", {}).get("memory", 0),
+                 "cpu": p.get("monit", {}).get("cpu", 0),
+                 "restarts": p.get("pm2_env", {}).get("restart_time", 0)}
+                for p in processes if p.get("name") == APP_NAME]
+
+
+def start_standin(port: int, latency_ms: float) -> subprocess.Popen:
+    env = {**os.environ, "STANDIN_PORT": str(port), "STANDIN_LATENCY_MS": str(latency_ms)}
+    process = subprocess.Popen(["npx", "tsx", STANDIN_SCRIPT], cwd=BACKEND_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("LLM stand-in exited on startup")
+        if port_open(url, port):
+            return process
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError(f"LLM stand-in not listening on {url}")
+
+
+def backend_env(args, standin_url: str) -> dict:
+    return {
+        **os.environ,
+        "NODE_ENV": "production",
+        "PORT": str(args.port),
+        "MONGODB_URI": args.mongodb_uri,
+        "REDIS_URL": args.redis_url,
+        "GROQ_BASE_URL": standin_url,
+        "GROQ_API_KEY": os.environ.get("GROQ_API_KEY", "standin"),
+        "LLM_PROVIDERS": "groq",
+        "RATE_LIMIT_DISABLED": "true",
+    }
+
+
+def poll_workers(origin: str, count: int, attempts: int) -> Dict[int, dict]:
+    """ai-memory diagnostics from as many distinct workers as answer (cluster round-robin)"""
+    seen: Dict[int, dict] = {}
+    for _ in range(attempts):
+        # Fresh connection each time so the cluster master hands it to the next worker
+        sample = sample_memory(requests.Session(), origin)
+        if sample:
+            seen[sample["pid"]] = sample
+            if len(seen) >= count:
+                break
+    return seen
+
+
+def wait_ready(pm2: PM2, origin: str, count: int) -> Optional[float]:
+    """Seconds until PM2 reports every worker online and they all answer"""
+    started = time.time()
+    while time.time() - started < READY_TIMEOUT:
+        online = [w for w in pm2.workers() if w["status"] == "online"]
+        if len(online) >= count and len(poll_workers(origin, count, 4 * count)) >= count:
+            return time.time() - started
+        time.sleep(0.5)
+    return None
+
+# ============================================
+# LOAD
+# ============================================
+
+
+def load_worker(origin: str, messages: List[str], chat_share: float, deadline: float,
+                out: List[tuple], seed: int):
+    rng = random.Random(seed)
+    session = requests.Session()
+    sent = 0
+    while time.time() < deadline:
+        sent += 1
+        start = time.time()
+        try:
+            if rng.random() < chat_share:
+                kind = "chat"
+                response = session.post(f"{origin}{CHAT_PATH}", timeout=TIMEOUT,
+                                        json={"message": rng.choice(messages), "sessionId": f"cluster-{seed}-{sent}"})
+            else:
+                kind = "catalog"
+                response = session.get(f"{origin}{rng.choice(CATALOG_PATHS)}", timeout=TIMEOUT)
+            status = response.status_code
+        except Exception:
+            status = None
+        out.append((kind, start, time.time() - start, status))
+
+
+def drive(origin: str, messages: List[str], chat_share: float, clients: int, duration: float,
+          seed: int, on_tick=None) -> dict:
+    """Closed-loop load for duration seconds → phase summary"""
+    samples: List[tuple] = []
+    started = time.time()
+    deadline = started + duration
+    threads = [threading.Thread(target=load_worker, daemon=True,
+                                args=(origin, messages, chat_share, deadline, samples, seed * 1000 + i))
+               for i in range(clients)]
+    for t in threads:
+        t.start()
+    while any(t.is_alive() for t in threads):
+        if on_tick:
+            on_tick()
+        time.sleep(0.5)
+    return summarize_phase(samples, time.time() - started)
+
+
+def latency_ms(values: List[float]) -> dict:
+    if not values:
+        return {"n": 0}
+    ms = [v * 1000 for v in values]
+    return {"n": len(ms), "p50": round(percentile(ms, 50), 1), "p99": round(percentile(ms, 99), 1),
+            "mean": round(mean(ms), 1)}
+
+
+def summarize_phase(samples: List[tuple], elapsed: float) -> dict:
+    ok = [s for s in samples if s[3] == 200]
+    statuses: Dict[str, int] = {}
+    for s in samples:
+        if s[3] != 200:
+            key = str(s[3]) if s[3] is not None else "error"
+            statuses[key] = statuses.get(key, 0) + 1
+    return {
+        "elapsed_s": round(elapsed, 1),
+        "requests": len(samples),
+        "throughput_per_s": round(len(ok) / elapsed, 2) if elapsed > 0 else None,
+        "errors": len(samples) - len(ok),
+        "error_statuses": statuses,
+        "chat_ms": latency_ms([s[2] for s in ok if s[0] == "chat"]),
+        "catalog_ms": latency_ms([s[2] for s in ok if s[0] == "catalog"]),
+    }
+
+# ============================================
+# BENCHMARK
+# ============================================
+
+
+def worker_memory(series: Dict[int, List[dict]]) -> dict:
+    """Per-worker RSS / CPU over the load phase from pm2 jlist samples"""
+    peaks = [max(s["memory"] for s in samples) for samples in series.values() if samples]
+    cpus = [mean([s["cpu"] for s in samples]) for samples in series.values() if samples]
+    if not peaks:
+        return {}
+    return {
+        "workers_seen": len(peaks),
+        "rss_per_worker_mb": round(mean(peaks) / 1048576, 1),
+        "rss_max_worker_mb": round(max(peaks) / 1048576, 1),
+        "rss_total_mb": round(sum(peaks) / 1048576, 1),
+        "cpu_per_worker_pct": round(mean(cpus), 1),
+    }
+
+
+def component_counts(samples: Dict[int, dict]) -> dict:
+    """Mean per-worker entry counts of the in-process structures (and the sum across workers)"""
+    per_worker = [s.get("components", {}) for s in samples.values()]
+    keys = sorted({k for c in per_worker for k in c})
+    return {k: {"per_worker": round(mean([c.get(k, 0) for c in per_worker]), 1),
+                "total": sum(c.get(k, 0) for c in per_worker)} for k in keys}
+
+
+def run_count(pm2: PM2, args, env: dict, origin: str, count: int, messages: List[str]) -> dict:
+    print(f"\n🚀 {count} worker(s)")
+    pm2.start(args.script, count, env)
+    try:
+        ready_s = wait_ready(pm2, origin, count)
+        if ready_s is None:
+            print(f"   ❌ not all workers ready within {READY_TIMEOUT}s")
+            return {"workers": count, "ready_s": None, "error": "workers not ready"}
+        cold = poll_workers(origin, count, 4 * count)
+        print(f"   ready in {ready_s:.1f}s")
+
+        clients = args.concurrency * count
+        warmup = drive(origin, messages, args.chat_share, clients, args.warmup, seed=count) if args.warmup else None
+        if warmup:
+            print(f"   warm-up: {warmup['throughput_per_s']} req/s, chat p99 {warmup['chat_ms'].get('p99', '-')}ms")
+
+        series: Dict[int, List[dict]] = {}
+        last = [0.0]
+
+        def sample_pm2():
+            if time.time() - last[0] < PM2_SAMPLE_INTERVAL:
+                return
+            last[0] = time.time()
+            for w in pm2.workers():
+                series.setdefault(w["pid"], []).append(w)
+
+        load = drive(origin, messages, args.chat_share, clients, args.duration, seed=count + 100, on_tick=sample_pm2)
+        warm = poll_workers(origin, count, 4 * count)
+        restarts = sum(w["restarts"] for w in pm2.workers())
+        result = {
+            "workers": count,
+            "clients": clients,
+            "ready_s": round(ready_s, 2),
+            "warmup": warmup,
+            "load": load,
+            "memory": worker_memory(series),
+            "components_cold": component_counts(cold),
+            "components_warm": component_counts(warm),
+            "restarts": restarts,
+        }
+        memory = result["memory"]
+        print(f"   load: {load['throughput_per_s']} req/s | chat p99 {load['chat_ms'].get('p99', '-')}ms | "
+              f"catalog p99 {load['catalog_ms'].get('p99', '-')}ms | {load['errors']} errors | "
+              f"rss/worker {memory.get('rss_per_worker_mb', '-')}MB")
+        if restarts:
+            print(f"   ⚠️  {restarts} worker restart(s) during the run (max_memory_restart or crash)")
+        return result
+    finally:
+        pm2.delete()
+
+
+def add_efficiency(results: List[dict]):
+    measured = [r for r in results if r.get("load") and r["load"]["throughput_per_s"]]
+    if not measured:
+        return
+    base = measured[0]
+    per_worker = base["load"]["throughput_per_s"] / base["workers"]
+    for r in measured:
+        r["throughput_per_worker"] = round(r["load"]["throughput_per_s"] / r["workers"], 2)
+        r["speedup"] = round(r["load"]["throughput_per_s"] / base["load"]["throughput_per_s"], 2)
+        r["efficiency"] = round(r["throughput_per_worker"] / per_worker, 3)
+
+
+def print_table(results: List[dict]):
+    print(f"\n{'workers':>7} {'ready':>6} {'req/s':>8} {'speedup':>7} {'eff':>6} {'chat p50':>9} {'chat p99':>9} "
+          f"{'cat p50':>8} {'cat p99':>8} {'errs':>5} {'rss/w MB':>9} {'rss MB':>8} {'cpu/w':>6}")
+    for r in results:
+        if not r.get("load"):
+            print(f"{r['workers']:>7}   {r.get('error', 'failed')}")
+            continue
+        load, memory = r["load"], r["memory"]
+
+        def cell(value, width):
+            return f"{value:>{width}}" if value is not None else f"{'-':>{width}}"
+        print(f"{r['workers']:>7} {r['ready_s']:>5}s {cell(load['throughput_per_s'], 8)} "
+              f"{cell(r.get('speedup'), 7)} {cell(r.get('efficiency'), 6)} "
+              f"{cell(load['chat_ms'].get('p50'), 9)} {cell(load['chat_ms'].get('p99'), 9)} "
+              f"{cell(load['catalog_ms'].get('p50'), 8)} {cell(load['catalog_ms'].get('p99'), 8)} "
+              f"{load['errors']:>5} {cell(memory.get('rss_per_worker_mb'), 9)} "
+              f"{cell(memory.get('rss_total_mb'), 8)} {cell(memory.get('cpu_per_worker_pct'), 6)}")
+    low = [r for r in results if r.get("efficiency") is not None and r["efficiency"] < 0.7]
+    if low:
+        print(f"\n⚠️  Efficiency below 70% from {low[0]['workers']} workers: extra workers add memory "
+              f"(and warm-up) faster than throughput - check per-worker CPU (saturated = CPU bound, "
+              f"idle = a shared bottleneck such as Mongo, Redis, the LLM or the load generator)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend throughput, tail latency and memory per PM2 worker count")
+    parser.add_argument("--workers", type=parse_workers, default=default_worker_counts(),
+                        help="Comma-separated worker counts (default: 1, 2, 4 ... cores)")
+    parser.add_argument("--duration", type=parse_duration, default=parse_duration("60s"), help="Load phase per count")
+    parser.add_argument("--warmup", type=parse_duration, default=parse_duration("15s"), help="Warm-up phase per count")
+    parser.add_argument("--concurrency", type=int, default=8, help="Closed-loop clients per worker")
+    parser.add_argument("--chat-share", type=float, default=0.3, help="Fraction of requests that are ai-chat turns")
+    parser.add_argument("--host", default="127.0.0.1", help="Host the load is sent to")
+    parser.add_argument("--port", type=int, default=5101, help="Port the benchmark backend listens on")
+    parser.add_argument("--script", default=DEFAULT_SCRIPT, help="Built backend entry point")
+    parser.add_argument("--pm2", default="pm2", help='PM2 command (e.g. "npx pm2")')
+    parser.add_argument("--mongodb-uri", default=os.environ.get("MONGODB_URI", "mongodb://127.0.0.1:27017/gadizone"))
+    parser.add_argument("--redis-url", default=os.environ.get("REDIS_URL", "redis://127.0.0.1:6379"))
+    parser.add_argument("--standin-url", help="Use an LLM stand-in that is already running")
+    parser.add_argument("--standin-port", type=int, default=8787)
+    parser.add_argument("--standin-latency-ms", type=float, default=300)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--report", default=DEFAULT_REPORT)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.script):
+        print(f"❌ Error: {args.script} not found - run `npm run build` in backend/ first")
+        sys.exit(1)
+    pm2 = PM2(args.pm2)
+    try:
+        pm2.run("--version")
+    except (OSError, RuntimeError) as e:
+        print(f"❌ Error: pm2 not available ({e}) - install it or pass --pm2 \"npx pm2\"")
+        sys.exit(1)
+    if not port_open(args.mongodb_uri, 27017):
+        print(f"⚠️  MongoDB not reachable at {args.mongodb_uri} - catalog requests will fail")
+    if not port_open(args.redis_url, 6379):
+        print(f"⚠️  Redis not reachable at {args.redis_url} - workers fall back to per-process caches")
+
+    messages = [case["turns"][0]["message"] for case in iter_cases(args.corpus) if case.get("turns")]
+    if not messages and args.chat_share > 0:
+        print(f"❌ Error: no chat messages in {args.corpus}")
+        sys.exit(1)
+    cores = os.cpu_count() or 1
+
+    print("=" * 60)
+    print("🧮 CLUSTER SCALING BENCHMARK")
+    print("=" * 60)
+    print(f"Workers: {', '.join(map(str, args.workers))} | {cores} cores | {args.concurrency} clients/worker | "
+          f"chat share {args.chat_share:.0%} | warm-up {args.warmup:.0f}s + load {args.duration:.0f}s each")
+    if args.workers[-1] >= cores and args.host in ("127.0.0.1", "localhost"):
+        print("⚠️  The largest count uses every core and the load generator runs on the same host - "
+              "its efficiency is a lower bound")
+
+    standin = None
+    standin_url = args.standin_url
+    try:
+        if not standin_url:
+            standin = start_standin(args.standin_port, args.standin_latency_ms)
+            standin_url = f"http://127.0.0.1:{args.standin_port}"
+            print(f"🤖 LLM stand-in on {standin_url} ({args.standin_latency_ms:.0f}ms base latency)")
+
+        env = backend_env(args, standin_url)
+        origin = f"http://{args.host}:{args.port}"
+        results = []
+        for count in args.workers:
+            try:
+                results.append(run_count(pm2, args, env, origin, count, messages))
+            except RuntimeError as e:
+                print(f"   ❌ {e}")
+                results.append({"workers": count, "error": str(e)})
+    except (OSError, RuntimeError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    finally:
+        if standin:
+            standin.terminate()
+
+    add_efficiency(results)
+    print_table(results)
+
+    with open(args.report, "w") as f:
+        json.dump({"timestamp": datetime.now().isoformat(), "cores": cores, "host": args.host,
+                   "concurrency_per_worker": args.concurrency, "chat_share": args.chat_share,
+                   "warmup_s": args.warmup, "duration_s": args.duration, "standin_url": standin_url,
+                   "results": results}, f, indent=2)
+    print(f"💾 Report saved to: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Evaluation Corpus
+=================
+One on-disk format for every AI chat harness case (eval_corpus.jsonl),
+replacing the question lists hard-coded in the test_*.py scripts.
+
+One JSON object per line:
+
+  {
+    "id": "accuracy-3f9c2a1b7e",        - stable id (suite + hash of the messages)
+    "suite": "accuracy",                - which script the case came from
+    "category": "car_name",             - breakdown within the suite
+    "description": "Basic Swift query",
+    "turns": [                          - 1 turn = single-turn case; history is
+      {                                   built from earlier replies otherwise
+        "message": "tell me about swift",
+        "expect": {"check": "cars", "expected_cars": ["Swift"], "match": "first"}
+      }
+    ],
+    "history": [...]                    - optional seeded conversationHistory
+  }
+
+Expectation checks (evaluated by eval_runner.py):
+  cars               expected_cars + match: first | all | any | nonempty
+  response_type      expected: query | recommendation, keywords that count as asking
+  intent             expected: query | recommendation (tricky-question heuristics)
+  direct_answer      reply has an info keyword and doesn't ask for requirements
+  asks_requirements  reply asks budget/seating/usage and shows no cars
+  reply_any          reply contains any of keywords
+  reply              smoke check - HTTP 200 with a non-empty reply
+
+The loader streams the file lazily and shards deterministically by case id,
+so every worker can read the corpus on its own and pick out its slice.
+
+Build: python build_eval_corpus.py
+"""
+
+import hashlib
+import json
+from typing import Iterable, Iterator, List, Optional
+
+from eval_io import open_jsonl
+
+DEFAULT_CORPUS = "eval_corpus.jsonl"
+
+CHECKS = frozenset([
+    "cars", "response_type", "intent", "direct_answer", "asks_requirements", "reply_any", "reply",
+])
+
+
+def make_case_id(suite: str, messages: List[str]) -> str:
+    """Stable id: survives reordering and insertion of other cases"""
+    digest = hashlib.sha1("\n".join(messages).encode("utf-8")).hexdigest()[:10]
+    return f"{suite}-{digest}"
+
+
+def shard_of(case_id: str, num_shards: int) -> int:
+    """Deterministic shard assignment (same case → same shard on every machine)"""
+    if num_shards <= 1:
+        return 0
+    return int(hashlib.sha1(case_id.encode("utf-8")).hexdigest()[:8], 16) % num_shards
+
+
+def validate_case(case: dict) -> Optional[str]:
+    """Return an error message for a malformed case, None if it is valid"""
+    for field in ("id", "suite", "turns"):
+        if not case.get(field):
+            return f"missing '{field}'"
+    for i, turn in enumerate(case["turns"]):
+        if not isinstance(turn.get("message"), str) or not turn["message"]:
+            return f"turn {i}: missing 'message'"
+        check = (turn.get("expect") or {}).get("check", "reply")
+        if check not in CHECKS:
+            return f"turn {i}: unknown check '{check}'"
+    return None
+
+
+def iter_cases(
+    path: str = DEFAULT_CORPUS,
+    suites: Optional[Iterable[str]] = None,
+    shard: int = 0,
+    num_shards: int = 1,
+) -> Iterator[dict]:
+    """
+    Lazily stream cases, optionally filtered to some suites and one shard.
+    Each yielded case carries its corpus position as "index" (for ordering
+    merged results the way the scripts printed them).
+    """
+    wanted = set(suites) if suites else None
+    with open_jsonl(path) as source:
+        index = 0
+        for line_no, line in enumerate(source, 1):
+            if not line.strip():
+                continue
+            try:
+                case = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_no}: invalid JSON ({e})")
+            error = validate_case(case)
+            if error:
+                raise ValueError(f"{path}:{line_no}: {error}")
+
+            case["index"] = index
+            index += 1
+            if wanted is not None and case["suite"] not in wanted:
+                continue
+            if shard_of(case["id"], num_shards) != shard:
+                continue
+            yield case
+
+
+def write_cases(path: str, cases: Iterable[dict]) -> int:
+    """Write cases as JSONL; returns the number written"""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for case in cases:
+            f.write(json.dumps(case, ensure_ascii=False) + "\n")
+            count += 1
+    return count
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+AI Chat Intent Fast Path Benchmark - Precision / Recall
+=======================================================
+Scores the in-process fast-path classifier (ai-engine/intent-fastpath.ts)
+that answers greetings, small talk and off-topic messages without the
+RAG + LLM pipeline:
+
+- car messages: the labelled intents of test_comprehensive_60.py and
+  test_tricky_questions.py (suites comprehensive_60 / tricky of the corpus)
+  - every one of them must fall through
+- non-car messages: eval_intents.jsonl (the chit-chat of test_simplified.py
+  and test_complex_questions.py plus hand-labelled greetings, small talk,
+  off-topic questions and car-looking hard negatives)
+
+By default only the classifier is called (POST /api/ai-chat/fast-path - no
+LLM tokens spent). --end-to-end sends real chat requests instead and also
+compares client latency of fast-path replies against the full pipeline.
+
+A car question answered by the fast path is the expensive mistake, so the
+run exits 1 when there are more than --max-false-positives of them.
+
+Run: python eval_intent.py
+     python eval_intent.py --end-to-end --report EVAL_INTENT_REPORT.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List
+
+import requests
+
+from eval_baseline import mean, percentile
+from eval_corpus import DEFAULT_CORPUS, iter_cases
+from eval_runner import API_URL, TIMEOUT
+
+DEFAULT_LABELS = "eval_intents.jsonl"
+DEFAULT_REPORT = "EVAL_INTENT_REPORT.json"
+LABELLED_SUITES = ["comprehensive_60", "tricky"]
+INTENTS = ("greeting", "thanks", "farewell", "small_talk", "out_of_domain", "car")
+
+
+def load_samples(labels_path: str, corpus: str, suites: List[str]) -> List[dict]:
+    samples = []
+    with open(labels_path) as f:
+        for line in f:
+            if line.strip():
+                samples.append(json.loads(line))
+    # Labelled car-domain suites keep their original label (query / recommendation)
+    for case in iter_cases(corpus, suites):
+        if len(case["turns"]) == 1 and not case.get("history"):
+            samples.append({"message": case["turns"][0]["message"], "intent": "car",
+                            "source": case["suite"], "label": case.get("category")})
+    return samples
+
+
+def parse_fast_path_header(value: str) -> dict:
+    """'intent=greeting; confidence=0.99; rule=greeting; decision=handled' → dict"""
+    fields = dict(part.strip().split("=", 1) for part in value.split(";") if "=" in part)
+    return {
+        "intent": fields.get("intent", "car"),
+        "confidence": float(fields.get("confidence", 0)),
+        "rule": fields.get("rule"),
+        "handled": fields.get("decision") == "handled",
+    }
+
+
+def classify(session: requests.Session, api_url: str, message: str) -> dict:
+    response = session.post(api_url.rstrip("/") + "/fast-path", json={"message": message}, timeout=TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+
+def chat(session: requests.Session, api_url: str, message: str) -> dict:
+    payload = {"message": message, "sessionId": f"intent-bench-{int(time.time() * 1000)}", "conversationHistory": []}
+    start = time.time()
+    response = session.post(api_url, json=payload, timeout=TIMEOUT)
+    latency = time.time() - start
+    header = response.headers.get("X-Fast-Path")
+    if response.status_code != 200 or not header:
+        raise RuntimeError(f"HTTP {response.status_code}" + ("" if header else " without X-Fast-Path"))
+    return {**parse_fast_path_header(header), "latency": round(latency, 3),
+            "route": response.headers.get("X-AI-Route")}
+
+
+def score(results: List[dict]) -> dict:
+    confusion: Dict[str, Dict[str, int]] = OrderedDict((i, OrderedDict((j, 0) for j in INTENTS)) for i in INTENTS)
+    for r in results:
+        confusion[r["intent"]][r["predicted"]] += 1
+
+    per_intent = OrderedDict()
+    for intent in INTENTS:
+        tp = confusion[intent][intent]
+        fp = sum(confusion[other][intent] for other in INTENTS if other != intent)
+        fn = sum(confusion[intent][other] for other in INTENTS if other != intent)
+        precision = tp / (tp + fp) if tp + fp else None
+        recall = tp / (tp + fn) if tp + fn else None
+        f1 = 2 * precision * recall / (precision + recall) if precision and recall else None
+        per_intent[intent] = {"support": tp + fn, "precision": precision, "recall": recall, "f1": f1}
+
+    # Skip-the-pipeline decision: handled vs a non-car label, whatever the intent
+    handled = [r for r in results if r["handled"]]
+    non_car = [r for r in results if r["intent"] != "car"]
+    correct_skips = sum(1 for r in handled if r["intent"] != "car")
+    return {
+        "samples": len(results),
+        "fast_path": {
+            "handled": len(handled),
+            "precision": correct_skips / len(handled) if handled else None,
+            "recall": correct_skips / len(non_car) if non_car else None,
+        },
+        "per_intent": per_intent,
+        "confusion": confusion,
+        "false_positives": [{"message": r["message"], "source": r["source"], "predicted": r["predicted"],
+                             "rule": r.get("rule")} for r in handled if r["intent"] == "car"],
+        "missed": [{"message": r["message"], "intent": r["intent"], "rule": r.get("rule"),
+                    "confidence": r.get("confidence")} for r in non_car if not r["handled"]],
+    }
+
+
+def latency_summary(values: List[float]) -> dict:
+    return {"n": len(values), "mean": round(mean(values), 4) if values else None,
+            "p50": round(percentile(values, 50), 4) if values else None,
+            "p95": round(percentile(values, 95), 4) if values else None}
+
+
+def fmt(value) -> str:
+    return f"{value * 100:6.1f}%" if value is not None else "     - "
+
+
+def print_score(summary: dict, latency: dict):
+    fast = summary["fast_path"]
+    print(f"\n{'Intent':15} {'support':>8} {'precision':>10} {'recall':>8} {'f1':>8}")
+    for intent, s in summary["per_intent"].items():
+        print(f"{intent:15} {s['support']:>8} {fmt(s['precision']):>10} {fmt(s['recall']):>8} {fmt(s['f1']):>8}")
+    print(f"\n⚡ Fast path: {fast['handled']}/{summary['samples']} handled | "
+          f"precision {fmt(fast['precision']).strip()} | recall {fmt(fast['recall']).strip()}")
+    for name, s in latency.items():
+        if s["n"]:
+            print(f"⏱️  {name}: mean {s['mean']} | p50 {s['p50']} | p95 {s['p95']} (n={s['n']})")
+    for fp in summary["false_positives"]:
+        print(f"   ❌ car question answered by fast path ({fp['predicted']}): {fp['message']}")
+    for miss in summary["missed"]:
+        print(f"   ⚠️  fell through ({miss['rule']}, {miss['confidence']}): [{miss['intent']}] {miss['message']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precision/recall of the ai-chat intent fast path")
+    parser.add_argument("--labels", default=DEFAULT_LABELS)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--suite", action="append", help=f"Car-domain suites (default: {', '.join(LABELLED_SUITES)})")
+    parser.add_argument("--url", default=API_URL)
+    parser.add_argument("--end-to-end", action="store_true",
+                        help="Send real chat requests (LLM calls for car questions) and compare latency")
+    parser.add_argument("--max-false-positives", type=int, default=0)
+    parser.add_argument("--report", default=DEFAULT_REPORT)
+    args = parser.parse_args()
+
+    samples = load_samples(args.labels, args.corpus, args.suite or LABELLED_SUITES)
+    counts = OrderedDict((i, sum(1 for s in samples if s["intent"] == i)) for i in INTENTS)
+    print(f"🏷️  {len(samples)} labelled messages: " + ", ".join(f"{i} {n}" for i, n in counts.items() if n))
+
+    session = requests.Session()
+    results = []
+    for sample in samples:
+        try:
+            decision = (chat if args.end_to_end else classify)(session, args.url, sample["message"])
+        except Exception as e:
+            print(f"❌ Error: '{sample['message'][:40]}': {e}")
+            sys.exit(1)
+        # The label stays in "intent"; what the classifier said goes to "predicted"
+        intent = decision.pop("intent")
+        predicted = intent if decision["handled"] else "car"
+        decision.pop("reply", None)
+        results.append({**sample, **decision, "predicted": predicted})
+
+    if args.end_to_end:
+        latency = {
+            "fast path (s)": latency_summary([r["latency"] for r in results if r["handled"]]),
+            "pipeline (s)": latency_summary([r["latency"] for r in results if not r["handled"]]),
+        }
+    else:
+        latency = {"classifier (µs)": latency_summary([r["elapsedUs"] for r in results if "elapsedUs" in r])}
+
+    summary = score(results)
+    print_score(summary, latency)
+
+    with open(args.report, "w") as f:
+        json.dump({"timestamp": datetime.now().isoformat(), "mode": "end_to_end" if args.end_to_end else "classifier",
+                   **summary, "latency": latency, "results": results}, f, indent=2, ensure_ascii=False)
+    print(f"💾 Report saved to: {args.report}")
+
+    if len(summary["false_positives"]) > args.max_false_positives:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
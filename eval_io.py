@@ -0,0 +1,19 @@
+"""
+JSONL Input
+===========
+Shared reader for the harness' JSONL inputs (corpora, trees, RAGAS
+batches): a path, a .gz path, or "-" for stdin.
+
+Used by eval_corpus.py, eval_tree.py and ragas_batch.py.
+"""
+
+import gzip
+import sys
+
+
+def open_jsonl(path: str):
+    if path == "-":
+        return sys.stdin
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Prometheus /metrics Deltas for Harness Runs
+===========================================
+Scrapes the backend's /metrics endpoint before and after a run and reports
+what the run itself did, using the same series production dashboards use:
+
+- counters: increase (cache hits/misses, query classes, tokens, ...)
+- histograms: request count, mean and p50/p95 estimated from the bucket
+  increases (same linear interpolation as PromQL histogram_quantile)
+- gauges: value before → after (vector store size/age, circuit state, ...)
+
+Only families matching the prefixes (ai_, llm_, http_request_ by default)
+are reported. In a PM2 cluster each scrape hits one worker, so run
+against a single instance for exact numbers.
+
+Used by eval_runner.py --metrics, or standalone around any load test:
+     python eval_metrics.py snapshot --out before.json
+     ... run load ...
+     python eval_metrics.py diff before.json --report METRICS_DELTA.json
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+DEFAULT_PREFIXES = ("ai_", "llm_", "http_request_")
+METRICS_URL = os.environ.get("METRICS_URL", "http://localhost:5001/metrics")
+
+SAMPLE_RE = re.compile(r'^([a-zA-Z_:][\w:]*)(?:\{(.*)\})?\s+(\S+)')
+LABEL_RE = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+# ============================================
+# PARSING
+# ============================================
+
+
+def parse_exposition(text: str) -> dict:
+    """Prometheus text format → {"types": {family: kind}, "samples": {series_key: value}}"""
+    types: Dict[str, str] = {}
+    samples: Dict[str, float] = OrderedDict()
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(None, 3)
+            types[name] = kind.strip()
+            continue
+        if not line or line.startswith("#"):
+            continue
+        match = SAMPLE_RE.match(line)
+        if not match:
+            continue
+        name, labels, value = match.groups()
+        try:
+            samples[series_key(name, dict(LABEL_RE.findall(labels or "")))] = float(value)
+        except ValueError:
+            continue
+    return {"types": types, "samples": samples}
+
+
+def series_key(name: str, labels: Dict[str, str]) -> str:
+    """Stable key: name{a="1",b="2"} with sorted labels (default 'app' label dropped)"""
+    labels = {k: v for k, v in labels.items() if k != "app"}
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{k}="{labels[k]}"' for k in sorted(labels)) + "}"
+
+
+def split_key(key: str) -> Tuple[str, Dict[str, str]]:
+    name, _, rest = key.partition("{")
+    return name, dict(LABEL_RE.findall(rest))
+
+
+def family_of(name: str, types: Dict[str, str]) -> Tuple[str, str]:
+    """(family, suffix) - histogram series carry _bucket/_sum/_count suffixes"""
+    for suffix in ("_bucket", "_sum", "_count"):
+        if name.endswith(suffix) and types.get(name[: -len(suffix)]) == "histogram":
+            return name[: -len(suffix)], suffix
+    return name, ""
+
+# ============================================
+# SCRAPING
+# ============================================
+
+
+def scrape(session, url: str = METRICS_URL) -> Optional[dict]:
+    try:
+        response = session.get(url, timeout=30)
+        if response.status_code != 200:
+            return None
+        return parse_exposition(response.text)
+    except Exception:
+        return None
+
+
+def metrics_url_for(api_url: str) -> str:
+    return "{0.scheme}://{0.netloc}/metrics".format(urlsplit(api_url))
+
+# ============================================
+# DELTAS
+# ============================================
+
+
+def histogram_quantile(q: float, buckets: List[Tuple[float, float]]) -> Optional[float]:
+    """buckets: sorted (upper bound, cumulative count increase)"""
+    if not buckets or buckets[-1][1] <= 0:
+        return None
+    rank = q * buckets[-1][1]
+    prev_bound, prev_count = 0.0, 0.0
+    for bound, count in buckets:
+        if count >= rank:
+            if math.isinf(bound):
+                return prev_bound
+            if count == prev_count:
+                return bound
+            return prev_bound + (bound - prev_bound) * (rank - prev_count) / (count - prev_count)
+        prev_bound, prev_count = bound, count
+    return prev_bound
+
+
+def compute_deltas(before: dict, after: dict, prefixes=DEFAULT_PREFIXES) -> dict:
+    """Per family: counter increases, histogram summaries, gauge before/after"""
+    types = {**before["types"], **after["types"]}
+    families: Dict[str, dict] = OrderedDict()
+    histograms: Dict[Tuple[str, str], dict] = OrderedDict()
+
+    for key, value in after["samples"].items():
+        name, labels = split_key(key)
+        family, suffix = family_of(name, types)
+        if not family.startswith(tuple(prefixes)):
+            continue
+        kind = types.get(family, "untyped")
+        previous = before["samples"].get(key, 0.0)
+
+        if kind == "histogram":
+            le = labels.pop("le", None)
+            entry = histograms.setdefault((family, series_key(family, labels)), {"buckets": []})
+            if suffix == "_bucket" and le is not None:
+                entry["buckets"].append((float(le), value - previous))
+            elif suffix in ("_sum", "_count"):
+                entry[suffix[1:]] = value - previous
+        elif kind == "counter":
+            delta = value - previous
+            if delta:
+                families.setdefault(family, {"type": kind, "series": OrderedDict()})["series"][key] = round(delta, 4)
+        else:
+            if key in before["samples"] or value:
+                families.setdefault(family, {"type": kind, "series": OrderedDict()})["series"][key] = {
+                    "before": before["samples"].get(key), "after": value,
+                }
+
+    for (family, key), entry in histograms.items():
+        count = entry.get("count", 0)
+        if not count:
+            continue
+        buckets = sorted(entry["buckets"])
+        families.setdefault(family, {"type": "histogram", "series": OrderedDict()})["series"][key] = {
+            "count": round(count),
+            "mean": round(entry.get("sum", 0) / count, 4),
+            "p50": _round(histogram_quantile(0.5, buckets)),
+            "p95": _round(histogram_quantile(0.95, buckets)),
+        }
+    return families
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 4) if value is not None else None
+
+
+def print_deltas(families: dict):
+    print(f"\n📡 /metrics DELTA ({len(families)} families changed)")
+    print("-" * 70)
+    for family, data in families.items():
+        print(f"📊 {family} ({data['type']})")
+        for key, value in data["series"].items():
+            _, labels = split_key(key)
+            label = ", ".join(f"{k}={v}" for k, v in labels.items()) or "-"
+            if data["type"] == "histogram":
+                print(f"   {label:45} n={value['count']:<6} mean={value['mean']:<10} "
+                      f"p50={value['p50']} p95={value['p95']}")
+            elif data["type"] == "counter":
+                print(f"   {label:45} +{value:g}")
+            else:
+                print(f"   {label:45} {value['before']} → {value['after']}")
+
+# ============================================
+# CLI
+# ============================================
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot /metrics and report deltas around a load test")
+    sub = parser.add_subparsers(dest="command", required=True)
+    snap = sub.add_parser("snapshot", help="Save the current /metrics")
+    snap.add_argument("--url", default=METRICS_URL)
+    snap.add_argument("--out", required=True)
+    diff = sub.add_parser("diff", help="Compare a saved snapshot with the current /metrics (or a second snapshot)")
+    diff.add_argument("before")
+    diff.add_argument("after", nargs="?")
+    diff.add_argument("--url", default=METRICS_URL)
+    diff.add_argument("--prefix", action="append", help=f"Family prefixes (default: {', '.join(DEFAULT_PREFIXES)})")
+    diff.add_argument("--report", default="METRICS_DELTA.json")
+    args = parser.parse_args()
+
+    if args.command == "snapshot":
+        data = scrape(requests.Session(), args.url)
+        if data is None:
+            print(f"❌ Error: could not scrape {args.url}")
+            sys.exit(1)
+        with open(args.out, "w") as f:
+            json.dump(data, f)
+        print(f"💾 {len(data['samples'])} series saved to {args.out}")
+        return
+
+    with open(args.before) as f:
+        before = json.load(f)
+    if args.after:
+        with open(args.after) as f:
+            after = json.load(f)
+    else:
+        after = scrape(requests.Session(), args.url)
+        if after is None:
+            print(f"❌ Error: could not scrape {args.url}")
+            sys.exit(1)
+    families = compute_deltas(before, after, tuple(args.prefix) if args.prefix else DEFAULT_PREFIXES)
+    print_deltas(families)
+    with open(args.report, "w") as f:
+        json.dump(families, f, indent=2)
+    print(f"\n💾 Deltas saved to: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+AI Chat Payload Benchmark - Full vs Compact Responses
+=====================================================
+Sends the same car-returning questions in each response mode and reports
+what a client actually pays per reply:
+
+- wire bytes as received (Accept-Encoding: br, gzip - the compression()
+  middleware picks the encoding) and the decoded JSON size
+- gzip / brotli size of the decoded body, for comparison across modes
+- server serialization time (Server-Timing: serialize) and client parse
+  time, plus re-serializing the cars into conversationHistory (the echo
+  every turn pays in full-history mode)
+
+Modes: full (legacy), compact (default fields, intelligence by id) and
+minimal (carFields=id,name,price). brotli sizes need the `brotli` package.
+
+Run: python eval_payload.py --limit 20
+     python eval_payload.py --mode full --mode compact --report EVAL_PAYLOAD_REPORT.json
+"""
+
+import argparse
+import gzip
+import json
+import re
+import sys
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import requests
+
+from eval_corpus import DEFAULT_CORPUS, iter_cases
+from eval_runner import API_URL, TIMEOUT
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_REPORT = "EVAL_PAYLOAD_REPORT.json"
+MODES = OrderedDict([
+    ("full", {}),
+    ("compact", {"compact": True}),
+    ("minimal", {"carFields": ["id", "name", "price"]}),
+])
+SERVER_TIMING_RE = re.compile(r"serialize;dur=([\d.]+)")
+
+
+def decode(raw: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        return gzip.decompress(raw)
+    if encoding == "deflate":
+        return zlib.decompress(raw)
+    if encoding == "br":
+        if brotli is None:
+            raise RuntimeError("br response but the brotli package isn't installed")
+        return brotli.decompress(raw)
+    return raw
+
+
+def measure(session: requests.Session, api_url: str, message: str, options: dict) -> dict:
+    payload = {"message": message, "sessionId": f"payload-bench-{int(time.time() * 1000)}",
+               "conversationHistory": [], **options}
+    accept = "br, gzip" if brotli is not None else "gzip"
+    start = time.time()
+    response = session.post(api_url, json=payload, timeout=TIMEOUT, stream=True,
+                            headers={"Accept-Encoding": accept})
+    # Undecoded bytes = what crossed the network
+    raw = response.raw.read(decode_content=False)
+    latency = time.time() - start
+    encoding = response.headers.get("Content-Encoding", "identity")
+    body = decode(raw, encoding)
+
+    parse_start = time.perf_counter()
+    data = json.loads(body)
+    parse_ms = (time.perf_counter() - parse_start) * 1000
+    cars = data.get("cars", []) or []
+    echo_start = time.perf_counter()
+    echo = json.dumps({"role": "ai", "content": data.get("reply", ""), "cars": cars})
+    echo_ms = (time.perf_counter() - echo_start) * 1000
+
+    timing = SERVER_TIMING_RE.search(response.headers.get("Server-Timing", ""))
+    return {
+        "status": response.status_code,
+        "encoding": encoding,
+        "wire_bytes": len(raw),
+        "json_bytes": len(body),
+        "gzip_bytes": len(gzip.compress(body, 6)),
+        "br_bytes": len(brotli.compress(body, quality=4)) if brotli is not None else None,
+        "cars_bytes": len(json.dumps(cars).encode("utf-8")),
+        "echo_bytes": len(echo.encode("utf-8")),
+        "cars": len(cars),
+        "server_serialize_ms": float(timing.group(1)) if timing else None,
+        "client_parse_ms": round(parse_ms, 3),
+        "client_echo_ms": round(echo_ms, 3),
+        "latency": round(latency, 3),
+    }
+
+
+def mean(values: List[Optional[float]]) -> Optional[float]:
+    values = [v for v in values if v is not None]
+    return round(sum(values) / len(values), 3) if values else None
+
+
+def summarize(samples: List[dict]) -> dict:
+    ok = [s for s in samples if s["status"] == 200]
+    keys = ("wire_bytes", "json_bytes", "gzip_bytes", "br_bytes", "cars_bytes", "echo_bytes",
+            "server_serialize_ms", "client_parse_ms", "client_echo_ms", "latency")
+    summary = OrderedDict((key, mean([s[key] for s in ok])) for key in keys)
+    summary["requests"] = len(samples)
+    summary["errors"] = len(samples) - len(ok)
+    summary["encodings"] = sorted({s["encoding"] for s in ok})
+    return summary
+
+
+def print_summary(summary: Dict[str, dict]):
+    base = summary.get("full")
+    print(f"\n{'Mode':10} {'wire':>8} {'json':>8} {'gzip':>8} {'br':>8} {'echo':>8} "
+          f"{'ser ms':>8} {'parse ms':>9} {'vs full':>8}")
+    for mode, s in summary.items():
+        saving = ""
+        if base and base["json_bytes"] and mode != "full":
+            saving = f"{(1 - s['json_bytes'] / base['json_bytes']) * 100:.1f}%"
+        print(f"{mode:10} {s['wire_bytes'] or 0:8.0f} {s['json_bytes'] or 0:8.0f} {s['gzip_bytes'] or 0:8.0f} "
+              f"{s['br_bytes'] or 0:8.0f} {s['echo_bytes'] or 0:8.0f} {s['server_serialize_ms'] or 0:8.3f} "
+              f"{s['client_parse_ms'] or 0:9.3f} {saving:>8}")
+    print("   (mean bytes per reply; echo = reply + cars re-sent as history next turn)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Payload bytes and serialization time per ai-chat response mode")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--suite", action="append")
+    parser.add_argument("--limit", type=int, default=20, help="Car-returning questions to send per mode")
+    parser.add_argument("--mode", action="append", choices=list(MODES))
+    parser.add_argument("--url", default=API_URL)
+    parser.add_argument("--report", default=DEFAULT_REPORT)
+    args = parser.parse_args()
+
+    # Single-turn questions that expect cars back - the payloads this is about
+    messages = []
+    for case in iter_cases(args.corpus, args.suite):
+        check = (case["turns"][0].get("expect") or {}).get("check")
+        if len(case["turns"]) == 1 and check in ("cars", "response_type") and not case.get("history"):
+            messages.append(case["turns"][0]["message"])
+        if len(messages) >= args.limit:
+            break
+    if not messages:
+        print(f"❌ Error: no car-returning questions in {args.corpus}")
+        sys.exit(1)
+    modes = args.mode or list(MODES)
+    print(f"📦 {len(messages)} questions × {len(modes)} modes"
+          + ("" if brotli is not None else " (brotli not installed - gzip only)"))
+
+    session = requests.Session()
+    samples: Dict[str, List[dict]] = OrderedDict((mode, []) for mode in modes)
+    for i, message in enumerate(messages, 1):
+        for mode in modes:
+            try:
+                samples[mode].append(measure(session, args.url, message, MODES[mode]))
+            except Exception as e:
+                print(f"   ❌ {mode} '{message[:40]}': {e}")
+                samples[mode].append({"status": None})
+        if i % 5 == 0:
+            print(f"   {i}/{len(messages)} questions", flush=True)
+
+    summary = OrderedDict((mode, summarize(mode_samples)) for mode, mode_samples in samples.items())
+    print_summary(summary)
+
+    with open(args.report, "w") as f:
+        json.dump({"timestamp": datetime.now().isoformat(), "questions": messages,
+                   "summary": summary, "samples": samples}, f, indent=2)
+    print(f"💾 Report saved to: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Harness Profiling Client
+========================
+Brackets harness scenarios with V8 CPU profiles / heap snapshots taken by
+the backend (/api/admin/profiling, admin only).
+
+- CPU profiles are header-scoped: the runner tags every request of the
+  scenario with X-Profile-Session, and the backend only counts samples
+  taken while one of those requests was in flight
+- Each profile is downloaded (.cpuprofile / .heapsnapshot, loadable in
+  Chrome DevTools) and the top self-time functions are printed per scenario
+
+The profiler lives in one backend process. In a PM2 cluster the scenario's
+requests (and even start/stop) are spread across workers, so run against a
+single instance (instances: 1, or one worker's own port). login() fails fast
+when /status answers from more than one pid, and every call checks that it
+reached the worker the profile was started on.
+
+Auth: EVAL_ADMIN_TOKEN (Bearer), else ADMIN_EMAIL + ADMIN_PASSWORD are used
+to log in via /api/auth/login (cookie session).
+
+Used by eval_runner.py --profile.
+"""
+
+import os
+from typing import Callable, List, Tuple
+
+import requests
+
+PROFILING_PATH = "/api/admin/profiling"
+LOGIN_PATH = "/api/auth/login"
+PROFILE_HEADER = "X-Profile-Session"
+DEFAULT_PROFILE_DIR = "eval_profiles"
+CLUSTER_PROBES = 4  # fresh connections used to detect several workers
+
+
+class ProfilingError(Exception):
+    pass
+
+
+class ProfilingClient:
+    def __init__(self, origin: str, profile_dir: str = DEFAULT_PROFILE_DIR):
+        self.origin = origin
+        self.base = f"{origin}{PROFILING_PATH}"
+        self.profile_dir = profile_dir
+        self.session = requests.Session()
+        self.pid = None
+
+    def login(self):
+        """Authenticate as an admin; raises ProfilingError if the profiler isn't reachable"""
+        token = os.environ.get("EVAL_ADMIN_TOKEN")
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+        elif os.environ.get("ADMIN_EMAIL") and os.environ.get("ADMIN_PASSWORD"):
+            response = self.session.post(f"{self.origin}{LOGIN_PATH}", json={
+                "email": os.environ["ADMIN_EMAIL"],
+                "password": os.environ["ADMIN_PASSWORD"],
+            }, timeout=30)
+            if response.status_code != 200:
+                raise ProfilingError(f"admin login failed: HTTP {response.status_code}")
+        self.pid = self._request("GET", "/status").get("pid")
+        self._check_single_worker()
+
+    def _check_single_worker(self):
+        """Each fresh connection is a new round-robin pick, so several pids mean a cluster"""
+        pids = {self.pid}
+        for _ in range(CLUSTER_PROBES):
+            probe = requests.Session()
+            probe.headers.update(self.session.headers)
+            probe.cookies.update(self.session.cookies)
+            try:
+                response = probe.get(f"{self.base}/status", timeout=30)
+                if response.status_code == 200:
+                    pids.add(response.json().get("pid"))
+            except (requests.RequestException, ValueError):
+                pass
+            finally:
+                probe.close()
+        if len(pids) > 1:
+            raise ProfilingError(
+                f"backend answered from several workers (pids {sorted(p for p in pids if p)}); "
+                "profile a single instance")
+
+    def _check_worker(self, data: dict, what: str) -> dict:
+        pid = data.get("pid")
+        if self.pid and pid and pid != self.pid:
+            raise ProfilingError(f"{what} reached worker {pid}, not {self.pid}; profile a single instance")
+        return data
+
+    def _request(self, method: str, path: str, **kwargs) -> dict:
+        try:
+            response = self.session.request(method, f"{self.base}{path}", timeout=120, **kwargs)
+        except requests.RequestException as e:
+            raise ProfilingError(str(e))
+        if response.status_code != 200:
+            try:
+                detail = response.json().get("error") or response.json().get("message")
+            except ValueError:
+                detail = response.text[:200]
+            raise ProfilingError(f"{method} {path}: HTTP {response.status_code} {detail or ''}".strip())
+        return response.json()
+
+    def start_cpu(self, sampling_interval_us: int = 1000) -> str:
+        """Start a header-scoped CPU profile; returns the session id to tag requests with"""
+        data = self._request("POST", "/cpu/start", json={"scope": "header", "samplingIntervalUs": sampling_interval_us})
+        return self._check_worker(data, "cpu/start")["sessionId"]
+
+    def stop_cpu(self) -> dict:
+        return self._check_worker(self._request("POST", "/cpu/stop"), "cpu/stop")
+
+    def heap_snapshot(self) -> dict:
+        return self._check_worker(self._request("POST", "/heap/snapshot"), "heap/snapshot")
+
+    def download(self, profile_id: str, name: str) -> str:
+        """Save a stored profile as <profile_dir>/<name>; returns the path"""
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(self.profile_dir, name)
+        with self.session.get(f"{self.base}/profiles/{profile_id}", stream=True, timeout=300) as response:
+            if response.status_code != 200:
+                raise ProfilingError(f"download {profile_id}: HTTP {response.status_code}")
+            with open(path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=1 << 20):
+                    f.write(chunk)
+        return path
+
+
+def print_cpu_summary(scenario: str, result: dict, top: int = 15):
+    print(f"\n🔬 CPU PROFILE: {scenario} - {result['scopedRequests']} requests, "
+          f"{result['sampledMs']}ms sampled of {result['durationMs']}ms")
+    if not result["topSelfTime"]:
+        print("   (no samples inside the scenario's requests)")
+        return
+    print(f"   {'Self ms':>9} {'%':>6}  Function")
+    for entry in result["topSelfTime"][:top]:
+        location = f"  {entry['location']}" if entry["location"] else ""
+        print(f"   {entry['selfMs']:>9.1f} {entry['selfPercent']:>5.1f}%  {entry['functionName']}{location}")
+
+
+
+def profile_scenario(client: ProfilingClient, mode: str, scenario: str, run_id: str,
+                     run: Callable[[dict], List]) -> Tuple[List, dict]:
+    """Run one scenario (run(headers) -> results) bracketed by the requested profiles"""
+    headers = {}
+    if mode in ("cpu", "both"):
+        headers[PROFILE_HEADER] = client.start_cpu()
+    try:
+        results = run(headers)
+    finally:
+        cpu = client.stop_cpu() if headers else None
+
+    record = {}
+    if cpu:
+        cpu["file"] = client.download(cpu["profileId"], f"{run_id}-{scenario}.cpuprofile")
+        print_cpu_summary(scenario, cpu)
+        record["cpu"] = cpu
+    if mode in ("heap", "both"):
+        heap = client.heap_snapshot()
+        heap["file"] = client.download(heap["profileId"], f"{run_id}-{scenario}.heapsnapshot")
+        print(f"📸 Heap snapshot after {scenario}: {heap['bytes'] / 1048576:.1f}MB → {heap['file']}")
+        record["heap"] = heap
+    return results, record
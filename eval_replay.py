@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+AI Chat Traffic Replay - Production Interactions with Original Timing
+=====================================================================
+Replays a window of real chat traffic exported from the AIInteraction
+collection (backend: npm run export:interactions -- --since 6h) against a
+target backend, instead of the synthetic case lists of the other harnesses:
+
+- inter-arrival gaps are kept (scaled by --speed: 1, 10, or max to drop them)
+- each session's turns are sent in order, one at a time, with the history
+  growing like the frontend's, so long sessions and repeated queries hit
+  the session store and caches the way real users do
+- a turn never starts before the previous turn of its session answered;
+  when the target (or --max-sessions) can't keep up, the turn starts late
+  and the delay is reported as schedule lag instead of being hidden
+
+Reports latency percentiles per queryType next to the response times
+recorded in production, error rates, achieved vs recorded request rate
+and schedule lag, plus the token summary of eval_tokens.py. --profile only describes the capture (sessions, turns,
+burstiness, repeated queries) without sending anything.
+
+Every replayed turn is a real chat request (LLM tokens are spent);
+--limit caps the number of interactions.
+
+Run: python eval_replay.py replay.jsonl --profile
+     python eval_replay.py replay.jsonl --speed 1
+     python eval_replay.py replay.jsonl --speed 10 --url http://staging:5001/api/ai-chat
+     python eval_replay.py replay.jsonl --speed max --max-sessions 32
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List
+
+import requests
+
+from eval_baseline import mean, percentile
+from eval_runner import API_URL, run_turn
+from eval_tokens import print_token_summary, summarize_tokens
+
+DEFAULT_REPORT = "EVAL_REPLAY_REPORT.json"
+REPLAY_FORMAT = "ai-interactions-replay/1"
+
+
+def parse_speed(value: str) -> float:
+    """'1', '10', '10x' or 'max' (gaps dropped) → time compression factor"""
+    value = value.strip().lower()
+    if value == "max":
+        return float("inf")
+    value = value.rstrip("x")
+    try:
+        speed = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid speed: {value}")
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("speed must be positive")
+    return speed
+
+
+def load_replay(path: str, limit: int = 0) -> tuple:
+    """Export file → (header, interactions in arrival order)"""
+    with open(path) as f:
+        header = json.loads(f.readline())
+        if header.get("format") != REPLAY_FORMAT:
+            raise ValueError(f"{path} is not an interaction export ({header.get('format')})")
+        rows = []
+        for line in f:
+            if line.strip():
+                rows.append(json.loads(line))
+                if limit and len(rows) >= limit:
+                    break
+    rows.sort(key=lambda r: r["t"])
+    for i, row in enumerate(rows):
+        row["i"] = i
+    return header, rows
+
+
+def group_sessions(rows: List[dict]) -> "OrderedDict[str, List[dict]]":
+    """Session → its turns, sessions ordered by first arrival"""
+    sessions: "OrderedDict[str, List[dict]]" = OrderedDict()
+    for row in rows:
+        sessions.setdefault(row["s"], []).append(row)
+    return sessions
+
+
+def peak_rate(offsets_ms: List[float], window_s: float = 1.0) -> int:
+    """Most requests arriving within any window_s window"""
+    best, lo = 0, 0
+    for hi in range(len(offsets_ms)):
+        while offsets_ms[hi] - offsets_ms[lo] >= window_s * 1000:
+            lo += 1
+        best = max(best, hi - lo + 1)
+    return best
+
+
+def profile(rows: List[dict]) -> dict:
+    """Shape of the capture: the things synthetic workloads don't reproduce"""
+    sessions = group_sessions(rows)
+    lengths = [len(turns) for turns in sessions.values()]
+    offsets = [r["t"] for r in rows]
+    duration_s = (offsets[-1] - offsets[0]) / 1000 if len(offsets) > 1 else 0
+    gaps = [(b - a) / 1000 for a, b in zip(offsets, offsets[1:])]
+    queries = Counter(r["q"].strip().lower() for r in rows)
+    return {
+        "interactions": len(rows),
+        "sessions": len(sessions),
+        "duration_s": round(duration_s, 1),
+        "mean_rate_per_s": round(len(rows) / duration_s, 3) if duration_s else None,
+        "peak_per_1s": peak_rate(offsets, 1),
+        "peak_per_10s": peak_rate(offsets, 10),
+        "turns_per_session": {"mean": round(mean(lengths), 2), "p50": percentile(lengths, 50),
+                              "p95": percentile(lengths, 95), "max": max(lengths)},
+        "gap_s": {"p50": round(percentile(gaps, 50), 3), "p95": round(percentile(gaps, 95), 3)} if gaps else None,
+        "repeated_query_share": round(sum(n for n in queries.values() if n > 1) / len(rows), 3),
+        "top_queries": queries.most_common(5),
+        "query_types": dict(Counter(r["k"] for r in rows).most_common()),
+    }
+
+
+class Replayer:
+    """Sends each session's turns in order at their (scaled) original offsets"""
+
+    def __init__(self, api_url: str, speed: float, run_id: str):
+        self.api_url = api_url
+        self.speed = speed
+        self.run_id = run_id
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.results: List[dict] = []
+        self.t0 = 0.0
+
+    def due(self, row: dict) -> float:
+        return self.t0 if self.speed == float("inf") else self.t0 + row["t"] / 1000 / self.speed
+
+    def run_session(self, session_key: str, turns: List[dict]):
+        if not hasattr(self.local, "session"):
+            self.local.session = requests.Session()
+        session_id = f"replay-{self.run_id}-{session_key}"
+        history: List[dict] = []
+        for index, row in enumerate(turns):
+            due = self.due(row)
+            wait = due - time.time()
+            if wait > 0:
+                time.sleep(wait)
+            started = time.time()
+            result, entries = run_turn(self.local.session, {"message": row["q"]}, self.api_url, session_id, history)
+            with self.lock:
+                self.results.append({
+                    "i": row["i"],
+                    "session": session_key,
+                    "turn": index,
+                    "query_type": row["k"],
+                    "message": row["q"],
+                    "recorded_ms": row.get("rt"),
+                    "offset_s": round(started - self.t0, 3),
+                    "lag_s": round(started - due, 3),
+                    "response_time": result.get("response_time"),
+                    "status": result.get("status"),
+                    "error": result.get("error"),
+                    "usage": result.get("usage"),
+                    "started_at": result["started_at"],
+                    "trace_id": result["trace_id"],
+                })
+            if entries is None:
+                # The frontend would show the error and the user would retype;
+                # keep the session going with the history it has
+                continue
+            history.extend(entries)
+
+    def run(self, rows: List[dict], max_sessions: int) -> float:
+        sessions = group_sessions(rows)
+        self.t0 = time.time() + 0.5
+        with ThreadPoolExecutor(max_workers=max_sessions) as executor:
+            for key, turns in sessions.items():
+                executor.submit(self.run_session, key, turns)
+        return time.time() - self.t0
+
+
+def latency_stats(values: List[float]) -> dict:
+    if not values:
+        return {"n": 0}
+    return {"n": len(values), "p50": round(percentile(values, 50), 3), "p95": round(percentile(values, 95), 3),
+            "p99": round(percentile(values, 99), 3), "mean": round(mean(values), 3)}
+
+
+def summarize(results: List[dict], elapsed: float, capture: dict, speed: float) -> dict:
+    by_type: Dict[str, List[dict]] = OrderedDict()
+    for r in sorted(results, key=lambda r: r["query_type"]):
+        by_type.setdefault(r["query_type"], []).append(r)
+    ok = [r for r in results if not r["error"] and r["status"] == 200]
+
+    def group(rs: List[dict]) -> dict:
+        good = [r["response_time"] for r in rs if not r["error"] and r["status"] == 200]
+        recorded = [r["recorded_ms"] / 1000 for r in rs if r["recorded_ms"] is not None]
+        return {"requests": len(rs), "errors": len(rs) - len(good),
+                "latency_s": latency_stats(good), "recorded_s": latency_stats(recorded)}
+
+    lags = [r["lag_s"] for r in results]
+    return {
+        "requests": len(results),
+        "errors": len(results) - len(ok),
+        "elapsed_s": round(elapsed, 1),
+        "achieved_rate_per_s": round(len(results) / elapsed, 3) if elapsed > 0 else None,
+        "scheduled_rate_per_s": round(capture["mean_rate_per_s"] * speed, 3)
+        if capture["mean_rate_per_s"] and speed != float("inf") else None,
+        "overall": group(results),
+        "by_query_type": {k: group(v) for k, v in by_type.items()},
+        "lag_s": {"p50": round(percentile(lags, 50), 3), "p95": round(percentile(lags, 95), 3),
+                  "max": round(max(lags), 3)} if lags and speed != float("inf") else None,
+        "capture": capture,
+    }
+
+
+def print_profile(capture: dict, speed: float):
+    scaled = "max" if speed == float("inf") else f"{speed:g}x"
+    print(f"\n📼 {capture['interactions']} interactions, {capture['sessions']} sessions "
+          f"over {capture['duration_s']}s (replay at {scaled})")
+    t = capture["turns_per_session"]
+    print(f"   turns/session: mean {t['mean']} | p50 {t['p50']} | p95 {t['p95']} | max {t['max']}")
+    print(f"   rate: mean {capture['mean_rate_per_s']}/s | peak {capture['peak_per_1s']} in 1s, "
+          f"{capture['peak_per_10s']} in 10s")
+    print(f"   repeated queries: {capture['repeated_query_share'] * 100:.1f}% of traffic")
+    print("   query types: " + ", ".join(f"{k} {n}" for k, n in capture["query_types"].items()))
+
+
+def fmt_latency(stats: dict) -> str:
+    if not stats.get("n"):
+        return f"{'-':>7} {'-':>7} {'-':>7}"
+    return f"{stats['p50']:>7} {stats['p95']:>7} {stats['p99']:>7}"
+
+
+def print_summary(summary: dict):
+    print(f"\n{'queryType':16} {'reqs':>5} {'errs':>5} {'p50':>7} {'p95':>7} {'p99':>7}   "
+          f"{'rec p50':>7} {'rec p95':>7}")
+    rows = list(summary["by_query_type"].items()) + [("ALL", summary["overall"])]
+    for name, g in rows:
+        rec = g["recorded_s"]
+        recorded = f"{rec['p50']:>7} {rec['p95']:>7}" if rec.get("n") else f"{'-':>7} {'-':>7}"
+        print(f"{name:16} {g['requests']:>5} {g['errors']:>5} {fmt_latency(g['latency_s'])}   {recorded}")
+    scheduled = summary["scheduled_rate_per_s"]
+    print(f"\n⏱️  {summary['requests']} requests in {summary['elapsed_s']}s "
+          f"({summary['achieved_rate_per_s']}/s achieved" + (f", {scheduled}/s scheduled)" if scheduled else ")"))
+    lag = summary["lag_s"]
+    if lag:
+        print(f"🐢 Schedule lag: p50 {lag['p50']}s | p95 {lag['p95']}s | max {lag['max']}s")
+        if lag["p95"] > 1:
+            print("   ⚠️  turns started well after their scheduled time - the target (or --max-sessions) "
+                  "did not keep up, so the offered load was lower than recorded")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay exported production chat traffic with its original timing")
+    parser.add_argument("replay", help="File written by npm run export:interactions")
+    parser.add_argument("--url", default=API_URL)
+    parser.add_argument("--speed", type=parse_speed, default=1.0, help="1 (real time), N (N times faster) or max")
+    parser.add_argument("--max-sessions", type=int, default=64, help="Sessions replayed concurrently")
+    parser.add_argument("--limit", type=int, default=0, help="Only the first N interactions")
+    parser.add_argument("--profile", action="store_true", help="Describe the capture and exit (no requests)")
+    parser.add_argument("--report", default=DEFAULT_REPORT)
+    args = parser.parse_args()
+
+    try:
+        header, rows = load_replay(args.replay, args.limit)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    if not rows:
+        print(f"❌ Error: no interactions in {args.replay}")
+        sys.exit(1)
+
+    capture = profile(rows)
+    print(f"🗂️  Export {header.get('since')} → {header.get('until')} (exported {header.get('exportedAt')})")
+    print_profile(capture, args.speed)
+    if args.profile:
+        return
+
+    replayer = Replayer(args.url, args.speed, uuid.uuid4().hex[:8])
+    elapsed = replayer.run(rows, args.max_sessions)
+    results = sorted(replayer.results, key=lambda r: r["i"])
+    summary = summarize(results, elapsed, capture, args.speed)
+    print_summary(summary)
+    tokens = summarize_tokens(results)
+    if tokens["overall"]["llm_calls"]:
+        print_token_summary(tokens)
+
+    with open(args.report, "w") as f:
+        json.dump({"timestamp": datetime.now().isoformat(), "replay": args.replay, "export": header,
+                   "speed": "max" if args.speed == float("inf") else args.speed,
+                   "max_sessions": args.max_sessions, "url": args.url, **summary, "tokens": tokens,
+                   "results": results},
+                  f, indent=2, ensure_ascii=False)
+    print(f"💾 Report saved to: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
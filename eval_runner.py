@@ -0,0 +1,899 @@
+#!/usr/bin/env python3
+"""
+Sharded Evaluation Runner
+=========================
+Runs the unified corpus (eval_corpus.jsonl) against the AI chat API.
+
+- The corpus is split deterministically into N shards (by case id) and each
+  shard runs in its own worker process; multi-turn cases always stay whole
+  inside one shard, with history built from the real replies.
+- Each worker streams the corpus itself, so nothing is loaded up front.
+- No fixed sleeps between requests: a full regression takes as long as the
+  slowest shard rather than the sum of all scripts.
+- Results are merged and reported per suite with the same pass criteria as
+  the original scripts, in each script's report format (the accuracy suite
+  still writes AI_TEST_RESULTS.json). Reply-only smoke suites print their
+  conversation; their scripts' quality scores are not reproduced.
+  With --sink, results are instead appended to a JSONL file as each case
+  finishes (eval_sink.py) and the summary is computed by streaming it back.
+- Results are cached per (case hash, backend fingerprint) - see eval_cache.py -
+  so only cases whose inputs or backend components changed are re-run.
+- 429s are not failures: the turn waits out Retry-After and is retried.
+  With --adaptive, an AIMD controller (eval_throttle.py) replaces the fixed
+  shards and converges on the concurrency the deployment sustains.
+
+Run: python eval_runner.py --shards 8
+     python eval_runner.py --suite accuracy --suite tricky --shards 4
+     python eval_runner.py --rerun      (ignore cached results, refresh the cache)
+     python eval_runner.py --adaptive --max-concurrency 32 --no-cache
+     python eval_runner.py --suite accuracy --profile   (CPU profile per suite, see eval_profile.py)
+     python eval_runner.py --metrics --no-cache         (/metrics deltas for the run, see eval_metrics.py)
+     python eval_runner.py --sink EVAL_RESULTS.jsonl.gz --resume  (stream results, resume after a crash)
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+from datetime import datetime
+from multiprocessing import Pool
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from eval_cache import DEFAULT_CACHE_DIR, ResultCache, case_hash, diff_components, fetch_fingerprint
+from eval_corpus import DEFAULT_CORPUS, iter_cases
+from eval_metrics import compute_deltas, metrics_url_for, print_deltas, scrape
+from eval_profile import DEFAULT_PROFILE_DIR, ProfilingClient, ProfilingError, profile_scenario
+from eval_sink import ResultSink, completed_ids, iter_records, summarize
+from eval_throttle import DEFAULT_RETRY_AFTER, AIMDController, retry_after_seconds
+from eval_tokens import parse_usage_header, print_token_summary, summarize_tokens
+
+API_URL = os.environ.get("AI_CHAT_URL", "http://localhost:5001/api/ai-chat")
+TIMEOUT = 30
+MAX_RATE_LIMIT_RETRIES = 5
+# Cases handed to the pool at a time in streaming mode (bounds the task queue)
+STREAM_BATCH = 256
+
+# ============================================
+# EXPECTATION CHECKS (same rules as the scripts they came from)
+# ============================================
+
+TRICKY_ASKING_KEYWORDS = ["how many people", "where will you", "what's your budget", "seating", "usage"]
+TRICKY_INFO_KEYWORDS = ["based on", "according", "news", "rating", "mileage",
+                        "safety", "problem", "issue", "waiting", "launch"]
+REQUIREMENT_PROMPTS = ["what's your budget", "how many people", "where will you drive",
+                       "what kind of car", "tell me more about"]
+DIRECT_ANSWER_KEYWORDS = ["mileage", "reliable", "safety", "rating", "problem", "issue",
+                          "owner", "review", "feedback", "based on", "according to"]
+
+
+def check_cars(expect: dict, reply: str, cars: List[dict], data: dict):
+    returned = [car.get("name", "") for car in cars]
+    returned_lower = [c.lower() for c in returned]
+    expected_lower = [c.lower() for c in expect.get("expected_cars", [])]
+    match = expect.get("match", "any")
+
+    if match == "nonempty" or not expected_lower:
+        passed = len(returned) > 0
+    elif match == "first":
+        passed = bool(returned) and returned_lower[0] in expected_lower
+    elif match == "all":
+        passed = all(exp in returned_lower for exp in expected_lower)
+    else:
+        passed = any(exp in returned_lower for exp in expected_lower)
+    return passed, returned[0] if returned else ""
+
+
+def check_response_type(expect: dict, reply: str, cars: List[dict], data: dict):
+    reply_lower = reply.lower()
+    if cars:
+        actual = "recommendation"
+    elif data.get("needsMoreInfo", False) or any(k in reply_lower for k in expect.get("keywords", [])):
+        actual = "recommendation"
+    else:
+        actual = "query"
+    return actual == expect["expected"], actual
+
+
+def check_intent(expect: dict, reply: str, cars: List[dict], data: dict):
+    reply_lower = reply.lower()
+    if any(k in reply_lower for k in TRICKY_ASKING_KEYWORDS) and "?" in reply:
+        actual = "recommendation"
+    elif any(k in reply_lower for k in TRICKY_INFO_KEYWORDS) or len(reply) > 100:
+        actual = "query"
+    else:
+        actual = "unclear"
+    return actual == expect["expected"], actual
+
+
+def check_direct_answer(expect: dict, reply: str, cars: List[dict], data: dict):
+    reply_lower = reply.lower()
+    asking = any(k in reply_lower for k in REQUIREMENT_PROMPTS)
+    direct = any(k in reply_lower for k in DIRECT_ANSWER_KEYWORDS)
+    return direct and not asking, "asking" if asking else "direct" if direct else "unclear"
+
+
+def check_asks_requirements(expect: dict, reply: str, cars: List[dict], data: dict):
+    reply_lower = reply.lower()
+    asks = "?" in reply and (
+        "budget" in reply_lower
+        or any(w in reply_lower for w in ["how many", "people", "seating"])
+        or any(w in reply_lower for w in ["drive", "city", "highway", "usage"])
+    )
+    if cars:
+        return False, f"showed {len(cars)} cars"
+    return asks, "asking" if asks else "unclear"
+
+
+def check_reply_any(expect: dict, reply: str, cars: List[dict], data: dict):
+    reply_lower = reply.lower()
+    hit = next((k for k in expect.get("keywords", []) if k.lower() in reply_lower), None)
+    return hit is not None, hit or ""
+
+
+def check_reply(expect: dict, reply: str, cars: List[dict], data: dict):
+    return bool(reply.strip()), f"{len(reply)} chars"
+
+
+CHECKS = {
+    "cars": check_cars,
+    "response_type": check_response_type,
+    "intent": check_intent,
+    "direct_answer": check_direct_answer,
+    "asks_requirements": check_asks_requirements,
+    "reply_any": check_reply_any,
+    "reply": check_reply,
+}
+
+# ============================================
+# WORKER
+# ============================================
+
+def post_turn(session: requests.Session, api_url: str, payload: dict,
+              controller: Optional[AIMDController] = None, headers: Optional[dict] = None) -> tuple:
+    """POST one turn; 429s wait out Retry-After and retry instead of failing the case"""
+    throttled = 0
+    while True:
+        if controller:
+            controller.wait_if_paused()
+        start = time.time()
+        try:
+            response = session.post(api_url, json=payload, timeout=TIMEOUT, headers=headers)
+        except Exception:
+            if controller:
+                controller.on_response(None, time.time() - start)
+            raise
+        latency = time.time() - start
+        if controller:
+            controller.on_response(response.status_code, latency, response.headers)
+        if response.status_code != 429 or throttled >= MAX_RATE_LIMIT_RETRIES:
+            return response, latency, throttled
+        throttled += 1
+        if not controller:
+            time.sleep(retry_after_seconds(response.headers) or DEFAULT_RETRY_AFTER)
+
+
+def body_bytes(payload: dict) -> int:
+    """Request body size as requests' json= serializes it"""
+    return len(json.dumps(payload).encode("utf-8"))
+
+
+def run_turn(session: requests.Session, turn: dict, api_url: str, session_id: str, history: List[dict],
+             controller: Optional[AIMDController] = None, session_version: Optional[int] = None,
+             session_token: Optional[str] = None) -> tuple:
+    """One turn against the given history → (result, the two history entries it adds, or None on error)
+
+    With session_version, only the message, version and the session token the
+    server issued (if any yet) are sent (server-side session store); a 409
+    resends the full history once to re-seed it.
+    """
+    expect = turn.get("expect") or {"check": "reply"}
+    start = time.time()
+    # W3C trace context: the backend continues this trace (eval_traces.py joins on trace_id)
+    trace_id, span_id = uuid.uuid4().hex, uuid.uuid4().hex[:16]
+    result = {"message": turn["message"], "check": expect.get("check", "reply"),
+              "trace_id": trace_id, "span_id": span_id, "started_at": round(start, 3)}
+    headers = {"traceparent": f"00-{trace_id}-{span_id}-01"}
+    payload = {"message": turn["message"], "sessionId": session_id}
+    if session_version is None:
+        payload["conversationHistory"] = history
+    else:
+        payload["sessionVersion"] = session_version
+        if session_token:
+            payload["sessionToken"] = session_token
+    try:
+        response, latency, throttled = post_turn(session, api_url, payload, controller, headers)
+        result["request_bytes"] = body_bytes(payload)
+        result["response_bytes"] = len(response.content)
+        if response.status_code == 409 and session_version is not None:
+            payload["conversationHistory"] = history
+            first_latency, first_throttled = latency, throttled
+            response, latency, throttled = post_turn(session, api_url, payload, controller, headers)
+            result["request_bytes"] += body_bytes(payload)
+            result["response_bytes"] += len(response.content)
+            result["resynced"] = True
+            latency, throttled = latency + first_latency, throttled + first_throttled
+        result["response_time"] = latency
+        result["status"] = response.status_code
+        if throttled:
+            result["throttled"] = throttled
+        tokens = response.headers.get("X-AI-Tokens")
+        if tokens and tokens.isdigit():
+            result["tokens"] = int(tokens)
+        usage = parse_usage_header(response.headers.get("X-AI-Usage"))
+        if usage:
+            result["usage"] = usage
+
+        if response.status_code != 200:
+            result.update(passed=False, error=f"HTTP {response.status_code}", returned_cars=[])
+            return result, None
+
+        data = response.json()
+        reply = data.get("reply", "")
+        cars = data.get("cars", []) or []
+        passed, actual = CHECKS[result["check"]](expect, reply, cars, data)
+        result.update(
+            passed=passed,
+            actual=actual,
+            reply=reply[:200],
+            returned_cars=[car.get("name", "") for car in cars][:5],
+        )
+        if session_version is not None:
+            result["session_version"] = data.get("sessionVersion")
+            result["session_token"] = data.get("sessionToken") or session_token
+        return result, [
+            {"role": "user", "content": turn["message"]},
+            {"role": "ai", "content": reply, "cars": cars, "conversationState": data.get("conversationState")},
+        ]
+    except Exception as e:
+        result.update(response_time=time.time() - start, passed=False, error=str(e), returned_cars=[])
+        return result, None
+
+
+def run_case(session: requests.Session, case: dict, api_url: str, run_id: str,
+             controller: Optional[AIMDController] = None, deltas: bool = False) -> dict:
+    """Run every turn of a case in one session; history grows like the frontend's
+
+    deltas=True uses the server-side session store: seeded cases re-seed it
+    on the first turn, later turns send only the new message.
+    """
+    session_id = f"eval-{case['id']}-{run_id}"
+    history = list(case.get("history", []))
+    version = (-1 if history else 0) if deltas else None
+    token = None
+    turns = []
+
+    for i, turn in enumerate(case["turns"]):
+        result, entries = run_turn(session, turn, api_url, session_id, history, controller, version, token)
+        token = result.pop("session_token", None) or token
+        turns.append({"turn": i, **result})
+        if entries is None:
+            break
+        history.extend(entries)
+        if deltas:
+            # null = the server couldn't store the turn; -1 forces a resync next time
+            version = result.get("session_version")
+            version = -1 if version is None else version
+
+    return {
+        "id": case["id"],
+        "index": case["index"],
+        "suite": case["suite"],
+        "category": case.get("category", case["suite"]),
+        "description": case.get("description", ""),
+        "expect": case["turns"][0].get("expect", {}),
+        "passed": len(turns) == len(case["turns"]) and all(t["passed"] for t in turns),
+        "response_time": sum(t.get("response_time", 0) for t in turns),
+        "turns": turns,
+    }
+
+
+def run_shard(job: tuple) -> List[dict]:
+    """Worker process: stream the corpus, run only this shard's cases"""
+    corpus, suites, shard, num_shards, api_url, run_id, skip_ids, headers = job
+    session = requests.Session()
+    session.headers.update(headers)
+    results = []
+    started = time.time()
+    for case in iter_cases(corpus, suites, shard, num_shards):
+        if case["id"] in skip_ids:
+            continue
+        results.append(run_case(session, case, api_url, run_id))
+    passed = sum(1 for r in results if r["passed"])
+    print(f"   🧵 shard {shard + 1}/{num_shards}: {passed}/{len(results)} passed in {time.time() - started:.1f}s",
+          flush=True)
+    return results
+
+
+def iter_adaptive(corpus: str, suites: Optional[List[str]], skip_ids: frozenset, api_url: str,
+                  run_id: str, controller: AIMDController, headers: Optional[dict] = None) -> Iterator[dict]:
+    """Single process, threads gated by the AIMD controller (one slot per case); yields as cases finish"""
+    local = threading.local()
+
+    def worker(case: dict) -> dict:
+        try:
+            if not hasattr(local, "session"):
+                local.session = requests.Session()
+                local.session.headers.update(headers or {})
+            return run_case(local.session, case, api_url, run_id, controller)
+        finally:
+            controller.release()
+
+    pending = set()
+    dispatched = 0
+    last_report = time.time()
+    with ThreadPoolExecutor(max_workers=controller.max_limit) as executor:
+        for case in iter_cases(corpus, suites):
+            if case["id"] in skip_ids:
+                continue
+            controller.acquire()
+            pending.add(executor.submit(worker, case))
+            dispatched += 1
+            done = {f for f in pending if f.done()}
+            pending -= done
+            for f in done:
+                yield f.result()
+            if time.time() - last_report >= 10:
+                last_report = time.time()
+                s = controller.summary()
+                print(f"   🎚️  limit {s['final_limit']:.1f} | {s['throughput_rps']} req/s | "
+                      f"{dispatched} cases dispatched | events {s['events']}", flush=True)
+        for f in as_completed(pending):
+            yield f.result()
+
+
+_worker_session: Optional[requests.Session] = None
+
+
+def _init_stream_worker(headers: dict):
+    global _worker_session
+    _worker_session = requests.Session()
+    _worker_session.headers.update(headers)
+
+
+def _run_case_job(job: tuple) -> dict:
+    case, api_url, run_id = job
+    return run_case(_worker_session, case, api_url, run_id)
+
+
+def iter_streamed(args, suites: Optional[List[str]], run_id: str, skip_ids: frozenset,
+                  controller: Optional[AIMDController] = None, headers: Optional[dict] = None) -> Iterator[dict]:
+    """Results one at a time as cases finish, never holding the run in memory"""
+    if controller:
+        yield from iter_adaptive(args.corpus, suites, skip_ids, args.url, run_id, controller, headers)
+        return
+    cases = (case for case in iter_cases(args.corpus, suites) if case["id"] not in skip_ids)
+    with Pool(processes=args.shards, initializer=_init_stream_worker, initargs=(headers or {},)) as pool:
+        while True:
+            batch = [(case, args.url, run_id) for case in islice(cases, STREAM_BATCH)]
+            if not batch:
+                break
+            yield from pool.imap_unordered(_run_case_job, batch)
+
+
+def run_suites(args, suites: Optional[List[str]], run_id: str, skip_ids: frozenset,
+               controller: Optional[AIMDController] = None, headers: Optional[dict] = None) -> List[List[dict]]:
+    """Per-shard result lists, from the process pool or the adaptive runner"""
+    if controller:
+        return [list(iter_adaptive(args.corpus, suites, skip_ids, args.url, run_id, controller, headers))]
+    jobs = [(args.corpus, suites, shard, args.shards, args.url, run_id, skip_ids, headers or {})
+            for shard in range(args.shards)]
+    with Pool(processes=args.shards) as pool:
+        return pool.map(run_shard, jobs)
+
+# ============================================
+# REPORTING
+# ============================================
+
+def write_accuracy_report(results: List[dict]) -> float:
+    """Same summary, category table and AI_TEST_RESULTS.json as test_ai_accuracy.py"""
+    categories = OrderedDict()
+    for r in results:
+        data = categories.setdefault(r["category"], {"passed": 0, "failed": 0})
+        data["passed" if r["passed"] else "failed"] += 1
+
+    total_passed = sum(1 for r in results if r["passed"])
+    total_failed = len(results) - total_passed
+    accuracy = (total_passed / len(results)) * 100
+    avg_time = sum(r["response_time"] for r in results) / len(results)
+
+    print(f"\n{'='*60}")
+    print("📊 TEST RESULTS SUMMARY")
+    print(f"{'='*60}")
+    print(f"Total:    {len(results)} tests")
+    print(f"Passed:   {total_passed} ✅")
+    print(f"Failed:   {total_failed} ❌")
+    print(f"Accuracy: {accuracy:.1f}%")
+    print(f"Avg Time: {avg_time:.2f}s")
+    print(f"{'='*60}\n")
+
+    print("📋 RESULTS BY CATEGORY:")
+    print("-" * 40)
+    for cat, data in categories.items():
+        cat_accuracy = (data["passed"] / (data["passed"] + data["failed"])) * 100
+        status = "🟢" if cat_accuracy >= 90 else "🟡" if cat_accuracy >= 70 else "🔴"
+        print(f"{status} {cat:15} {data['passed']}/{data['passed']+data['failed']} ({cat_accuracy:.0f}%)")
+
+    failed = [r for r in results if not r["passed"]]
+    if failed:
+        print(f"\n{'='*60}")
+        print(f"❌ FAILED TESTS ({len(failed)}):")
+        print(f"{'='*60}")
+        for r in failed:
+            turn = r["turns"][0]
+            print(f"\nQuery: {turn['message']}")
+            print(f"Expected: {r['expect'].get('expected_cars', [])}")
+            print(f"Got: {turn['returned_cars']}")
+            print(f"First: {turn['returned_cars'][0] if turn['returned_cars'] else ''}")
+            if turn.get("error"):
+                print(f"Error: {turn['error']}")
+
+    report = {
+        "total": len(results),
+        "passed": total_passed,
+        "failed": total_failed,
+        "accuracy": accuracy,
+        "avg_response_time": avg_time,
+        "by_category": {
+            cat: {
+                "passed": data["passed"],
+                "failed": data["failed"],
+                "accuracy": (data["passed"] / (data["passed"] + data["failed"])) * 100
+            }
+            for cat, data in categories.items()
+        },
+        "failed_tests": [
+            {
+                "query": r["turns"][0]["message"],
+                "expected": r["expect"].get("expected_cars", []),
+                "got": r["turns"][0]["returned_cars"],
+                "error": r["turns"][0].get("error")
+            }
+            for r in failed
+        ]
+    }
+
+    with open("AI_TEST_RESULTS.json", "w") as f:
+        json.dump(report, f, indent=2)
+
+    print("\n📁 Full report saved to: AI_TEST_RESULTS.json")
+    return accuracy
+
+
+def print_suite_report(suite: str, results: List[dict]):
+    """`📊 RESULTS: x/y` block for suites without a report of their own"""
+    passed = sum(1 for r in results if r["passed"])
+    total = len(results)
+    turns = sum(len(r["turns"]) for r in results)
+    avg_time = sum(r["response_time"] for r in results) / max(turns, 1)
+
+    print(f"\n{'='*70}")
+    print(f"🧪 {suite} ({total} cases, {turns} turns, avg {avg_time:.2f}s/turn)")
+    print(f"📊 RESULTS: {passed}/{total} correct ({int(passed/total*100)}%)")
+
+    for r in results:
+        for t in r["turns"]:
+            if t["passed"]:
+                continue
+            got = t.get("error") or t.get("actual", "")
+            print(f"   ❌ [{r['category']}] '{t['message'][:60]}' → {got}")
+
+
+def print_transcript_report(suite: str, results: List[dict]):
+    """Smoke suites: the conversation as the scripts printed it, then the x/y block
+
+    Their scripts' quality scores (keyword heuristics, 0-10 ratings) are not
+    reproduced - only whether each turn got a reply.
+    """
+    print(f"\n{'='*70}")
+    print(f"🧪 {suite}")
+    for r in results:
+        for i, t in enumerate(r["turns"], 1):
+            print(f"\n{i}. 👤 User: '{t['message']}'")
+            if t.get("error"):
+                print(f"   ❌ Error: {t['error']}")
+                continue
+            print(f"   🤖 AI: {t.get('reply', '')[:200]}...")
+            if t.get("returned_cars"):
+                print(f"   🚗 Cars: {', '.join(t['returned_cars'])}")
+    print_suite_report(suite, results)
+
+
+def print_type_report(suite: str, results: List[dict]):
+    """test_comprehensive_60.py / test_car_names.py: expected vs actual type, then the verdict"""
+    print(f"\n{'='*70}")
+    print(f"🧪 {suite}")
+    total = len(results)
+    for i, r in enumerate(results, 1):
+        t = r["turns"][0]
+        print(f"\n{i}/{total}. 👤 User: '{t['message']}'")
+        if r.get("description"):
+            print(f"   📝 Test: {r['description']}")
+        print(f"   🎯 Expected: {r['expect'].get('expected', '').upper()}")
+        if t.get("error"):
+            print(f"   ❌ ERROR: {t['error']}")
+        elif t["passed"]:
+            print("   ✅ PASS")
+        else:
+            print(f"   ❌ FAIL (Got {str(t.get('actual', '')).upper()})")
+
+    passed = sum(1 for r in results if r["passed"])
+    failed = total - passed
+    print(f"\n{'='*70}")
+    print("\n📊 RESULTS:")
+    print(f"   ✅ Passed: {passed}/{total} ({passed/total*100:.1f}%)")
+    print(f"   ❌ Failed: {failed}/{total} ({failed/total*100:.1f}%)")
+    if suite == "comprehensive_60":
+        # Thresholds were 50/40/30 out of 60
+        if passed >= total * 50 / 60:
+            print(f"\n🎉 EXCELLENT! AI is highly accurate ({passed}/{total})")
+        elif passed >= total * 40 / 60:
+            print(f"\n👍 GOOD! AI is performing well ({passed}/{total})")
+        elif passed >= total * 30 / 60:
+            print(f"\n⚠️  NEEDS IMPROVEMENT ({passed}/{total})")
+        else:
+            print(f"\n❌ POOR PERFORMANCE ({passed}/{total})")
+    elif passed == total:
+        print("\n🎉 PERFECT! All tests passed!")
+    elif passed >= total * 0.8:
+        print("\n👍 GOOD! Most tests passed")
+    else:
+        print("\n⚠️  NEEDS IMPROVEMENT")
+
+
+def print_tricky_report(suite: str, results: List[dict]):
+    """test_tricky_questions.py: intent per question, then the accuracy verdict"""
+    print(f"\n{'='*70}")
+    print("🧪 TRICKY QUESTIONS TEST - LLM Intent Classification")
+    for i, r in enumerate(results, 1):
+        t = r["turns"][0]
+        expected = r["expect"].get("expected", "").upper()
+        print(f"\n{i}. 👤 User: '{t['message']}'")
+        print(f"   Expected Intent: {expected}")
+        if t.get("error"):
+            print(f"   ❌ Error: {t['error']}")
+            continue
+        actual = str(t.get("actual", "")).upper()
+        if t["passed"]:
+            print(f"   ✅ CORRECT: AI treated as {actual}")
+        else:
+            print(f"   ❌ WRONG: AI treated as {actual} (expected {expected})")
+        print(f"   Reply: {t.get('reply', '')[:100]}...")
+
+    correct = sum(1 for r in results if r["passed"])
+    total = len(results)
+    rate = correct / total * 100
+    print(f"\n{'='*70}")
+    print(f"📊 RESULTS: {correct}/{total} correct ({int(rate)}%)")
+    print("=" * 70)
+    if correct == total:
+        print("🎉 PERFECT! AI correctly classified ALL tricky questions!")
+    elif rate >= 80:
+        print("✅ GOOD! AI correctly classified most questions (80%+)")
+    elif rate >= 60:
+        print("⚠️  OKAY: AI needs improvement (60-80% accuracy)")
+    else:
+        print("❌ NEEDS WORK: AI is struggling with intent classification (<60%)")
+
+
+def print_comparisons_report(suite: str, results: List[dict]):
+    """test_comparisons.py: spec comparison vs news fallback per question"""
+    print(f"\n{'='*70}")
+    print("🧪 TESTING: Database-Driven Car Comparison")
+    for i, r in enumerate(results, 1):
+        t = r["turns"][0]
+        print(f"\n{i}. 👤 User: '{t['message']}'")
+        if t.get("error"):
+            print(f"   ❌ Error: {t['error']}")
+            continue
+        reply = t.get("reply", "")
+        print(f"   🤖 AI: {reply}...")
+        if t["passed"]:
+            print("   ✅ GOOD: Database comparison with specs")
+        elif "based on recent news" in reply.lower():
+            print("   ⚠️  FALLBACK: Using news articles")
+        else:
+            print("   ❓ UNCLEAR: Check response above")
+    print_suite_report(suite, results)
+
+
+def print_logic_report(suite: str, results: List[dict]):
+    """test_ai_logic_verification.py: the three scenarios with their verdicts"""
+    scenarios = [
+        ("query", "📊 SCENARIO 1: USER ASKS QUERIES (Should answer from web/DB)",
+         "✅ CORRECT: AI answered directly", "❌ WRONG: AI is asking for requirements instead of answering"),
+        ("recommendation", "🎯 SCENARIO 2: USER WANTS RECOMMENDATIONS (Should ask questions)",
+         "✅ CORRECT: AI is asking questions to narrow down", "❌ WRONG: AI gave recommendations without asking questions"),
+        ("flow", "🔄 SCENARIO 3: COMPLETE RECOMMENDATION FLOW", "✅ Step passed", "❌ Step failed"),
+    ]
+    for category, title, good, bad in scenarios:
+        cases = [r for r in results if r["category"] == category]
+        if not cases:
+            continue
+        print(f"\n{'='*70}")
+        print(title)
+        print("=" * 70)
+        for r in cases:
+            for i, t in enumerate(r["turns"], 1):
+                print(f"\n{i}. 👤 User: '{t['message']}'")
+                if t.get("error"):
+                    print(f"   ❌ Error: {t['error']}")
+                    continue
+                print(f"   {good if t['passed'] else bad}")
+                print(f"   Reply: {t.get('reply', '')[:150]}...")
+                if t.get("returned_cars"):
+                    print(f"   Cars: {len(t['returned_cars'])} cars shown")
+    print_suite_report(suite, results)
+
+
+# Suites whose scripts had a report format of their own; reply-only suites get a transcript
+SUITE_REPORTS = {
+    "comprehensive_60": print_type_report,
+    "car_names": print_type_report,
+    "tricky": print_tricky_report,
+    "comparisons": print_comparisons_report,
+    "logic_verification": print_logic_report,
+}
+
+
+def report_suite(suite: str, results: List[dict]):
+    """Render a suite the way the script it came from did"""
+    if suite in SUITE_REPORTS:
+        SUITE_REPORTS[suite](suite, results)
+    elif all(t["check"] == "reply" for r in results for t in r["turns"]):
+        print_transcript_report(suite, results)
+    else:
+        print_suite_report(suite, results)
+
+
+def print_stream_summary(summary: dict) -> Optional[float]:
+    """Per-suite results computed from the sink; returns accuracy when that suite ran"""
+    accuracy = None
+    for suite, s in summary.items():
+        rate = s["passed"] / s["total"] * 100 if s["total"] else 0
+        latency = s["latency"]
+        timing = f"p50 {latency['p50']:.2f}s p95 {latency['p95']:.2f}s | " if latency["count"] else ""
+        print(f"\n🧪 {suite}: {s['passed']}/{s['total']} ({rate:.1f}%) | {timing}"
+              f"{s['errors']} errors, {s['cached']} cached")
+        if suite == "accuracy":
+            accuracy = rate
+            for category, data in s["categories"].items():
+                total = data["passed"] + data["failed"]
+                print(f"   {category:25} {data['passed']}/{total}")
+    return accuracy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the evaluation corpus sharded across worker processes")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--suite", action="append", help="Only run these suites (repeatable)")
+    parser.add_argument("--shards", type=int, default=4, help="Worker processes (requests are I/O bound)")
+    parser.add_argument("--url", default=API_URL)
+    parser.add_argument("--report", default="EVAL_RUN_REPORT.json")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--no-cache", action="store_true", help="Don't read or write cached results")
+    parser.add_argument("--rerun", action="store_true", help="Run every case, then refresh the cache")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="AIMD concurrency instead of fixed shards; reports sustained throughput")
+    parser.add_argument("--initial-concurrency", type=int, default=2)
+    parser.add_argument("--max-concurrency", type=int, default=32)
+    parser.add_argument("--profile", nargs="?", const="cpu", choices=["cpu", "heap", "both"],
+                        help="Profile the backend per suite (admin auth, implies --rerun)")
+    parser.add_argument("--profile-dir", default=DEFAULT_PROFILE_DIR)
+    parser.add_argument("--metrics", action="store_true", help="Report /metrics deltas (AI pipeline series) for the run")
+    parser.add_argument("--sink", help="Stream results to this JSONL file (.gz to compress) instead of holding them")
+    parser.add_argument("--resume", action="store_true", help="Skip cases already in --sink and append")
+    args = parser.parse_args()
+    if args.resume and not args.sink:
+        parser.error("--resume needs --sink")
+    if args.profile:
+        # Cached cases would leave holes in the profiled scenarios
+        args.rerun = True
+
+    origin = "{0.scheme}://{0.netloc}".format(urlsplit(args.url))
+    try:
+        requests.get(f"{origin}/health", timeout=5)
+    except Exception:
+        print(f"❌ Error: Backend server not running at {origin}")
+        print("   Start with: cd backend && npm run dev")
+        sys.exit(1)
+
+    profiler = None
+    if args.profile:
+        profiler = ProfilingClient(origin, args.profile_dir)
+        try:
+            profiler.login()
+        except ProfilingError as e:
+            print(f"❌ Error: profiling unavailable ({e})")
+            print("   Set EVAL_ADMIN_TOKEN, or ADMIN_EMAIL and ADMIN_PASSWORD")
+            sys.exit(1)
+
+    print(f"\n{'='*60}")
+    print("🧪 AI HARNESS - SHARDED RUN")
+    print(f"{'='*60}")
+    print(f"Corpus: {args.corpus} | suites: {', '.join(args.suite) if args.suite else 'all'} | shards: {args.shards}")
+    print(f"API URL: {args.url}")
+    print(f"{'='*60}\n")
+
+    # Incremental run: reuse results for unchanged cases on an unchanged backend
+    cache = None
+    fingerprint = None
+    hashes: Dict[str, str] = {}
+    cached: Dict[str, dict] = {}
+    if not args.no_cache:
+        fingerprint = fetch_fingerprint(requests.Session(), origin)
+        if fingerprint:
+            cache = ResultCache(args.cache_dir)
+            changed = diff_components(cache.previous_fingerprint(), fingerprint)
+            print(f"🔑 Backend fingerprint {fingerprint['fingerprint']}"
+                  + (f" (changed: {', '.join(changed)})" if changed else " (unchanged)"))
+            hashes = {case["id"]: case_hash(case) for case in iter_cases(args.corpus, args.suite)}
+            if not args.rerun:
+                hits = cache.lookup(hashes.values(), fingerprint["fingerprint"])
+                cached = {case_id: hits[h] for case_id, h in hashes.items() if h in hits}
+            print(f"💾 {len(cached)}/{len(hashes)} cases cached, {len(hashes) - len(cached)} to run\n")
+        else:
+            print("⚠️  Fingerprint endpoint unavailable - running without the result cache\n")
+
+    metrics_before = None
+    if args.metrics:
+        metrics_before = scrape(requests.Session(), metrics_url_for(args.url))
+        if metrics_before is None:
+            print("⚠️  /metrics unavailable - no metric deltas for this run\n")
+
+    run_id = uuid.uuid4().hex[:8]
+    sink = None
+    resumed = set()
+    if args.sink:
+        resumed = completed_ids(args.sink) if args.resume else set()
+        sink = ResultSink(args.sink, append=args.resume)
+        if resumed:
+            print(f"♻️  Resuming: {len(resumed)} cases already in {args.sink}\n")
+        # Cached results go straight to the sink rather than staying in memory
+        for case_id, result in cached.items():
+            if case_id not in resumed:
+                sink.write({**result, "cached": True})
+    sink_offset = sink.written if sink else 0
+    skip_ids = frozenset(cached) | frozenset(resumed)
+    started = time.time()
+    controller = None
+    profiles = {}
+    if args.adaptive:
+        controller = AIMDController(initial=args.initial_concurrency, max_limit=args.max_concurrency)
+
+    def execute(suites: Optional[List[str]], headers: Optional[dict] = None) -> List[dict]:
+        """Fresh results in memory, or streamed into the sink (returning nothing)"""
+        if not sink:
+            return [r for shard in run_suites(args, suites, run_id, skip_ids, controller, headers) for r in shard]
+        for result in iter_streamed(args, suites, run_id, skip_ids, controller, headers):
+            sink.write(result)
+            if sink.written % 500 == 0:
+                print(f"   📝 {sink.written} results written ({time.time() - started:.0f}s)", flush=True)
+        return []
+
+    if hashes and len(cached) == len(hashes):
+        fresh = []
+    elif profiler:
+        # One scenario per suite, each bracketed by its own profile
+        fresh = []
+        suites = args.suite or list(OrderedDict.fromkeys(case["suite"] for case in iter_cases(args.corpus)))
+        for suite in suites:
+            results, profiles[suite] = profile_scenario(
+                profiler, args.profile, suite, run_id, lambda headers: execute([suite], headers),
+            )
+            fresh.extend(results)
+    else:
+        fresh = execute(args.suite)
+    elapsed = time.time() - started
+    if sink:
+        sink.close()
+
+    metrics_delta = None
+    if metrics_before:
+        metrics_after = scrape(requests.Session(), metrics_url_for(args.url))
+        if metrics_after:
+            metrics_delta = compute_deltas(metrics_before, metrics_after)
+
+    if cache:
+        # Streaming runs read their new results back from the sink
+        new_results = fresh if not sink else (
+            r for r in iter_records(args.sink) if not r.get("cached") and r["id"] in hashes
+        )
+        stored = cache.store(((hashes[r["id"]], r) for r in new_results), fingerprint["fingerprint"])
+        cache.remember_fingerprint(fingerprint)
+        cache.prune()
+        cache.close()
+        print(f"💾 Cached {stored} new results")
+
+    results = None
+    summary = None
+    if sink:
+        summary = summarize(args.sink)
+        accuracy = print_stream_summary(summary)
+        suites_report = {suite: {"total": s["total"], "passed": s["passed"]} for suite, s in summary.items()}
+        run_count = sink.written - sink_offset
+        throttled = sum(s["throttled"] for s in summary.values())
+    else:
+        # Merge back into corpus order so reports read like the original scripts
+        # (cached results take their current corpus position)
+        for case in iter_cases(args.corpus, args.suite) if cached else ():
+            if case["id"] in cached:
+                cached[case["id"]].update(index=case["index"], cached=True)
+        results = sorted(fresh + list(cached.values()), key=lambda r: r["index"])
+        by_suite: Dict[str, List[dict]] = OrderedDict()
+        for r in results:
+            by_suite.setdefault(r["suite"], []).append(r)
+
+        accuracy: Optional[float] = None
+        for suite, suite_results in by_suite.items():
+            if suite == "accuracy":
+                accuracy = write_accuracy_report(suite_results)
+            else:
+                report_suite(suite, suite_results)
+        suites_report = {
+            suite: {"total": len(rs), "passed": sum(1 for r in rs if r["passed"])}
+            for suite, rs in by_suite.items()
+        }
+        run_count = len(fresh)
+        throttled = sum(t.get("throttled", 0) for r in fresh for t in r["turns"])
+
+    passed = sum(s["passed"] for s in suites_report.values())
+    total = sum(s["total"] for s in suites_report.values())
+    print(f"\n{'='*70}")
+    mode = "adaptively" if controller else f"across {args.shards} shards"
+    print(f"⚡ {run_count} cases run in {elapsed:.1f}s {mode}, "
+          f"{len(cached)} from cache - {passed}/{total} passed")
+    if throttled:
+        print(f"🚦 {throttled} rate-limited requests retried after Retry-After")
+    throttle = controller.summary() if controller else None
+    if throttle:
+        print(f"🎚️  AIMD converged to {throttle['converged_limit']} concurrent requests "
+              f"(peak {throttle['peak_limit']}), sustained {throttle['sustained_rps']} req/s "
+              f"| events {throttle['events']}")
+
+    if metrics_delta is not None:
+        print_deltas(metrics_delta)
+
+    # Tokens per category / turn / second (X-AI-Usage); resumed sink records keep their
+    # counts but stay out of this run's per-second load
+    tokens = summarize_tokens(iter_records(args.sink) if sink else results, since=started)
+    if tokens["overall"]["llm_calls"]:
+        print_token_summary(tokens)
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "run_id": run_id,
+        "shards": args.shards,
+        "elapsed_seconds": round(elapsed, 2),
+        "fingerprint": fingerprint,
+        "cached_cases": len(cached),
+        "throttle": throttle,
+        "profiles": profiles or None,
+        "metrics_delta": metrics_delta,
+        "tokens": tokens,
+        "suites": suites_report,
+    }
+    if sink:
+        report.update(sink=args.sink, summary=summary)
+    else:
+        report["results"] = results
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"💾 {'Summary' if sink else 'Full results'} saved to: {args.report}"
+          + (f" (results: {args.sink})" if sink else ""))
+
+    # Same exit rule as test_ai_accuracy.py when the accuracy suite ran
+    if accuracy is not None and accuracy < 70:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
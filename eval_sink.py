@@ -0,0 +1,205 @@
+"""
+Streaming Result Sink
+=====================
+Append-only JSONL store for harness results, so run size no longer bounds
+memory and a crash at case 950 keeps the first 949.
+
+- One compact record per completed case, flushed as it is written
+  (gzip when the path ends in .gz; flushed at most once per second there,
+  since every gzip flush costs compression ratio)
+- Resumable: completed_ids() streams the file for case ids to skip; a file
+  cut off mid-record (crash, kill -9) is repaired before appending
+- Summaries are computed by streaming over the file with constant memory
+  (per-suite counters + log-bucketed latency histograms)
+
+Used by eval_runner.py --sink / --resume and eval_baseline.py.
+"""
+
+import gzip
+import json
+import math
+import os
+import time
+import zlib
+from collections import OrderedDict
+from typing import Iterator, Optional, Set, Tuple
+
+GZIP_FLUSH_INTERVAL = 1.0
+
+
+def _open_read(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def _scan(path: str) -> Iterator[Tuple[dict, bool]]:
+    """(record, ok) pairs; stops with ok=False at the first truncated/corrupt record"""
+    try:
+        with _open_read(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                if not line.endswith("\n"):
+                    yield {}, False
+                    return
+                try:
+                    yield json.loads(line), True
+                except json.JSONDecodeError:
+                    yield {}, False
+                    return
+    except (EOFError, zlib.error, gzip.BadGzipFile):
+        # Gzip stream cut off mid-member
+        yield {}, False
+
+
+def iter_records(path: str) -> Iterator[dict]:
+    """Stream every intact record (a truncated tail is ignored)"""
+    for record, ok in _scan(path):
+        if not ok:
+            return
+        yield record
+
+
+def completed_ids(path: str) -> Set[str]:
+    if not os.path.exists(path):
+        return set()
+    return {record["id"] for record in iter_records(path) if "id" in record}
+
+
+def repair(path: str) -> int:
+    """Rewrite the file without a truncated tail; returns how many records were kept"""
+    kept, clean = 0, True
+    for _, ok in _scan(path):
+        if not ok:
+            clean = False
+            break
+        kept += 1
+    if clean:
+        return kept
+    # Same suffix as the original so a .gz stays compressed
+    directory, name = os.path.split(path)
+    tmp = os.path.join(directory, ".repair-" + name)
+    with ResultSink(tmp, append=False) as sink:
+        for record in iter_records(path):
+            sink.write(record)
+    os.replace(tmp, path)
+    return kept
+
+
+class ResultSink:
+    def __init__(self, path: str, append: bool = True):
+        self.path = path
+        self.compressed = path.endswith(".gz")
+        if append and os.path.exists(path):
+            repair(path)
+        mode = "ab" if append else "wb"
+        # Appending to .gz adds a new gzip member - concatenated members are valid gzip
+        self.file = gzip.open(path, mode) if self.compressed else open(path, mode)
+        self.written = 0
+        self._last_flush = time.time()
+
+    def write(self, record: dict):
+        self.file.write((json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8"))
+        self.written += 1
+        now = time.time()
+        if not self.compressed or now - self._last_flush >= GZIP_FLUSH_INTERVAL:
+            self.file.flush()
+            self._last_flush = now
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# ============================================
+# STREAMING SUMMARY
+# ============================================
+
+
+class LatencyHistogram:
+    """Log-spaced buckets (~2% resolution) - quantiles in constant memory"""
+
+    GROWTH = 1.02
+    MIN_VALUE = 0.001
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float):
+        index = 0 if value <= self.MIN_VALUE else int(math.log(value / self.MIN_VALUE, self.GROWTH)) + 1
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(self.max, self.MIN_VALUE * self.GROWTH ** index)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else None,
+            "p50": _round(self.quantile(0.5)),
+            "p95": _round(self.quantile(0.95)),
+            "p99": _round(self.quantile(0.99)),
+            "max": round(self.max, 3),
+        }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 3) if value is not None else None
+
+
+class StreamingSummary:
+    def __init__(self):
+        self.suites = OrderedDict()
+
+    def add(self, result: dict):
+        suite = self.suites.get(result["suite"])
+        if suite is None:
+            suite = self.suites[result["suite"]] = {
+                "total": 0, "passed": 0, "cached": 0, "errors": 0, "throttled": 0, "tokens": 0,
+                "categories": OrderedDict(), "latency": LatencyHistogram(),
+            }
+        suite["total"] += 1
+        suite["passed"] += bool(result["passed"])
+        category = suite["categories"].setdefault(result.get("category", result["suite"]), {"passed": 0, "failed": 0})
+        category["passed" if result["passed"] else "failed"] += 1
+        if result.get("cached"):
+            suite["cached"] += 1
+            return
+        for turn in result.get("turns", []):
+            suite["errors"] += bool(turn.get("error"))
+            suite["throttled"] += turn.get("throttled", 0)
+            suite["tokens"] += turn.get("tokens", 0)
+            if turn.get("response_time") is not None and not turn.get("error"):
+                suite["latency"].add(turn["response_time"])
+
+    def to_dict(self) -> dict:
+        return OrderedDict(
+            (name, {**{k: v for k, v in s.items() if k != "latency"}, "latency": s["latency"].to_dict()})
+            for name, s in self.suites.items()
+        )
+
+
+def summarize(path: str) -> dict:
+    summary = StreamingSummary()
+    for record in iter_records(path):
+        summary.add(record)
+    return summary.to_dict()
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Soak Test - Long-Running Mixed Traffic with Memory Growth Tracking
+==================================================================
+Drives realistic mixed chat traffic (cases sampled from eval_corpus.jsonl,
+single- and multi-turn) for hours, and periodically samples
+GET /api/monitoring/diagnostics/ai-memory:
+
+- process RSS / heap
+- entry counts of every in-process AI structure (web-scraper cache, search
+  index, vector store, car names, learning patterns, prompt cache, ...)
+
+Under PM2 cluster mode each sample polls with fresh connections until every
+worker has answered (round-robin), and series are kept per worker (pid).
+Samples are streamed to a JSONL file as they are taken. At the end (or
+with --analyze on an existing file) each worker's series gets a growth slope
+and a plateau check: a component whose growth over the last third of the run
+is still a sizeable fraction of its early growth is flagged as unbounded.
+Process restarts (PM2 max_memory_restart) - a pid whose uptime went
+backwards, or a worker that started after the soak did - are reported
+separately, since they hide growth behind resets. A soak in which no worker
+had enough samples to analyse fails rather than passing.
+
+Run: python eval_soak.py --duration 4h --concurrency 4
+     python eval_soak.py --analyze SOAK_SAMPLES.jsonl
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from eval_corpus import DEFAULT_CORPUS, iter_cases
+from eval_runner import API_URL, run_case
+
+DIAGNOSTICS_PATH = "/api/monitoring/diagnostics/ai-memory"
+
+# Growth in the last third of the run must fall below this fraction of the
+# first third's growth for a series to count as plateaued
+PLATEAU_RATIO = 0.25
+# ...unless the late growth is negligible relative to the series level
+MIN_RELATIVE_GROWTH_PER_HOUR = 0.02
+MIN_POINTS = 6
+# Fresh-connection polls per sample while looking for workers not seen yet
+MAX_WORKER_POLLS = 16
+# Uptime is whole seconds; a worker counts as restarted if it started this much after the soak
+RESTART_SLACK_SECONDS = 5
+
+
+def parse_duration(value: str) -> float:
+    """'90s', '30m', '4h' or plain seconds"""
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)([smh]?)", value.strip())
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid duration: {value}")
+    return float(match.group(1)) * {"": 1, "s": 1, "m": 60, "h": 3600}[match.group(2)]
+
+# ============================================
+# TRAFFIC
+# ============================================
+
+
+class TrafficStats:
+    """Per-interval request counters (reset by each memory sample)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.errors = 0
+        self.latencies: List[float] = []
+
+    def record(self, result: dict):
+        with self.lock:
+            for turn in result["turns"]:
+                self.requests += 1
+                if turn.get("error"):
+                    self.errors += 1
+                elif turn.get("response_time") is not None:
+                    self.latencies.append(turn["response_time"])
+
+    def snapshot_and_reset(self) -> dict:
+        with self.lock:
+            latencies = sorted(self.latencies)
+            snapshot = {
+                "requests": self.requests,
+                "errors": self.errors,
+                "p50": latencies[len(latencies) // 2] if latencies else None,
+                "p95": latencies[int(len(latencies) * 0.95)] if latencies else None,
+            }
+            self.reset()
+            return snapshot
+
+
+def traffic_worker(cases: List[dict], api_url: str, deadline: float, stats: TrafficStats,
+                   stop: threading.Event, seed: int, think_time: float):
+    rng = random.Random(seed)
+    session = requests.Session()
+    runs = 0
+    while not stop.is_set() and time.time() < deadline:
+        case = rng.choice(cases)
+        # Fresh session per conversation, like distinct users
+        result = run_case(session, case, api_url, f"soak{seed}-{runs}")
+        stats.record(result)
+        runs += 1
+        if think_time:
+            stop.wait(rng.uniform(0, 2 * think_time))
+
+# ============================================
+# SAMPLING
+# ============================================
+
+
+def sample_memory(session: requests.Session, origin: str) -> Optional[dict]:
+    try:
+        response = session.get(f"{origin}{DIAGNOSTICS_PATH}", timeout=10)
+        return response.json() if response.status_code == 200 else None
+    except Exception:
+        return None
+
+
+def sample_workers(origin: str) -> List[dict]:
+    """Diagnostics of every worker that answers, one per pid
+
+    The cluster master hands each new connection to the next worker, so poll
+    with fresh connections until a pid repeats (all workers seen).
+    """
+    seen: Dict[int, dict] = {}
+    for _ in range(MAX_WORKER_POLLS):
+        diagnostics = sample_memory(requests.Session(), origin)
+        if diagnostics is None or diagnostics.get("pid") in seen:
+            break
+        seen[diagnostics.get("pid")] = diagnostics
+    return list(seen.values())
+
+
+def sample_diagnostics(sample: dict) -> List[dict]:
+    """Per-worker diagnostics of a sample (older files hold one `diagnostics`)"""
+    if "workers" in sample:
+        return sample["workers"]
+    return [sample["diagnostics"]] if sample.get("diagnostics") else []
+
+
+def flatten_sample(sample: dict) -> Dict[str, float]:
+    series = {f"memory.{k}": v for k, v in sample.get("memory", {}).items() if k != "heapLimit"}
+    series.update({f"components.{k}": v for k, v in sample.get("components", {}).items()})
+    return series
+
+# ============================================
+# ANALYSIS
+# ============================================
+
+
+def slope_per_hour(points: List[tuple]) -> float:
+    """Least-squares slope of (seconds, value) points, per hour"""
+    if len(points) < 2:
+        return 0.0
+    n = len(points)
+    mean_t = sum(t for t, _ in points) / n
+    mean_v = sum(v for _, v in points) / n
+    var_t = sum((t - mean_t) ** 2 for t, _ in points)
+    if var_t == 0:
+        return 0.0
+    cov = sum((t - mean_t) * (v - mean_v) for t, v in points)
+    return cov / var_t * 3600
+
+
+def worker_lifetimes(samples: List[dict]) -> Dict[str, List[tuple]]:
+    """(t, diagnostics) per worker lifetime: keyed by pid, split where its uptime went backwards"""
+    lifetimes: Dict[str, List[tuple]] = OrderedDict()
+    current: Dict[object, str] = {}
+    for s in samples:
+        for d in sample_diagnostics(s):
+            pid = d.get("pid")
+            label = current.get(pid)
+            if label and d.get("uptimeSeconds", 0) < lifetimes[label][-1][1].get("uptimeSeconds", 0):
+                label = None
+            if not label:
+                runs = sum(1 for key in lifetimes if key.split("#")[0] == f"pid {pid}")
+                label = f"pid {pid}" + (f"#{runs + 1}" if runs else "")
+                current[pid] = label
+                lifetimes[label] = []
+            lifetimes[label].append((s["t"], d))
+    return lifetimes
+
+
+def analyze_series(points_by_name: Dict[str, List[tuple]]) -> dict:
+    """Growth slopes + plateau verdict for each series with enough points"""
+    series = {}
+    for name, points in points_by_name.items():
+        if len(points) < MIN_POINTS:
+            continue
+        third = len(points) // 3
+        early, late = points[:third + 1], points[-(third + 1):]
+        early_slope, late_slope = slope_per_hour(early), slope_per_hour(late)
+        level = max(abs(v) for _, v in points) or 1
+
+        plateaued = (
+            late_slope <= PLATEAU_RATIO * max(early_slope, 0)
+            or late_slope / level < MIN_RELATIVE_GROWTH_PER_HOUR
+        )
+        series[name] = {
+            "first": points[0][1],
+            "last": points[-1][1],
+            "max": max(v for _, v in points),
+            "slope_per_hour": round(slope_per_hour(points), 2),
+            "early_slope_per_hour": round(early_slope, 2),
+            "late_slope_per_hour": round(late_slope, 2),
+            "status": "plateaued" if plateaued else "growing",
+        }
+    return series
+
+
+def analyze(samples: List[dict]) -> dict:
+    """Growth slopes + plateau verdicts per worker lifetime and series"""
+    samples = [s for s in samples if sample_diagnostics(s)]
+    if not samples:
+        return {"samples": 0, "error": "no diagnostics samples"}
+    soak_start = samples[0]["t"]
+
+    workers = {}
+    restarts = 0
+    for label, lifetime in worker_lifetimes(samples).items():
+        start = lifetime[0][0]
+        # Started after the soak did: a restart (or a worker added mid-run)
+        if start - lifetime[0][1].get("uptimeSeconds", 0) > soak_start + RESTART_SLACK_SECONDS:
+            restarts += 1
+        points_by_name: Dict[str, List[tuple]] = OrderedDict()
+        for t, d in lifetime:
+            for name, value in sorted(flatten_sample(d).items()):
+                if isinstance(value, (int, float)):
+                    points_by_name.setdefault(name, []).append((t - start, value))
+        workers[label] = {
+            "samples": len(lifetime),
+            "hours": round((lifetime[-1][0] - start) / 3600, 2),
+            "series": analyze_series(points_by_name),
+        }
+
+    report = {
+        "samples": len(samples),
+        "restarts": restarts,
+        "workers": workers,
+        "analyzed_workers": sum(1 for w in workers.values() if w["series"]),
+        "growing": [f"{label} {name}" for label, w in workers.items()
+                    for name, s in w["series"].items() if s["status"] == "growing"],
+    }
+    if not report["analyzed_workers"]:
+        report["error"] = f"no worker had {MIN_POINTS}+ samples in one lifetime - nothing analysed"
+    return report
+
+
+def _human(name: str, value) -> str:
+    if value is None:
+        return "-"
+    if name.startswith("memory.") or name.endswith("Bytes"):
+        return f"{value / 1024 / 1024:.1f}MB"
+    return f"{value:,.0f}" if isinstance(value, (int, float)) else str(value)
+
+
+def print_analysis(report: dict):
+    if report["samples"] == 0:
+        print(f"❌ {report['error']}")
+        return
+    print(f"\n📈 GROWTH ANALYSIS ({report['samples']} samples, {len(report['workers'])} worker lifetime(s), "
+          f"{report['analyzed_workers']} analysed, {report['restarts']} restarts)")
+    for label, worker in report["workers"].items():
+        print("-" * 92)
+        print(f"   {label}: {worker['samples']} samples, {worker['hours']}h"
+              + ("" if worker["series"] else f" - too few samples (< {MIN_POINTS}), not analysed"))
+        if not worker["series"]:
+            continue
+        print(f"   {'Series':38} {'First':>10} {'Last':>10} {'Early/h':>12} {'Late/h':>12}")
+        for name, s in worker["series"].items():
+            icon = "🔴" if s["status"] == "growing" else "🟢"
+            print(f"{icon} {name:38} {_human(name, s['first']):>10} {_human(name, s['last']):>10} "
+                  f"{_human(name, s['early_slope_per_hour']):>12} {_human(name, s['late_slope_per_hour']):>12}")
+    if report["restarts"]:
+        print(f"\n⚠️  Backend restarted {report['restarts']} time(s) during the soak "
+              f"(PM2 max_memory_restart?) - growth may be hidden by restarts")
+    if report["growing"]:
+        print(f"\n❌ Not plateauing: {', '.join(report['growing'])}")
+    elif "error" in report:
+        print(f"\n❌ {report['error']}")
+    else:
+        print("\n✅ All tracked components plateaued")
+
+
+def soak_failed(report: dict) -> bool:
+    """Growth found, or nothing could be analysed"""
+    return bool(report.get("growing")) or "error" in report
+
+# ============================================
+# MAIN
+# ============================================
+
+
+def load_samples(path: str) -> List[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-running soak test with backend memory growth tracking")
+    parser.add_argument("--duration", type=parse_duration, default=parse_duration("1h"))
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--think-time", type=float, default=1.0, help="Mean pause between a user's conversations (s)")
+    parser.add_argument("--sample-interval", type=parse_duration, default=parse_duration("60s"))
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--suite", action="append")
+    parser.add_argument("--url", default=API_URL)
+    parser.add_argument("--samples", default="SOAK_SAMPLES.jsonl")
+    parser.add_argument("--report", default="SOAK_REPORT.json")
+    parser.add_argument("--analyze", metavar="SAMPLES", help="Only analyse an existing samples file")
+    args = parser.parse_args()
+
+    if args.analyze:
+        report = analyze(load_samples(args.analyze))
+        print_analysis(report)
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+        sys.exit(1 if soak_failed(report) else 0)
+
+    origin = "{0.scheme}://{0.netloc}".format(urlsplit(args.url))
+    session = requests.Session()
+    if sample_memory(session, origin) is None:
+        print(f"❌ Error: {origin}{DIAGNOSTICS_PATH} not reachable")
+        sys.exit(1)
+
+    cases = list(iter_cases(args.corpus, args.suite))
+    print("=" * 60)
+    print("🏋️  SOAK TEST")
+    print("=" * 60)
+    print(f"Duration: {args.duration / 3600:.2f}h | concurrency: {args.concurrency} | "
+          f"sampling every {args.sample_interval:.0f}s | {len(cases)} cases")
+
+    stats = TrafficStats()
+    stop = threading.Event()
+    started = time.time()
+    deadline = started + args.duration
+    workers = [
+        threading.Thread(target=traffic_worker, daemon=True,
+                         args=(cases, args.url, deadline, stats, stop, seed, args.think_time))
+        for seed in range(args.concurrency)
+    ]
+    for w in workers:
+        w.start()
+
+    samples = []
+    try:
+        with open(args.samples, "w", encoding="utf-8") as out:
+            while True:
+                now = time.time()
+                diagnostics = sample_workers(origin)
+                sample = {"t": now, "elapsed": round(now - started, 1), "traffic": stats.snapshot_and_reset(),
+                          "workers": diagnostics}
+                samples.append(sample)
+                out.write(json.dumps(sample) + "\n")
+                out.flush()
+
+                if diagnostics:
+                    rss = sum(d["memory"]["rss"] for d in diagnostics)
+                    heap = sum(d["memory"]["heapUsed"] for d in diagnostics)
+                    t = sample["traffic"]
+                    print(f"[{sample['elapsed'] / 60:6.1f}m] {len(diagnostics)} worker(s) rss {rss / 1048576:7.1f}MB "
+                          f"heap {heap / 1048576:7.1f}MB | {t['requests']} req, {t['errors']} err, "
+                          f"p95 {t['p95'] or 0:.2f}s", flush=True)
+                else:
+                    print(f"[{sample['elapsed'] / 60:6.1f}m] ⚠️  diagnostics unavailable (restarting?)", flush=True)
+
+                if now >= deadline:
+                    break
+                stop.wait(min(args.sample_interval, max(deadline - time.time(), 0)))
+    except KeyboardInterrupt:
+        print("\n⏹️  Interrupted - analysing samples so far")
+    finally:
+        stop.set()
+
+    report = analyze(samples)
+    report["timestamp"] = datetime.now().isoformat()
+    report["duration_hours"] = round((time.time() - started) / 3600, 2)
+    print_analysis(report)
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Samples: {args.samples} | report: {args.report}")
+    sys.exit(1 if soak_failed(report) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+AI Chat Spec Answers - Coverage Report
+======================================
+Replays every corpus turn (with the earlier user turns of its case as
+history, so "Fuel tank capacity?" after talking about one car resolves)
+against POST /api/ai-chat/spec-answer, which runs only the spec-table
+engine (ai-engine/spec-answer.ts) - no retrieval, no LLM.
+
+Reports how many turns are answered straight from the spec table, why the
+rest fall through to the LLM (no_attribute, no_entity, multiple_models,
+consultant, no_data), which attributes are asked most, engine latency,
+and the answered turns for spot-checking against the model pages.
+
+Run: python eval_spec.py
+     python eval_spec.py --suite comprehensive_60 --suite consultant_simulation --show 40
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import List
+
+import requests
+
+from eval_baseline import mean, percentile
+from eval_corpus import DEFAULT_CORPUS, iter_cases
+from eval_runner import API_URL, TIMEOUT
+
+DEFAULT_REPORT = "EVAL_SPEC_REPORT.json"
+
+
+def iter_turns(corpus: str, suites: List[str]):
+    for case in iter_cases(corpus, suites):
+        history = list(case.get("history", []))
+        for turn in case["turns"]:
+            yield case["suite"], turn["message"], list(history)
+            history.append({"role": "user", "content": turn["message"]})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="How many chat turns the spec table answers without the LLM")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--suite", action="append", help="Only these suites (default: all)")
+    parser.add_argument("--url", default=API_URL)
+    parser.add_argument("--show", type=int, default=20, help="Answered turns to print")
+    parser.add_argument("--report", default=DEFAULT_REPORT)
+    args = parser.parse_args()
+
+    session = requests.Session()
+    endpoint = args.url.rstrip("/") + "/spec-answer"
+    results = []
+    for suite, message, history in iter_turns(args.corpus, args.suite):
+        try:
+            response = session.post(endpoint, json={"message": message, "conversationHistory": history}, timeout=TIMEOUT)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"❌ Error: '{message[:40]}': {e}")
+            sys.exit(1)
+        answer = response.json()
+        results.append({"suite": suite, "message": message, "history_turns": len(history), **answer})
+
+    if not results:
+        print(f"❌ Error: no turns in {args.corpus}")
+        sys.exit(1)
+    if results[0].get("reason") == "no_table":
+        print(f"❌ Spec table not built yet: {results[0].get('table')}")
+        sys.exit(1)
+
+    answered = [r for r in results if r["answered"]]
+    reasons = Counter(r["reason"] for r in results)
+    asked = Counter(a for r in results for a in r["attributes"])
+    answered_by_attr = Counter(a for r in answered for a in r["attributes"])
+    latency = [r["elapsedUs"] for r in results]
+    by_suite = OrderedDict()
+    for r in results:
+        s = by_suite.setdefault(r["suite"], {"turns": 0, "answered": 0})
+        s["turns"] += 1
+        s["answered"] += r["answered"]
+
+    print(f"\n📐 Spec table: {results[0]['table']['models']} models, {results[0]['table']['variants']} variants")
+    print(f"✅ Answered without the LLM: {len(answered)}/{len(results)} turns "
+          f"({len(answered) / len(results) * 100:.1f}%)")
+    print(f"⏱️  Engine: mean {mean(latency):.1f}µs | p50 {percentile(latency, 50):.1f}µs | p99 {percentile(latency, 99):.1f}µs")
+    print("\nFall-through reasons:")
+    for reason, n in reasons.most_common():
+        if reason != "answered":
+            print(f"   {reason:16} {n:>5}")
+    print("\nAttributes asked (answered/asked):")
+    for attr, n in asked.most_common():
+        print(f"   {attr:18} {answered_by_attr[attr]:>4}/{n}")
+    print("\nSuites with answered turns:")
+    for suite, s in by_suite.items():
+        if s["answered"]:
+            print(f"   {suite:28} {s['answered']:>4}/{s['turns']}")
+    if args.show:
+        print("\nAnswers:")
+        for r in answered[:args.show]:
+            print(f"   [{r['suite']}] {r['message']}\n      → {r['reply'].splitlines()[0]}")
+
+    with open(args.report, "w") as f:
+        json.dump({
+            "timestamp": datetime.now().isoformat(),
+            "turns": len(results),
+            "answered": len(answered),
+            "reasons": dict(reasons),
+            "attributes": {a: {"asked": n, "answered": answered_by_attr[a]} for a, n in asked.items()},
+            "latency_us": {"mean": mean(latency), "p50": percentile(latency, 50), "p99": percentile(latency, 99)},
+            "table": results[0]["table"],
+            "results": results,
+        }, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Report saved to: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Adaptive Concurrency (AIMD) for the Harness
+===========================================
+Client-side controller that finds how hard a deployment can be driven
+without tripping its own rate limiter (publicLimiter: 60 req/min per IP,
+standard RateLimit-* headers, Retry-After on 429).
+
+- Additive increase: +1 concurrent request per "window" of healthy
+  responses (limit += 1/limit per success, like TCP congestion avoidance)
+- Multiplicative decrease: limit *= 0.5 on 429, 5xx or a latency spike,
+  at most once per observed round-trip so one burst only counts once
+- Honors Retry-After / RateLimit-Reset: all dispatching pauses until the
+  window resets instead of burning requests on 429s
+- Reports the concurrency it converged to and the sustained throughput
+
+Used by eval_runner.py --adaptive.
+"""
+
+import threading
+import time
+from collections import Counter, deque
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+DEFAULT_RETRY_AFTER = 1.0
+MAX_PAUSE_SECONDS = 120.0
+
+
+def _header(headers: Optional[Mapping[str, str]], name: str) -> Optional[str]:
+    if not headers:
+        return None
+    value = headers.get(name)
+    if value is None:
+        # Plain dicts (tests, cached responses) aren't case-insensitive
+        lowered = name.lower()
+        value = next((v for k, v in headers.items() if k.lower() == lowered), None)
+    return value
+
+
+def retry_after_seconds(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Seconds to wait from Retry-After (delta or HTTP date), else RateLimit-Reset"""
+    value = _header(headers, "Retry-After")
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    reset = _header(headers, "RateLimit-Reset")
+    if reset:
+        try:
+            return max(0.0, float(reset))
+        except ValueError:
+            pass
+    return None
+
+
+def rate_limit_remaining(headers: Optional[Mapping[str, str]]) -> Optional[int]:
+    value = _header(headers, "RateLimit-Remaining")
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class AIMDController:
+    def __init__(
+        self,
+        initial: int = 2,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        decrease_factor: float = 0.5,
+        spike_factor: float = 3.0,
+        min_latency_samples: int = 10,
+    ):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.spike_factor = spike_factor
+        self.min_latency_samples = min_latency_samples
+
+        self.inflight = 0
+        self.paused_until = 0.0
+        self.latency_ewma: Optional[float] = None
+        self.latency_samples = 0
+        self.last_decrease = 0.0
+
+        self.started = time.time()
+        self.completions = deque()         # timestamps of healthy responses
+        self.history = [(0.0, self.limit)]  # (seconds since start, limit)
+        self.counts = Counter()
+        self._cond = threading.Condition()
+
+    # ----------------------------------------
+    # Dispatch gate
+    # ----------------------------------------
+
+    def acquire(self):
+        """Block until a concurrency slot is free and no rate-limit pause is active"""
+        with self._cond:
+            while True:
+                wait = self.paused_until - time.time()
+                if wait <= 0 and self.inflight < int(self.limit):
+                    self.inflight += 1
+                    return
+                self._cond.wait(timeout=wait if wait > 0 else 0.5)
+
+    def release(self):
+        with self._cond:
+            self.inflight -= 1
+            self._cond.notify_all()
+
+    def wait_if_paused(self):
+        """Called before each turn of a multi-turn case (it already holds a slot)"""
+        while True:
+            with self._cond:
+                wait = self.paused_until - time.time()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    # ----------------------------------------
+    # Feedback
+    # ----------------------------------------
+
+    def on_response(self, status: Optional[int], latency: float, headers: Optional[Mapping[str, str]] = None):
+        """Feed one response (status None = transport error / timeout)"""
+        with self._cond:
+            now = time.time()
+            if status == 429:
+                self.counts["429"] += 1
+                self._decrease(now, "429")
+                self._pause(now, retry_after_seconds(headers) or DEFAULT_RETRY_AFTER)
+            elif status is None or status >= 500:
+                self.counts["5xx" if status else "transport"] += 1
+                self._decrease(now, "5xx" if status else "transport")
+            elif self._is_spike(latency):
+                self.counts["latency_spike"] += 1
+                self._decrease(now, "latency_spike")
+            else:
+                self.counts["ok"] += 1
+                self.completions.append(now)
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+                self._observe_latency(latency)
+
+            # Out of budget for this window: wait for the reset instead of collecting 429s
+            remaining = rate_limit_remaining(headers)
+            if status != 429 and remaining is not None and remaining <= 0:
+                self.counts["budget_exhausted"] += 1
+                self._pause(now, retry_after_seconds(headers) or DEFAULT_RETRY_AFTER)
+
+            self.history.append((now - self.started, self.limit))
+            self._cond.notify_all()
+
+    def _observe_latency(self, latency: float):
+        self.latency_samples += 1
+        self.latency_ewma = latency if self.latency_ewma is None else 0.9 * self.latency_ewma + 0.1 * latency
+
+    def _is_spike(self, latency: float) -> bool:
+        return (
+            self.latency_ewma is not None
+            and self.latency_samples >= self.min_latency_samples
+            and latency > self.spike_factor * self.latency_ewma
+        )
+
+    def _decrease(self, now: float, reason: str):
+        # One decrease per round-trip: responses already in flight saw the old limit
+        if now - self.last_decrease < max(self.latency_ewma or 0.0, 1.0):
+            return
+        self.limit = max(float(self.min_limit), self.limit * self.decrease_factor)
+        self.last_decrease = now
+        self.counts[f"decrease_{reason}"] += 1
+
+    def _pause(self, now: float, seconds: float):
+        self.paused_until = max(self.paused_until, now + min(seconds, MAX_PAUSE_SECONDS))
+
+    # ----------------------------------------
+    # Reporting
+    # ----------------------------------------
+
+    def summary(self) -> dict:
+        """Converged limit and sustained throughput over the second half of the run"""
+        with self._cond:
+            elapsed = max(time.time() - self.started, 1e-9)
+            half = self.started + elapsed / 2
+            late_completions = sum(1 for t in self.completions if t >= half)
+            late_limits = [limit for t, limit in self.history if t >= elapsed / 2] or [self.limit]
+            late_limits.sort()
+            return {
+                "elapsed_seconds": round(elapsed, 2),
+                "final_limit": round(self.limit, 2),
+                "converged_limit": round(late_limits[len(late_limits) // 2], 2),
+                "peak_limit": round(max(limit for _, limit in self.history), 2),
+                "throughput_rps": round(len(self.completions) / elapsed, 3),
+                "sustained_rps": round(late_completions / (elapsed / 2), 3),
+                "latency_ewma_s": round(self.latency_ewma, 3) if self.latency_ewma else None,
+                "events": dict(self.counts),
+            }
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+LLM Token Accounting - Per Category, Turn and Second
+====================================================
+Aggregates the per-request token account the backend reports in the
+X-AI-Usage header (ai-engine/prompt-accounting.ts): prompt tokens split
+into system prompt, conversation history, user message and RAG / expert /
+learned context, completion tokens and estimated cost.
+
+Three views, since each points at a different fix:
+
+- per query category: which kinds of questions are expensive
+- per turn index: how much the history adds as conversations grow
+- per second of load: token throughput (what provider rate limits and
+  the bill see), peak vs mean
+
+Requests answered without the LLM (fast path, spec table, coalesced
+followers, cached harness results) count as requests that spent nothing.
+
+eval_runner.py prints this summary for every run; standalone it reads a
+run report, a --sink JSONL(.gz) file or an eval_replay.py report.
+
+Run: python eval_tokens.py EVAL_RUN_REPORT.json
+     python eval_tokens.py EVAL_RESULTS.jsonl.gz --report EVAL_TOKEN_REPORT.json
+     python eval_tokens.py EVAL_REPLAY_REPORT.json
+"""
+
+import argparse
+import json
+import sys
+from collections import OrderedDict
+from datetime import datetime
+from typing import Iterable, Iterator, Optional, Tuple
+
+from eval_baseline import percentile
+from eval_sink import iter_records
+
+SECTIONS = ("system", "history", "message", "rag", "expert", "learned", "overhead")
+MAX_TURN_BUCKET = 10  # turn indexes from here on share one "10+" row
+
+
+def parse_usage_header(value: Optional[str]) -> Optional[dict]:
+    """'prompt=1840; completion=212; system=1210; ...; cost_usd=0.000109' → dict"""
+    if not value:
+        return None
+    fields = dict(part.strip().split("=", 1) for part in value.split(";") if "=" in part)
+    try:
+        usage = {"prompt": int(fields["prompt"]), "completion": int(fields["completion"])}
+    except (KeyError, ValueError):
+        return None
+    usage["sections"] = {s: int(fields.get(s, 0) or 0) for s in SECTIONS}
+    usage["model"] = fields.get("model")
+    usage["estimated"] = fields.get("estimated") == "1"
+    usage["cached"] = fields.get("cached") == "1"
+    if "cost_usd" in fields:
+        usage["cost_usd"] = float(fields["cost_usd"])
+    return usage
+
+
+def _bucket() -> dict:
+    return {"requests": 0, "llm_calls": 0, "prompt": 0, "completion": 0, "cost_usd": 0.0,
+            "sections": OrderedDict((s, 0) for s in SECTIONS)}
+
+
+def _add(bucket: dict, usage: Optional[dict]):
+    bucket["requests"] += 1
+    if not usage or usage.get("cached"):
+        return
+    bucket["llm_calls"] += 1
+    bucket["prompt"] += usage["prompt"]
+    bucket["completion"] += usage["completion"]
+    bucket["cost_usd"] += usage.get("cost_usd", 0.0)
+    for s in SECTIONS:
+        bucket["sections"][s] += usage["sections"].get(s, 0)
+
+
+def _finish(bucket: dict) -> dict:
+    calls = bucket["llm_calls"]
+    tokens = bucket["prompt"] + bucket["completion"]
+    return {
+        "requests": bucket["requests"],
+        "llm_calls": calls,
+        "prompt_mean": round(bucket["prompt"] / calls, 1) if calls else None,
+        "completion_mean": round(bucket["completion"] / calls, 1) if calls else None,
+        "tokens_per_request": round(tokens / bucket["requests"], 1) if bucket["requests"] else None,
+        "sections_mean": OrderedDict((s, round(n / calls, 1)) for s, n in bucket["sections"].items()) if calls else None,
+        "cost_usd": round(bucket["cost_usd"], 6),
+        "cost_per_1k_requests": round(bucket["cost_usd"] / bucket["requests"] * 1000, 4) if bucket["requests"] else None,
+    }
+
+
+class TokenSummary:
+    """Streaming token totals per category, turn index and second of load"""
+
+    def __init__(self):
+        self.total = _bucket()
+        self.categories = OrderedDict()
+        self.turns = OrderedDict()
+        self.seconds = {}
+
+    def add(self, category: str, turn_index: int, usage: Optional[dict], started_at: Optional[float]):
+        _add(self.total, usage)
+        _add(self.categories.setdefault(category, _bucket()), usage)
+        turn_key = str(turn_index) if turn_index < MAX_TURN_BUCKET else f"{MAX_TURN_BUCKET}+"
+        _add(self.turns.setdefault(turn_key, _bucket()), usage)
+        if started_at is not None:
+            second = self.seconds.setdefault(int(started_at), [0, 0, 0.0])
+            second[0] += 1
+            if usage and not usage.get("cached"):
+                second[1] += usage["prompt"] + usage["completion"]
+                second[2] += usage.get("cost_usd", 0.0)
+
+    def load(self) -> Optional[dict]:
+        """Tokens per second over the run (idle seconds inside the run count as 0)"""
+        if not self.seconds:
+            return None
+        first, last = min(self.seconds), max(self.seconds)
+        per_second = [self.seconds.get(t, [0, 0, 0.0]) for t in range(first, last + 1)]
+        tokens = [s[1] for s in per_second]
+        cost_per_s = sum(s[2] for s in per_second) / len(per_second)
+        return {
+            "seconds": len(per_second),
+            "requests_per_s": round(sum(s[0] for s in per_second) / len(per_second), 3),
+            "tokens_per_s": {"mean": round(sum(tokens) / len(tokens), 1), "p50": round(percentile(tokens, 50), 1),
+                             "p95": round(percentile(tokens, 95), 1), "max": max(tokens)},
+            "cost_per_hour_usd": round(cost_per_s * 3600, 4),
+            "timeline": [{"t": i, "requests": s[0], "tokens": s[1]} for i, s in enumerate(per_second)],
+        }
+
+    def to_dict(self) -> dict:
+        ordered_turns = sorted(self.turns.items(), key=lambda kv: int(kv[0].rstrip("+")))
+        return {
+            "overall": _finish(self.total),
+            "by_category": OrderedDict((k, _finish(v)) for k, v in self.categories.items()),
+            "by_turn": OrderedDict((k, _finish(v)) for k, v in ordered_turns),
+            "load": self.load(),
+        }
+
+
+def iter_turn_usage(records: Iterable[dict]) -> Iterator[Tuple[str, int, Optional[dict], Optional[float]]]:
+    """(category, turn index, usage, started_at) for harness case records or replay results"""
+    for record in records:
+        if "turns" in record:
+            category = f"{record['suite']}/{record.get('category', record['suite'])}"
+            for i, turn in enumerate(record["turns"]):
+                if record.get("cached"):
+                    # Served from the harness result cache - nothing was sent this run
+                    yield category, i, None, None
+                else:
+                    yield category, turn.get("turn", i), turn.get("usage"), turn.get("started_at")
+        elif "query_type" in record:
+            yield record["query_type"], record.get("turn", 0), record.get("usage"), record.get("started_at")
+
+
+def summarize_tokens(records: Iterable[dict], since: Optional[float] = None) -> dict:
+    """since: only turns started from then on count towards the per-second load"""
+    summary = TokenSummary()
+    for category, turn_index, usage, started_at in iter_turn_usage(records):
+        if since is not None and started_at is not None and started_at < since:
+            started_at = None
+        summary.add(category, turn_index, usage, started_at)
+    return summary.to_dict()
+
+
+def _share(row: dict) -> str:
+    sections = row.get("sections_mean")
+    if not sections or not row["prompt_mean"]:
+        return ""
+    top = sorted(sections.items(), key=lambda kv: -kv[1])[:3]
+    return ", ".join(f"{s} {n / row['prompt_mean'] * 100:.0f}%" for s, n in top if n)
+
+
+def _row(name: str, row: dict) -> str:
+    def num(v):
+        return f"{v:>8}" if v is not None else f"{'-':>8}"
+    cost = f"{row['cost_per_1k_requests']:.4f}" if row["cost_per_1k_requests"] is not None else "-"
+    return (f"{name[:34]:34} {row['requests']:>5} {row['llm_calls']:>5} {num(row['prompt_mean'])} "
+            f"{num(row['completion_mean'])} {cost:>9}   {_share(row)}")
+
+
+def print_token_summary(summary: dict):
+    overall = summary["overall"]
+    if not overall["llm_calls"]:
+        print("\n🧾 No token accounting in these results (backend without X-AI-Usage, or no LLM calls)")
+        return
+    header = f"{'':34} {'reqs':>5} {'llm':>5} {'prompt':>8} {'compl':>8} {'$/1k req':>9}   top prompt sections"
+    print(f"\n🧾 TOKENS BY QUERY CATEGORY\n{header}")
+    for name, row in summary["by_category"].items():
+        print(_row(name, row))
+    print(_row("ALL", overall))
+    print(f"\n🧾 TOKENS BY TURN INDEX\n{header}")
+    for name, row in summary["by_turn"].items():
+        print(_row(f"turn {name}", row))
+    load = summary["load"]
+    if load:
+        t = load["tokens_per_s"]
+        print(f"\n🔥 Load: {load['requests_per_s']} req/s over {load['seconds']}s | tokens/s mean {t['mean']} "
+              f"| p95 {t['p95']} | max {t['max']} | ≈ ${load['cost_per_hour_usd']}/hour at this rate")
+
+
+def load_records(path: str) -> Iterator[dict]:
+    """Run report (results), eval_replay.py report, or sink JSONL(.gz)"""
+    if path.endswith(".json"):
+        with open(path) as f:
+            report = json.load(f)
+        if report.get("results") is None and report.get("sink"):
+            yield from iter_records(report["sink"])
+            return
+        yield from report.get("results") or []
+        return
+    yield from iter_records(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Token and cost accounting from harness results")
+    parser.add_argument("results", help="EVAL_RUN_REPORT.json, a --sink JSONL(.gz) file or EVAL_REPLAY_REPORT.json")
+    parser.add_argument("--report", help="Write the summary as JSON")
+    args = parser.parse_args()
+
+    try:
+        summary = summarize_tokens(load_records(args.results))
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    print_token_summary(summary)
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({"timestamp": datetime.now().isoformat(), "source": args.results, **summary}, f, indent=2)
+        print(f"💾 Report saved to: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
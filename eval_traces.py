@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Trace Analyzer - Critical Path & Flame Breakdowns per Scenario
+==============================================================
+Joins backend spans (TRACE_FILE JSONL written by monitoring/tracing.ts) with
+a harness run report (EVAL_RUN_REPORT.json, whose turns carry the trace_id
+sent in `traceparent`) and reports, per scenario (suite):
+
+- critical path: for each request, the chain of spans that actually
+  determined its latency (last-finishing child first, as in Jaeger), with
+  the client-observed remainder attributed to "(network+queue)"
+- mean critical-path ms per stage, and the slowest requests with their
+  individual breakdowns - tail latency is explained request by request
+- folded stacks of self time (eval_traces/<suite>.folded) for
+  flamegraph.pl / speedscope
+
+Run: TRACE_FILE=traces/spans.jsonl npm run dev      (backend)
+     python eval_runner.py --no-cache
+     python eval_traces.py --spans backend/traces/spans.jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import OrderedDict, defaultdict
+from typing import Dict, List, Optional
+
+from eval_sink import iter_records
+
+DEFAULT_OUT_DIR = "eval_traces"
+NETWORK = "(network+queue)"
+
+
+def load_spans(path: str) -> Dict[str, List[dict]]:
+    """trace_id → spans (JSONL, streamed)"""
+    traces: Dict[str, List[dict]] = defaultdict(list)
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                span = json.loads(line)
+                traces[span["traceId"]].append(span)
+    return traces
+
+
+def load_turns(report_path: str) -> Dict[str, dict]:
+    """trace_id → {suite, case, message, client_ms} from a runner report"""
+    with open(report_path, "r", encoding="utf-8") as f:
+        report = json.load(f)
+    turns = {}
+    for result in report.get("results") or (iter_records(report["sink"]) if report.get("sink") else []):
+        if result.get("cached"):
+            continue
+        for turn in result.get("turns", []):
+            if turn.get("trace_id"):
+                turns[turn["trace_id"]] = {
+                    "suite": result["suite"],
+                    "case": result["id"],
+                    "message": turn.get("message", ""),
+                    "client_ms": (turn.get("response_time") or 0) * 1000,
+                }
+    return turns
+
+# ============================================
+# TREE ANALYSIS
+# ============================================
+
+
+class Trace:
+    def __init__(self, spans: List[dict]):
+        self.spans = {s["spanId"]: s for s in spans}
+        self.children: Dict[str, List[dict]] = defaultdict(list)
+        roots = []
+        for s in spans:
+            if s.get("parentSpanId") in self.spans:
+                self.children[s["parentSpanId"]].append(s)
+            else:
+                roots.append(s)
+        # The server span is the root; its parent is the harness' client span
+        self.root = min(roots, key=lambda s: s["startTimeMs"]) if roots else None
+
+    def critical_path(self) -> "OrderedDict[str, float]":
+        """Stage name → ms on the critical path"""
+        path: Dict[str, float] = OrderedDict()
+        if self.root:
+            self._walk(self.root, self.root["endTimeMs"], path)
+        return path
+
+    def _walk(self, span: dict, hi: float, path: Dict[str, float]):
+        lo = span["startTimeMs"]
+        cursor = min(span["endTimeMs"], hi)
+        for child in sorted(self.children[span["spanId"]], key=lambda c: c["endTimeMs"], reverse=True):
+            if child["startTimeMs"] >= cursor:
+                continue
+            child_end = min(child["endTimeMs"], cursor)
+            if cursor > child_end:
+                path[span["name"]] = path.get(span["name"], 0.0) + cursor - child_end
+            self._walk(child, child_end, path)
+            cursor = max(child["startTimeMs"], lo)
+        if cursor > lo:
+            path[span["name"]] = path.get(span["name"], 0.0) + cursor - lo
+
+    def folded(self) -> Dict[str, float]:
+        """'root;child;grandchild' → self ms (parallel children can't push self below 0)"""
+        stacks: Dict[str, float] = {}
+
+        def visit(span: dict, prefix: str):
+            stack = f"{prefix};{span['name']}" if prefix else span["name"]
+            covered = sum(
+                max(0.0, min(c["endTimeMs"], span["endTimeMs"]) - max(c["startTimeMs"], span["startTimeMs"]))
+                for c in self.children[span["spanId"]]
+            )
+            stacks[stack] = stacks.get(stack, 0.0) + max(0.0, span["durationMs"] - covered)
+            for child in self.children[span["spanId"]]:
+                visit(child, stack)
+
+        if self.root:
+            visit(self.root, "")
+        return stacks
+
+# ============================================
+# REPORTING
+# ============================================
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def analyze(traces: Dict[str, List[dict]], turns: Dict[str, dict], slowest: int = 3) -> dict:
+    scenarios: Dict[str, dict] = OrderedDict()
+    for trace_id, spans in traces.items():
+        trace = Trace(spans)
+        if not trace.root:
+            continue
+        turn = turns.get(trace_id, {"suite": "(untagged)", "case": None, "message": "", "client_ms": 0})
+        path = trace.critical_path()
+        total = trace.root["durationMs"]
+        if turn["client_ms"] > total:
+            path[NETWORK] = turn["client_ms"] - total
+            total = turn["client_ms"]
+
+        scenario = scenarios.setdefault(turn["suite"], {
+            "requests": 0, "totals": [], "stages": defaultdict(float), "folded": defaultdict(float), "traces": [],
+        })
+        scenario["requests"] += 1
+        scenario["totals"].append(total)
+        for stage, ms in path.items():
+            scenario["stages"][stage] += ms
+        for stack, ms in trace.folded().items():
+            scenario["folded"][stack] += ms
+        scenario["traces"].append({
+            "trace_id": trace_id,
+            "case": turn["case"],
+            "message": turn["message"][:80],
+            "total_ms": round(total, 1),
+            "critical_path": {k: round(v, 1) for k, v in sorted(path.items(), key=lambda kv: -kv[1])},
+        })
+
+    report = OrderedDict()
+    for suite, s in scenarios.items():
+        n = s["requests"]
+        report[suite] = {
+            "requests": n,
+            "p50_ms": round(percentile(s["totals"], 0.5), 1),
+            "p95_ms": round(percentile(s["totals"], 0.95), 1),
+            "critical_path_mean_ms": OrderedDict(
+                (stage, round(ms / n, 1)) for stage, ms in sorted(s["stages"].items(), key=lambda kv: -kv[1])
+            ),
+            "slowest": sorted(s["traces"], key=lambda t: -t["total_ms"])[:slowest],
+            "folded": dict(s["folded"]),
+        }
+    return report
+
+
+def print_report(report: dict):
+    for suite, s in report.items():
+        print(f"\n{'='*70}")
+        print(f"🔭 {suite}: {s['requests']} traced requests | p50 {s['p50_ms']}ms | p95 {s['p95_ms']}ms")
+        print(f"{'='*70}")
+        total = sum(s["critical_path_mean_ms"].values()) or 1
+        print("   Critical path (mean per request):")
+        for stage, ms in s["critical_path_mean_ms"].items():
+            bar = "█" * int(ms / total * 30)
+            print(f"   {stage:36} {ms:9.1f}ms {ms / total * 100:5.1f}% {bar}")
+        print("   Slowest requests:")
+        for t in s["slowest"]:
+            top = ", ".join(f"{k} {v}ms" for k, v in list(t["critical_path"].items())[:3])
+            print(f"   🐢 {t['total_ms']:8.1f}ms  {t['trace_id'][:12]}  '{t['message'][:40]}' → {top}")
+
+
+def write_folded(report: dict, out_dir: str) -> List[str]:
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for suite, s in report.items():
+        path = os.path.join(out_dir, f"{suite.replace('/', '_')}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, ms in sorted(s["folded"].items()):
+                # flamegraph.pl wants integer sample counts: use microseconds
+                if ms > 0:
+                    f.write(f"{stack} {int(ms * 1000)}\n")
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Critical-path and flame breakdowns from harness traces")
+    parser.add_argument("--spans", default=os.environ.get("TRACE_FILE", "backend/traces/spans.jsonl"))
+    parser.add_argument("--report", default="EVAL_RUN_REPORT.json", help="Runner report (maps traces to scenarios)")
+    parser.add_argument("--out-dir", default=DEFAULT_OUT_DIR)
+    parser.add_argument("--slowest", type=int, default=3)
+    parser.add_argument("--json", default="EVAL_TRACE_REPORT.json")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.spans):
+        print(f"❌ Error: no spans at {args.spans} (start the backend with TRACE_FILE set)")
+        sys.exit(1)
+    traces = load_spans(args.spans)
+    turns = load_turns(args.report) if os.path.exists(args.report) else {}
+    if turns:
+        # Only this run's traces
+        traces = {tid: spans for tid, spans in traces.items() if tid in turns}
+    print(f"📥 {len(traces)} traces from {args.spans}" + (f", joined with {args.report}" if turns else ""))
+
+    report = analyze(traces, turns, args.slowest)
+    print_report(report)
+    folded = write_folded(report, args.out_dir)
+    with open(args.json, "w", encoding="utf-8") as f:
+        json.dump({suite: {k: v for k, v in s.items() if k != "folded"} for suite, s in report.items()},
+                  f, indent=2, ensure_ascii=False)
+    print(f"\n🔥 Folded stacks: {', '.join(folded)}")
+    print(f"💾 Report saved to: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
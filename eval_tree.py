@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Conversation-Tree Scenarios - Shared-Prefix Forking
+===================================================
+Multi-turn journeys (the test_full_flow.py / test_mixed_usage.py style:
+"hello" → "suggest me a car" → budget → seating → usage → follow-up)
+described as trees, so every variant no longer replays the opening turns
+from scratch. Each prefix is sent once; its reply (history, cars,
+conversationState) is the snapshot every branch below it forks from, and
+the branches run concurrently.
+
+One tree per line in eval_trees.jsonl:
+
+  {
+    "id": "requirements_journey",
+    "suite": "journeys",
+    "category": "requirements_flow",
+    "description": "...",
+    "history": [...],                         - optional seeded conversationHistory
+    "tree": [                                 - explicit tree: root turns,
+      {"message": "hello",                      each with its branches
+       "branches": [
+         {"message": "10 lakhs", "expect": {"check": "reply"}, "branches": [...]},
+         ...
+       ]}
+    ]
+  }
+
+or, for combinatorial journeys, "levels" instead of "tree" - every turn of
+one level forks into every turn of the next (budget × seating × usage):
+
+    "levels": [["hello"], ["5 lakhs", "10 lakhs"], ["5", "7"], [{"message": "city", "expect": {...}}]]
+
+A turn is a message string or {"message", "expect"} with the same checks as
+eval_corpus.py. Every root-to-leaf path becomes one result in the runner's
+format (id = make_case_id(suite, path messages), so a path equal to a corpus
+case gets the same id); a failed turn fails every path below it.
+
+Run: python eval_tree.py --plan                      (paths and calls saved, no requests)
+     python eval_tree.py --concurrency 16
+     python eval_tree.py --tree requirements_journey --sink EVAL_TREE_RESULTS.jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from itertools import count
+from typing import Dict, Iterator, List, Optional
+
+import requests
+
+from eval_corpus import CHECKS, make_case_id
+from eval_io import open_jsonl
+from eval_runner import API_URL, run_turn
+from eval_sink import LatencyHistogram, ResultSink
+
+DEFAULT_TREES = "eval_trees.jsonl"
+DEFAULT_REPORT = "EVAL_TREE_REPORT.json"
+
+# ============================================
+# TREE FORMAT
+# ============================================
+
+
+class Node:
+    __slots__ = ("key", "turn", "children", "leaves", "depth")
+
+    def __init__(self, key: str, turn: dict, depth: int):
+        self.key = key
+        self.turn = turn
+        self.children: List["Node"] = []
+        self.leaves = 1
+        self.depth = depth
+
+
+def _turn(spec) -> dict:
+    if isinstance(spec, str):
+        return {"message": spec}
+    return {k: v for k, v in spec.items() if k != "branches"}
+
+
+def _build(specs: list, prefix: str, depth: int) -> List[Node]:
+    nodes = []
+    for i, spec in enumerate(specs):
+        node = Node(f"{prefix}{i}", _turn(spec), depth)
+        if isinstance(spec, dict) and spec.get("branches"):
+            node.children = _build(spec["branches"], f"{node.key}.", depth + 1)
+            node.leaves = sum(child.leaves for child in node.children)
+        nodes.append(node)
+    return nodes
+
+
+def expand_levels(levels: List[list]) -> list:
+    """levels → explicit tree specs (every turn of a level forks into the whole next level)"""
+    specs: list = []
+    for level in reversed(levels):
+        specs = [{**_turn(turn), "branches": specs} if specs else _turn(turn) for turn in level]
+    return specs
+
+
+def build_tree(tree: dict) -> List[Node]:
+    specs = expand_levels(tree["levels"]) if "levels" in tree else tree.get("tree", [])
+    return _build(specs, "", 0)
+
+
+def iter_nodes(nodes: List[Node]) -> Iterator[Node]:
+    for node in nodes:
+        yield node
+        yield from iter_nodes(node.children)
+
+
+def iter_leaf_paths(nodes: List[Node]) -> Iterator[List[str]]:
+    """Messages of every root-to-leaf path below nodes"""
+    for node in nodes:
+        if not node.children:
+            yield [node.turn["message"]]
+        for rest in iter_leaf_paths(node.children):
+            yield [node.turn["message"]] + rest
+
+
+def validate_tree(tree: dict) -> Optional[str]:
+    """Return an error message for a malformed tree, None if it is valid"""
+    for field in ("id", "suite"):
+        if not tree.get(field):
+            return f"missing '{field}'"
+    if not tree.get("tree") and not tree.get("levels"):
+        return "needs 'tree' or 'levels'"
+    if "levels" in tree and not all(tree["levels"]):
+        return "empty level"
+    for node in iter_nodes(build_tree(tree)):
+        if not isinstance(node.turn.get("message"), str) or not node.turn["message"]:
+            return f"node {node.key}: missing 'message'"
+        check = (node.turn.get("expect") or {}).get("check", "reply")
+        if check not in CHECKS:
+            return f"node {node.key}: unknown check '{check}'"
+    return None
+
+
+def iter_trees(path: str = DEFAULT_TREES, ids: Optional[List[str]] = None) -> Iterator[dict]:
+    with open_jsonl(path) as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            tree = json.loads(line)
+            if ids and tree.get("id") not in ids:
+                continue
+            error = validate_tree(tree)
+            if error:
+                raise ValueError(f"{path}:{line_no}: {error}")
+            yield tree
+
+
+def plan(tree: dict) -> dict:
+    """Backend calls for the tree vs replaying every path from the first turn"""
+    roots = build_tree(tree)
+    calls = paths = linear = 0
+    for node in iter_nodes(roots):
+        calls += 1
+        if not node.children:
+            paths += 1
+            linear += node.depth + 1
+    return {"paths": paths, "calls": calls, "linear_calls": linear,
+            "saving": round(linear / calls, 2) if calls else None}
+
+# ============================================
+# EXECUTOR
+# ============================================
+
+
+class TreeRun:
+    """Forks branches from each finished prefix; emits one result per root-to-leaf path"""
+
+    def __init__(self, api_url: str, run_id: str, concurrency: int):
+        self.api_url = api_url
+        self.run_id = run_id
+        self.concurrency = concurrency
+        self.local = threading.local()
+        self.index = count()
+        self.calls = LatencyHistogram()
+        self.errors = 0
+
+    def _session(self) -> requests.Session:
+        if not hasattr(self.local, "session"):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def _run_node(self, tree: dict, node: Node, history: List[dict]) -> tuple:
+        # Branches fork into their own backend session (the prefix's stays with the prefix)
+        session_id = f"eval-{tree['id']}-{node.key}-{self.run_id}"
+        return run_turn(self._session(), node.turn, self.api_url, session_id, history)
+
+    def _path_result(self, tree: dict, turns: List[dict], complete: bool,
+                     messages: Optional[List[str]] = None) -> dict:
+        # Failed paths keep the id of the full path they stand for
+        messages = messages or [t["message"] for t in turns]
+        return {
+            "id": make_case_id(tree["suite"], messages),
+            "index": next(self.index),
+            "suite": tree["suite"],
+            "category": tree.get("category", tree["suite"]),
+            "description": tree.get("description", ""),
+            "tree": tree["id"],
+            "expect": turns[0].get("expect", {}) if turns else {},
+            "passed": complete and all(t["passed"] for t in turns),
+            "response_time": sum(t.get("response_time", 0) for t in turns),
+            "turns": [{"turn": i, **t} for i, t in enumerate(turns)],
+        }
+
+    def _failed_paths(self, tree: dict, node: Node, turns: List[dict]) -> Iterator[dict]:
+        """A failed turn ends every path below it (as a failed turn ends a corpus case)"""
+        prefix = [t["message"] for t in turns[:-1]]
+        for messages in iter_leaf_paths([node]):
+            yield self._path_result(tree, turns, complete=False, messages=prefix + messages)
+
+    def run(self, trees: List[dict]) -> Iterator[dict]:
+        """Path results as they complete, across all trees at once"""
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            pending = {}
+
+            def fork(tree: dict, nodes: List[Node], history: List[dict], turns: List[dict]):
+                for node in nodes:
+                    future = executor.submit(self._run_node, tree, node, history)
+                    pending[future] = (tree, node, history, turns)
+
+            for tree in trees:
+                fork(tree, build_tree(tree), list(tree.get("history", [])), [])
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    tree, node, history, turns = pending.pop(future)
+                    result, entries = future.result()
+                    result.update(node=node.key, shared_by=node.leaves)
+                    if result.get("error"):
+                        self.errors += 1
+                    elif result.get("response_time") is not None:
+                        self.calls.add(result["response_time"])
+                    path = turns + [{**{k: v for k, v in node.turn.items() if k != "message"}, **result}]
+                    if entries is None:
+                        yield from self._failed_paths(tree, node, path)
+                    elif not node.children:
+                        yield self._path_result(tree, path, complete=True)
+                    else:
+                        # The snapshot: every branch continues from this exact reply
+                        fork(tree, node.children, history + entries, path)
+
+# ============================================
+# REPORTING
+# ============================================
+
+
+def print_plan(plans: Dict[str, dict]):
+    print(f"{'Tree':32} {'paths':>7} {'calls':>7} {'linear':>8} {'saving':>8}")
+    for tree_id, p in plans.items():
+        print(f"{tree_id:32} {p['paths']:7} {p['calls']:7} {p['linear_calls']:8} {p['saving']:7}x")
+    calls = sum(p["calls"] for p in plans.values())
+    linear = sum(p["linear_calls"] for p in plans.values())
+    print(f"{'TOTAL':32} {sum(p['paths'] for p in plans.values()):7} {calls:7} {linear:8} "
+          f"{round(linear / calls, 2) if calls else 0:7}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run conversation trees, forking branches from shared prefixes")
+    parser.add_argument("--trees", default=DEFAULT_TREES)
+    parser.add_argument("--tree", action="append", help="Only these tree ids (repeatable)")
+    parser.add_argument("--url", default=API_URL)
+    parser.add_argument("--concurrency", type=int, default=8, help="Turns in flight at once")
+    parser.add_argument("--plan", action="store_true", help="Print paths and backend calls, send nothing")
+    parser.add_argument("--sink", help="Stream path results to this JSONL file instead of the report")
+    parser.add_argument("--report", default=DEFAULT_REPORT)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.trees):
+        print(f"❌ Error: {args.trees} not found")
+        sys.exit(1)
+    trees = list(iter_trees(args.trees, args.tree))
+    if not trees:
+        print("❌ Error: no trees selected")
+        sys.exit(1)
+    plans = OrderedDict((tree["id"], plan(tree)) for tree in trees)
+    print(f"🌳 {len(trees)} conversation trees from {args.trees}\n")
+    print_plan(plans)
+    if args.plan:
+        return
+
+    run_id = uuid.uuid4().hex[:8]
+    runner = TreeRun(args.url, run_id, args.concurrency)
+    sink = ResultSink(args.sink, append=False) if args.sink else None
+    results: List[dict] = []
+    by_tree: Dict[str, Dict[str, int]] = OrderedDict((tree["id"], {"paths": 0, "passed": 0}) for tree in trees)
+    started = time.time()
+    print(f"\n🚀 Running with {args.concurrency} turns in flight...")
+    for result in runner.run(trees):
+        by_tree[result["tree"]]["paths"] += 1
+        by_tree[result["tree"]]["passed"] += result["passed"]
+        if sink:
+            sink.write(result)
+        else:
+            results.append(result)
+        if not result["passed"]:
+            failed = next((t for t in result["turns"] if not t["passed"]), result["turns"][-1])
+            print(f"   ❌ {result['tree']}: {' → '.join(t['message'] for t in result['turns'])}"
+                  f" ({failed.get('error') or failed.get('actual') or failed['check']})")
+    elapsed = time.time() - started
+    if sink:
+        sink.close()
+
+    print(f"\n{'='*70}")
+    for tree_id, t in by_tree.items():
+        p = plans[tree_id]
+        print(f"🌳 {tree_id}: {t['passed']}/{t['paths']} paths passed | "
+              f"{p['calls']} calls instead of {p['linear_calls']} ({p['saving']}x)")
+    calls = runner.calls.to_dict()
+    total_calls = sum(p["calls"] for p in plans.values())
+    linear_calls = sum(p["linear_calls"] for p in plans.values())
+    passed = sum(t["passed"] for t in by_tree.values())
+    paths = sum(t["paths"] for t in by_tree.values())
+    print(f"⚡ {paths} paths via {total_calls} backend calls in {elapsed:.1f}s "
+          f"(linear replay: {linear_calls}) - {passed}/{paths} passed")
+    if calls["count"]:
+        print(f"⏱️  Per call: p50 {calls['p50']:.2f}s | p95 {calls['p95']:.2f}s | {runner.errors} errors")
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "run_id": run_id,
+        "concurrency": args.concurrency,
+        "elapsed_seconds": round(elapsed, 2),
+        "plans": plans,
+        "trees": by_tree,
+        "calls": {**calls, "errors": runner.errors},
+    }
+    if sink:
+        report["sink"] = args.sink
+    else:
+        report["results"] = results
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"💾 Report saved to: {args.report}")
+
+    if passed < paths:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Bytes on the Wire - Full History vs Server-Side Sessions
+========================================================
+Runs the multi-turn corpus cases twice against the AI chat API:
+
+- full:   every turn carries the whole conversationHistory (cars and
+          conversationState included) - what the frontend always did
+- deltas: the message plus the sessionToken / sessionVersion, with history kept by
+          the backend session store (ai-engine/chat-session.ts); a 409
+          resync resends the history once and is counted
+
+and reports request/response body bytes per turn index and per session, so
+the quadratic growth of the full-history mode is visible next to the flat
+delta mode. Bodies only (HTTP headers are the same in both modes).
+
+Run: python eval_wire.py
+     python eval_wire.py --suite full_flow --suite mixed_usage --concurrency 8
+"""
+
+import argparse
+import json
+import sys
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List
+
+import requests
+
+from eval_corpus import DEFAULT_CORPUS, iter_cases
+from eval_runner import API_URL, run_case
+
+DEFAULT_REPORT = "EVAL_WIRE_REPORT.json"
+MODES = ("full", "deltas")
+
+
+def run_mode(cases: List[dict], api_url: str, deltas: bool, concurrency: int) -> List[dict]:
+    run_id = uuid.uuid4().hex[:8]
+    local = threading.local()
+
+    def worker(case: dict) -> dict:
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        return run_case(local.session, case, api_url, run_id, deltas=deltas)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(worker, cases))
+
+
+def summarize_mode(results: List[dict]) -> dict:
+    by_turn: Dict[int, dict] = OrderedDict()
+    sessions = []
+    resyncs = errors = 0
+    for result in results:
+        session_bytes = 0
+        for turn in result["turns"]:
+            if "request_bytes" not in turn:
+                errors += 1
+                continue
+            entry = by_turn.setdefault(turn["turn"], {"n": 0, "request_bytes": 0, "response_bytes": 0})
+            entry["n"] += 1
+            entry["request_bytes"] += turn["request_bytes"]
+            entry["response_bytes"] += turn["response_bytes"]
+            session_bytes += turn["request_bytes"] + turn["response_bytes"]
+            resyncs += bool(turn.get("resynced"))
+            errors += bool(turn.get("error"))
+        sessions.append(session_bytes)
+    return {
+        "per_turn": OrderedDict(
+            (i, {"requests": e["n"],
+                 "request_bytes": round(e["request_bytes"] / e["n"]),
+                 "response_bytes": round(e["response_bytes"] / e["n"])})
+            for i, e in sorted(by_turn.items())
+        ),
+        "request_bytes": sum(e["request_bytes"] for e in by_turn.values()),
+        "response_bytes": sum(e["response_bytes"] for e in by_turn.values()),
+        "mean_session_bytes": round(sum(sessions) / len(sessions)) if sessions else 0,
+        "resyncs": resyncs,
+        "errors": errors,
+        "passed": sum(1 for r in results if r["passed"]),
+        "cases": len(results),
+    }
+
+
+def print_comparison(summary: Dict[str, dict]):
+    full, deltas = summary["full"], summary["deltas"]
+    print("\n📦 Request body bytes per turn (mean)")
+    print(f"{'Turn':>6} {'full':>10} {'deltas':>10} {'saved':>8}   {'response':>10}")
+    for i, f in full["per_turn"].items():
+        d = deltas["per_turn"].get(i)
+        if not d:
+            continue
+        saved = (1 - d["request_bytes"] / f["request_bytes"]) * 100 if f["request_bytes"] else 0
+        print(f"{i + 1:>6} {f['request_bytes']:>10} {d['request_bytes']:>10} {saved:>7.1f}%   {f['response_bytes']:>10}")
+
+    total_full = full["request_bytes"] + full["response_bytes"]
+    total_deltas = deltas["request_bytes"] + deltas["response_bytes"]
+    print(f"\n{'='*70}")
+    print(f"📤 Requests: {full['request_bytes']:,} → {deltas['request_bytes']:,} bytes "
+          f"({(1 - deltas['request_bytes'] / max(full['request_bytes'], 1)) * 100:.1f}% less)")
+    print(f"🔁 Round trips incl. responses: {total_full:,} → {total_deltas:,} bytes | "
+          f"per session {full['mean_session_bytes']:,} → {deltas['mean_session_bytes']:,}")
+    print(f"♻️  Resyncs: {deltas['resyncs']} | errors: full {full['errors']}, deltas {deltas['errors']} | "
+          f"passed: full {full['passed']}/{full['cases']}, deltas {deltas['passed']}/{deltas['cases']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes per turn with full history vs server-side chat sessions")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--suite", action="append", help="Only these suites (default: every multi-turn case)")
+    parser.add_argument("--min-turns", type=int, default=2)
+    parser.add_argument("--url", default=API_URL)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--report", default=DEFAULT_REPORT)
+    args = parser.parse_args()
+
+    cases = [c for c in iter_cases(args.corpus, args.suite) if len(c["turns"]) >= args.min_turns]
+    if not cases:
+        print(f"❌ Error: no cases with {args.min_turns}+ turns in {args.corpus}")
+        sys.exit(1)
+    print(f"📂 {len(cases)} multi-turn cases ({sum(len(c['turns']) for c in cases)} turns per mode)")
+
+    summary: Dict[str, dict] = OrderedDict()
+    for mode in MODES:
+        print(f"🚀 Running {mode}...")
+        summary[mode] = summarize_mode(run_mode(cases, args.url, mode == "deltas", args.concurrency))
+    print_comparison(summary)
+
+    with open(args.report, "w") as f:
+        json.dump({"timestamp": datetime.now().isoformat(), "cases": len(cases), **summary}, f, indent=2)
+    print(f"💾 Report saved to: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+RAGAS Batch Scoring Engine
+==========================
+Offline, multi-process scoring of recorded question/answer pairs using the
+same metrics as ragas_evaluation.py:
+- Faithfulness
+- Context Relevancy
+- Answer Relevancy
+- Hallucination Score
+
+Input is JSONL (optionally .gz), one record per line. Recognised fields:
+  question | query | message            - the user question
+  answer | reply | response            - the AI answer
+  expected_context_keywords | keywords - optional; derived from the question otherwise
+  category | queryType                 - optional; used for the breakdown
+
+All matchers are compiled once per worker process; each record is lowercased
+once and work is distributed to a process pool in chunks.
+
+Run: python ragas_batch.py interactions.jsonl --out scores.jsonl --workers 8
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from datetime import datetime
+from functools import lru_cache
+from itertools import islice
+from multiprocessing import Pool
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from eval_io import open_jsonl
+
+METRICS = ["faithfulness", "context_relevancy", "answer_relevancy", "hallucination_score", "overall"]
+
+# ============================================
+# PRECOMPILED MATCHERS
+# ============================================
+
+# Same vocabulary as ragas_evaluation.calculate_context_relevancy (substring match)
+CAR_MENTION_RE = re.compile(r"creta|seltos|nexon|swift|xuv|harrier")
+APOLOGY_RE = re.compile(r"sorry|don't know")
+DIGIT_RE = re.compile(r"\d")
+PRICE_RE = re.compile(r"₹?(\d+\.?\d*)\s*(?:lakh|L|lakhs)", re.IGNORECASE)
+SPECIFIC_DECIMAL_RE = re.compile(r"\d+\.\d{3,}")
+PRICE_ANSWER_RE = re.compile(r"₹|lakh|L")           # "L" is case-sensitive, as in the original
+KMPL_RE = re.compile(r"kmpl|km/l")
+SAFETY_ANSWER_RE = re.compile(r"star|airbag|ncap")
+COMPARISON_ANSWER_RE = re.compile(r"both|vs| and ")
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "what which when where about tell give show best good does have with from that this there their "
+    "under over than then into your should would could much many price cost".split()
+)
+
+
+@lru_cache(maxsize=4096)
+def _lower_keywords(keywords: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Keyword lists repeat across records (same category) - lowercase once"""
+    return tuple(kw.lower() for kw in keywords)
+
+
+def derive_keywords(question_lower: str) -> Tuple[str, ...]:
+    """Fallback context keywords for production logs without annotations"""
+    seen = []
+    for token in TOKEN_RE.findall(question_lower):
+        if len(token) >= 4 and token not in STOPWORDS and token not in seen:
+            seen.append(token)
+    return tuple(seen[:6])
+
+
+# ============================================
+# METRICS (same semantics as ragas_evaluation.py)
+# ============================================
+
+def score_answer(question: str, answer: str, keywords: Optional[Iterable[str]] = None) -> Dict[str, float]:
+    """Score one answer; lowercases each string once"""
+    if not answer:
+        return {m: 0.0 for m in METRICS}
+
+    answer_lower = answer.lower()
+    question_lower = question.lower()
+    kws = _lower_keywords(tuple(keywords)) if keywords else derive_keywords(question_lower)
+
+    # Faithfulness
+    matches = sum(1 for kw in kws if kw in answer_lower)
+    faithfulness = min(1.0, matches / max(len(kws) * 0.5, 1))
+
+    # Context relevancy
+    indicators = (
+        DIGIT_RE.search(answer) is not None,
+        20 < len(answer) < 500,
+        APOLOGY_RE.search(answer_lower) is None,
+        CAR_MENTION_RE.search(answer_lower) is not None,
+    )
+    context_relevancy = sum(indicators) / len(indicators)
+
+    # Answer relevancy
+    checks = []
+    if "price" in question_lower or "cost" in question_lower:
+        checks.append(PRICE_ANSWER_RE.search(answer) is not None or "lakh" in answer_lower)
+    if "mileage" in question_lower:
+        checks.append(KMPL_RE.search(answer_lower) is not None)
+    if "safe" in question_lower:
+        checks.append(SAFETY_ANSWER_RE.search(answer_lower) is not None)
+    if " vs " in question_lower or "compare" in question_lower:
+        checks.append(COMPARISON_ANSWER_RE.search(answer_lower) is not None)
+    if checks:
+        answer_relevancy = sum(checks) / len(checks)
+    else:
+        answer_relevancy = 0.7 if len(answer) > 50 else 0.4
+
+    # Hallucination
+    issues = 0
+    for price in PRICE_RE.findall(answer):
+        try:
+            value = float(price)
+        except ValueError:
+            continue
+        if value < 3 or value > 80:
+            issues += 1
+    if len(SPECIFIC_DECIMAL_RE.findall(answer)) > 2:
+        issues += 1
+    hallucination = 1.0 if not issues else max(0, 1 - issues * 0.3)
+
+    overall = (faithfulness + context_relevancy + answer_relevancy + hallucination) / 4
+    return {
+        "faithfulness": faithfulness,
+        "context_relevancy": context_relevancy,
+        "answer_relevancy": answer_relevancy,
+        "hallucination_score": hallucination,
+        "overall": overall,
+    }
+
+
+# ============================================
+# BATCH ENGINE
+# ============================================
+
+def _field(record: dict, *names: str, default=None):
+    for name in names:
+        value = record.get(name)
+        if value not in (None, ""):
+            return value
+    return default
+
+
+def _new_aggregate() -> dict:
+    return {"count": 0, "errors": 0, "sums": {m: 0.0 for m in METRICS}, "categories": {}}
+
+
+def _merge_aggregate(total: dict, part: dict):
+    total["count"] += part["count"]
+    total["errors"] += part["errors"]
+    for m in METRICS:
+        total["sums"][m] += part["sums"][m]
+    for cat, (count, overall_sum) in part["categories"].items():
+        prev = total["categories"].get(cat, (0, 0.0))
+        total["categories"][cat] = (prev[0] + count, prev[1] + overall_sum)
+
+
+def score_chunk(chunk: Tuple[int, List[str], bool]) -> Tuple[List[dict], dict]:
+    """Worker: parse + score a chunk of raw JSONL lines"""
+    start_index, lines, keep_records = chunk
+    aggregate = _new_aggregate()
+    scored = []
+
+    for offset, line in enumerate(lines):
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            aggregate["errors"] += 1
+            continue
+
+        question = str(_field(record, "question", "query", "message", default=""))
+        answer = str(_field(record, "answer", "reply", "response", default=""))
+        keywords = _field(record, "expected_context_keywords", "keywords")
+        category = str(_field(record, "category", "queryType", default="uncategorized"))
+
+        scores = score_answer(question, answer, keywords)
+        aggregate["count"] += 1
+        for m in METRICS:
+            aggregate["sums"][m] += scores[m]
+        count, overall_sum = aggregate["categories"].get(category, (0, 0.0))
+        aggregate["categories"][category] = (count + 1, overall_sum + scores["overall"])
+
+        if keep_records:
+            scored.append({
+                "index": start_index + offset,
+                "id": _field(record, "id", "_id", "sessionId"),
+                "category": category,
+                **{m: round(v, 4) for m, v in scores.items()},
+            })
+
+    return scored, aggregate
+
+
+def iter_chunks(lines: Iterator[str], chunk_size: int, keep_records: bool) -> Iterator[Tuple[int, List[str], bool]]:
+    """Lazily slice the input stream into chunks (never loads the whole file)"""
+    index = 0
+    non_empty = (line for line in lines if line.strip())
+    while True:
+        chunk = list(islice(non_empty, chunk_size))
+        if not chunk:
+            return
+        yield index, chunk, keep_records
+        index += len(chunk)
+
+
+def run_batch(path: str, out_path: Optional[str], workers: int, chunk_size: int) -> dict:
+    total = _new_aggregate()
+    keep_records = out_path is not None
+    out = open(out_path, "w", encoding="utf-8") if out_path else None
+    start = time.perf_counter()
+
+    try:
+        with open_jsonl(path) as source:
+            chunks = iter_chunks(source, chunk_size, keep_records)
+            if workers <= 1:
+                results = map(score_chunk, chunks)
+                pool = None
+            else:
+                pool = Pool(processes=workers)
+                results = pool.imap(score_chunk, chunks)
+
+            try:
+                for scored, aggregate in results:
+                    _merge_aggregate(total, aggregate)
+                    if out:
+                        out.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in scored))
+            finally:
+                if pool:
+                    pool.close()
+                    pool.join()
+    finally:
+        if out:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    count = total["count"]
+    summary = {m: round(total["sums"][m] / count, 4) if count else 0 for m in METRICS}
+    categories = {
+        cat: {"count": c, "overall": round(s / c, 4)}
+        for cat, (c, s) in sorted(total["categories"].items(), key=lambda item: -item[1][0])
+    }
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "input": path,
+        "records": count,
+        "parse_errors": total["errors"],
+        "workers": workers,
+        "chunk_size": chunk_size,
+        "elapsed_seconds": round(elapsed, 3),
+        "records_per_second": round(count / elapsed) if elapsed > 0 else None,
+        "summary": summary,
+        "categories": categories,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch RAGAS scoring over JSONL answer corpora")
+    parser.add_argument("input", help="JSONL file (.gz supported, '-' for stdin)")
+    parser.add_argument("--out", help="Write per-record scores to this JSONL file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--report", default="RAGAS_BATCH_REPORT.json")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🔍 RAGAS Batch Scoring")
+    print("=" * 60)
+    print(f"Input: {args.input} | workers: {args.workers} | chunk: {args.chunk_size}")
+
+    report = run_batch(args.input, args.out, args.workers, args.chunk_size)
+    s = report["summary"]
+
+    print(f"""
+┌────────────────────────┬─────────┐
+│ Metric                 │ Score   │
+├────────────────────────┼─────────┤
+│ Faithfulness           │ {s['faithfulness']:.2f}    │
+│ Context Relevancy      │ {s['context_relevancy']:.2f}    │
+│ Answer Relevancy       │ {s['answer_relevancy']:.2f}    │
+│ Hallucination Score    │ {s['hallucination_score']:.2f}    │
+├────────────────────────┼─────────┤
+│ OVERALL RAGAS SCORE    │ {s['overall']:.2f}    │
+└────────────────────────┴─────────┘
+    """)
+    print(f"⚡ Scored {report['records']} records in {report['elapsed_seconds']}s "
+          f"({report['records_per_second']} records/s, {report['parse_errors']} parse errors)")
+
+    print("\n📊 By Category:")
+    for cat, data in list(report["categories"].items())[:15]:
+        print(f"   {cat}: {data['overall']:.2f} ({data['count']} records)")
+
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Report saved to: {args.report}")
+    if args.out:
+        print(f"💾 Per-record scores saved to: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
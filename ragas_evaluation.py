@@ -12,12 +12,17 @@ Install: pip install ragas langchain openai requests
 import requests
 import json
 import os
+import re
 from datetime import datetime
 
 # Configuration
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:5001")
 API_ENDPOINT = f"{BACKEND_URL}/api/ai-chat"
 
+# Compiled once (see ragas_batch.py for scoring large JSONL corpora)
+PRICE_RE = re.compile(r'₹?(\d+\.?\d*)\s*(?:lakh|L|lakhs)', re.IGNORECASE)
+SPECIFIC_DECIMAL_RE = re.compile(r'\d+\.\d{3,}')
+
 # Test cases with expected context and ground truth
 TEST_CASES = [
     {
@@ -170,8 +175,7 @@ def calculate_hallucination_score(answer: str) -> float:
     issues = []
     
     # Check for unrealistic prices (Indian car context)
-    import re
-    price_matches = re.findall(r'₹?(\d+\.?\d*)\s*(?:lakh|L|lakhs)', answer, re.IGNORECASE)
+    price_matches = PRICE_RE.findall(answer)
     for price in price_matches:
         try:
             value = float(price)
@@ -182,7 +186,7 @@ def calculate_hallucination_score(answer: str) -> float:
     
     # Check for suspiciously specific numbers that might be hallucinated
     # (e.g., "exactly 17.3456 kmpl" - too precise)
-    specific_decimals = re.findall(r'\d+\.\d{3,}', answer)
+    specific_decimals = SPECIFIC_DECIMAL_RE.findall(answer)
     if len(specific_decimals) > 2:
         issues.append("Too many overly specific numbers")
     